@@ -1,9 +1,41 @@
+import re
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.GasOptimizationAgent import GasOptimizationAgent
+from agents.blockchain.analysis import BLOCK_GAS_LIMIT, GAS, index_file, loop_iteration_gas, unbounded_loops
+from agents.blockchain.compiler import CompilerUnavailable
+from agents.blockchain.gas_profiler import EVMUnavailable, profile_project, run_blocking
+from agents.blockchain.storage_layout import analyze_storage
+from pipeline.registry import register_agent
+
+# Temps de bloc du réseau cible pour l'estimation du débit
+BLOCK_TIME = 12
+# Opérations unitaires habituellement répétées par un même appelant
+BATCHABLE = re.compile(r'^(safe|owner)?(mint|transfer|burn|approve|airdrop|claim|deposit|stake)', re.I)
+ENVIRONMENT_ACCESS = re.compile(r'\b(msg|block|tx)\s*\.|\bthis\b|\bgasleft\s*\(|\bselfdestruct\s*\(')
+
+
+@register_agent('blockchain_performance',
+                tasks={'analyze': 'analyze_blockchain_performance', 'benchmark': 'run_benchmarks'},
+                inputs=('project',),
+                outputs=('gas_analysis', 'throughput_capacity', 'latency_analysis', 'storage_efficiency',
+                         'scalability_analysis', 'optimizations', 'benchmarks'),
+                cost='moderate', description='Gas, débit, latence et stockage mesurés sur EVM locale')
 class BlockchainPerformanceAgent:
     """Agent spécialisé en performance blockchain"""
-    
+
+    def __init__(self):
+        self.gas_agent = GasOptimizationAgent()
+        # Mesures sur EVM locale, une seule exécution par projet
+        self._measurements = {}
+
     def analyze_blockchain_performance(self, project):
         """Analyse de performance blockchain"""
-        
+
         performance_report = {
             'gas_analysis': self.analyze_gas_consumption(project),
             'throughput_capacity': self.calculate_throughput(project),
@@ -11,7 +43,7 @@ class BlockchainPerformanceAgent:
             'storage_efficiency': self.analyze_storage_usage(project),
             'scalability_analysis': self.assess_scalability(project)
         }
-        
+
         # Optimisations spécifiques
         performance_report['optimizations'] = {
             'gas_optimization_techniques': self.suggest_gas_optimizations(project),
@@ -20,7 +52,7 @@ class BlockchainPerformanceAgent:
             'calldata_usage': self.optimize_calldata_usage(project),
             'view_pure_functions': self.check_function_visibility(project)
         }
-        
+
         # Benchmarks comparatifs
         performance_report['benchmarks'] = self.run_benchmarks(
             project,
@@ -31,5 +63,188 @@ class BlockchainPerformanceAgent:
                 'storage_cost'
             ]
         )
-        
-        return performance_report
\ No newline at end of file
+
+        return performance_report
+
+    def analyze_gas_consumption(self, project):
+        """Gas mesuré par contrat: déploiement, par fonction, appel le plus coûteux"""
+        measured = self._measure(project)
+        if not measured['available']:
+            return measured
+        contracts = {}
+        for m in measured['contracts']:
+            contracts[m.contract] = {
+                'deployment': m.deployment,
+                'functions': m.functions,
+                'most_expensive': max(m.functions, key=m.functions.get) if m.functions else None,
+                'errors': m.errors,
+                'skipped': m.skipped
+            }
+        return {'available': True, 'contracts': contracts}
+
+    def calculate_throughput(self, project):
+        """Transactions par bloc et par seconde pour chaque fonction mesurée"""
+        measured = self._measure(project)
+        if not measured['available']:
+            return measured
+        throughput = {}
+        for m in measured['contracts']:
+            for function, gas in m.functions.items():
+                if gas:
+                    per_block = BLOCK_GAS_LIMIT // gas
+                    throughput[f'{m.contract}.{function}'] = {
+                        'gas': gas, 'tx_per_block': per_block, 'tx_per_second': round(per_block / BLOCK_TIME, 1)
+                    }
+        return {'available': True, 'block_gas_limit': BLOCK_GAS_LIMIT, 'block_time': BLOCK_TIME,
+                'functions': throughput}
+
+    def measure_latency(self, project):
+        """Temps d'exécution sur l'EVM locale (déploiement et appels, en secondes)"""
+        measured = self._measure(project)
+        if not measured['available']:
+            return measured
+        durations = {f'{m.contract}.{label}': seconds
+                     for m in measured['contracts'] for label, seconds in m.durations.items()}
+        values = list(durations.values())
+        return {
+            'available': True,
+            'calls': durations,
+            'median': statistics.median(values) if values else None,
+            'max': max(values) if values else None
+        }
+
+    def analyze_storage_usage(self, project):
+        """Slots de stockage occupés et coût d'initialisation par contrat"""
+        usage = {}
+        for path, source in self._sources(project):
+            for report in analyze_storage(source):
+                usage[report.name] = {
+                    'file': path.name,
+                    'slots': report.current_slots,
+                    'optimal_slots': report.optimal_slots,
+                    'initialization_gas': report.current_slots * GAS['sstore_set']
+                }
+        return usage
+
+    def assess_scalability(self, project):
+        """Boucles dont le nombre d'itérations croît avec l'état du contrat"""
+        risks = []
+        for path, _ in self._sources(project):
+            index = index_file(path)
+            for function, loop, bound in unbounded_loops(index):
+                per_iteration = loop_iteration_gas(index, function, loop)
+                risks.append({
+                    'file': path.name, 'contract': function.contract, 'function': function.name,
+                    'line': loop.line, 'bound': bound, 'gas_per_iteration': per_iteration,
+                    'max_iterations': BLOCK_GAS_LIMIT // per_iteration,
+                    'message': f"Boucle bornée par {bound}: le coût croît avec les données "
+                               "jusqu'à la limite de gas du bloc"
+                })
+        return risks
+
+    def suggest_gas_optimizations(self, project):
+        return self._per_file(project, self.gas_agent.find_optimization_opportunities)
+
+    def check_batch_operations(self, project):
+        """Fonctions par lot existantes et fonctions unitaires sans équivalent par lot"""
+        batch, candidates = [], []
+        for path, _ in self._sources(project):
+            index = index_file(path)
+            for contract in index.contracts:
+                if contract.kind in ('interface', 'library'):
+                    continue
+                public = [f for f in contract.functions if f.kind == 'function' and f.is_public and f.mutates_state]
+                batched = {f.name for f in public if any(p.type.endswith('[]') for p in f.parameters)}
+                batch.extend(f'{contract.name}.{name}' for name in sorted(batched))
+                for function in public:
+                    if function.name in batched or not function.parameters or not BATCHABLE.search(function.name):
+                        continue
+                    if not any(function.name.lower() in name.lower() for name in batched):
+                        candidates.append({'file': path.name, 'contract': contract.name,
+                                           'function': function.name, 'line': function.line})
+        return {'batch_functions': batch, 'candidates': candidates}
+
+    def check_storage_packing(self, project):
+        return self._per_file(project, self.gas_agent.pack_storage_variables)
+
+    def optimize_calldata_usage(self, project):
+        return self._per_file(project, self.gas_agent.optimize_data_location)
+
+    def check_function_visibility(self, project):
+        """Fonctions sans effet de bord non déclarées view/pure"""
+        suggestions = []
+        for path, _ in self._sources(project):
+            index = index_file(path)
+            for contract in index.contracts:
+                mutating = {f.name for f in contract.functions if f.mutates_state}
+                for function in contract.functions:
+                    if (function.kind != 'function' or not function.has_body
+                            or function.mutability not in ('nonpayable', None) or function.override):
+                        continue
+                    body = index.body(function)
+                    if (function.state_writes or function.events or function.external_calls
+                            or function.uses.get('assembly')
+                            or any(re.search(rf'(?<![\w.]){re.escape(n)}\s*\(', body) for n in mutating)):
+                        continue
+                    suggested = 'pure' if not function.state_reads and not ENVIRONMENT_ACCESS.search(body) else 'view'
+                    suggestions.append({'file': path.name, 'contract': contract.name, 'function': function.name,
+                                        'line': function.line, 'suggested': suggested})
+        return suggestions
+
+    def run_benchmarks(self, project, benchmarks=None):
+        """
+        Benchmarks mesurés sur EVM locale
+
+        deployment_cost / transaction_cost: gas mesuré; execution_time: secondes;
+        storage_cost: gas d'initialisation des slots occupés
+        """
+        benchmarks = benchmarks or ['deployment_cost', 'transaction_cost', 'execution_time', 'storage_cost']
+        results = {}
+        if 'storage_cost' in benchmarks:
+            results['storage_cost'] = {name: usage['initialization_gas']
+                                       for name, usage in self.analyze_storage_usage(project).items()}
+
+        measured_benchmarks = [b for b in benchmarks if b != 'storage_cost']
+        if not measured_benchmarks:
+            return results
+        measured = self._measure(project)
+        if not measured['available']:
+            results.update({b: measured for b in measured_benchmarks})
+            return results
+
+        contracts = [m for m in measured['contracts'] if m.deployment is not None]
+        if 'deployment_cost' in benchmarks:
+            results['deployment_cost'] = {m.contract: m.deployment for m in contracts}
+        if 'transaction_cost' in benchmarks:
+            results['transaction_cost'] = {m.contract: dict(m.functions) for m in contracts}
+        if 'execution_time' in benchmarks:
+            results['execution_time'] = {m.contract: dict(m.durations) for m in contracts}
+        return results
+
+    def _root(self, project):
+        return Path(project).resolve()
+
+    def _sources(self, project):
+        contracts_dir = self._root(project) / 'contracts'
+        if not contracts_dir.exists():
+            return []
+        return [(path, path.read_text(encoding='utf-8', errors='replace'))
+                for path in sorted(contracts_dir.glob('**/*.sol'))]
+
+    def _per_file(self, project, check):
+        results = {}
+        for path, source in self._sources(project):
+            suggestions = check(source)
+            if suggestions:
+                results[path.name] = suggestions
+        return results
+
+    def _measure(self, project):
+        root = self._root(project)
+        if root not in self._measurements:
+            try:
+                contracts = run_blocking(profile_project(root))
+                self._measurements[root] = {'available': True, 'contracts': contracts}
+            except (EVMUnavailable, CompilerUnavailable) as e:
+                self._measurements[root] = {'available': False, 'error': str(e)}
+        return self._measurements[root]
@@ -1,3 +1,15 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipeline.registry import register_agent
+
+
+@register_agent('blockchain_specific', tasks={'validate': 'validate_project'},
+                inputs=('project',),
+                outputs=('chain_specific', 'consensus_validation', 'economic_model', 'interoperability'),
+                cost='cheap', description='Spécificités des chaînes cibles')
 class BlockchainSpecificAgent:
     def __init__(self):
         self.chains = {
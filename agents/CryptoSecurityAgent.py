@@ -1,3 +1,16 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipeline.registry import register_agent
+
+
+@register_agent('crypto_security', tasks={'validate': 'validate_crypto_security'},
+                inputs=('project',),
+                outputs=('key_management', 'signature_security', 'encryption', 'randomness', 'wallet_security',
+                         'crypto_standards', 'best_practices'),
+                cost='cheap', description='Sécurité cryptographique et wallets')
 class CryptoSecurityAgent:
     """Agent spécialisé en sécurité cryptographique et wallets"""
     
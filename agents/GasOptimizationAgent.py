@@ -1,3 +1,37 @@
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.blockchain.analysis import (
+    BLOCK_GAS_LIMIT, GAS, access_kind, condition_span, loop_depth, loop_iteration_gas, loop_region,
+    parse_solidity, unbounded_loops
+)
+from agents.blockchain.compiler import CompilerUnavailable
+from agents.blockchain.gas_profiler import EVMUnavailable, profile_source, run_blocking
+from agents.blockchain.storage_layout import analyze_storage
+from pipeline.registry import register_agent
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Nombre d'itérations supposé pour chiffrer les optimisations de boucle
+ASSUMED_ITERATIONS = 10
+# Copie calldata → memory: allocation, puis décodage ABI et écriture de chaque mot
+COPY_BASE_GAS = 60
+COPY_WORD_GAS = 40
+# Constats dont estimated_gas est un coût (gas par élément supplémentaire), pas une économie
+COST_ONLY_RULES = {'unbounded-loop'}
+# Appels qui lisent un paramètre calldata sans le copier en memory
+BUILTIN_CALLS = {'require', 'assert', 'revert', 'keccak256', 'sha256', 'ripemd160', 'ecrecover', 'bytes', 'string',
+                 'if', 'for', 'while', 'return', 'emit'}
+VALUE_TYPE = re.compile(r'^(u?int\d*|bool|address( payable)?|bytes\d+|[A-Z]\w*)$')
+
+
+@register_agent('gas_optimization', tasks={'optimize': 'optimize_contract_gas', 'measure': 'measure_gas_usage'},
+                inputs=('contract_code',),
+                outputs=('current_gas_usage', 'optimization_opportunities', 'suggested_changes', 'estimated_savings'),
+                cost='moderate', description='Optimisations de gas chiffrées (calldata, stockage, boucles)')
 class GasOptimizationAgent:
     """Agent spécialisé en optimisation de gas"""
     
@@ -33,4 +67,288 @@ class GasOptimizationAgent:
             optimization_report['suggested_changes']
         )
         
-        return optimization_report
\ No newline at end of file
+        return optimization_report
+
+    def measure_gas_usage(self, contract_code, project_root=None):
+        """Gas de déploiement et par fonction mesuré sur EVM locale (scénarios de benchmarks/gas)"""
+        project_root = Path(project_root) if project_root else PROJECT_ROOT
+        try:
+            measurements = run_blocking(profile_source(project_root, contract_code))
+        except (EVMUnavailable, CompilerUnavailable) as e:
+            return {'available': False, 'error': str(e)}
+        return {'available': True, 'contracts': {m.contract: m.to_dict() for m in measurements}}
+
+    def find_optimization_opportunities(self, contract_code):
+        """Variables constantes / immuables, lectures de stockage répétées, messages d'erreur"""
+        index = parse_solidity(contract_code)
+        opportunities = []
+        for contract in index.contracts:
+            functions = contract.functions + contract.modifiers
+            for variable in contract.state_variables:
+                if variable.constant or variable.immutable:
+                    continue
+                writers = {f.kind for f in functions for w in f.state_writes if w.name == variable.name}
+                readers = [f for f in functions if any(r.name == variable.name for r in f.state_reads)]
+                if not readers:
+                    continue
+                if not writers and variable.initialized:
+                    opportunities.append(self._suggestion('constant', f"{variable.name} n'est jamais modifiée: la déclarer constant",
+                                                          variable.line, GAS['sload_cold'], variable=variable.name))
+                elif writers == {'constructor'} and VALUE_TYPE.match(variable.type):
+                    opportunities.append(self._suggestion('immutable', f"{variable.name} n'est écrite que dans le constructeur: la déclarer immutable",
+                                                          variable.line, GAS['sload_cold'], variable=variable.name))
+
+            # Les éléments de tableaux/mappings et les lectures en boucle relèvent d'optimize_loops
+            cacheable = {v.name for v in index.inherited_state(contract)
+                         if not (v.constant or v.immutable or 'mapping' in v.type or v.type.endswith(']'))}
+            for function in functions:
+                counts = {}
+                for read in function.state_reads:
+                    if read.name in cacheable and not loop_depth(index, function, read.offset):
+                        counts[read.name] = counts.get(read.name, 0) + 1
+                for name, count in counts.items():
+                    if count >= 3 or (count == 2 and not any(w.name == name for w in function.state_writes)):
+                        opportunities.append(self._suggestion('cache-storage-read',
+                                                              f"{name} lue {count} fois dans {function.name}: la copier en mémoire",
+                                                              function.line, (count - 1) * GAS['sload_warm'],
+                                                              function=function.name, variable=name))
+
+        version = re.search(r'0\.8\.(\d+)', index.pragma or '')
+        if version and int(version.group(1)) >= 4:
+            for function in index.functions():
+                if function.requires:
+                    opportunities.append(self._suggestion('custom-errors', f"{function.requires} require(…, \"message\") dans {function.name}: utiliser des erreurs personnalisées",
+                                                          function.line, 24 * function.requires, function=function.name))
+        return opportunities
+
+    def optimize_data_location(self, contract_code):
+        """Paramètres memory non modifiés de fonctions externes/publiques: passer en calldata"""
+        index = parse_solidity(contract_code)
+        suggestions = []
+        for contract in index.contracts:
+            structs = {name: fields for other in index.contracts for name, fields in other.structs.items()}
+            for function in contract.functions:
+                # Les paramètres d'un constructeur restent en memory
+                if not function.is_public or function.kind != 'function' or not function.has_body:
+                    continue
+                body = index.body(function)
+                header = index.masked[function.start:function.body_start]
+                for parameter in function.parameters:
+                    if parameter.location != 'memory' or not parameter.name:
+                        continue
+                    words = self._copied_words(parameter.type, structs)
+                    if not words:
+                        continue
+                    assigned = re.search(rf'(?<![\w.])\b{re.escape(parameter.name)}\b(\s*\[[^\]]*\]|\s*\.\s*\w+)*\s*=(?![=>])', body)
+                    if assigned or self._passed_to_function(index, function, parameter.name):
+                        continue
+                    declaration = re.search(rf'\bmemory\s+{re.escape(parameter.name)}\b', header)
+                    line = index.line_of(function.start + declaration.start()) if declaration else function.line
+                    suggestions.append(self._suggestion('calldata', f"{parameter.name} ({parameter.type} memory) → calldata",
+                                                        line, COPY_BASE_GAS + words * COPY_WORD_GAS,
+                                                        function=function.name, parameter=parameter.name))
+        return suggestions
+
+    def _passed_to_function(self, index, function, name):
+        """Paramètre transmis à une fonction (la copie en memory aurait lieu à l'appel)"""
+        body = index.body(function)
+        for call in re.finditer(r'(?<![\w.])([a-z_]\w*)\s*\(', body):
+            if call.group(1) in BUILTIN_CALLS:
+                continue
+            open_paren = function.body_start + call.end() - 1
+            arguments = index.masked[open_paren + 1:index.closing(open_paren) or open_paren]
+            if re.search(rf'(?<![\w.]){re.escape(name)}\b', arguments):
+                return True
+        return False
+
+    def _copied_words(self, type_name, structs):
+        """Mots de 32 octets copiés de calldata vers memory (0 si le type n'est pas une référence)"""
+        if type_name.endswith(']'):
+            element = type_name[:type_name.rfind('[')]
+            length = type_name[type_name.rfind('[') + 1:-1]
+            return (int(length) if length.isdigit() else ASSUMED_ITERATIONS) * max(1, self._copied_words(element, structs))
+        if type_name in ('string', 'bytes'):
+            return 2
+        struct = structs.get(type_name.split('.')[-1])
+        if struct is not None:
+            return sum(max(1, self._copied_words(f.type, structs)) for f in struct)
+        return 0
+
+    def pack_storage_variables(self, contract_code, storage_layouts=None):
+        """Réordonnancement des variables d'état (et champs de struct) pour occuper moins de slots"""
+        suggestions = []
+        for report in analyze_storage(contract_code, storage_layouts):
+            if report.slots_saved > 0:
+                suggestions.append(self._suggestion(
+                    'storage-packing',
+                    f"{report.name}: {report.current_slots} → {report.optimal_slots} slots "
+                    f"(ordre: {', '.join(report.suggested_order)})",
+                    report.layout[0].line if report.layout else None,
+                    report.gas['max_per_call'],
+                    contract=report.name,
+                    deployment_gas=report.gas['sstore_init_saved'],
+                    per_function=report.gas['per_function'],
+                    warnings=report.warnings
+                ))
+            for name, struct in report.structs.items():
+                suggestions.append(self._suggestion(
+                    'struct-packing',
+                    f"struct {name}: {struct['current_slots']} → {struct['optimal_slots']} slots "
+                    f"(ordre: {', '.join(struct['suggested_order'])})",
+                    None,
+                    (struct['current_slots'] - struct['optimal_slots']) * GAS['sload_cold'],
+                    contract=report.name
+                ))
+        return suggestions
+
+    def optimize_loops(self, contract_code):
+        """Lectures de stockage dans les boucles, boucles non bornées, .length relu, incréments vérifiés"""
+        index = parse_solidity(contract_code)
+        suggestions = []
+        for contract in index.contracts:
+            state = {v.name: v for v in index.inherited_state(contract) if not v.constant and not v.immutable}
+            for function in contract.functions:
+                if function.loops:
+                    suggestions.extend(self._hoistable_reads(index, contract, function, state))
+                    suggestions.extend(self._loop_lengths(index, function))
+                suggestions.extend(self._repeated_lengths(index, function))
+                for loop in function.loops:
+                    if loop.kind == 'for' and re.search(r'\w+\s*\+\+|\+\+\s*\w+|\+=\s*1\b', loop.header):
+                        body = index.masked[loop.body_start:loop.body_end + 1]
+                        if 'unchecked' not in body:
+                            suggestions.append(self._suggestion('unchecked-increment', "Incrément du compteur vérifié (unchecked { ++i; })",
+                                                                loop.line, self._executions(index, function, loop.start) * ASSUMED_ITERATIONS * 30,
+                                                                function=function.name))
+
+        for function, loop, bound in unbounded_loops(index):
+            per_iteration = loop_iteration_gas(index, function, loop)
+            suggestions.append(self._suggestion(
+                'unbounded-loop',
+                f"Boucle bornée par {bound} (état du contrat): ~{per_iteration} gas par itération, "
+                f"limite du bloc atteinte vers {BLOCK_GAS_LIMIT // per_iteration} éléments; paginer le traitement",
+                loop.line, per_iteration, function=function.name, variable=bound,
+                gas_per_iteration=per_iteration, max_iterations=BLOCK_GAS_LIMIT // per_iteration,
+                public=function.is_public
+            ))
+        return suggestions
+
+    def _executions(self, index, function, offset):
+        """Nombre d'exécutions supposé du code situé à `offset` (boucles imbriquées comprises)"""
+        return ASSUMED_ITERATIONS ** loop_depth(index, function, offset)
+
+    def _writers(self, contract, name):
+        """Fonctions du contrat qui modifient la variable d'état `name`"""
+        return [f.name for f in contract.functions + contract.modifiers if any(w.name == name for w in f.state_writes)]
+
+    def _hoistable_reads(self, index, contract, function, state):
+        """Variables d'état (valeurs, champs de struct) relues à chaque itération sans être modifiées dans la boucle"""
+        regions = [(loop, loop_region(index, loop)) for loop in sorted(function.loops, key=lambda l: l.start)]
+        groups = {}
+        for read in function.state_reads:
+            variable = state.get(read.name)
+            if variable is None or 'mapping' in variable.type or variable.type.endswith(']'):
+                continue
+            if access_kind(index, read) not in ('value', 'member'):
+                continue
+            containing = [(loop, region) for loop, region in regions if region[0] <= read.offset < region[1]]
+            writers = self._writers(contract, read.name)
+            # Boucle la plus externe dans laquelle la variable n'est ni écrite ni modifiée par un appel
+            for depth, (loop, region) in enumerate(containing):
+                written = any(region[0] <= w.offset < region[1] for w in function.state_writes if w.name == read.name)
+                text = index.masked[region[0]:region[1]]
+                called = any(re.search(rf'(?<![\w.]){re.escape(name)}\s*\(', text) for name in writers)
+                if not written and not called:
+                    group = groups.setdefault((read.name, loop.start), {'loop': loop, 'depth': depth, 'executions': 0})
+                    group['executions'] += self._executions(index, function, read.offset)
+                    break
+
+        suggestions = []
+        for (name, _), group in sorted(groups.items(), key=lambda item: item[0][1]):
+            saved = group['executions'] - ASSUMED_ITERATIONS ** group['depth']
+            if saved > 0:
+                suggestions.append(self._suggestion('hoist-storage-read', f"{name} lue à chaque itération: la copier avant la boucle",
+                                                    group['loop'].line, saved * GAS['sload_warm'],
+                                                    function=function.name, variable=name))
+        return suggestions
+
+    def _loop_lengths(self, index, function):
+        """Longueur d'un tableau de stockage relue dans la condition de boucle"""
+        suggestions = []
+        for loop in function.loops:
+            span = condition_span(index, loop)
+            region = loop_region(index, loop)
+            for read in function.state_reads:
+                if not span[0] <= read.offset < span[1] or access_kind(index, read) != 'length':
+                    continue
+                resized = any(region[0] <= w.offset < region[1] and w.operator in ('push', 'pop', 'delete', '=')
+                              for w in function.state_writes if w.name == read.name)
+                if not resized:
+                    suggestions.append(self._suggestion('cache-length', f"{read.name}.length relu à chaque itération",
+                                                        loop.line, self._executions(index, function, read.offset) * GAS['sload_warm'],
+                                                        function=function.name, variable=read.name))
+        return suggestions
+
+    def _repeated_lengths(self, index, function):
+        """Longueur d'un tableau de stockage lue plusieurs fois hors condition de boucle"""
+        spans = [condition_span(index, loop) for loop in function.loops]
+        reads = {}
+        for read in function.state_reads:
+            if access_kind(index, read) == 'length' and not any(s[0] <= read.offset < s[1] for s in spans):
+                reads.setdefault(read.name, []).append(read)
+
+        suggestions = []
+        for name, accesses in reads.items():
+            if any(w.name == name and w.operator in ('push', 'pop', 'delete', '=') for w in function.state_writes):
+                continue
+            executions = sum(self._executions(index, function, a.offset) for a in accesses)
+            if executions >= 2:
+                suggestions.append(self._suggestion('repeated-length', f"{name}.length lu {len(accesses)} fois dans {function.name}: "
+                                                    "le copier dans une variable locale",
+                                                    accesses[0].line, (executions - 1) * GAS['sload_warm'],
+                                                    function=function.name, variable=name))
+        return suggestions
+
+    def inline_functions(self, contract_code):
+        """Fonctions internes courtes appelées une seule fois"""
+        index = parse_solidity(contract_code)
+        suggestions = []
+        for contract in index.contracts:
+            callers = contract.functions + contract.modifiers
+            for function in contract.functions:
+                if (function.visibility not in ('internal', 'private') or not function.has_body
+                        or function.virtual or function.override):
+                    continue
+                pattern = re.compile(rf'(?<![\w.]){re.escape(function.name)}\s*\(')
+                calls = sum(len(pattern.findall(index.body(caller))) for caller in callers if caller is not function)
+                if calls == 1 and function.end_line - function.line <= 4:
+                    suggestions.append(self._suggestion('inline', f"{function.name} n'est appelée qu'une fois: l'intégrer à l'appelant",
+                                                        function.line, 24, function=function.name))
+        return suggestions
+
+    def suggest_assembly_optimizations(self, contract_code):
+        """Motifs remplaçables par quelques opcodes en assembly"""
+        index = parse_solidity(contract_code)
+        suggestions = []
+        for function in index.functions():
+            body = index.body(function)
+            if function.uses.get('assembly'):
+                continue
+            for match in re.finditer(r'address\s*\(\s*this\s*\)\s*\.\s*balance', body):
+                suggestions.append(self._suggestion('selfbalance', "address(this).balance → selfbalance()",
+                                                    index.line_of(function.body_start + match.start()), 95,
+                                                    function=function.name))
+            for match in re.finditer(r'keccak256\s*\(\s*abi\.encode(Packed)?\s*\(', body):
+                suggestions.append(self._suggestion('scratch-keccak', "Hachage via l'espace scratch (mstore + keccak256)",
+                                                    index.line_of(function.body_start + match.start()), 80,
+                                                    function=function.name))
+        return suggestions
+
+    def calculate_savings(self, suggested_changes):
+        """Somme des économies estimées (gas par appel) des suggestions retenues"""
+        return sum(s.get('estimated_gas', 0) for change in suggested_changes for s in change['suggestions']
+                   if s['rule'] not in COST_ONLY_RULES)
+
+    def _suggestion(self, rule, message, line, estimated_gas, **extra):
+        suggestion = {'rule': rule, 'message': message, 'line': line, 'estimated_gas': estimated_gas}
+        suggestion.update(extra)
+        return suggestion
@@ -1,3 +1,15 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipeline.registry import register_agent
+
+
+@register_agent('integration_validation', tasks={'validate': 'validate_all_integrations'},
+                inputs=('project',),
+                outputs=('validation', 'documentation', 'tests', 'score'),
+                cost='cheap', description='Intégrations blockchain, API et services')
 class IntegrationValidationAgent:
     def __init__(self):
         self.integration_points = []
@@ -1,3 +1,15 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipeline.registry import register_agent
+
+
+@register_agent('regulatory_compliance', tasks={'analyze': 'analyze_project'},
+                inputs=('project_specs',),
+                outputs=('report', 'plan', 'compliance_score'),
+                cost='cheap', description='Conformité réglementaire par juridiction')
 class RegulatoryComplianceAgent:
     def __init__(self):
         self.jurisdictions = {
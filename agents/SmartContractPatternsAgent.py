@@ -1,3 +1,30 @@
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.blockchain.analysis import (GAS, SENSITIVE_STATE, cei_violations, finding, is_access_controlled,
+                                        parse_solidity)
+from pipeline.registry import register_agent
+
+# Fonctions requises par standard (implémentées localement ou héritées d'une base du même nom)
+STANDARD_INTERFACES = {
+    'ERC-20': ['totalSupply', 'balanceOf', 'transfer', 'transferFrom', 'approve', 'allowance'],
+    'ERC-721': ['balanceOf', 'ownerOf', 'safeTransferFrom', 'transferFrom', 'approve',
+                'setApprovalForAll', 'getApproved', 'isApprovedForAll'],
+    'ERC-1155': ['balanceOf', 'balanceOfBatch', 'setApprovalForAll', 'isApprovedForAll',
+                 'safeTransferFrom', 'safeBatchTransferFrom'],
+    'ERC-4626': ['asset', 'totalAssets', 'convertToShares', 'convertToAssets', 'maxDeposit',
+                 'previewDeposit', 'deposit', 'mint', 'withdraw', 'redeem']
+}
+
+
+@register_agent('contract_patterns', tasks={'analyze': 'analyze_contract'},
+                inputs=('contract_code',),
+                outputs=('design_patterns', 'security_patterns', 'gas_optimization', 'upgradeability',
+                         'reentrancy_guards', 'access_control', 'standards_compliance', 'best_practices'),
+                cost='cheap', description='Patterns de conception et de sécurité des contrats')
 class SmartContractPatternsAgent:
     """Agent spécialisé dans les patterns et best practices Solidity"""
     
@@ -39,4 +66,227 @@ class SmartContractPatternsAgent:
             'vesting': self.detect_vesting_pattern(code),
             'staking': self.detect_staking_pattern(code)
         }
-        return {k: v for k, v in patterns.items() if v}
\ No newline at end of file
+        return {k: v for k, v in patterns.items() if v}
+
+    def detect_factory_pattern(self, code):
+        """Contrats déployant d'autres contrats (new / create2)"""
+        index = parse_solidity(code)
+        created = set()
+        for function in index.functions():
+            body = index.body(function)
+            created.update(re.findall(r'\bnew\s+([A-Z]\w*)\s*[({]', body))
+            if 'create2(' in body:
+                created.add('create2')
+        return sorted(created)
+
+    def detect_proxy_pattern(self, code):
+        """Délégation de l'exécution vers une implémentation"""
+        index = parse_solidity(code)
+        evidence = [f'hérite de {base}' for contract in index.contracts for base in contract.bases
+                    if re.search(r'Proxy|UUPS|ERC1967|Beacon', base)]
+        for function in index.functions():
+            if function.uses.get('delegatecall') and function.kind in ('fallback', 'function'):
+                evidence.append(f'delegatecall dans {function.name}')
+        if any(re.search(r'implementation', v.name, re.IGNORECASE) for v in index.state_variables()):
+            evidence.append("variable d'implémentation")
+        return evidence
+
+    def detect_diamond_pattern(self, code):
+        """Proxy multi-facettes (EIP-2535)"""
+        index = parse_solidity(code)
+        names = {f.name for f in index.functions(include_interfaces=True)}
+        evidence = sorted(names & {'diamondCut', 'facets', 'facetAddress', 'facetFunctionSelectors'})
+        if any('IDiamondCut' in contract.bases for contract in index.contracts):
+            evidence.append('IDiamondCut')
+        return evidence
+
+    def detect_governance_pattern(self, code):
+        """Propositions, votes et exécution"""
+        index = parse_solidity(code)
+        names = {f.name for f in index.functions()}
+        evidence = sorted(names & {'propose', 'castVote', 'vote', 'queue', 'execute', 'delegate', 'getPastVotes'})
+        evidence += [base for contract in index.contracts for base in contract.bases
+                     if base.startswith(('Governor', 'Timelock', 'ERC20Votes'))]
+        return evidence if len(evidence) >= 2 else []
+
+    def detect_vesting_pattern(self, code):
+        """Libération progressive de tokens dans le temps"""
+        index = parse_solidity(code)
+        evidence = [v.name for v in index.state_variables() if re.search(r'vest|cliff|release|duration', v.name, re.IGNORECASE)]
+        evidence += [f.name for f in index.functions()
+                     if re.search(r'release|vest|claim', f.name, re.IGNORECASE) and f.uses.get('block.timestamp')]
+        return evidence if len(evidence) >= 2 else []
+
+    def detect_staking_pattern(self, code):
+        """Dépôt de tokens rémunéré par des récompenses"""
+        index = parse_solidity(code)
+        names = {f.name for f in index.functions()}
+        evidence = sorted(n for n in names if re.match(r'(un)?stake|earned|rewardPerToken|getReward|claimRewards?$', n))
+        return evidence if len(evidence) >= 2 else []
+
+    def check_security_patterns(self, code):
+        """Patterns de sécurité en place"""
+        index = parse_solidity(code)
+        bases = {base for contract in index.contracts for base in contract.bases}
+        modifiers = {m for f in index.functions() for m in f.modifiers}
+        return {
+            'reentrancy_guard': 'ReentrancyGuard' in bases or 'nonReentrant' in modifiers,
+            'access_control': bool(bases & {'Ownable', 'Ownable2Step', 'AccessControl', 'AccessControlEnumerable'})
+                              or any(m.startswith('only') for m in modifiers),
+            'pausable': 'Pausable' in bases or 'whenNotPaused' in modifiers,
+            'pull_payments': self.check_payment_patterns(code)['pull'],
+            'checks_effects_interactions': not cei_violations(index),
+            'custom_errors': any(contract.errors for contract in index.contracts)
+        }
+
+    def analyze_gas_usage(self, code):
+        """Estimation statique du coût des fonctions publiques qui modifient l'état"""
+        index = parse_solidity(code)
+        functions = []
+        for function in index.functions():
+            if not function.is_public or not function.mutates_state or function.kind == 'constructor':
+                continue
+            written = {w.name for w in function.state_writes}
+            read = {r.name for r in function.state_reads} - written
+            estimate = (len(written) * GAS['sstore_reset'] + len(read) * GAS['sload_cold']
+                        + sum(GAS['call_value'] if c.sends_value else GAS['call'] for c in function.external_calls)
+                        + len(function.events) * GAS['log'])
+            functions.append({
+                'function': function.name,
+                'storage_writes': len(written),
+                'storage_reads': len(read),
+                'external_calls': len(function.external_calls),
+                'loops': len(function.loops),
+                'estimated_gas': estimate
+            })
+        return sorted(functions, key=lambda f: f['estimated_gas'], reverse=True)
+
+    def check_upgradeability(self, code):
+        """Contrat upgradeable et précautions associées (initializer, storage gap)"""
+        index = parse_solidity(code)
+        bases = {base for contract in index.contracts for base in contract.bases}
+        upgradeable = bool(bases & {'Initializable', 'UUPSUpgradeable'}) or any(b.endswith('Upgradeable') for b in bases)
+        report = {'upgradeable': upgradeable, 'issues': []}
+        if not upgradeable:
+            return report
+
+        initializers = [f for f in index.functions() if f.name == 'initialize']
+        if not initializers:
+            report['issues'].append(finding('missing-initializer', 'high', "Aucune fonction initialize"))
+        for function in initializers:
+            if 'initializer' not in function.modifiers:
+                report['issues'].append(finding('unprotected-initializer', 'critical',
+                                                "initialize sans modificateur initializer",
+                                                function.line, function.name))
+        for function in index.functions():
+            if function.kind == 'constructor' and '_disableInitializers' not in index.body(function):
+                report['issues'].append(finding('constructor-in-upgradeable', 'medium',
+                                                "Constructeur sans _disableInitializers()", function.line))
+        if not any(v.name == '__gap' for v in index.state_variables()):
+            report['issues'].append(finding('missing-storage-gap', 'low', "Pas de __gap pour les futures variables"))
+        return report
+
+    def check_reentrancy_protection(self, code):
+        """Fonctions publiques appelant l'extérieur sans garde ni respect de CEI"""
+        index = parse_solidity(code)
+        violations = {(v['contract'], v['function']): v for v in cei_violations(index)}
+        unprotected = []
+        for function in index.functions():
+            if not function.is_public or not function.external_calls or 'nonReentrant' in function.modifiers:
+                continue
+            violation = violations.get((function.contract, function.name))
+            if violation:
+                unprotected.append(finding('reentrancy', 'high' if violation['call']['sends_value'] else 'medium',
+                                           f"État modifié après l'appel externe ligne {violation['call']['line']}",
+                                           function.line, function.name))
+        return {'protected': not unprotected, 'unprotected_functions': unprotected}
+
+    def check_access_control(self, code):
+        """Fonctions publiques modifiant un état sensible sans contrôle de l'appelant"""
+        index = parse_solidity(code)
+        issues = []
+        for function in index.functions():
+            if not function.is_public or not function.mutates_state or function.kind != 'function':
+                continue
+            sensitive = sorted({w.name for w in function.state_writes if SENSITIVE_STATE.search(w.name)})
+            dangerous = function.uses.get('selfdestruct') or function.uses.get('delegatecall')
+            if (sensitive or dangerous) and not is_access_controlled(index, function):
+                issues.append(finding('missing-access-control', 'high',
+                                      f"Modifie {', '.join(sensitive) or 'un état critique'} sans restriction d'appelant",
+                                      function.line, function.name))
+        return {'issues': issues, 'tx_origin_auth': any(f.uses.get('tx.origin') for f in index.functions())}
+
+    def check_standards(self, code, standards):
+        """Conformité aux standards (fonctions requises présentes ou héritées)"""
+        index = parse_solidity(code)
+        bases = {base for contract in index.contracts for base in contract.bases}
+        defined = {f.name for f in index.functions()}
+        defined |= {v.name for v in index.state_variables() if v.visibility == 'public'}
+        report = {}
+        for standard in standards:
+            base_name = standard.replace('-', '')
+            required = STANDARD_INTERFACES.get(standard, [])
+            inherited = any(b == base_name or b.startswith(base_name) for b in bases)
+            missing = [] if inherited else [name for name in required if name not in defined]
+            if inherited or len(missing) < len(required) / 2:
+                report[standard] = {'implemented': not missing, 'inherited': inherited, 'missing': missing}
+        return report
+
+    def check_cei_pattern(self, code):
+        """Violations de Checks-Effects-Interactions"""
+        return cei_violations(parse_solidity(code))
+
+    def check_payment_patterns(self, code):
+        """Paiements poussés (envoi d'ether aux tiers, en boucle) vs retraits à l'initiative du bénéficiaire"""
+        index = parse_solidity(code)
+        push = []
+        for function in index.functions():
+            for call in function.external_calls:
+                if not call.sends_value:
+                    continue
+                in_loop = any(loop.start <= call.offset < loop.end for loop in function.loops)
+                if in_loop or 'msg.sender' not in call.target:
+                    push.append(finding('push-payment', 'medium' if in_loop else 'low',
+                                        f"Envoi d'ether à {call.target}" + (" dans une boucle" if in_loop else ""),
+                                        call.line, function.name))
+        pull = any(re.match(r'withdraw|claim', f.name, re.IGNORECASE)
+                   and any(c.sends_value and 'msg.sender' in c.target for c in f.external_calls)
+                   for f in index.functions())
+        return {'pull': pull, 'push_payments': push}
+
+    def check_error_patterns(self, code):
+        """Erreurs personnalisées, messages de require, usage d'assert"""
+        index = parse_solidity(code)
+        requires_without_message = []
+        long_messages = []
+        for function in index.functions():
+            body = index.body(function)
+            for match in re.finditer(r'\brequire\s*\(', body):
+                close = index.closing(function.body_start + match.end() - 1)
+                arguments = index.source[function.body_start + match.end():close] if close else ''
+                message = re.search(r',\s*"([^"]*)"\s*$', arguments)
+                line = index.line_of(function.body_start + match.start())
+                if not message:
+                    requires_without_message.append({'function': function.name, 'line': line})
+                elif len(message.group(1).encode('utf-8')) > 32:
+                    long_messages.append({'function': function.name, 'line': line})
+        return {
+            'custom_errors': sum(len(c.errors) for c in index.contracts),
+            'require_statements': sum(f.requires for f in index.functions()),
+            'requires_without_message': requires_without_message,
+            'long_revert_strings': long_messages,
+            'assert_usage': sum(len(re.findall(r'\bassert\s*\(', index.body(f))) for f in index.functions())
+        }
+
+    def check_event_usage(self, code):
+        """Événements déclarés et modifications d'état non tracées"""
+        index = parse_solidity(code)
+        declared = {event for contract in index.contracts for event in contract.events}
+        emitted = {event for function in index.functions() for event in function.events}
+        silent = [f.name for f in index.functions()
+                  if f.is_public and f.kind == 'function' and f.state_writes and not f.events]
+        return {
+            'declared': sorted(declared),
+            'never_emitted': sorted(declared - emitted),
+            'state_changes_without_event': silent
+        }
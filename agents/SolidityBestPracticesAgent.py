@@ -1,3 +1,34 @@
+import json
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.blockchain.analysis import cei_violations, finding, parse_solidity, pragma_allows
+from pipeline.registry import register_agent
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TOOL_TIMEOUT = 180
+
+CAP_WORDS = re.compile(r'^[A-Z][A-Za-z0-9]*$')
+MIXED_CASE = re.compile(r'^_{0,2}[a-z][A-Za-z0-9]*$')
+UPPER_CASE = re.compile(r'^[A-Z][A-Z0-9_]*$')
+
+# Ordre recommandé par le guide de style Solidity
+MEMBER_RANK = {'struct': 0, 'enum': 0, 'variable': 1, 'event': 2, 'error': 2, 'modifier': 3,
+               'constructor': 4, 'receive': 5, 'fallback': 6, 'function': 7}
+VISIBILITY_RANK = {'external': 0, 'public': 1, 'internal': 2, 'private': 3}
+
+
+@register_agent('best_practices', tasks={'check': 'check_solidity_practices'},
+                inputs=('contract_code',),
+                outputs=('style_guide', 'naming_conventions', 'comments_natspec', 'function_ordering',
+                         'modifier_usage', 'error_handling', 'recommended_patterns', 'tooling'),
+                cost='moderate', description='Best practices Solidity (style, NatSpec, outils)')
 class SolidityBestPracticesAgent:
     """Agent spécialisé dans les best practices Solidity"""
     
@@ -29,4 +60,217 @@ class SolidityBestPracticesAgent:
             'foundry_standards': self.check_foundry_standards(contract_code)
         }
         
-        return practices
\ No newline at end of file
+        return practices
+
+    def check_style_guide(self, contract_code):
+        """Mise en forme: longueur de ligne, indentation, espaces de fin"""
+        lines = contract_code.splitlines()
+        long_lines = [number for number, line in enumerate(lines, 1) if len(line) > 120]
+        tabs = [number for number, line in enumerate(lines, 1) if line.startswith('\t')]
+        odd_indent = [number for number, line in enumerate(lines, 1)
+                      if line.strip() and not line.startswith('\t')
+                      and (len(line) - len(line.lstrip(' '))) % 4 and not line.lstrip().startswith('*')]
+        trailing = [number for number, line in enumerate(lines, 1) if line != line.rstrip()]
+        return {
+            'long_lines': long_lines,
+            'tab_indentation': tabs,
+            'irregular_indentation': odd_indent,
+            'trailing_whitespace': len(trailing),
+            'compliant': not (long_lines or tabs or odd_indent)
+        }
+
+    def check_naming_conventions(self, contract_code):
+        """Conventions de nommage du guide de style"""
+        index = parse_solidity(contract_code)
+        issues = []
+        for contract in index.contracts:
+            if not CAP_WORDS.match(contract.name):
+                issues.append(finding('naming-contract', 'info', f"{contract.name}: CapWords attendu", contract.line))
+            for name in contract.events + contract.errors + list(contract.structs) + list(contract.enums):
+                if not CAP_WORDS.match(name):
+                    issues.append(finding('naming-type', 'info', f"{name}: CapWords attendu"))
+            for variable in contract.state_variables:
+                if variable.constant and not UPPER_CASE.match(variable.name):
+                    issues.append(finding('naming-constant', 'info', f"{variable.name}: UPPER_CASE attendu", variable.line))
+                elif not variable.constant and not variable.immutable and not MIXED_CASE.match(variable.name):
+                    issues.append(finding('naming-variable', 'info', f"{variable.name}: mixedCase attendu", variable.line))
+            for function in contract.functions + contract.modifiers:
+                if function.kind in ('function', 'modifier') and not MIXED_CASE.match(function.name):
+                    issues.append(finding('naming-function', 'info', f"{function.name}: mixedCase attendu",
+                                          function.line, function.name))
+                for parameter in function.parameters:
+                    if parameter.name and not MIXED_CASE.match(parameter.name):
+                        issues.append(finding('naming-parameter', 'info', f"{parameter.name}: mixedCase attendu",
+                                              function.line, function.name))
+        return issues
+
+    def check_natspec_comments(self, contract_code):
+        """Couverture NatSpec des contrats et des fonctions publiques"""
+        index = parse_solidity(contract_code)
+        missing = []
+        public = [f for f in index.functions(include_interfaces=True) if f.is_public and f.kind == 'function']
+        documented = 0
+        for function in public:
+            if not function.doc:
+                missing.append(finding('natspec-missing', 'info', "Fonction publique sans NatSpec",
+                                       function.line, function.name))
+                continue
+            documented += 1
+            undocumented = [p.name for p in function.parameters if p.name and f'@param {p.name}' not in function.doc]
+            if undocumented:
+                missing.append(finding('natspec-param', 'info', f"@param manquant: {', '.join(undocumented)}",
+                                       function.line, function.name))
+            if function.returns and '@return' not in function.doc and '@inheritdoc' not in function.doc:
+                missing.append(finding('natspec-return', 'info', "@return manquant", function.line, function.name))
+        untitled = [c.name for c in index.contracts if '@title' not in c.doc]
+        return {
+            'coverage': round(documented / len(public), 2) if public else 1.0,
+            'contracts_without_title': untitled,
+            'issues': missing
+        }
+
+    def check_function_ordering(self, contract_code):
+        """Ordre des membres: types, état, événements, modificateurs, constructeur, puis fonctions par visibilité"""
+        index = parse_solidity(contract_code)
+        issues = []
+        for contract in index.contracts:
+            functions = {(f.kind, f.name, f.line): f for f in contract.functions}
+            previous = (-1, -1)
+            for kind, name, line in contract.member_order:
+                function = functions.get((kind, name, line))
+                rank = (MEMBER_RANK[kind], VISIBILITY_RANK.get(function.visibility, 0) if function and kind == 'function' else 0)
+                if rank < previous:
+                    issues.append(finding('member-order', 'info', f"{name} ({kind}) déclaré trop tard", line, name))
+                previous = max(previous, rank)
+        return issues
+
+    def check_modifier_usage(self, contract_code):
+        """Modificateurs inutilisés, trop volumineux, ou require dupliqués qui mériteraient un modificateur"""
+        index = parse_solidity(contract_code)
+        used = {m for f in index.functions() for m in f.modifiers}
+        report = {'unused': [], 'large': [], 'duplicated_checks': []}
+        for modifier in index.modifiers():
+            if modifier.name not in used:
+                report['unused'].append(modifier.name)
+            elif modifier.end_line - modifier.line > 6:
+                # Le corps d'un modificateur est recopié dans chaque fonction qui l'utilise
+                report['large'].append(modifier.name)
+
+        checks = {}
+        for function in index.functions():
+            for check in re.findall(r'require\s*\(([^;]*)\)\s*;', index.body(function)):
+                checks.setdefault(' '.join(check.split()), set()).add(function.name)
+        report['duplicated_checks'] = [{'check': check, 'functions': sorted(names)}
+                                       for check, names in checks.items() if len(names) >= 3]
+        return report
+
+    def check_error_handling_practices(self, contract_code):
+        """Erreurs personnalisées (>= 0.8.4), require sans message, assert sur les entrées"""
+        index = parse_solidity(contract_code)
+        issues = []
+        version = re.search(r'0\.8\.(\d+)', index.pragma or '')
+        custom_errors = any(contract.errors for contract in index.contracts)
+        requires = sum(f.requires for f in index.functions())
+        if version and int(version.group(1)) >= 4 and requires and not custom_errors:
+            issues.append(finding('prefer-custom-errors', 'info',
+                                  f"{requires} require avec message: les erreurs personnalisées coûtent moins de gas"))
+        for function in index.functions():
+            body = index.body(function)
+            for match in re.finditer(r'\bassert\s*\(([^;]*)\)', body):
+                if any(p.name and re.search(rf'\b{re.escape(p.name)}\b', match.group(1)) for p in function.parameters):
+                    issues.append(finding('assert-on-input', 'low', "assert utilisé pour valider une entrée (require attendu)",
+                                          index.line_of(function.body_start + match.start()), function.name))
+            if re.search(r'\brevert\s*\(\s*\)', body):
+                issues.append(finding('empty-revert', 'low', "revert() sans raison", function.line, function.name))
+        return issues
+
+    def enforce_cei(self, contract_code):
+        """Fonctions à réordonner pour respecter Checks-Effects-Interactions"""
+        return [v for v in cei_violations(parse_solidity(contract_code)) if not v['guarded']]
+
+    def check_pull_pattern(self, contract_code):
+        from agents.SmartContractPatternsAgent import SmartContractPatternsAgent
+        return SmartContractPatternsAgent().check_payment_patterns(contract_code)
+
+    def check_upgrade_patterns(self, contract_code):
+        from agents.SmartContractPatternsAgent import SmartContractPatternsAgent
+        return SmartContractPatternsAgent().check_upgradeability(contract_code)
+
+    def check_gas_patterns(self, contract_code):
+        from agents.GasOptimizationAgent import GasOptimizationAgent
+        return GasOptimizationAgent().find_optimization_opportunities(contract_code)
+
+    def _run_tool(self, command, contract_code):
+        """Exécute un analyseur externe ({file} = copie temporaire du contrat) et lit son JSON"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'Contract.sol'
+            path.write_text(contract_code, encoding='utf-8')
+            try:
+                process = subprocess.run([str(path) if part == '{file}' else part for part in command],
+                                         capture_output=True, text=True, timeout=TOOL_TIMEOUT, cwd=PROJECT_ROOT)
+            except subprocess.TimeoutExpired:
+                return None, f"Timeout après {TOOL_TIMEOUT}s"
+        try:
+            return json.loads(process.stdout or '{}'), None
+        except json.JSONDecodeError:
+            return None, (process.stderr or process.stdout)[-500:]
+
+    def run_slither_checks(self, contract_code):
+        """Détecteurs Slither (si installé)"""
+        if not shutil.which('slither'):
+            return {'available': False, 'findings': []}
+        data, error = self._run_tool(['slither', '{file}', '--json', '-'], contract_code)
+        if error:
+            return {'available': True, 'error': error, 'findings': []}
+        findings = []
+        for detector in data.get('results', {}).get('detectors', []):
+            lines = (detector.get('elements') or [{}])[0].get('source_mapping', {}).get('lines') or [None]
+            findings.append(finding(detector.get('check'), detector.get('impact', 'info').lower(),
+                                    detector.get('description', '').strip().split('\n')[0], lines[0],
+                                    confidence=detector.get('confidence')))
+        return {'available': True, 'findings': findings}
+
+    def run_mythril_checks(self, contract_code):
+        """Analyse symbolique Mythril (si installé)"""
+        if not shutil.which('myth'):
+            return {'available': False, 'findings': []}
+        data, error = self._run_tool(['myth', 'analyze', '{file}', '-o', 'json', '--execution-timeout', '60'],
+                                     contract_code)
+        if error:
+            return {'available': True, 'error': error, 'findings': []}
+        findings = [finding(issue.get('swc-id'), issue.get('severity', 'info').lower(), issue.get('title', ''),
+                            issue.get('lineno'), issue.get('function'))
+                    for issue in data.get('issues', [])]
+        return {'available': True, 'findings': findings}
+
+    def check_hardhat_config(self, contract_code):
+        """Cohérence entre le pragma du contrat et hardhat.config.js"""
+        config_file = PROJECT_ROOT / 'hardhat.config.js'
+        if not config_file.exists():
+            return {'configured': False}
+        config = config_file.read_text(encoding='utf-8')
+        version = re.search(r'version:\s*["\'](\d+\.\d+\.\d+)["\']', config) \
+            or re.search(r'solidity:\s*["\'](\d+\.\d+\.\d+)["\']', config)
+        pragma = parse_solidity(contract_code).pragma
+        compiler = version.group(1) if version else None
+        return {
+            'configured': True,
+            'compiler': compiler,
+            'pragma': pragma,
+            'pragma_compatible': pragma_allows(pragma, compiler) if compiler else None,
+            'optimizer_enabled': re.search(r'optimizer:\s*\{[^}]*enabled:\s*true', config) is not None,
+            'gas_reporter': 'hardhat-gas-reporter' in config,
+            'coverage': 'solidity-coverage' in config
+        }
+
+    def check_foundry_standards(self, contract_code):
+        """Présence d'une configuration Foundry et de tests .t.sol pour le contrat"""
+        if not (PROJECT_ROOT / 'foundry.toml').exists():
+            return {'configured': False}
+        contract = parse_solidity(contract_code).main_contract
+        tests = list((PROJECT_ROOT / 'test').glob('*.t.sol')) if (PROJECT_ROOT / 'test').exists() else []
+        return {
+            'configured': True,
+            'test_files': len(tests),
+            'contract_tested': bool(contract) and any(contract.name in t.name for t in tests)
+        }
@@ -1,3 +1,16 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipeline.registry import register_agent
+
+
+@register_agent('web3_frontend', tasks={'validate': 'validate_frontend'},
+                inputs=('frontend_code', 'blockchain_integration'),
+                outputs=('wallet_integration', 'web3_libraries', 'state_management', 'error_handling',
+                         'loading_states', 'transaction_flow', 'integration', 'ux_web3'),
+                cost='cheap', description='Frontend Web3 (wallets, wagmi/viem, UX)')
 class Web3FrontendAgent:
     """Agent spécialisé dans le frontend Web3"""
     
@@ -1,3 +1,16 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipeline.registry import register_agent
+
+
+@register_agent('web3_js', tasks={'validate': 'validate_web3_js_code'},
+                inputs=('code',),
+                outputs=('typescript_strictness', 'web3_library_usage', 'async_await_patterns', 'error_handling',
+                         'type_safety', 'web3_patterns', 'performance'),
+                cost='cheap', description='Code JS/TS Web3')
 class Web3JSTSAgent:
     """Agent spécialisé dans les best practices JS/TS Web3"""
     
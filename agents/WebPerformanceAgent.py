@@ -1,3 +1,15 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipeline.registry import register_agent
+
+
+@register_agent('web_performance', tasks={'analyze': 'analyze_web_performance'},
+                inputs=('frontend_code', 'blockchain_context'),
+                outputs=('metrics', 'recommendations', 'score'),
+                cost='cheap', description='Performance web des applications Web3')
 class WebPerformanceAgent:
     """Agent spécialisé en performance Web"""
     
@@ -0,0 +1,932 @@
+"""
+Moteur d'analyse structurelle Solidity partagé par les agents contrats
+
+Le source est analysé une seule fois (commentaires et chaînes masqués,
+accolades appariées, membres découpés) et l'index obtenu est mis en cache
+par hash du contenu: les agents interrogent ensuite les fonctions,
+modificateurs, variables d'état, appels externes et boucles sans
+ré-analyser le code.
+"""
+import bisect
+import hashlib
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+# Commentaires et littéraux chaîne (masqués avant toute analyse)
+_LEXEMES = re.compile(r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'', re.S)
+_CONTRACT = re.compile(r"\b(abstract\s+contract|contract|interface|library)\s+(\w+)([^{;]*)\{")
+_DELIMITER = re.compile(r"[(;{]")
+_NON_SPACE = re.compile(r"\S")
+_CALLABLE = re.compile(r"(function\s+(\w+)|constructor|fallback|receive|modifier\s+(\w+))\s*\(")
+_ATTRIBUTE = re.compile(r"(\w+)\s*(\([^()]*\))?")
+_PRAGMA = re.compile(r"pragma\s+solidity\s+([^;]+);")
+_IMPORT = re.compile(r"\bimport\b[^;]*;")
+_LICENSE = re.compile(r"SPDX-License-Identifier:\s*(\S+)")
+_LOOP = re.compile(r"\b(for|while)\s*\(|\bdo\s*\{")
+_LOW_LEVEL = re.compile(r"\.\s*(call|delegatecall|staticcall|transfer|send)\s*(\{[^{}]*\})?\s*\(")
+_CAST = re.compile(r"(?<![\w.])([A-Z]\w*)\s*\(")
+_MEMBER_CALL = re.compile(r"\s*\.\s*(\w+)\s*(\{[^{}]*\})?\s*\(")
+_TARGET = re.compile(r"[\w\]\[().]+$")
+_EMIT = re.compile(r"\bemit\s+(\w+)")
+_STORAGE_ALIAS = re.compile(r"\b[\w.]+(?:\[\d*\])*\s+storage\s+(\w+)\s*=\s*(\w+)")
+_LOCAL = re.compile(r"\b(?:u?int\d*|bool|address(?:\s+payable)?|bytes\d*|string|[A-Z]\w*)(?:\s*\[\d*\])*"
+                    r"\s+(?:memory\s+|storage\s+|calldata\s+)?(\w+)\s*(?:=(?!=)|;)")
+
+VISIBILITIES = {"public", "external", "internal", "private"}
+MUTABILITIES = {"view", "pure", "payable", "nonpayable", "constant"}
+_FUNCTION_KEYWORDS = VISIBILITIES | MUTABILITIES | {"virtual", "override", "returns"}
+_STATEMENT_KEYWORDS = {"return", "emit", "delete", "revert", "require", "if", "else", "for", "while", "do",
+                       "break", "continue", "import", "pragma", "using", "assembly", "unchecked"}
+_VARIABLE_KEYWORDS = VISIBILITIES | {"constant", "immutable", "override", "transient"}
+ELEMENTARY_TYPE = re.compile(r"^(u?int\d*|bool|address|address payable|bytes\d*|string|bytes)$")
+
+
+@dataclass
+class Parameter:
+    """Paramètre ou valeur de retour"""
+    type: str
+    name: str = ""
+    location: Optional[str] = None
+
+
+@dataclass
+class StateVariable:
+    """Variable d'état déclarée dans un contrat"""
+    name: str
+    type: str
+    visibility: str = "internal"
+    constant: bool = False
+    immutable: bool = False
+    initialized: bool = False
+    line: int = 0
+    offset: int = 0
+
+
+@dataclass
+class Access:
+    """Lecture ou écriture d'une variable d'état dans une fonction"""
+    name: str
+    line: int
+    offset: int
+    operator: Optional[str] = None
+
+
+@dataclass
+class ExternalCall:
+    """Appel sortant du contrat (bas niveau, transfert d'ether ou interface)"""
+    kind: str
+    target: str
+    method: str
+    line: int
+    offset: int
+    sends_value: bool = False
+
+
+@dataclass
+class Loop:
+    """Boucle for / while / do-while"""
+    kind: str
+    line: int
+    end_line: int
+    start: int
+    end: int
+    header: str = ""
+    condition: str = ""
+    body_start: int = 0
+    body_end: int = 0
+
+
+@dataclass
+class FunctionInfo:
+    """Fonction, constructeur, fallback, receive ou modificateur"""
+    name: str
+    kind: str
+    contract: str
+    visibility: str = "public"
+    mutability: str = "nonpayable"
+    virtual: bool = False
+    override: bool = False
+    modifiers: List[str] = field(default_factory=list)
+    parameters: List[Parameter] = field(default_factory=list)
+    returns: List[Parameter] = field(default_factory=list)
+    line: int = 0
+    end_line: int = 0
+    start: int = 0
+    end: int = 0
+    body_start: Optional[int] = None
+    body_end: Optional[int] = None
+    doc: str = ""
+    state_reads: List[Access] = field(default_factory=list)
+    state_writes: List[Access] = field(default_factory=list)
+    external_calls: List[ExternalCall] = field(default_factory=list)
+    loops: List[Loop] = field(default_factory=list)
+    events: List[str] = field(default_factory=list)
+    requires: int = 0
+    reverts: int = 0
+    uses: Dict[str, bool] = field(default_factory=dict)
+
+    @property
+    def has_body(self) -> bool:
+        return self.body_start is not None
+
+    @property
+    def is_public(self) -> bool:
+        return self.visibility in ("public", "external")
+
+    @property
+    def mutates_state(self) -> bool:
+        return self.mutability not in ("view", "pure", "constant")
+
+    @property
+    def signature(self) -> str:
+        return f"{self.name}({','.join(p.type for p in self.parameters)})"
+
+
+@dataclass
+class ContractInfo:
+    """Contrat, contrat abstrait, interface ou bibliothèque"""
+    name: str
+    kind: str
+    bases: List[str] = field(default_factory=list)
+    line: int = 0
+    end_line: int = 0
+    start: int = 0
+    end: int = 0
+    doc: str = ""
+    functions: List[FunctionInfo] = field(default_factory=list)
+    modifiers: List[FunctionInfo] = field(default_factory=list)
+    state_variables: List[StateVariable] = field(default_factory=list)
+    events: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    structs: Dict[str, List[Parameter]] = field(default_factory=dict)
+    enums: Dict[str, List[str]] = field(default_factory=dict)
+    using: List[str] = field(default_factory=list)
+    # Ordre de déclaration des membres (pour les règles de style)
+    member_order: List[Tuple[str, str, int]] = field(default_factory=list)
+
+    def function(self, name: str) -> Optional[FunctionInfo]:
+        return next((f for f in self.functions if f.name == name), None)
+
+    def state_variable(self, name: str) -> Optional[StateVariable]:
+        return next((v for v in self.state_variables if v.name == name), None)
+
+
+class SourceIndex:
+    """Index d'un fichier Solidity (immuable une fois construit)"""
+
+    def __init__(self, source: str, content_hash: Optional[str] = None):
+        self.source = source
+        self.hash = content_hash or hashlib.sha256(source.encode("utf-8")).hexdigest()
+        self._docs: List[Tuple[int, int, str]] = []
+        self.masked = _LEXEMES.sub(self._blank, source)
+        self._doc_ends = [end for _, end, _ in self._docs]
+        self._newlines = [m.start() for m in re.finditer("\n", source)]
+        self._pairs = self._match_pairs()
+
+        pragma = _PRAGMA.search(self.masked)
+        self.pragma = self.source[pragma.start(1):pragma.end(1)].strip() if pragma else None
+        license_match = _LICENSE.search(source)
+        self.license = license_match.group(1) if license_match else None
+        self.imports = [self.source[m.start():m.end()] for m in _IMPORT.finditer(self.masked)]
+
+        self.contracts: List[ContractInfo] = []
+        self._parse_contracts()
+
+    # ------------------------------------------------------------------ lexique
+
+    def _blank(self, match: "re.Match") -> str:
+        text = match.group(0)
+        if text.startswith("///") or (text.startswith("/**") and not text.startswith("/**/")):
+            self._docs.append((match.start(), match.end(), text))
+        if text[0] in "\"'":
+            # Les guillemets sont conservés pour garder la forme des expressions
+            return text[0] + re.sub(r"[^\n]", " ", text[1:-1]) + text[-1]
+        return re.sub(r"[^\n]", " ", text)
+
+    def _match_pairs(self) -> Dict[int, int]:
+        pairs: Dict[int, int] = {}
+        stacks: Dict[str, List[int]] = {"{": [], "(": [], "[": []}
+        closing = {"}": "{", ")": "(", "]": "["}
+        for match in re.finditer(r"[{}()\[\]]", self.masked):
+            char = match.group(0)
+            if char in stacks:
+                stacks[char].append(match.start())
+            elif stacks[closing[char]]:
+                pairs[stacks[closing[char]].pop()] = match.start()
+        return pairs
+
+    def line_of(self, offset: int) -> int:
+        """Numéro de ligne (1-indexé) d'un offset"""
+        return bisect.bisect_left(self._newlines, offset) + 1
+
+    def closing(self, offset: int) -> Optional[int]:
+        """Offset du délimiteur fermant celui ouvert à `offset` ({, ( ou [)"""
+        return self._pairs.get(offset)
+
+    def text(self, start: int, end: int) -> str:
+        """Extrait le source original entre deux offsets"""
+        return self.source[start:end]
+
+    def _doc_before(self, start: int, floor: int) -> str:
+        index = bisect.bisect_right(self._doc_ends, start)
+        docs = []
+        while index > 0 and self._docs[index - 1][0] >= floor:
+            docs.append(self._docs[index - 1][2])
+            index -= 1
+        return "\n".join(reversed(docs))
+
+    # --------------------------------------------------------------- contrats
+
+    def _parse_contracts(self):
+        position = 0
+        while True:
+            match = _CONTRACT.search(self.masked, position)
+            if not match:
+                break
+            open_brace = match.end() - 1
+            close_brace = self._pairs.get(open_brace, len(self.masked) - 1)
+            kind = "abstract" if match.group(1).startswith("abstract") else match.group(1)
+            inheritance = match.group(3).strip()
+            bases = []
+            if inheritance.startswith("is"):
+                bases = [re.match(r"[\w.]+", b.strip()).group(0)
+                         for b in _split_top_level(inheritance[2:]) if b.strip()]
+
+            contract = ContractInfo(
+                name=match.group(2), kind=kind, bases=bases,
+                line=self.line_of(match.start()), end_line=self.line_of(close_brace),
+                start=match.start(), end=close_brace + 1,
+                doc=self._doc_before(match.start(), position)
+            )
+            self._parse_members(contract, open_brace + 1, close_brace)
+            self.contracts.append(contract)
+            position = close_brace + 1
+
+        # Analyse des corps une fois toutes les variables d'état (et héritées) connues
+        for contract in self.contracts:
+            state = {v.name: v for v in self.inherited_state(contract)}
+            types = self._contract_types(contract)
+            for function in contract.functions + contract.modifiers:
+                if function.has_body:
+                    self._analyze_body(function, state, types)
+
+    def _parse_members(self, contract: ContractInfo, start: int, end: int):
+        position = start
+        previous_end = start
+        while position < end:
+            first = _NON_SPACE.search(self.masked, position, end)
+            if not first:
+                break
+            member_start = first.start()
+            cursor = member_start
+            body = None
+            member_end = end
+            while cursor < end:
+                delimiter = _DELIMITER.search(self.masked, cursor, end)
+                if not delimiter:
+                    break
+                char = delimiter.group(0)
+                if char == "(":
+                    cursor = self._pairs.get(delimiter.start(), end) + 1
+                    continue
+                if char == ";":
+                    member_end = delimiter.start() + 1
+                else:
+                    close = self._pairs.get(delimiter.start(), end - 1)
+                    body = (delimiter.start(), close)
+                    member_end = close + 1
+                break
+
+            self._add_member(contract, member_start, member_end, body, previous_end)
+            previous_end = member_end
+            position = member_end
+
+    def _add_member(self, contract: ContractInfo, start: int, end: int,
+                    body: Optional[Tuple[int, int]], previous_end: int):
+        header = self.masked[start:body[0] if body else end]
+        keyword = header.split(None, 1)[0] if header.split() else ""
+        line = self.line_of(start)
+
+        if _CALLABLE.match(header):
+            function = self._parse_callable(contract, header, start, end, body, previous_end)
+            target = contract.modifiers if function.kind == "modifier" else contract.functions
+            target.append(function)
+            contract.member_order.append((function.kind, function.name, line))
+        elif keyword == "event":
+            contract.events.append(re.match(r"event\s+(\w+)", header).group(1))
+            contract.member_order.append(("event", contract.events[-1], line))
+        elif keyword == "error":
+            contract.errors.append(re.match(r"error\s+(\w+)", header).group(1))
+            contract.member_order.append(("error", contract.errors[-1], line))
+        elif keyword == "struct" and body:
+            name = re.match(r"struct\s+(\w+)", header).group(1)
+            fields = [_parse_parameter(f) for f in self.masked[body[0] + 1:body[1]].split(";") if f.strip()]
+            contract.structs[name] = fields
+            contract.member_order.append(("struct", name, line))
+        elif keyword == "enum" and body:
+            name = re.match(r"enum\s+(\w+)", header).group(1)
+            contract.enums[name] = [v.strip() for v in self.masked[body[0] + 1:body[1]].split(",") if v.strip()]
+            contract.member_order.append(("enum", name, line))
+        elif keyword == "using":
+            contract.using.append(" ".join(header.rstrip(";").split()[1:]))
+        elif body is None and header.strip().endswith(";"):
+            variable = _parse_state_variable(header.strip()[:-1], line, start)
+            if variable:
+                contract.state_variables.append(variable)
+                contract.member_order.append(("variable", variable.name, line))
+
+    def _parse_callable(self, contract: ContractInfo, header: str, start: int, end: int,
+                        body: Optional[Tuple[int, int]], previous_end: int) -> FunctionInfo:
+        match = _CALLABLE.match(header)
+        if match.group(2):
+            kind, name = "function", match.group(2)
+        elif match.group(3):
+            kind, name = "modifier", match.group(3)
+        else:
+            kind = name = match.group(1)
+
+        open_paren = start + match.end() - 1
+        close_paren = self._pairs.get(open_paren, open_paren)
+        parameters = [_parse_parameter(p) for p in _split_top_level(self.masked[open_paren + 1:close_paren])
+                      if p.strip()]
+
+        rest = self.masked[close_paren + 1:body[0] if body else end - 1]
+        returns: List[Parameter] = []
+        returns_match = re.search(r"\breturns\s*\(", rest)
+        if returns_match:
+            returns_open = close_paren + 1 + returns_match.end() - 1
+            returns_close = self._pairs.get(returns_open, returns_open)
+            returns = [_parse_parameter(p) for p in _split_top_level(self.masked[returns_open + 1:returns_close])
+                       if p.strip()]
+            rest = rest[:returns_match.start()]
+
+        function = FunctionInfo(
+            name=name, kind=kind, contract=contract.name,
+            visibility="external" if contract.kind == "interface" else ("internal" if kind == "modifier" else "public"),
+            parameters=parameters, returns=returns,
+            line=self.line_of(start), end_line=self.line_of(end - 1), start=start, end=end,
+            body_start=body[0] if body else None, body_end=body[1] if body else None,
+            doc=self._doc_before(start, previous_end)
+        )
+
+        for attribute in _ATTRIBUTE.finditer(rest):
+            word = attribute.group(1)
+            if word in VISIBILITIES:
+                function.visibility = word
+            elif word in MUTABILITIES:
+                function.mutability = "view" if word == "constant" else word
+            elif word == "virtual":
+                function.virtual = True
+            elif word == "override":
+                function.override = True
+            elif word not in _FUNCTION_KEYWORDS:
+                function.modifiers.append(word)
+
+        if kind in ("fallback", "receive"):
+            function.visibility = "external"
+        elif kind == "constructor":
+            # Appels aux constructeurs des contrats de base, pas des modificateurs
+            function.modifiers = [m for m in function.modifiers if m not in contract.bases]
+        return function
+
+    # ------------------------------------------------------------------ corps
+
+    def inherited_state(self, contract: ContractInfo) -> List[StateVariable]:
+        """Variables d'état du contrat et de ses bases définies dans le même fichier"""
+        seen, variables = set(), []
+
+        def visit(current: ContractInfo):
+            if current.name in seen:
+                return
+            seen.add(current.name)
+            for base in current.bases:
+                base_contract = self.contract(base)
+                if base_contract:
+                    visit(base_contract)
+            variables.extend(current.state_variables)
+
+        visit(contract)
+        return variables
+
+    def _contract_types(self, contract: ContractInfo) -> set:
+        local_types = set(contract.structs) | set(contract.enums)
+        for other in self.contracts:
+            local_types |= set(other.structs) | set(other.enums)
+            if other.kind == "library":
+                local_types.add(other.name)
+        return local_types
+
+    def _analyze_body(self, function: FunctionInfo, state: Dict[str, StateVariable], local_types: set):
+        start, end = function.body_start, function.body_end + 1
+        body = self.masked[start:end]
+
+        # Les paramètres et variables locales masquent les variables d'état homonymes
+        shadowed = {p.name for p in function.parameters + function.returns if p.name}
+        shadowed |= {m.group(1) for m in _LOCAL.finditer(body)}
+        alias_matches = [m for m in _STORAGE_ALIAS.finditer(body) if m.group(2) in state]
+        aliases = {m.group(1): m.group(2) for m in alias_matches}
+        declarations = {m.start(1) for m in alias_matches}
+        tracked = {name: name for name in state if name not in shadowed}
+        tracked.update(aliases)
+
+        if tracked:
+            names = "|".join(sorted(map(re.escape, tracked), key=len, reverse=True))
+            accessors = r"(?:\s*\[(?:[^\[\]]|\[[^\[\]]*\])*\]|\s*\.\s*\w+)*"
+            writes = re.compile(rf"(?<![\w.])({names})\b{accessors}\s*"
+                                r"(=(?![=>])|\+=|-=|\*=|/=|%=|\|=|&=|\^=|<<=|>>=|\+\+|--)")
+            prefix = re.compile(rf"(\+\+|--|\bdelete\s+)\s*({names})\b")
+            mutators = re.compile(rf"(?<![\w.])({names})\b{accessors}\s*\.\s*(push|pop)\s*\(")
+            plain_writes = set()
+            for match in writes.finditer(body):
+                if match.start() in declarations:
+                    continue
+                operator = match.group(2)
+                function.state_writes.append(Access(tracked[match.group(1)], self.line_of(start + match.start()),
+                                                    start + match.start(), operator))
+                if operator == "=":
+                    plain_writes.add(match.start())
+            for match in prefix.finditer(body):
+                function.state_writes.append(Access(tracked[match.group(2)], self.line_of(start + match.start(2)),
+                                                    start + match.start(2), match.group(1).strip()))
+            for match in mutators.finditer(body):
+                function.state_writes.append(Access(tracked[match.group(1)], self.line_of(start + match.start()),
+                                                    start + match.start(), match.group(2)))
+            function.state_writes.sort(key=lambda a: a.offset)
+
+            for match in re.finditer(rf"(?<![\w.])({names})\b", body):
+                if match.start() not in plain_writes:
+                    function.state_reads.append(Access(tracked[match.group(1)], self.line_of(start + match.start()),
+                                                       start + match.start()))
+
+        function.external_calls = self._external_calls(body, start, state, shadowed, function, local_types)
+        function.loops = self._loops(start, end)
+        function.events = _EMIT.findall(body)
+        function.requires = len(re.findall(r"\brequire\s*\(", body))
+        function.reverts = len(re.findall(r"\brevert\b", body))
+        function.uses = {
+            "msg.value": "msg.value" in body,
+            "msg.sender": "msg.sender" in body,
+            "tx.origin": "tx.origin" in body,
+            "block.timestamp": "block.timestamp" in body or re.search(r"\bnow\b", body) is not None,
+            "blockhash": "blockhash" in body or "block.prevrandao" in body or "block.difficulty" in body,
+            "selfdestruct": "selfdestruct" in body,
+            "delegatecall": "delegatecall" in body,
+            "assembly": re.search(r"\bassembly\b", body) is not None,
+            "unchecked": re.search(r"\bunchecked\b", body) is not None,
+            "ecrecover": "ecrecover" in body
+        }
+
+    def _external_calls(self, body: str, offset: int, state: Dict[str, StateVariable], shadowed: set,
+                        function: FunctionInfo, local_types: set) -> List[ExternalCall]:
+        calls: List[ExternalCall] = []
+        seen = set()
+
+        for match in _LOW_LEVEL.finditer(body):
+            kind = match.group(1)
+            target_match = _TARGET.search(body[max(0, match.start() - 80):match.start()])
+            target = target_match.group(0) if target_match else ""
+            if kind == "transfer":
+                # token.transfer(to, amount) est un appel d'interface, addr.transfer(amount) un envoi d'ether
+                open_paren = offset + match.end() - 1
+                arguments = self.masked[open_paren + 1:self._pairs.get(open_paren, open_paren)]
+                if len(_split_top_level(arguments)) > 1:
+                    kind = "interface"
+            options = match.group(2) or ""
+            calls.append(ExternalCall(
+                kind=kind, target=target, method=match.group(1),
+                line=self.line_of(offset + match.start()), offset=offset + match.start(),
+                sends_value=kind in ("transfer", "send") or "value" in options
+            ))
+            seen.add(match.start())
+
+        # Conversions explicites vers une interface: IERC20(token).transfer(...)
+        for match in _CAST.finditer(body):
+            if match.group(1) in local_types:
+                continue
+            open_paren = offset + match.end() - 1
+            close_paren = self._pairs.get(open_paren)
+            if close_paren is None:
+                continue
+            member = _MEMBER_CALL.match(self.masked, close_paren + 1, offset + len(body))
+            if not member:
+                continue
+            calls.append(ExternalCall(
+                kind="interface", target=f"{match.group(1)}({' '.join(self.masked[open_paren + 1:close_paren].split())})",
+                method=member.group(1), line=self.line_of(offset + match.start()), offset=offset + match.start(),
+                sends_value="value" in (member.group(2) or "")
+            ))
+
+        # Appels via une variable (état ou paramètre) de type contrat / interface
+        contract_typed = {v.name for v in state.values()
+                          if _is_contract_type(v.type, local_types) and v.name not in shadowed}
+        contract_typed |= {p.name for p in function.parameters if p.name and _is_contract_type(p.type, local_types)}
+        if contract_typed:
+            names = "|".join(map(re.escape, contract_typed))
+            for match in re.finditer(rf"(?<![\w.])({names})\s*\.\s*(\w+)\s*(\{{[^{{}}]*\}})?\s*\(", body):
+                if any(abs(match.end() - s) < 2 for s in seen) or match.group(2) in ("call", "delegatecall",
+                                                                                     "staticcall", "transfer", "send"):
+                    continue
+                calls.append(ExternalCall(
+                    kind="interface", target=match.group(1), method=match.group(2),
+                    line=self.line_of(offset + match.start()), offset=offset + match.start(),
+                    sends_value="value" in (match.group(3) or "")
+                ))
+
+        calls.sort(key=lambda c: c.offset)
+        return calls
+
+    def _loops(self, start: int, end: int) -> List[Loop]:
+        loops = []
+        for match in _LOOP.finditer(self.masked, start, end):
+            position = match.start()
+            if match.group(1):
+                open_paren = match.end() - 1
+                close_paren = self._pairs.get(open_paren, open_paren)
+                header = self.masked[open_paren + 1:close_paren]
+                following = _NON_SPACE.search(self.masked, close_paren + 1, end)
+                if following is None:
+                    continue
+                if following.group(0) == "{":
+                    body_start, body_end = following.start(), self._pairs.get(following.start(), end - 1)
+                elif following.group(0) == ";" and match.group(1) == "while":
+                    # Fin d'un do { ... } while (...); déjà comptabilisé
+                    continue
+                else:
+                    body_start = following.start()
+                    semicolon = self.masked.find(";", body_start, end)
+                    body_end = semicolon if semicolon != -1 else end - 1
+                kind = match.group(1)
+                parts = _split_top_level(header, ";")
+                condition = parts[1].strip() if kind == "for" and len(parts) > 1 else header.strip()
+            else:
+                kind = "do"
+                body_start = match.end() - 1
+                body_end = self._pairs.get(body_start, end - 1)
+                condition_match = re.match(r"\s*while\s*\(", self.masked[body_end + 1:end])
+                header = condition = ""
+                if condition_match:
+                    open_paren = body_end + 1 + condition_match.end() - 1
+                    condition = header = self.masked[open_paren + 1:self._pairs.get(open_paren, open_paren)].strip()
+
+            loops.append(Loop(
+                kind=kind, line=self.line_of(position), end_line=self.line_of(body_end),
+                start=position, end=body_end + 1, header=" ".join(header.split()),
+                condition=" ".join(condition.split()), body_start=body_start, body_end=body_end
+            ))
+        return loops
+
+    # ---------------------------------------------------------------- requêtes
+
+    def contract(self, name: str) -> Optional[ContractInfo]:
+        return next((c for c in self.contracts if c.name == name), None)
+
+    @property
+    def main_contract(self) -> Optional[ContractInfo]:
+        """Dernier contrat concret du fichier (à défaut, le dernier déclaré)"""
+        concrete = [c for c in self.contracts if c.kind == "contract"]
+        return (concrete or self.contracts or [None])[-1]
+
+    def functions(self, include_interfaces: bool = False) -> Iterator[FunctionInfo]:
+        for contract in self.contracts:
+            if include_interfaces or contract.kind != "interface":
+                yield from contract.functions
+
+    def modifiers(self) -> Iterator[FunctionInfo]:
+        for contract in self.contracts:
+            yield from contract.modifiers
+
+    def state_variables(self) -> Iterator[StateVariable]:
+        for contract in self.contracts:
+            yield from contract.state_variables
+
+    def external_calls(self) -> Iterator[Tuple[FunctionInfo, ExternalCall]]:
+        for function in self.functions():
+            for call in function.external_calls:
+                yield function, call
+
+    def loops(self) -> Iterator[Tuple[FunctionInfo, Loop]]:
+        for function in self.functions():
+            for loop in function.loops:
+                yield function, loop
+
+    def body(self, function: FunctionInfo, masked: bool = True) -> str:
+        """Corps d'une fonction (masqué par défaut: sans commentaires ni chaînes)"""
+        if not function.has_body:
+            return ""
+        text = self.masked if masked else self.source
+        return text[function.body_start:function.body_end + 1]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "hash": self.hash[:16],
+            "pragma": self.pragma,
+            "license": self.license,
+            "imports": len(self.imports),
+            "contracts": [
+                {
+                    "name": c.name,
+                    "kind": c.kind,
+                    "bases": c.bases,
+                    "functions": len(c.functions),
+                    "modifiers": len(c.modifiers),
+                    "state_variables": len(c.state_variables),
+                    "events": len(c.events)
+                }
+                for c in self.contracts
+            ]
+        }
+
+
+def _split_top_level(text: str, separator: str = ",") -> List[str]:
+    """Découpe sur un séparateur hors parenthèses / crochets / accolades"""
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        if char == separator and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return parts if any(p.strip() for p in parts) else []
+
+
+def _parse_parameter(text: str) -> Parameter:
+    tokens = text.split()
+    location = next((t for t in tokens if t in ("memory", "calldata", "storage")), None)
+    tokens = [t for t in tokens if t not in ("memory", "calldata", "storage", "indexed")]
+    if len(tokens) >= 2 and re.match(r"^\w+$", tokens[-1]) and not tokens[-1] == "payable":
+        return Parameter(type=" ".join(tokens[:-1]), name=tokens[-1], location=location)
+    return Parameter(type=" ".join(tokens), location=location)
+
+
+def _parse_state_variable(declaration: str, line: int, offset: int) -> Optional[StateVariable]:
+    initialized = False
+    parts = re.split(r"(?<![=!<>])=(?![=>])", declaration, maxsplit=1)
+    if len(parts) == 2:
+        declaration, initialized = parts[0], True
+
+    match = re.match(r"(mapping\s*\(.*\)|[\w.]+(?:\s+payable)?(?:\s*\[[^\]]*\])*)\s+(.+)$",
+                     " ".join(declaration.split()), re.S)
+    if not match:
+        return None
+    words = re.sub(r"\([^()]*\)", "", match.group(2)).split()
+    if not words or not re.match(r"^\w+$", words[-1]) or match.group(1) in _STATEMENT_KEYWORDS:
+        return None
+
+    variable = StateVariable(name=words[-1], type=re.sub(r"\s*\[", "[", match.group(1)),
+                             initialized=initialized, line=line, offset=offset)
+    for word in words[:-1]:
+        if word in VISIBILITIES:
+            variable.visibility = word
+        elif word == "constant":
+            variable.constant = True
+        elif word == "immutable":
+            variable.immutable = True
+        elif word not in _VARIABLE_KEYWORDS:
+            return None
+    return variable
+
+
+def _is_contract_type(type_name: str, local_types: set) -> bool:
+    return (re.match(r"^[A-Z]\w*$", type_name) is not None
+            and type_name not in local_types
+            and not ELEMENTARY_TYPE.match(type_name))
+
+
+# Cache LRU des index par hash de contenu (partagé par tous les agents du processus)
+_CACHE: "OrderedDict[str, SourceIndex]" = OrderedDict()
+_CACHE_SIZE = 256
+
+
+def parse_solidity(source: str) -> SourceIndex:
+    """
+    Retourne l'index d'un source Solidity (analysé une seule fois par contenu)
+
+    Args:
+        source: Code Solidity
+
+    Returns:
+        SourceIndex partagé (ne pas le modifier)
+    """
+    key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    index = _CACHE.get(key)
+    if index is not None:
+        _CACHE.move_to_end(key)
+        return index
+
+    index = SourceIndex(source, key)
+    _CACHE[key] = index
+    if len(_CACHE) > _CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return index
+
+
+def index_file(path: Path) -> SourceIndex:
+    """Index d'un fichier .sol (via le cache de contenu)"""
+    return parse_solidity(Path(path).read_text(encoding="utf-8", errors="replace"))
+
+
+# Coûts de référence (EIP-2929 / EIP-2200) pour les estimations statiques
+GAS = {
+    "sload_cold": 2100,
+    "sload_warm": 100,
+    "sstore_set": 22100,
+    "sstore_reset": 5000,
+    "call": 2600,
+    "call_value": 9000,
+    "log": 375,
+    "memory_word": 3,
+    "calldata_word": 16
+}
+BLOCK_GAS_LIMIT = 30_000_000
+
+# Variables d'état dont la modification doit être réservée à un rôle
+SENSITIVE_STATE = re.compile(r"owner|admin|role|fee|price|rate|paused|treasury|oracle|implementation|minter|limit",
+                             re.IGNORECASE)
+
+_SENDER_CHECK = re.compile(r"msg\.sender\s*[!=]=|[!=]=\s*msg\.sender|_checkOwner\s*\(|_checkRole\s*\(|hasRole\s*\(")
+
+
+def finding(rule: str, severity: str, message: str, line: Optional[int] = None,
+            function: Optional[str] = None, **extra) -> Dict[str, Any]:
+    """Constat au format commun des agents contrats"""
+    result = {"rule": rule, "severity": severity, "message": message, "line": line, "function": function}
+    result.update(extra)
+    return result
+
+
+def pragma_allows(pragma: Optional[str], version: str) -> bool:
+    """Vrai si la version de compilateur satisfait la contrainte `pragma solidity`"""
+    if not pragma:
+        return True
+    target = tuple(int(part) for part in version.split("."))
+    for operator, bound in re.findall(r"(\^|~|>=|<=|>|<|=)?\s*(\d+\.\d+\.\d+)", pragma):
+        reference = tuple(int(part) for part in bound.split("."))
+        if operator in ("^", "~"):
+            allowed = target >= reference and target[:2] == reference[:2]
+        elif operator == ">=":
+            allowed = target >= reference
+        elif operator == "<=":
+            allowed = target <= reference
+        elif operator == ">":
+            allowed = target > reference
+        elif operator == "<":
+            allowed = target < reference
+        else:
+            allowed = target == reference
+        if not allowed:
+            return False
+    return True
+
+
+def is_access_controlled(index: SourceIndex, function: FunctionInfo) -> bool:
+    """Vrai si la fonction restreint l'appelant (modificateur only*/auth ou test sur msg.sender)"""
+    for modifier in function.modifiers:
+        if modifier.startswith("only") or modifier in ("auth", "requiresAuth", "initializer"):
+            return True
+        definition = next((m for m in index.modifiers() if m.name == modifier), None)
+        if definition and _SENDER_CHECK.search(index.body(definition)):
+            return True
+    return _SENDER_CHECK.search(index.body(function)) is not None
+
+
+def cei_violations(index: SourceIndex) -> List[Dict[str, Any]]:
+    """
+    Écritures d'état postérieures à un appel externe (non-respect de Checks-Effects-Interactions)
+
+    Returns:
+        Une entrée par fonction fautive: premier appel, écritures suivantes, présence de nonReentrant
+    """
+    violations = []
+    for function in index.functions():
+        if not function.external_calls or not function.state_writes:
+            continue
+        call = function.external_calls[0]
+        late_writes = [w for w in function.state_writes if w.offset > call.offset]
+        if late_writes:
+            violations.append({
+                "contract": function.contract,
+                "function": function.name,
+                "call": {"kind": call.kind, "target": call.target, "method": call.method,
+                         "line": call.line, "sends_value": call.sends_value},
+                "writes_after_call": [{"variable": w.name, "line": w.line} for w in late_writes],
+                "guarded": "nonReentrant" in function.modifiers
+            })
+    return violations
+
+
+def unchecked_low_level_calls(index: SourceIndex) -> List[Tuple[FunctionInfo, ExternalCall]]:
+    """Appels call/delegatecall/send dont la valeur de retour est ignorée"""
+    unchecked = []
+    for function, call in index.external_calls():
+        if call.kind not in ("call", "delegatecall", "staticcall", "send"):
+            continue
+        statement_start = max(index.masked.rfind(";", 0, call.offset), index.masked.rfind("{", 0, call.offset))
+        prefix = index.masked[statement_start + 1:call.offset]
+        if not re.search(r"=|\b(?:if|require|assert|return)\b", prefix):
+            unchecked.append((function, call))
+    return unchecked
+
+
+_ACCESSOR = re.compile(r"\w+\s*(\[|\.\s*length\b|\.\s*\w+)?")
+_DO_CONDITION = re.compile(r"\s*while\s*\(")
+
+
+def access_kind(index: SourceIndex, access: Access) -> str:
+    """Forme d'un accès: element (a[i], m[k]), length (a.length), member (s.x) ou value"""
+    match = _ACCESSOR.match(index.masked, access.offset)
+    accessor = match.group(1) if match else None
+    if not accessor:
+        return "value"
+    if accessor == "[":
+        return "element"
+    return "length" if accessor.endswith("length") else "member"
+
+
+def condition_span(index: SourceIndex, loop: Loop) -> Tuple[int, int]:
+    """Offsets [début, fin) de la condition d'une boucle (évaluée à chaque itération)"""
+    if loop.kind == "do":
+        match = _DO_CONDITION.match(index.masked, loop.end)
+        if not match:
+            return loop.end, loop.end
+        return match.end(), index.closing(match.end() - 1) or match.end()
+    open_paren = index.masked.find("(", loop.start)
+    close_paren = index.closing(open_paren) or loop.body_start
+    if loop.kind == "while":
+        return open_paren + 1, close_paren
+    first = index.masked.find(";", open_paren, close_paren)
+    second = index.masked.find(";", first + 1, close_paren)
+    return first + 1, second if second != -1 else close_paren
+
+
+def loop_region(index: SourceIndex, loop: Loop) -> Tuple[int, int]:
+    """Offsets [début, fin) du code exécuté à chaque itération (condition, incrément, corps; pas l'initialisation)"""
+    condition_start, condition_end = condition_span(index, loop)
+    if loop.kind == "do":
+        return loop.body_start, max(condition_end, loop.end)
+    return (condition_start if loop.kind == "for" else loop.start), loop.end
+
+
+def loop_depth(index: SourceIndex, function: FunctionInfo, offset: int) -> int:
+    """Nombre de boucles de `function` qui répètent le code situé à `offset`"""
+    return sum(1 for loop in function.loops if _within(loop_region(index, loop), offset))
+
+
+def _within(region: Tuple[int, int], offset: int) -> bool:
+    return region[0] <= offset < region[1]
+
+
+def loop_iteration_gas(index: SourceIndex, function: FunctionInfo, loop: Loop) -> int:
+    """
+    Estimation du gas d'une itération: accès au stockage (éléments froids, variables
+    chaudes après la première itération), appels externes et événements
+    """
+    region = loop_region(index, loop)
+    gas = 50  # comparaison, incrément et saut
+    for read in function.state_reads:
+        if _within(region, read.offset):
+            gas += GAS["sload_cold"] if access_kind(index, read) == "element" else GAS["sload_warm"]
+    for write in function.state_writes:
+        if _within(region, write.offset):
+            gas += GAS["sstore_reset"] if access_kind(index, write) == "element" else GAS["sload_warm"]
+    for call in function.external_calls:
+        if _within(region, call.offset):
+            gas += GAS["call_value"] if call.sends_value else GAS["call"]
+    gas += GAS["log"] * len(_EMIT.findall(index.masked, region[0], region[1]))
+    return gas
+
+
+def unbounded_loops(index: SourceIndex) -> List[Tuple[FunctionInfo, Loop, str]]:
+    """
+    Boucles dont la condition dépend de l'état du contrat: longueur d'un tableau
+    de stockage ou compteur entier en stockage. Leur coût croît avec les données
+    jusqu'à dépasser la limite de gas du bloc.
+
+    Returns:
+        (fonction, boucle, variable qui borne la boucle)
+    """
+    unbounded = []
+    for contract in index.contracts:
+        if contract.kind == "interface":
+            continue
+        state = {v.name: v for v in index.inherited_state(contract) if not v.constant and not v.immutable}
+        for function in contract.functions:
+            for loop in function.loops:
+                span = condition_span(index, loop)
+                for read in function.state_reads:
+                    variable = state.get(read.name)
+                    if variable is None or not _within(span, read.offset):
+                        continue
+                    kind = access_kind(index, read)
+                    if kind == "length" or (kind == "value" and re.match(r"u?int\d*$", variable.type)):
+                        unbounded.append((function, loop, read.name))
+                        break
+    return unbounded
+
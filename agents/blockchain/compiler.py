@@ -0,0 +1,257 @@
+"""
+Compilateur Solidity "chaud" pour la validation des contrats générés
+
+Le binaire solc est résolu une seule fois par version puis réutilisé; les
+compilations passent par l'interface standard-json (sans fichiers temporaires)
+et leurs résultats sont mis en cache par hash du source.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Téléchargement d'un solc manquant par py-solc-x: désactivé sauf demande explicite
+AUTO_INSTALL_ENV = "SOLC_AUTO_INSTALL"
+
+_PRAGMA = re.compile(r"pragma\s+solidity\s+([^;]+);")
+_VERSION = re.compile(r"(\d+)\.(\d+)\.(\d+)")
+
+
+@dataclass
+class CompileResult:
+    """Résultat d'une compilation"""
+    success: bool
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    warnings: List[Dict[str, Any]] = field(default_factory=list)
+    contracts: Dict[str, Any] = field(default_factory=dict)
+    ast: Optional[Dict[str, Any]] = None
+    duration: float = 0.0
+    cached: bool = False
+    compiler: Optional[str] = None
+
+    def error_messages(self, limit: int = 10) -> List[str]:
+        """Messages d'erreur formatés (tronqués à `limit`)"""
+        return [e.get("formattedMessage") or e.get("message", "") for e in self.errors[:limit]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "success": self.success,
+            "errors": self.error_messages(),
+            "warning_count": len(self.warnings),
+            "contracts": sorted(self.contracts),
+            "duration": self.duration,
+            "cached": self.cached,
+            "compiler": self.compiler
+        }
+
+
+class CompilerUnavailable(RuntimeError):
+    """Aucun compilateur solc n'a pu être trouvé"""
+
+
+class SolidityCompiler:
+    """Compilateur solc réutilisable (résolution unique du binaire, cache des résultats)"""
+
+    # Binaires résolus par version, partagés par toutes les instances du processus
+    _binaries: Dict[str, List[str]] = {}
+
+    def __init__(self, project_root: Path, default_version: str = "0.8.20", cache_size: int = 128,
+                 optimizer_runs: int = 200, auto_install: Optional[bool] = None):
+        """
+        Args:
+            auto_install: Télécharger via py-solc-x une version absente (accès réseau);
+                par défaut selon $SOLC_AUTO_INSTALL
+        """
+        self.project_root = Path(project_root)
+        if auto_install is None:
+            auto_install = os.getenv(AUTO_INSTALL_ENV, "").lower() in ("1", "true", "yes")
+        self.auto_install = auto_install
+        self.default_version = default_version
+        self.optimizer_runs = optimizer_runs
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, CompileResult]" = OrderedDict()
+
+    def _requested_version(self, source: str) -> str:
+        match = _PRAGMA.search(source)
+        if match:
+            version = _VERSION.search(match.group(1))
+            if version:
+                return version.group(0)
+        return self.default_version
+
+    def resolve(self, version: Optional[str] = None) -> List[str]:
+        """
+        Trouve la commande solc à utiliser (une seule fois par version)
+
+        Ordre: $SOLC_BINARY, versions déjà installées par py-solc-x, solc du PATH,
+        cache de compilateurs Hardhat, solcjs via npx. Une version absente n'est
+        téléchargée (py-solc-x) qu'avec `auto_install`.
+
+        Returns:
+            Commande (liste d'arguments) acceptant --standard-json
+
+        Raises:
+            CompilerUnavailable: $SOLC_BINARY introuvable, ou aucun compilateur pour `version`
+        """
+        version = version or self.default_version
+        if version in self._binaries:
+            return self._binaries[version]
+
+        command = None
+        if os.getenv("SOLC_BINARY"):
+            binary = shutil.which(os.environ["SOLC_BINARY"])
+            if binary is None:
+                raise CompilerUnavailable(f"SOLC_BINARY introuvable ou non exécutable: {os.environ['SOLC_BINARY']}")
+            command = [binary]
+
+        if command is None:
+            command = self._solcx(version)
+
+        if command is None and shutil.which("solc"):
+            command = [shutil.which("solc")]
+
+        if command is None:
+            hardhat_cache = Path.home() / ".cache" / "hardhat-nodejs"
+            candidates = sorted(hardhat_cache.glob(f"compilers*/*/solc-*-v{version}+*")) if hardhat_cache.exists() else []
+            if candidates:
+                command = [str(candidates[-1])]
+
+        if command is None and shutil.which("npx") and (self.project_root / "node_modules" / "solc").exists():
+            command = ["npx", "--no-install", "solcjs"]
+
+        if command is None:
+            raise CompilerUnavailable(f"Aucun compilateur solc {version} disponible (définir SOLC_BINARY, "
+                                      f"ou {AUTO_INSTALL_ENV}=1 pour l'installer via py-solc-x)")
+
+        logger.info(f"🔧 Compilateur solc {version}: {' '.join(command)}")
+        self._binaries[version] = command
+        return command
+
+    def _solcx(self, version: str) -> Optional[List[str]]:
+        """Binaire py-solc-x de `version`: installé, ou téléchargé si `auto_install`"""
+        try:
+            import solcx
+        except ImportError:
+            return None
+        if version not in {str(v) for v in solcx.get_installed_solc_versions()}:
+            if not self.auto_install:
+                return None
+            logger.info(f"⬇️  Installation de solc {version} (py-solc-x)")
+            try:
+                solcx.install_solc(version)
+            except Exception as e:
+                logger.warning(f"⚠️  Installation de solc {version} impossible: {e}")
+                return None
+        return [str(solcx.get_executable(version))]
+
+    def _standard_input(self, sources: Dict[str, str]) -> Dict[str, Any]:
+        return {
+            "language": "Solidity",
+            "sources": {name: {"content": content} for name, content in sources.items()},
+            "settings": {
+                "optimizer": {"enabled": True, "runs": self.optimizer_runs},
+                "remappings": ["@openzeppelin/=node_modules/@openzeppelin/"],
+                "outputSelection": {
+                    "*": {"*": ["abi", "evm.bytecode.object", "storageLayout"], "": ["ast"]}
+                }
+            }
+        }
+
+    async def compile(self, source: str, name: str = "Contract.sol", timeout: float = 60.0) -> CompileResult:
+        """
+        Compile un source Solidity
+
+        Args:
+            source: Code Solidity
+            name: Nom d'unité de compilation
+            timeout: Délai maximal de compilation (s)
+
+        Returns:
+            CompileResult (les erreurs du compilateur sont dans `errors`)
+        """
+        key = hashlib.sha256(f"{name}\0{source}".encode("utf-8")).hexdigest()
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            cached = self._cache[key]
+            return CompileResult(cached.success, cached.errors, cached.warnings, cached.contracts,
+                                 cached.ast, 0.0, True, cached.compiler)
+
+        command = self.resolve(self._requested_version(source))
+        start = time.perf_counter()
+
+        arguments = ["--standard-json",
+                     "--base-path", str(self.project_root),
+                     "--include-path", str(self.project_root / "node_modules")]
+        if "solcjs" not in command:
+            arguments += ["--allow-paths", str(self.project_root)]
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command, *arguments,
+                cwd=self.project_root,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except OSError as e:
+            # Binaire supprimé ou devenu inexécutable depuis sa résolution
+            self._binaries.pop(self._requested_version(source), None)
+            raise CompilerUnavailable(f"Lancement de {command[0]} impossible: {e}") from e
+        payload = json.dumps(self._standard_input({name: source})).encode("utf-8")
+
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(payload), timeout=timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return CompileResult(False, [{"severity": "error", "message": "Timeout de compilation"}],
+                                 duration=time.perf_counter() - start, compiler=command[0])
+
+        try:
+            output = json.loads(stdout or b"{}")
+        except json.JSONDecodeError:
+            output = {"errors": [{"severity": "error",
+                                  "message": stderr.decode("utf-8", errors="replace")[-2000:]}]}
+
+        diagnostics = output.get("errors", [])
+        errors = [d for d in diagnostics if d.get("severity") == "error"]
+        warnings = [d for d in diagnostics if d.get("severity") != "error"]
+
+        result = CompileResult(
+            success=not errors,
+            errors=errors,
+            warnings=warnings,
+            contracts=output.get("contracts", {}).get(name, {}),
+            ast=output.get("sources", {}).get(name, {}).get("ast"),
+            duration=time.perf_counter() - start,
+            compiler=command[0]
+        )
+
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+
+# Compilateurs partagés du processus, par racine de projet: le cache des résultats
+# survit aux instances d'agents (une par génération)
+_COMPILERS: Dict[Path, SolidityCompiler] = {}
+
+
+def get_compiler(project_root: Path) -> SolidityCompiler:
+    """Compilateur chaud du processus pour `project_root` (créé au premier appel)"""
+    root = Path(project_root).resolve()
+    compiler = _COMPILERS.get(root)
+    if compiler is None:
+        compiler = _COMPILERS[root] = SolidityCompiler(root)
+    return compiler
@@ -1,13 +1,24 @@
 """
 Agent IA pour générer des smart contracts Solidity
 """
-import os
+import sys
 import json
+import time
+import asyncio
 import logging
 from typing import Dict, Any, Optional
 from pathlib import Path
 from datetime import datetime
 
+# Racine du dépôt dans le path pour la couche LLM partagée (agents/llm)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from agents.llm.client import LLMRequest, get_provider
+from agents.llm.hedging import hedged_call
+from agents.blockchain.compiler import CompilerUnavailable, get_compiler
+from agents.llm.prompts import PromptTemplate, TokenBudget, TokenCounter, compact_prompt
+from pipeline.registry import register_agent
+
 # Configuration logging
 logging.basicConfig(
     level=logging.INFO,
@@ -16,67 +27,180 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Templates compilés une seule fois au chargement du module
+GENERATION_TEMPLATE = PromptTemplate("""
+    TU ES UN EXPERT SOLIDITY ET SÉCURITÉ WEB3.
+    
+    # MISSION
+    Génère un smart contract Solidity SÉCURISÉ et OPTIMISÉ basé sur:
+    
+    TYPE: {contract_type}
+    EXIGENCES: {requirements}
+    
+    # RÈGLES STRICTES
+    1. Solidity ^0.8.20 avec pragma strict
+    2. Utiliser OpenZeppelin imports quand possible
+    3. Implémenter les standards ERC complètement
+    4. AJOUTER DES COMMENTAIRES NATSPEC POUR TOUTES LES FONCTIONS
+    5. Inclure les modificateurs: onlyOwner, nonReentrant si nécessaire
+    6. Gérer les erreurs avec require et messages clairs
+    7. Optimiser le gas usage
+    8. Prévenir les vulnérabilités: reentrancy, overflow, access control
+    
+    # RÈGLES SPÉCIFIQUES
+    {type_rules}
+    
+    # FORMAT DE SORTIE
+    Retourne UNIQUEMENT le code Solidity complet et valide.
+    Commence directement par "// SPDX-License-Identifier:".
+    Pas d'explications, pas de markdown, juste le code.
+    
+    # EXEMPLE DE STRUCTURE:
+    // SPDX-License-Identifier: MIT
+    pragma solidity ^0.8.20;
+    
+    import "@openzeppelin/contracts/...";
+    
+    /**
+     * @title NomDuContrat
+     * @dev Description détaillée
+     */
+    contract NomDuContrat {{ ... }}
+""")
+
+TYPE_SPECIFIC_RULES = {
+    contract_type: compact_prompt(rules)
+    for contract_type, rules in {
+        "erc20": """
+            - Implémenter toutes les fonctions ERC20 standard
+            - Inclure les événements Transfer et Approval
+            - Ajouter les extensions: mintable, burnable si demandé
+            """,
+        "erc721": """
+            - Implémenter toutes les fonctions ERC721 standard
+            - Gérer les tokenURI correctement
+            - Considérer ERC721Enumerable et ERC721URIStorage
+            """,
+        "erc1155": """
+            - Implémenter le multi-token standard
+            - Gérer les balances par type de token
+            - Inclure les événements TransferSingle et TransferBatch
+            """,
+        "custom": """
+            - Analyser les exigences pour déterminer le meilleur standard
+            - Prioriser la sécurité et la gas efficiency
+            """
+    }.items()
+}
+
+SYSTEM_PROMPT = compact_prompt("""
+    Tu es un expert senior en développement Solidity et sécurité blockchain.
+    Tes contrats sont utilisés en production avec des millions en valeur.
+    
+    TES PRINCIPES:
+    1. SÉCURITÉ d'abord - auditée, testée, battle-tested
+    2. GAS OPTIMIZATION - chaque opération compte
+    3. READABILITY - code clair, commentaires NatSpec
+    4. STANDARDS - suivre les meilleures pratiques de l'industrie
+    5. UPGRADEABILITY - penser à l'évolution du contrat
+    
+    TU NE DOIS JAMAIS:
+    - Oublier les checks d'overflow/underflow
+    - Utiliser .transfer() ou .send()
+    - Exposer des fonctions sensibles sans access control
+    - Négliger les événements pour la traçabilité
+""")
+
+FIX_TEMPLATE = PromptTemplate("""
+    Le smart contract Solidity suivant ne compile pas.
+    
+    # ERREURS DU COMPILATEUR
+    {errors}
+    
+    # CODE ACTUEL
+    {code}
+    
+    # FORMAT DE SORTIE
+    Corrige toutes les erreurs sans retirer de fonctionnalité.
+    Retourne UNIQUEMENT le code Solidity complet corrigé.
+    Commence directement par "// SPDX-License-Identifier:".
+    Pas d'explications, pas de markdown, juste le code.
+""")
+
+# Taille de réponse attendue (tokens) par type de contrat, pour dimensionner max_tokens
+EXPECTED_CONTRACT_TOKENS = {
+    "erc20": 1200,
+    "erc721": 1800,
+    "erc1155": 2000,
+    "custom": 2400,
+    "default": 2400
+}
+
+
 class ContractGeneratorAgent:
     """Agent IA pour génération et analyse de smart contracts"""
     
-    def __init__(self, ai_provider: str = "openai"):
+    def __init__(self, ai_provider: str = "openai", fallback_provider: Optional[str] = None,
+                 hedge_after: float = 8.0):
         """
         Initialise l'agent avec le provider IA spécifié
         
         Args:
-            ai_provider: "openai", "anthropic", ou "google"
+            ai_provider: "openai", "anthropic", "google", "fake" ou "replay"
+            fallback_provider: Provider secondaire mis en concurrence si le principal tarde ou échoue
+            hedge_after: Délai (s) avant de lancer le provider secondaire
         """
         self.ai_provider = ai_provider
+        self.fallback_provider = fallback_provider
+        self.hedge_after = hedge_after
         self.project_root = Path(__file__).parent.parent.parent
+        # Compilateur partagé du processus: binaire résolu et résultats en cache entre générations
+        self.compiler = get_compiler(self.project_root)
         self.setup_ai_client()
         
     def setup_ai_client(self):
-        """Configure le client IA selon le provider"""
+        """Configure le client IA selon le provider (client asynchrone partagé, connexions poolées)"""
         try:
-            if self.ai_provider == "openai":
-                import openai
-                api_key = os.getenv("OPENAI_API_KEY")
-                if not api_key or api_key == "sk-xxx":
-                    raise ValueError("OPENAI_API_KEY non configuré dans .env. Remplace 'sk-xxx' par ta vraie clé.")
-                
-                # Configuration pour OpenAI v1.0+
-                from openai import OpenAI
-                self.client = OpenAI(api_key=api_key)
-                self.model = "gpt-4"  # ou "gpt-3.5-turbo"
-                
-            elif self.ai_provider == "anthropic":
-                from anthropic import Anthropic
-                api_key = os.getenv("ANTHROPIC_API_KEY")
-                if not api_key:
-                    raise ValueError("ANTHROPIC_API_KEY non configuré dans .env")
-                self.client = Anthropic(api_key=api_key)
-                self.model = "claude-3-5-sonnet-20241022"
-                
-            elif self.ai_provider == "google":
-                import google.generativeai as genai
-                api_key = os.getenv("GOOGLE_AI_API_KEY")
-                if not api_key:
-                    raise ValueError("GOOGLE_AI_API_KEY non configuré dans .env")
-                genai.configure(api_key=api_key)
-                self.client = genai
-                self.model = "gemini-pro"
-                
-            else:
-                raise ValueError(f"Provider IA non supporté: {self.ai_provider}")
-                
+            self.client = get_provider(self.ai_provider)
+            self.model = self.client.model
+            self.token_budget = TokenBudget(TokenCounter(self.ai_provider, self.model),
+                                            EXPECTED_CONTRACT_TOKENS)
+            self.backends = {self.ai_provider: (self.client, self.model, self.token_budget)}
+            
             logger.info(f"✅ Agent IA configuré avec {self.ai_provider}")
             
-        except ImportError as e:
-            logger.error(f"❌ Package manquant: {e}. Installe avec: pip install {self.ai_provider}")
-            raise
         except Exception as e:
             logger.error(f"❌ Erreur configuration IA: {e}")
             raise
+        
+        # Le provider secondaire est optionnel: sans clé, l'agent fonctionne sans couverture
+        if self.fallback_provider and self.fallback_provider != self.ai_provider:
+            try:
+                client = get_provider(self.fallback_provider)
+                budget = TokenBudget(TokenCounter(self.fallback_provider, client.model),
+                                     EXPECTED_CONTRACT_TOKENS)
+                self.backends[self.fallback_provider] = (client, client.model, budget)
+                logger.info(f"✅ Provider de secours: {self.fallback_provider} (après {self.hedge_after}s)")
+            except Exception as e:
+                logger.warning(f"⚠️  Provider de secours {self.fallback_provider} indisponible: {e}")
     
     def generate_contract(self, requirements: str, contract_type: str = "custom") -> Dict[str, Any]:
         """
         Génère un smart contract complet basé sur des exigences
         
+        Args:
+            requirements: Description textuelle des exigences
+            contract_type: Type de contrat (erc20, erc721, erc1155, custom)
+            
+        Returns:
+            Dict avec code, analyse et métadonnées
+        """
+        return asyncio.run(self.generate_contract_async(requirements, contract_type))
+    
+    async def generate_contract_async(self, requirements: str, contract_type: str = "custom") -> Dict[str, Any]:
+        """
+        Version asynchrone de generate_contract (utilisable depuis la boucle de l'orchestrateur)
+        
         Args:
             requirements: Description textuelle des exigences
             contract_type: Type de contrat (erc20, erc721, erc1155, custom)
@@ -88,67 +212,50 @@ class ContractGeneratorAgent:
         
         # Prompt optimisé pour Solidity
         prompt = self._build_generation_prompt(requirements, contract_type)
+        system_prompt = self._get_system_prompt()
         
         try:
-            # Appel au modèle IA
-            if self.ai_provider == "openai":
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {
-                            "role": "system", 
-                            "content": self._get_system_prompt()
-                        },
-                        {
-                            "role": "user", 
-                            "content": prompt
-                        }
-                    ],
-                    temperature=0.1,
-                    max_tokens=4000
+            # Appel au modèle IA (couvert par le provider de secours si configuré)
+            hedge = None
+            if len(self.backends) > 1:
+                hedge = await hedged_call(
+                    {name: (lambda name=name: self._call_backend(name, prompt, system_prompt, contract_type))
+                     for name in self.backends},
+                    primary=self.ai_provider,
+                    hedge_after=self.hedge_after,
+                    is_valid=lambda outcome: bool(outcome[1].text) and outcome[3]["is_valid"]
                 )
-                generated_code = response.choices[0].message.content.strip()
-                
-            elif self.ai_provider == "anthropic":
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=4000,
-                    temperature=0.1,
-                    system=self._get_system_prompt(),
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                generated_code = response.content[0].text
-                
-            elif self.ai_provider == "google":
-                import google.generativeai as genai
-                model = genai.GenerativeModel(self.model)
-                response = model.generate_content(
-                    prompt,
-                    generation_config=genai.GenerationConfig(
-                        temperature=0.1,
-                        max_output_tokens=4000,
-                    )
-                )
-                generated_code = response.text
-            
+                if hedge.result is None:
+                    errors = "; ".join(f"{a['provider']}: {a['error']}" for a in hedge.attempts if a.get("error"))
+                    raise RuntimeError(f"Aucun provider n'a produit de contrat ({errors})")
+                provider, response, max_tokens, analysis = hedge.result
             else:
-                raise ValueError(f"Provider {self.ai_provider} non implémenté")
+                provider, response, max_tokens, analysis = await self._call_backend(
+                    self.ai_provider, prompt, system_prompt, contract_type
+                )
             
-            # Analyse et validation du code généré
-            analysis = self._analyze_generated_code(generated_code, contract_type)
+            generated_code = response.text
             
             # Préparation du résultat
             result = {
                 "timestamp": datetime.now().isoformat(),
                 "contract_type": contract_type,
                 "requirements": requirements,
-                "ai_provider": self.ai_provider,
-                "model": self.model,
+                "ai_provider": provider,
+                "model": self.backends[provider][1],
                 "code": generated_code,
                 "analysis": analysis,
+                "latency": response.latency,
+                "usage": {
+                    "input_tokens": response.input_tokens,
+                    "output_tokens": response.output_tokens,
+                    "max_tokens": max_tokens
+                },
                 "file_name": self._generate_filename(contract_type),
                 "status": "success" if analysis["is_valid"] else "needs_review"
             }
+            if hedge is not None:
+                result["hedge"] = hedge.to_dict()
             
             logger.info(f"✅ Contrat généré: {analysis['summary']}")
             return result
@@ -163,90 +270,106 @@ class ContractGeneratorAgent:
                 "analysis": {}
             }
     
-    def _build_generation_prompt(self, requirements: str, contract_type: str) -> str:
-        """Construit le prompt pour la génération"""
-        
-        type_specific_rules = {
-            "erc20": """
-            - Implémenter toutes les fonctions ERC20 standard
-            - Inclure les événements Transfer et Approval
-            - Ajouter les extensions: mintable, burnable si demandé
-            """,
-            "erc721": """
-            - Implémenter toutes les fonctions ERC721 standard
-            - Gérer les tokenURI correctement
-            - Considérer ERC721Enumerable et ERC721URIStorage
-            """,
-            "erc1155": """
-            - Implémenter le multi-token standard
-            - Gérer les balances par type de token
-            - Inclure les événements TransferSingle et TransferBatch
-            """,
-            "custom": """
-            - Analyser les exigences pour déterminer le meilleur standard
-            - Prioriser la sécurité et la gas efficiency
-            """
-        }
-        
-        return f"""
-        TU ES UN EXPERT SOLIDITY ET SÉCURITÉ WEB3.
-        
-        # MISSION
-        Génère un smart contract Solidity SÉCURISÉ et OPTIMISÉ basé sur:
-        
-        TYPE: {contract_type.upper()}
-        EXIGENCES: {requirements}
-        
-        # RÈGLES STRICTES
-        1. Solidity ^0.8.20 avec pragma strict
-        2. Utiliser OpenZeppelin imports quand possible
-        3. Implémenter les standards ERC complètement
-        4. AJOUTER DES COMMENTAIRES NATSPEC POUR TOUTES LES FONCTIONS
-        5. Inclure les modificateurs: onlyOwner, nonReentrant si nécessaire
-        6. Gérer les erreurs avec require et messages clairs
-        7. Optimiser le gas usage
-        8. Prévenir les vulnérabilités: reentrancy, overflow, access control
+    async def _call_backend(self, provider: str, prompt: str, system_prompt: str, contract_type: str):
+        """Appelle un provider et analyse le code retourné"""
+        client, model, budget = self.backends[provider]
+        max_tokens = budget.max_tokens(contract_type, prompt, system_prompt, model)
+        response = await client.complete(LLMRequest(
+            prompt=prompt,
+            system=system_prompt,
+            max_tokens=max_tokens,
+            temperature=0.1,
+            model=model
+        ))
+        # Analyse et validation du code généré
+        return provider, response, max_tokens, self._analyze_generated_code(response.text, contract_type)
+    
+    async def generate_and_fix(self, requirements: str, contract_type: str = "custom",
+                               max_iterations: int = 3) -> Dict[str, Any]:
+        """
+        Génère un contrat puis boucle compilation → correction jusqu'au premier succès
         
-        # RÈGLES SPÉCIFIQUES
-        {type_specific_rules.get(contract_type, type_specific_rules['custom'])}
+        Args:
+            requirements: Description textuelle des exigences
+            contract_type: Type de contrat (erc20, erc721, erc1155, custom)
+            max_iterations: Nombre maximal d'itérations (génération initiale incluse)
+            
+        Returns:
+            Résultat de generate_contract enrichi de "compilation" et "iterations"
+        """
+        start = time.perf_counter()
+        result = await self.generate_contract_async(requirements, contract_type)
+        iterations = [{"iteration": 1, "generation_latency": result.get("latency", 0.0)}]
+        result["iterations"] = iterations
         
-        # FORMAT DE SORTIE
-        Retourne UNIQUEMENT le code Solidity complet et valide.
-        Commence directement par "// SPDX-License-Identifier:".
-        Pas d'explications, pas de markdown, juste le code.
+        if result["status"] == "error":
+            return result
         
-        # EXEMPLE DE STRUCTURE:
-        // SPDX-License-Identifier: MIT
-        pragma solidity ^0.8.20;
+        for iteration in range(1, max_iterations + 1):
+            current = iterations[-1]
+            try:
+                compiled = await self.compiler.compile(result["code"], result["file_name"])
+            except CompilerUnavailable as e:
+                logger.warning(f"⚠️  Compilation ignorée: {e}")
+                result["compilation"] = {"success": None, "error": str(e)}
+                break
+            
+            current.update({
+                "compile_latency": compiled.duration,
+                "compiled": compiled.success,
+                "error_count": len(compiled.errors)
+            })
+            result["compilation"] = compiled.to_dict()
+            
+            if compiled.success:
+                logger.info(f"✅ Compilation réussie à l'itération {iteration}")
+                break
+            
+            if iteration == max_iterations:
+                logger.warning(f"⚠️  Contrat non compilable après {max_iterations} itération(s)")
+                result["status"] = "compile_failed"
+                break
+            
+            # Renvoyer les erreurs du compilateur au modèle
+            logger.info(f"🔁 Itération {iteration + 1}: correction de {len(compiled.errors)} erreur(s)")
+            fix_prompt = FIX_TEMPLATE.render(
+                errors="\n".join(compiled.error_messages()),
+                code=result["code"]
+            )
+            try:
+                provider, response, _, analysis = await self._call_backend(
+                    result["ai_provider"], fix_prompt, self._get_system_prompt(), contract_type
+                )
+            except Exception as e:
+                # Provider en échec pendant la correction: le dernier code (non compilable) est conservé
+                logger.error(f"❌ Correction impossible à l'itération {iteration + 1}: {e}")
+                iterations.append({"iteration": iteration + 1, "error": str(e), "compiled": False})
+                result["status"] = "compile_failed"
+                result["error"] = f"Correction impossible: {e}"
+                break
+            
+            result["code"] = response.text
+            result["analysis"] = analysis
+            result["status"] = "success" if analysis["is_valid"] else "needs_review"
+            iterations.append({"iteration": iteration + 1, "generation_latency": response.latency})
         
-        import "@openzeppelin/contracts/...";
+        for entry in iterations:
+            entry["latency"] = entry.get("generation_latency", 0.0) + entry.get("compile_latency", 0.0)
+        result["total_latency"] = time.perf_counter() - start
         
-        /**
-         * @title NomDuContrat
-         * @dev Description détaillée
-         */
-        contract NomDuContrat {{ ... }}
-        """
+        return result
+    
+    def _build_generation_prompt(self, requirements: str, contract_type: str) -> str:
+        """Construit le prompt pour la génération (template précompilé)"""
+        return GENERATION_TEMPLATE.render(
+            contract_type=contract_type.upper(),
+            requirements=requirements.strip(),
+            type_rules=TYPE_SPECIFIC_RULES.get(contract_type, TYPE_SPECIFIC_RULES["custom"])
+        )
     
     def _get_system_prompt(self) -> str:
         """Retourne le prompt système pour l'IA"""
-        return """
-        Tu es un expert senior en développement Solidity et sécurité blockchain.
-        Tes contrats sont utilisés en production avec des millions en valeur.
-        
-        TES PRINCIPES:
-        1. SÉCURITÉ d'abord - auditée, testée, battle-tested
-        2. GAS OPTIMIZATION - chaque opération compte
-        3. READABILITY - code clair, commentaires NatSpec
-        4. STANDARDS - suivre les meilleures pratiques de l'industrie
-        5. UPGRADEABILITY - penser à l'évolution du contrat
-        
-        TU NE DOIS JAMAIS:
-        - Oublier les checks d'overflow/underflow
-        - Utiliser .transfer() ou .send()
-        - Exposer des fonctions sensibles sans access control
-        - Négliger les événements pour la traçabilité
-        """
+        return SYSTEM_PROMPT
     
     def _analyze_generated_code(self, code: str, expected_type: str) -> Dict[str, Any]:
         """Analyse le code généré pour la qualité et sécurité"""
@@ -338,6 +461,54 @@ class ContractGeneratorAgent:
         return filepath
 
 
+@register_agent("contract_generator", tasks=("generate",), inputs=("requirements", "contract_type"),
+                outputs=("code", "analysis", "status", "file_path"), cost="expensive",
+                description="Génération de contrats Solidity par LLM, compilée et corrigée")
+async def run(task: str, config: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+    """
+    Point d'entrée utilisé par l'orchestrateur (Web3PipelineOrchestrator.run_agent)
+    
+    Args:
+        task: Tâche à exécuter ("generate")
+        config: Configuration de l'agent (provider, auto_save, ...)
+        **kwargs: requirements, contract_type
+        
+    Returns:
+        Résultat de la génération avec le statut "success" attendu par l'orchestrateur
+    """
+    config = config or {}
+    
+    if task != "generate":
+        return {"success": False, "agent": "contract_generator", "error": f"Tâche inconnue: {task}"}
+    
+    agent = ContractGeneratorAgent(
+        ai_provider=kwargs.pop("provider", config.get("provider", "openai")),
+        fallback_provider=kwargs.pop("fallback_provider", config.get("fallback_provider")),
+        hedge_after=config.get("hedge_after_s", 8.0)
+    )
+    
+    if config.get("validate_after_generate", False):
+        result = await agent.generate_and_fix(
+            kwargs.get("requirements", ""),
+            kwargs.get("contract_type", "custom"),
+            max_iterations=config.get("max_fix_iterations", 3)
+        )
+    else:
+        result = await agent.generate_contract_async(
+            kwargs.get("requirements", ""),
+            kwargs.get("contract_type", "custom")
+        )
+    
+    result["agent"] = "contract_generator"
+    result["task"] = task
+    result["success"] = result["status"] not in ("error", "compile_failed")
+    
+    if result["success"] and config.get("auto_save", True):
+        result["file_path"] = str(agent.save_contract(result))
+    
+    return result
+
+
 # Interface CLI simplifiée
 def main():
     """Point d'entrée pour l'agent"""
@@ -351,8 +522,16 @@ def main():
                        choices=["erc20", "erc721", "erc1155", "custom"],
                        help="Type de contrat à générer")
     parser.add_argument("--provider", "-p", default="openai",
-                       choices=["openai", "anthropic", "google"],
+                       choices=["openai", "anthropic", "google", "fake", "replay"],
                        help="Provider IA à utiliser")
+    parser.add_argument("--fallback-provider", choices=["openai", "anthropic", "google", "fake", "replay"],
+                       help="Provider secondaire mis en concurrence si le principal tarde")
+    parser.add_argument("--hedge-after", type=float, default=8.0,
+                       help="Délai (s) avant de solliciter le provider secondaire")
+    parser.add_argument("--compile", "-c", action="store_true",
+                       help="Compiler et corriger le contrat jusqu'au succès")
+    parser.add_argument("--max-iterations", type=int, default=3,
+                       help="Itérations maximales de la boucle compilation/correction")
     parser.add_argument("--save", "-s", action="store_true",
                        help="Sauvegarder le contrat généré")
     
@@ -364,11 +543,16 @@ def main():
     try:
         # Initialiser l'agent
         print(f"🔧 Initialisation avec {args.provider}...")
-        agent = ContractGeneratorAgent(ai_provider=args.provider)
+        agent = ContractGeneratorAgent(ai_provider=args.provider,
+                                       fallback_provider=args.fallback_provider,
+                                       hedge_after=args.hedge_after)
         
         # Générer le contrat
         print(f"🎯 Génération d'un contrat {args.type.upper()}...")
-        result = agent.generate_contract(args.requirements, args.type)
+        if args.compile:
+            result = asyncio.run(agent.generate_and_fix(args.requirements, args.type, args.max_iterations))
+        else:
+            result = agent.generate_contract(args.requirements, args.type)
         
         if result["status"] == "error":
             print(f"❌ Erreur: {result.get('error', 'Unknown error')}")
@@ -385,6 +569,14 @@ def main():
         # Afficher le résultat
         print(f"\n✅ {result['analysis']['summary']}")
         
+        if "compilation" in result:
+            compiled = result["compilation"].get("success")
+            status = "OK" if compiled else "ignorée" if compiled is None else "ÉCHEC"
+            print(f"🔨 Compilation: {status} ({len(result['iterations'])} itération(s), "
+                  f"{result['total_latency']:.1f}s)")
+            for entry in result["iterations"]:
+                print(f"   #{entry['iteration']}: {entry['latency']:.2f}s")
+        
         if result["analysis"]["issues"]:
             print("\n⚠️  Problèmes détectés:")
             for issue in result["analysis"]["issues"]:
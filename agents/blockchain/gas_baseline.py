@@ -0,0 +1,189 @@
+"""
+Historique du gas par commit
+
+Chaque exécution de la gate PERFORMANCE ajoute une ligne JSON compacte à
+l'historique: commit, horodatage et gas par source ("profiler" pour les
+mesures sur EVM locale, "gas-reporter" pour la sortie de hardhat-gas-reporter),
+contrat et fonction ("deployment" pour le déploiement). La baseline d'une
+exécution est le dernier enregistrement d'un commit ancêtre; le diff classe
+les régressions par ampleur.
+"""
+import asyncio
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from agents.blockchain.gas_profiler import ContractGas
+
+DEFAULT_HISTORY = Path("reports") / "gas" / "history.jsonl"
+DEFAULT_GAS_REPORTER_OUTPUT = Path("reports") / "gas" / "gas-reporter.json"
+DEFAULT_THRESHOLD_PCT = 5.0
+DEFAULT_MAX_RECORDS = 200
+# Profondeur maximale de recherche d'un commit ancêtre enregistré
+ANCESTOR_DEPTH = 200
+
+# {source: {contrat: {fonction: gas}}}
+GasTable = Dict[str, Dict[str, Dict[str, int]]]
+
+
+def from_measurements(measurements: List[ContractGas]) -> Dict[str, Dict[str, int]]:
+    """Table {contrat: {fonction: gas}} des contrats effectivement déployés"""
+    table = {}
+    for measurement in measurements:
+        if measurement.deployment is not None:
+            table[measurement.contract] = {"deployment": measurement.deployment, **measurement.functions}
+    return table
+
+
+def parse_gas_reporter(path: Path) -> Dict[str, Dict[str, int]]:
+    """
+    Lit la sortie JSON de hardhat-gas-reporter (outputJSON)
+
+    Gère le format eth-gas-reporter (v1, clé "info") et celui de la v2 (clé "data").
+    Le gas retenu par fonction est la moyenne des appels observés par les tests.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    data = document.get("info") or document.get("data") or {}
+
+    table: Dict[str, Dict[str, int]] = {}
+    for method in (data.get("methods") or {}).values():
+        samples = method.get("gasData") or []
+        if not samples:
+            continue
+        functions = table.setdefault(method["contract"], {})
+        name = method.get("method") or method.get("fnSig")
+        if name in functions and method.get("fnSig"):
+            name = method["fnSig"]  # surcharge: distinguer par signature
+        functions[name] = round(statistics.mean(samples))
+
+    for deployment in data.get("deployments") or []:
+        samples = deployment.get("gasData") or []
+        if samples:
+            table.setdefault(deployment["name"], {})["deployment"] = round(statistics.mean(samples))
+    return table
+
+
+async def git_commit(project_root: Path) -> Optional[str]:
+    """Commit courant (suffixé "-dirty" si l'arbre de travail est modifié), None hors dépôt git"""
+    head = await _git(project_root, "rev-parse", "HEAD")
+    if not head:
+        return None
+    status = await _git(project_root, "status", "--porcelain", "--untracked-files=no")
+    return f"{head[0]}-dirty" if status else head[0]
+
+
+async def git_ancestors(project_root: Path, depth: int = ANCESTOR_DEPTH) -> List[str]:
+    """HEAD puis ses ancêtres, du plus récent au plus ancien"""
+    return await _git(project_root, "rev-list", f"--max-count={depth}", "HEAD")
+
+
+async def _git(project_root: Path, *args: str) -> List[str]:
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "git", *args,
+            cwd=project_root,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout, _ = await asyncio.wait_for(process.communicate(), timeout=30)
+    except (OSError, asyncio.TimeoutError):
+        return []
+    if process.returncode != 0:
+        return []
+    return stdout.decode("utf-8", errors="replace").split()
+
+
+class GasBaselineStore:
+    """Historique append-only (une ligne JSON par exécution), borné à `max_records`"""
+
+    def __init__(self, path: Path, max_records: int = DEFAULT_MAX_RECORDS):
+        self.path = Path(path)
+        self.max_records = max_records
+
+    def records(self) -> List[Dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def append(self, commit: Optional[str], gas: GasTable):
+        record = {"commit": commit, "timestamp": time.time(), "gas": gas}
+        line = json.dumps(record, separators=(",", ":"), sort_keys=True)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        records = self.records()
+        if len(records) < self.max_records:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            return
+
+        # Historique plein: réécriture atomique sans les plus anciens
+        kept = records[-(self.max_records - 1):] if self.max_records > 1 else []
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for old in kept:
+                f.write(json.dumps(old, separators=(",", ":"), sort_keys=True) + "\n")
+            f.write(line + "\n")
+        os.replace(tmp_path, self.path)
+
+    def baseline(self, commit: Optional[str], ancestors: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Enregistrement de référence pour `commit`
+
+        Un arbre modifié se compare à HEAD; un commit propre à son plus proche
+        ancêtre enregistré. Hors git (ou sans ancêtre connu): le dernier
+        enregistrement d'un autre commit.
+        """
+        latest: Dict[str, Dict[str, Any]] = {}
+        for record in self.records():
+            latest[record.get("commit")] = record
+
+        for ancestor in ancestors:
+            if ancestor != commit and ancestor in latest:
+                return latest[ancestor]
+
+        others = [r for c, r in latest.items() if c != commit]
+        return max(others, key=lambda r: r.get("timestamp", 0)) if others else None
+
+
+def diff(current: GasTable, previous: GasTable,
+         threshold_pct: float = DEFAULT_THRESHOLD_PCT) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Compare deux tables de gas source par source
+
+    Returns:
+        {"regressions": [...], "improvements": [...], "new": [...], "removed": [...]};
+        les régressions sont classées par hausse relative puis absolue (champ `rank`)
+    """
+    result = {"regressions": [], "improvements": [], "new": [], "removed": []}
+    for source, contracts in current.items():
+        before_contracts = previous.get(source, {})
+        for contract, functions in contracts.items():
+            before_functions = before_contracts.get(contract, {})
+            for function, gas in functions.items():
+                before = before_functions.get(function)
+                entry = {"source": source, "contract": contract, "function": function,
+                         "baseline": before, "current": gas}
+                if not before:
+                    result["new"].append(entry)
+                    continue
+                entry["delta_gas"] = gas - before
+                entry["delta_pct"] = round((gas - before) / before * 100, 2)
+                if entry["delta_pct"] > threshold_pct:
+                    result["regressions"].append(entry)
+                elif gas < before:
+                    result["improvements"].append(entry)
+            for function in before_functions.keys() - functions.keys():
+                result["removed"].append({"source": source, "contract": contract, "function": function,
+                                          "baseline": before_functions[function]})
+
+    result["regressions"].sort(key=lambda e: (e["delta_pct"], e["delta_gas"]), reverse=True)
+    for rank, entry in enumerate(result["regressions"], 1):
+        entry["rank"] = rank
+    result["improvements"].sort(key=lambda e: e["delta_pct"])
+    return result
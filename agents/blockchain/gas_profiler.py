@@ -0,0 +1,429 @@
+"""
+Mesure du gas sur une EVM locale
+
+Chaque contrat compilé est déployé sur le réseau Hardhat local (chainId lu
+dans hardhat.config.js, 1337 par défaut) ou sur une EVM en processus
+(eth-tester/py-evm), puis les appels déclarés dans un fichier de scénarios
+sont exécutés. Les gas de déploiement et par fonction mesurés alimentent
+l'historique de gas_baseline.
+
+Format des scénarios (JSON, par nom de contrat):
+    {
+      "Lock": {
+        "constructor": {"args": ["$now+3600"], "value": 1000},
+        "calls": [
+          {"function": "unlockTime"},
+          {"increase_time": 3601},
+          {"function": "withdraw", "from": 0}
+        ]
+      }
+    }
+
+Valeurs spéciales: "$self" (adresse du contrat), "$accountN" (N-ième compte),
+"$now+N" (horodatage du dernier bloc + N secondes).
+"""
+import asyncio
+import concurrent.futures
+import json
+import logging
+import re
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from agents.blockchain.compiler import SolidityCompiler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RPC_URL = "http://127.0.0.1:8545"
+DEFAULT_CHAIN_ID = 1337
+DEFAULT_SCENARIOS = Path("benchmarks") / "gas" / "scenarios.json"
+
+_CHAIN_ID = re.compile(r"chainId\s*:\s*(\d+)")
+_ACCOUNT = re.compile(r"^\$account(\d+)$")
+_NOW = re.compile(r"^\$now([+-]\d+)?$")
+
+
+class EVMUnavailable(RuntimeError):
+    """Ni nœud Hardhat local, ni EVM en processus utilisable"""
+
+
+@dataclass
+class ContractGas:
+    """Gas mesuré pour un contrat"""
+    contract: str
+    source: str
+    deployment: Optional[int] = None
+    functions: Dict[str, int] = field(default_factory=dict)
+    durations: Dict[str, float] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+    skipped: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "contract": self.contract,
+            "source": self.source,
+            "deployment": self.deployment,
+            "functions": dict(self.functions),
+            "durations": dict(self.durations),
+            "errors": list(self.errors),
+            "skipped": self.skipped
+        }
+
+
+def hardhat_chain_id(project_root: Path) -> int:
+    """chainId du réseau hardhat déclaré dans hardhat.config.js (1337 à défaut)"""
+    for name in ("hardhat.config.js", "hardhat.config.ts", "hardhat.config.cjs", "hardhat.config.mjs"):
+        path = Path(project_root) / name
+        if path.exists():
+            match = _CHAIN_ID.search(path.read_text(encoding="utf-8", errors="replace"))
+            if match:
+                return int(match.group(1))
+    return DEFAULT_CHAIN_ID
+
+
+class EVMBackend:
+    """Connexion web3 à une EVM de test (instantanés, avance du temps)"""
+
+    name = "evm"
+
+    def __init__(self):
+        self.w3 = None
+
+    async def start(self):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    def snapshot(self) -> Any:
+        return self.w3.provider.make_request("evm_snapshot", [])["result"]
+
+    def revert(self, snapshot_id: Any):
+        self.w3.provider.make_request("evm_revert", [snapshot_id])
+
+    def increase_time(self, seconds: int):
+        self.w3.provider.make_request("evm_increaseTime", [int(seconds)])
+        self.w3.provider.make_request("evm_mine", [])
+
+
+class HardhatBackend(EVMBackend):
+    """Nœud Hardhat local (existant, ou lancé via `npx hardhat node`)"""
+
+    name = "hardhat"
+
+    def __init__(self, project_root: Path, rpc_url: str = DEFAULT_RPC_URL,
+                 chain_id: Optional[int] = None, spawn_node: bool = True, startup_timeout: float = 60.0):
+        super().__init__()
+        self.project_root = Path(project_root)
+        self.rpc_url = rpc_url
+        self.chain_id = chain_id or hardhat_chain_id(self.project_root)
+        self.spawn_node = spawn_node
+        self.startup_timeout = startup_timeout
+        self._process: Optional[asyncio.subprocess.Process] = None
+
+    def _connect(self) -> bool:
+        from web3 import Web3
+
+        w3 = Web3(Web3.HTTPProvider(self.rpc_url, request_kwargs={"timeout": 5}))
+        if not w3.is_connected():
+            return False
+        chain_id = w3.eth.chain_id
+        # Ne jamais déployer sur un autre réseau que le réseau de test déclaré
+        if chain_id != self.chain_id:
+            raise EVMUnavailable(f"{self.rpc_url} répond avec le chainId {chain_id} "
+                                 f"(attendu: {self.chain_id})")
+        self.w3 = w3
+        return True
+
+    async def start(self):
+        try:
+            import web3  # noqa: F401
+        except ImportError:
+            raise EVMUnavailable("web3 n'est pas installé (pip install web3)")
+
+        if await asyncio.to_thread(self._connect):
+            logger.info(f"⛓️  Nœud Hardhat existant: {self.rpc_url} (chainId {self.chain_id})")
+            return
+
+        if not self.spawn_node:
+            raise EVMUnavailable(f"Aucun nœud sur {self.rpc_url}")
+        if not shutil.which("npx") or not (self.project_root / "node_modules" / "hardhat").exists():
+            raise EVMUnavailable("Hardhat n'est pas installé (npm install)")
+
+        port = self.rpc_url.rsplit(":", 1)[-1].split("/")[0]
+        self._process = await asyncio.create_subprocess_exec(
+            "npx", "--no-install", "hardhat", "node", "--hostname", "127.0.0.1", "--port", port,
+            cwd=self.project_root,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self._process.returncode is not None:
+                raise EVMUnavailable(f"Le nœud Hardhat s'est arrêté (code {self._process.returncode})")
+            if await asyncio.to_thread(self._connect):
+                logger.info(f"⛓️  Nœud Hardhat lancé: {self.rpc_url} (chainId {self.chain_id})")
+                return
+            await asyncio.sleep(0.5)
+
+        await self.close()
+        raise EVMUnavailable(f"Le nœud Hardhat n'a pas démarré en {self.startup_timeout:.0f}s")
+
+    async def close(self):
+        if self._process and self._process.returncode is None:
+            self._process.terminate()
+            try:
+                await asyncio.wait_for(self._process.wait(), timeout=10)
+            except asyncio.TimeoutError:
+                self._process.kill()
+                await self._process.wait()
+        self._process = None
+
+
+class InProcessBackend(EVMBackend):
+    """EVM en processus (eth-tester + py-evm), sans Node.js"""
+
+    name = "inprocess"
+
+    async def start(self):
+        try:
+            from web3 import Web3, EthereumTesterProvider
+            self.w3 = Web3(EthereumTesterProvider())
+        except Exception as e:
+            raise EVMUnavailable(f"EVM en processus indisponible (pip install 'web3[tester]'): {e}")
+        logger.info("⛓️  EVM en processus (eth-tester)")
+
+    def snapshot(self) -> Any:
+        return self.w3.testing.snapshot()
+
+    def revert(self, snapshot_id: Any):
+        self.w3.testing.revert(snapshot_id)
+
+    def increase_time(self, seconds: int):
+        latest = self.w3.eth.get_block("latest")["timestamp"]
+        self.w3.testing.timeTravel(latest + int(seconds))
+        self.w3.testing.mine()
+
+
+async def open_backend(project_root: Path, backend: str = "auto", rpc_url: str = DEFAULT_RPC_URL,
+                       chain_id: Optional[int] = None, spawn_node: bool = True) -> EVMBackend:
+    """
+    Ouvre la première EVM disponible
+
+    Args:
+        backend: "hardhat", "inprocess", ou "auto" (Hardhat puis EVM en processus)
+
+    Raises:
+        EVMUnavailable: aucune EVM utilisable
+    """
+    candidates: List[EVMBackend] = []
+    if backend in ("auto", "hardhat"):
+        candidates.append(HardhatBackend(project_root, rpc_url, chain_id, spawn_node))
+    if backend in ("auto", "inprocess"):
+        candidates.append(InProcessBackend())
+    if not candidates:
+        raise EVMUnavailable(f"Backend EVM inconnu: {backend}")
+
+    reasons = []
+    for candidate in candidates:
+        try:
+            await candidate.start()
+            return candidate
+        except EVMUnavailable as e:
+            reasons.append(f"{candidate.name}: {e}")
+    raise EVMUnavailable("; ".join(reasons))
+
+
+def load_scenarios(path: Path) -> Dict[str, Any]:
+    """Scénarios d'appels par contrat (vide si le fichier n'existe pas)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+class GasProfiler:
+    """Déploie des contrats et mesure le gas des appels déclarés"""
+
+    def __init__(self, project_root: Path, backend: str = "auto", rpc_url: str = DEFAULT_RPC_URL,
+                 chain_id: Optional[int] = None, spawn_node: bool = True,
+                 scenarios: Optional[Dict[str, Any]] = None,
+                 compiler: Optional[SolidityCompiler] = None):
+        self.project_root = Path(project_root)
+        self.backend_name = backend
+        self.rpc_url = rpc_url
+        self.chain_id = chain_id
+        self.spawn_node = spawn_node
+        self.scenarios = scenarios if scenarios is not None else load_scenarios(self.project_root / DEFAULT_SCENARIOS)
+        self.compiler = compiler or SolidityCompiler(self.project_root)
+        self.backend: Optional[EVMBackend] = None
+
+    async def __aenter__(self) -> "GasProfiler":
+        self.backend = await open_backend(self.project_root, self.backend_name, self.rpc_url,
+                                          self.chain_id, self.spawn_node)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self.backend:
+            await self.backend.close()
+            self.backend = None
+
+    async def profile_file(self, path: Path) -> List[ContractGas]:
+        source = Path(path).read_text(encoding="utf-8", errors="replace")
+        try:
+            name = str(Path(path).resolve().relative_to(self.project_root))
+        except ValueError:
+            name = Path(path).name
+        return await self.profile_source(source, name)
+
+    async def profile_source(self, source: str, name: str = "Contract.sol") -> List[ContractGas]:
+        """
+        Compile un source puis déploie et exerce chacun de ses contrats déployables
+
+        Returns:
+            Une mesure par contrat (les erreurs de compilation sont reportées dans `errors`)
+        """
+        result = await self.compiler.compile(source, name)
+        if not result.success:
+            return [ContractGas(contract=Path(name).stem, source=name,
+                                errors=result.error_messages(3), skipped="compilation")]
+
+        measurements = []
+        for contract, artifact in result.contracts.items():
+            bytecode = artifact.get("evm", {}).get("bytecode", {}).get("object", "")
+            if not bytecode:
+                continue  # interface ou contrat abstrait
+            measurement = ContractGas(contract=contract, source=name)
+            if "__$" in bytecode:
+                measurement.skipped = "bibliothèques à lier"
+            else:
+                # web3 est synchrone: l'exécution ne doit pas bloquer la boucle (heartbeats des workers)
+                await asyncio.to_thread(self._exercise, measurement, artifact["abi"], bytecode,
+                                        self.scenarios.get(contract, {}))
+            measurements.append(measurement)
+        return measurements
+
+    def _exercise(self, measurement: ContractGas, abi: List[Dict[str, Any]], bytecode: str,
+                  scenario: Dict[str, Any]):
+        w3 = self.backend.w3
+        accounts = w3.eth.accounts
+        constructor = next((e for e in abi if e.get("type") == "constructor"), {"inputs": []})
+        deployment = scenario.get("constructor", {})
+        if constructor["inputs"] and "args" not in deployment:
+            measurement.skipped = "arguments du constructeur non déclarés"
+            return
+
+        # Chaque contrat part du même état: les mesures ne dépendent pas de l'ordre
+        snapshot = self.backend.snapshot()
+        try:
+            factory = w3.eth.contract(abi=abi, bytecode=bytecode)
+            args = self._arguments(deployment.get("args", []), constructor["inputs"], accounts, None)
+            start = time.perf_counter()
+            tx_hash = factory.constructor(*args).transact(self._transaction(deployment, accounts))
+            receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+            measurement.durations["deployment"] = time.perf_counter() - start
+            measurement.deployment = receipt["gasUsed"]
+            contract = w3.eth.contract(address=receipt["contractAddress"], abi=abi)
+
+            for step in scenario.get("calls", []):
+                if "increase_time" in step:
+                    self.backend.increase_time(step["increase_time"])
+                    continue
+                label = step.get("label") or step["function"]
+                if label in measurement.functions:
+                    label = f"{label}#{sum(1 for k in measurement.functions if k.split('#')[0] == label) + 1}"
+                try:
+                    measurement.functions[label], measurement.durations[label] = self._call(
+                        contract, abi, step, accounts)
+                except Exception as e:
+                    measurement.errors.append(f"{label}: {e}")
+        except Exception as e:
+            measurement.errors.append(f"deployment: {e}")
+        finally:
+            self.backend.revert(snapshot)
+
+    def _call(self, contract, abi: List[Dict[str, Any]], step: Dict[str, Any], accounts: List[str]):
+        entry = next((e for e in abi if e.get("type") == "function" and e["name"] == step["function"]
+                      and len(e["inputs"]) == len(step.get("args", []))), None)
+        if entry is None:
+            raise ValueError(f"fonction {step['function']}/{len(step.get('args', []))} absente de l'ABI")
+
+        args = self._arguments(step.get("args", []), entry["inputs"], accounts, contract.address)
+        function = contract.get_function_by_signature(
+            f"{entry['name']}({','.join(i['type'] for i in entry['inputs'])})")(*args)
+        transaction = self._transaction(step, accounts)
+
+        start = time.perf_counter()
+        if entry.get("stateMutability") in ("view", "pure"):
+            # Gas qu'un appel en transaction coûterait (eth_estimateGas)
+            gas = function.estimate_gas(transaction)
+        else:
+            receipt = contract.w3.eth.wait_for_transaction_receipt(function.transact(transaction))
+            if receipt["status"] != 1:
+                raise RuntimeError("transaction annulée (revert)")
+            gas = receipt["gasUsed"]
+        return gas, time.perf_counter() - start
+
+    def _transaction(self, step: Dict[str, Any], accounts: List[str]) -> Dict[str, Any]:
+        transaction = {"from": accounts[int(step.get("from", 0))]}
+        if step.get("value"):
+            transaction["value"] = int(step["value"])
+        return transaction
+
+    def _arguments(self, values: List[Any], inputs: List[Dict[str, Any]], accounts: List[str],
+                   address: Optional[str]) -> List[Any]:
+        return [self._argument(value, spec["type"], accounts, address) for value, spec in zip(values, inputs)]
+
+    def _argument(self, value: Any, abi_type: str, accounts: List[str], address: Optional[str]) -> Any:
+        if isinstance(value, list):
+            return [self._argument(v, abi_type[:abi_type.rfind("[")], accounts, address) for v in value]
+        if not isinstance(value, str):
+            return value
+        if value == "$self":
+            return address
+        account = _ACCOUNT.match(value)
+        if account:
+            return accounts[int(account.group(1))]
+        now = _NOW.match(value)
+        if now:
+            return self.backend.w3.eth.get_block("latest")["timestamp"] + int(now.group(1) or 0)
+        if re.match(r"^u?int", abi_type):
+            return int(value, 0)
+        return value
+
+
+async def profile_project(project_root: Path, files: Optional[List[Path]] = None,
+                          **options) -> List[ContractGas]:
+    """Mesure le gas de tous les contrats de contracts/ (ou des fichiers donnés)"""
+    project_root = Path(project_root)
+    if files is None:
+        contracts_dir = project_root / "contracts"
+        files = sorted(contracts_dir.glob("**/*.sol")) if contracts_dir.exists() else []
+
+    async with GasProfiler(project_root, **options) as profiler:
+        measurements = []
+        for path in files:
+            measurements.extend(await profiler.profile_file(path))
+        return measurements
+
+
+async def profile_source(project_root: Path, source: str, name: str = "Contract.sol",
+                         **options) -> List[ContractGas]:
+    """Mesure le gas des contrats d'un source isolé"""
+    async with GasProfiler(project_root, **options) as profiler:
+        return await profiler.profile_source(source, name)
+
+
+def run_blocking(coroutine):
+    """Exécute une coroutine depuis du code synchrone (y compris sous une boucle déjà active)"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
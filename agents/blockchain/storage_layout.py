@@ -0,0 +1,372 @@
+"""
+Analyse de l'agencement du stockage et empaquetage optimal des variables d'état
+
+Reproduit les règles d'allocation de solc (variables empaquetées dans des
+slots de 32 octets dans l'ordre de déclaration; structs, tableaux, mappings
+et chaînes commencent un nouveau slot), puis cherche un ordre qui minimise
+le nombre de slots (bin-packing exact par séparation-évaluation, FFD au-delà
+d'une taille limite). Le gain est chiffré en SSTORE d'initialisation et en
+accès froids (SLOAD/SSTORE) évités par fonction.
+"""
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+from agents.blockchain.analysis import GAS, ContractInfo, SourceIndex, Parameter, parse_solidity
+
+SLOT_SIZE = 32
+# Au-delà, la recherche exacte est remplacée par first-fit decreasing
+EXACT_SEARCH_LIMIT = 24
+# Nœuds explorés au plus par la recherche exacte (quelques ms)
+SEARCH_BUDGET = 5000
+
+_STATIC_ARRAY = re.compile(r"^(.+)\[(\d+)\]$")
+
+
+@dataclass
+class StorageItem:
+    """Variable (ou champ de struct) placée dans le stockage"""
+    name: str
+    type: str
+    size: int
+    # Occupe des slots entiers: commence un nouveau slot et le suivant aussi
+    whole_slots: int = 0
+    slot: int = 0
+    offset: int = 0
+    line: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "type": self.type, "slot": self.slot, "offset": self.offset,
+                "size": self.size if not self.whole_slots else self.whole_slots * SLOT_SIZE}
+
+
+@dataclass
+class PackingReport:
+    """Agencement courant vs optimal d'un contrat (ou d'une struct)"""
+    name: str
+    current_slots: int
+    optimal_slots: int
+    layout: List[StorageItem]
+    suggested_order: List[str]
+    optimal: bool
+    source: str = "parser"
+    gas: Dict[str, Any] = field(default_factory=dict)
+    structs: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def slots_saved(self) -> int:
+        return self.current_slots - self.optimal_slots
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "contract": self.name,
+            "current_slots": self.current_slots,
+            "optimal_slots": self.optimal_slots,
+            "slots_saved": self.slots_saved,
+            "optimal": self.optimal,
+            "source": self.source,
+            "layout": [item.to_dict() for item in self.layout],
+            "suggested_order": self.suggested_order,
+            "gas": self.gas,
+            "structs": self.structs,
+            "warnings": self.warnings
+        }
+
+
+class TypeSizer:
+    """Taille en stockage des types Solidity d'un fichier"""
+
+    def __init__(self, index: SourceIndex):
+        self.structs: Dict[str, List[Parameter]] = {}
+        self.enums: Dict[str, int] = {}
+        self.contract_types = {c.name for c in index.contracts}
+        for contract in index.contracts:
+            self.structs.update(contract.structs)
+            self.enums.update({name: len(values) for name, values in contract.enums.items()})
+        self._struct_slots: Dict[str, int] = {}
+
+    def size(self, type_name: str) -> Tuple[int, int]:
+        """
+        Taille d'un type
+
+        Returns:
+            (octets, slots entiers): slots entiers > 0 pour les types qui ne s'empaquettent pas
+        """
+        qualified = "." in type_name
+        type_name = type_name.split(".")[-1].strip()
+
+        if type_name.startswith("mapping") or type_name.endswith("[]") or type_name in ("string", "bytes"):
+            return SLOT_SIZE, 1
+
+        array = _STATIC_ARRAY.match(type_name)
+        if array:
+            element, count = array.group(1), int(array.group(2))
+            size, whole = self.size(element)
+            if whole:
+                return SLOT_SIZE, whole * count
+            per_slot = SLOT_SIZE // size
+            return SLOT_SIZE, math.ceil(count / per_slot)
+
+        if type_name == "bool":
+            return 1, 0
+        match = re.match(r"^u?int(\d+)$", type_name)
+        if match:
+            return int(match.group(1)) // 8, 0
+        if type_name in ("uint", "int"):
+            return SLOT_SIZE, 0
+        if type_name.startswith("address") or type_name in self.contract_types:
+            return 20, 0
+        match = re.match(r"^bytes(\d+)$", type_name)
+        if match:
+            return int(match.group(1)), 0
+        if type_name in self.enums:
+            return max(1, math.ceil(math.log2(max(self.enums[type_name], 2)) / 8)), 0
+        if type_name in self.structs:
+            return SLOT_SIZE, self.struct_slots(type_name)
+        if re.match(r"^[A-Z]\w*$", type_name):
+            # Lib.Type importé: struct (au moins un slot); sinon interface ou contrat: une adresse
+            return (SLOT_SIZE, 1) if qualified else (20, 0)
+        return SLOT_SIZE, 0
+
+    def struct_slots(self, name: str) -> int:
+        if name not in self._struct_slots:
+            self._struct_slots[name] = 1  # garde contre les structs récursives
+            items = [self.item(f.name, f.type) for f in self.structs[name]]
+            self._struct_slots[name] = max(1, count_slots(allocate(items)))
+        return self._struct_slots[name]
+
+    def item(self, name: str, type_name: str, line: int = 0) -> StorageItem:
+        size, whole = self.size(type_name)
+        return StorageItem(name=name, type=type_name, size=size, whole_slots=whole, line=line)
+
+
+def allocate(items: List[StorageItem], start_slot: int = 0) -> List[StorageItem]:
+    """Place les éléments dans l'ordre donné selon les règles de solc (modifie et retourne items)"""
+    slot, offset = start_slot, 0
+    for item in items:
+        if item.whole_slots:
+            if offset:
+                slot, offset = slot + 1, 0
+            item.slot, item.offset = slot, 0
+            slot += item.whole_slots
+            continue
+        if offset + item.size > SLOT_SIZE:
+            slot, offset = slot + 1, 0
+        item.slot, item.offset = slot, offset
+        offset += item.size
+        if offset == SLOT_SIZE:
+            slot, offset = slot + 1, 0
+    return items
+
+
+def count_slots(items: List[StorageItem]) -> int:
+    if not items:
+        return 0
+    last = items[-1]
+    used = last.slot + (last.whole_slots or 1)
+    return used - items[0].slot
+
+
+def pack(items: List[StorageItem]) -> Tuple[List[StorageItem], bool]:
+    """
+    Ordre minimisant le nombre de slots
+
+    Les types à slots entiers sont placés en tête (ils ne partagent rien);
+    les petits types sont répartis par bin-packing.
+
+    Returns:
+        (éléments réordonnés, True si le minimum est prouvé)
+    """
+    whole = [item for item in items if item.whole_slots]
+    small = sorted((item for item in items if not item.whole_slots), key=lambda i: i.size, reverse=True)
+
+    bins = _first_fit_decreasing(small)
+    lower_bound = math.ceil(sum(item.size for item in small) / SLOT_SIZE)
+    proven = len(bins) == lower_bound
+
+    if not proven and len(small) <= EXACT_SEARCH_LIMIT:
+        bins, proven = _branch_and_bound(small, bins, lower_bound)
+
+    # Slots pleins d'abord, puis les moins remplis (les ajouts futurs s'y logeront)
+    bins.sort(key=lambda b: sum(i.size for i in b), reverse=True)
+    ordered = whole + [item for current in bins for item in current]
+    return ordered, proven
+
+
+def _first_fit_decreasing(items: List[StorageItem]) -> List[List[StorageItem]]:
+    bins: List[List[StorageItem]] = []
+    free: List[int] = []
+    for item in items:
+        for position, space in enumerate(free):
+            if item.size <= space:
+                bins[position].append(item)
+                free[position] -= item.size
+                break
+        else:
+            bins.append([item])
+            free.append(SLOT_SIZE - item.size)
+    return bins
+
+
+def _branch_and_bound(items: List[StorageItem], best: List[List[StorageItem]],
+                      lower_bound: int) -> Tuple[List[List[StorageItem]], bool]:
+    """Recherche exacte bornée par SEARCH_BUDGET nœuds (retourne la meilleure solution et si elle est prouvée)"""
+    best_bins = [list(b) for b in best]
+    nodes = 0
+    assignment: List[List[StorageItem]] = []
+    free: List[int] = []
+    # Taille cumulée des éléments restant à placer à partir de chaque position
+    remaining = [sum(item.size for item in items[position:]) for position in range(len(items) + 1)]
+
+    def search(position: int) -> bool:
+        nonlocal best_bins, nodes
+        nodes += 1
+        if nodes > SEARCH_BUDGET:
+            return True
+        overflow = max(0, remaining[position] - sum(free))
+        if len(assignment) + math.ceil(overflow / SLOT_SIZE) >= len(best_bins):
+            return False
+        if position == len(items):
+            best_bins = [list(b) for b in assignment]
+            return len(best_bins) == lower_bound
+
+        item = items[position]
+        tried = set()
+        for index, space in enumerate(free):
+            # Deux slots avec la même place libre sont interchangeables
+            if item.size <= space and space not in tried:
+                tried.add(space)
+                assignment[index].append(item)
+                free[index] -= item.size
+                if search(position + 1):
+                    return True
+                free[index] += item.size
+                assignment[index].pop()
+
+        assignment.append([item])
+        free.append(SLOT_SIZE - item.size)
+        found = search(position + 1)
+        free.pop()
+        assignment.pop()
+        return found
+
+    search(0)
+    return best_bins, nodes <= SEARCH_BUDGET
+
+
+def layout_from_solc(storage_layout: Dict[str, Any]) -> List[StorageItem]:
+    """Agencement réel produit par solc (sortie storageLayout du compilateur)"""
+    types = storage_layout.get("types") or {}
+    items = []
+    for entry in storage_layout.get("storage", []):
+        type_info = types.get(entry["type"], {})
+        size = int(type_info.get("numberOfBytes", SLOT_SIZE))
+        encoding = type_info.get("encoding", "inplace")
+        whole = 0
+        if encoding != "inplace" or type_info.get("members") or entry["type"].startswith("t_array"):
+            whole = max(1, math.ceil(size / SLOT_SIZE))
+        items.append(StorageItem(name=entry["label"], type=type_info.get("label", entry["type"]),
+                                 size=min(size, SLOT_SIZE), whole_slots=whole,
+                                 slot=int(entry["slot"]), offset=int(entry.get("offset", 0))))
+    return items
+
+
+def analyze_contract_storage(index: SourceIndex, contract: ContractInfo,
+                             storage_layout: Optional[Dict[str, Any]] = None) -> PackingReport:
+    """
+    Agencement courant et optimal des variables d'état propres à un contrat
+
+    Les variables héritées gardent leur position (seules celles du contrat sont
+    réordonnées); l'agencement solc est utilisé quand il est fourni.
+
+    Args:
+        index: Index du fichier
+        contract: Contrat analysé
+        storage_layout: Sortie storageLayout de solc pour ce contrat (optionnelle)
+    """
+    sizer = TypeSizer(index)
+    own = [sizer.item(v.name, v.type, v.line) for v in contract.state_variables
+           if not v.constant and not v.immutable]
+    inherited = [v for v in index.inherited_state(contract)
+                 if v not in contract.state_variables and not v.constant and not v.immutable]
+
+    source = "parser"
+    if storage_layout and storage_layout.get("storage"):
+        solc_items = {item.name: item for item in layout_from_solc(storage_layout)}
+        if all(item.name in solc_items for item in own):
+            for item in own:
+                item.slot, item.offset = solc_items[item.name].slot, solc_items[item.name].offset
+            source = "solc"
+
+    inherited_items = allocate([sizer.item(v.name, v.type) for v in inherited])
+    start_slot = count_slots(inherited_items) if inherited_items else 0
+    if source == "parser":
+        allocate(own, start_slot)
+    current = count_slots(own) if own else 0
+
+    ordered, proven = pack([StorageItem(i.name, i.type, i.size, i.whole_slots, line=i.line) for i in own])
+    allocate(ordered, start_slot)
+    optimal = min(current, count_slots(ordered) if ordered else 0)
+
+    report = PackingReport(
+        name=contract.name,
+        current_slots=current,
+        optimal_slots=optimal,
+        layout=own,
+        suggested_order=[item.name for item in ordered] if optimal < current else [item.name for item in own],
+        optimal=proven,
+        source=source
+    )
+    report.gas = _estimate_gas(contract, own, ordered if optimal < current else own)
+
+    for name, fields in contract.structs.items():
+        items = allocate([sizer.item(f.name, f.type) for f in fields])
+        packed, struct_proven = pack([StorageItem(i.name, i.type, i.size, i.whole_slots) for i in items])
+        allocate(packed)
+        if count_slots(packed) < count_slots(items):
+            report.structs[name] = {
+                "current_slots": count_slots(items),
+                "optimal_slots": count_slots(packed),
+                "suggested_order": [item.name for item in packed],
+                "optimal": struct_proven
+            }
+
+    bases = set(contract.bases)
+    if report.slots_saved and (bases & {"Initializable", "UUPSUpgradeable"} or any(b.endswith("Upgradeable") for b in bases)):
+        report.warnings.append("Contrat upgradeable: réordonner le stockage corrompt les données déjà déployées")
+    return report
+
+
+def _estimate_gas(contract: ContractInfo, current: List[StorageItem], optimal: List[StorageItem]) -> Dict[str, Any]:
+    """Accès froids évités par fonction (un slot froid coûte 2100 gas, chaque slot initialisé 20000)"""
+    current_slot = {item.name: item.slot for item in current}
+    optimal_slot = {item.name: item.slot for item in optimal}
+    per_function = {}
+    for function in contract.functions:
+        touched = {a.name for a in function.state_reads + function.state_writes if a.name in current_slot}
+        saved = len({current_slot[n] for n in touched}) - len({optimal_slot[n] for n in touched})
+        if saved > 0:
+            per_function[function.name] = saved * GAS["sload_cold"]
+
+    slots_saved = (count_slots(current) if current else 0) - (count_slots(optimal) if optimal else 0)
+    return {
+        "sstore_init_saved": max(0, slots_saved) * (GAS["sstore_set"] - GAS["sload_cold"]),
+        "per_function": per_function,
+        "max_per_call": max(per_function.values(), default=0)
+    }
+
+
+def analyze_storage(source: str, storage_layouts: Optional[Dict[str, Dict[str, Any]]] = None) -> List[PackingReport]:
+    """
+    Rapports d'empaquetage de tous les contrats concrets d'un source
+
+    Args:
+        source: Code Solidity
+        storage_layouts: storageLayout solc par nom de contrat (CompileResult.contracts[n]["storageLayout"])
+    """
+    index = parse_solidity(source)
+    layouts = storage_layouts or {}
+    return [analyze_contract_storage(index, contract, layouts.get(contract.name))
+            for contract in index.contracts if contract.kind in ("contract", "abstract")]
@@ -1,13 +1,19 @@
-import os
-import openai
+import sys
+import asyncio
+from pathlib import Path
 from dotenv import load_dotenv
 
+# Racine du dépôt dans le path pour la couche LLM partagée (agents/llm)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.llm.client import LLMRequest, get_provider
+
 load_dotenv()
 
 class ContractGeneratorAgent:
-    def __init__(self):
-        openai.api_key = os.getenv("OPENAI_API_KEY")
-        self.model = "gpt-4"  # ou "gpt-3.5-turbo" pour moins cher
+    def __init__(self, ai_provider="openai"):
+        self.client = get_provider(ai_provider)
+        self.model = self.client.model  # "gpt-4" par défaut pour openai
     
     def generate_contract(self, requirements):
         """Génère un smart contract basé sur des exigences"""
@@ -27,16 +33,14 @@ class ContractGeneratorAgent:
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "Tu es un expert en développement Web3 et sécurité des smart contracts."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2
-            )
+            response = asyncio.run(self.client.complete(LLMRequest(
+                prompt=prompt,
+                system="Tu es un expert en développement Web3 et sécurité des smart contracts.",
+                temperature=0.2,
+                model=self.model
+            )))
             
-            return response.choices[0].message.content.strip()
+            return response.text
         except Exception as e:
             return f"Erreur: {e}"
 
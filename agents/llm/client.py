@@ -0,0 +1,450 @@
+"""
+Couche d'accès asynchrone aux LLM (OpenAI, Anthropic, Google, fake)
+
+Tous les providers HTTP partagent un pool de connexions aiohttp (keep-alive,
+cache DNS) par boucle d'événements: pas de handshake TLS par appel, et chaque
+provider limite ses appels simultanés par un sémaphore.
+"""
+import asyncio
+import logging
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderError(Exception):
+    """Erreur retournée par un provider LLM"""
+
+    def __init__(self, provider: str, message: str, status: Optional[int] = None):
+        super().__init__(f"[{provider}] {message}")
+        self.provider = provider
+        self.status = status
+
+
+@dataclass
+class LLMRequest:
+    """Requête de complétion indépendante du provider"""
+    prompt: str
+    system: str = ""
+    max_tokens: int = 4000
+    temperature: float = 0.1
+    model: Optional[str] = None
+
+
+@dataclass
+class LLMResponse:
+    """Réponse normalisée d'un provider"""
+    text: str
+    provider: str
+    model: str
+    latency: float
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    raw: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+
+# Attente maximale entre deux tentatives, quel que soit le Retry-After annoncé
+MAX_RETRY_DELAY = 60.0
+
+
+def retry_delay(retry_after: Optional[str], attempt: int) -> float:
+    """
+    Délai avant un nouvel essai (s)
+
+    Retry-After en secondes ou en date HTTP (RFC 9110); absent ou illisible:
+    backoff exponentiel (1, 2, 4... s). Toujours borné à MAX_RETRY_DELAY.
+    """
+    fallback = min(float(2 ** attempt), MAX_RETRY_DELAY)
+    if not retry_after:
+        return fallback
+    try:
+        delay = float(retry_after)
+    except ValueError:
+        try:
+            date = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError, IndexError):
+            return fallback
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        delay = (date - datetime.now(timezone.utc)).total_seconds()
+    if not math.isfinite(delay):
+        return fallback
+    return min(max(delay, 0.0), MAX_RETRY_DELAY)
+
+
+class ConnectionPool:
+    """Session aiohttp partagée (une par boucle d'événements)"""
+
+    def __init__(self, limit: int = 64, keepalive_timeout: float = 60.0):
+        self.limit = limit
+        self.keepalive_timeout = keepalive_timeout
+        self._session = None
+        self._loop = None
+
+    def session(self):
+        """Retourne la session de la boucle courante (créée à la demande)"""
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=300, connect=15)
+            )
+            self._loop = loop
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+# Pool unique partagé par tous les providers HTTP du processus
+_POOL = ConnectionPool()
+
+
+class LLMProvider(ABC):
+    """Provider LLM asynchrone"""
+
+    name = "base"
+    default_model = ""
+
+    def __init__(self, model: Optional[str] = None, max_concurrency: int = 4):
+        self.model = model or self.default_model
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+
+    def _limiter(self) -> asyncio.Semaphore:
+        # Un sémaphore est lié à sa boucle: le recréer si la boucle a changé
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        """
+        Exécute une complétion en respectant la limite de concurrence du provider
+
+        Args:
+            request: Requête normalisée
+
+        Returns:
+            Réponse normalisée
+        """
+        async with self._limiter():
+            start = time.perf_counter()
+            response = await self._complete(request)
+            response.latency = time.perf_counter() - start
+            return response
+
+    @abstractmethod
+    async def _complete(self, request: LLMRequest) -> LLMResponse:
+        """Appel spécifique au provider"""
+
+
+class HTTPProvider(LLMProvider):
+    """Provider appelant une API REST via le pool partagé"""
+
+    api_key_env = ""
+    retry_statuses = (429, 500, 502, 503, 529)
+    max_retries = 3
+
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None,
+                 max_concurrency: int = 4, pool: Optional[ConnectionPool] = None):
+        super().__init__(model=model, max_concurrency=max_concurrency)
+        self.api_key = api_key or os.getenv(self.api_key_env)
+        if not self.api_key:
+            raise ValueError(f"{self.api_key_env} non configuré dans .env")
+        self.pool = pool or _POOL
+
+    @abstractmethod
+    def _build(self, request: LLMRequest) -> Dict[str, Any]:
+        """Retourne {'url', 'headers', 'json'} pour la requête HTTP"""
+
+    @abstractmethod
+    def _parse(self, data: Dict[str, Any], model: str) -> LLMResponse:
+        """Convertit la réponse JSON en LLMResponse"""
+
+    async def _complete(self, request: LLMRequest) -> LLMResponse:
+        import aiohttp
+
+        http = self._build(request)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.pool.session().post(http["url"], headers=http["headers"],
+                                                    json=http["json"]) as response:
+                    if response.status in self.retry_statuses and attempt < self.max_retries:
+                        delay = retry_delay(response.headers.get("retry-after"), attempt)
+                        logger.warning(f"⚠️  {self.name}: HTTP {response.status}, nouvel essai dans {delay:.0f}s")
+                    else:
+                        data = await response.json(content_type=None)
+                        if response.status >= 400:
+                            message = data.get("error", data) if isinstance(data, dict) else data
+                            raise ProviderError(self.name, str(message), response.status)
+
+                        return self._parse(data, request.model or self.model)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # Connexion refusée ou coupée, délai dépassé: même budget de tentatives que les HTTP 429/5xx
+                if attempt >= self.max_retries:
+                    raise ProviderError(self.name, f"Erreur réseau: {e or type(e).__name__}") from e
+                delay = retry_delay(None, attempt)
+                logger.warning(f"⚠️  {self.name}: {type(e).__name__}, nouvel essai dans {delay:.0f}s")
+            # Connexion rendue au pool avant l'attente
+            await asyncio.sleep(delay)
+
+        raise ProviderError(self.name, "Nombre maximal de tentatives atteint")
+
+
+class OpenAIProvider(HTTPProvider):
+    """API Chat Completions d'OpenAI"""
+
+    name = "openai"
+    default_model = "gpt-4"
+    api_key_env = "OPENAI_API_KEY"
+
+    def __init__(self, *args, base_url: str = "https://api.openai.com/v1", **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.api_key == "sk-xxx":
+            raise ValueError("OPENAI_API_KEY non configuré dans .env. Remplace 'sk-xxx' par ta vraie clé.")
+        self.base_url = os.getenv("OPENAI_BASE_URL", base_url)
+
+    def _build(self, request: LLMRequest) -> Dict[str, Any]:
+        messages = []
+        if request.system:
+            messages.append({"role": "system", "content": request.system})
+        messages.append({"role": "user", "content": request.prompt})
+
+        return {
+            "url": f"{self.base_url}/chat/completions",
+            "headers": {"Authorization": f"Bearer {self.api_key}"},
+            "json": {
+                "model": request.model or self.model,
+                "messages": messages,
+                "temperature": request.temperature,
+                "max_tokens": request.max_tokens
+            }
+        }
+
+    def _parse(self, data: Dict[str, Any], model: str) -> LLMResponse:
+        usage = data.get("usage", {})
+        return LLMResponse(
+            text=data["choices"][0]["message"]["content"].strip(),
+            provider=self.name,
+            model=data.get("model", model),
+            latency=0.0,
+            input_tokens=usage.get("prompt_tokens"),
+            output_tokens=usage.get("completion_tokens"),
+            raw=data
+        )
+
+
+class AnthropicProvider(HTTPProvider):
+    """API Messages d'Anthropic"""
+
+    name = "anthropic"
+    default_model = "claude-3-5-sonnet-20241022"
+    api_key_env = "ANTHROPIC_API_KEY"
+
+    def _build(self, request: LLMRequest) -> Dict[str, Any]:
+        body = {
+            "model": request.model or self.model,
+            "max_tokens": request.max_tokens,
+            "temperature": request.temperature,
+            "messages": [{"role": "user", "content": request.prompt}]
+        }
+        if request.system:
+            body["system"] = request.system
+
+        return {
+            "url": "https://api.anthropic.com/v1/messages",
+            "headers": {"x-api-key": self.api_key, "anthropic-version": "2023-06-01"},
+            "json": body
+        }
+
+    def _parse(self, data: Dict[str, Any], model: str) -> LLMResponse:
+        usage = data.get("usage", {})
+        text = "".join(block.get("text", "") for block in data.get("content", []) if block.get("type") == "text")
+        return LLMResponse(
+            text=text.strip(),
+            provider=self.name,
+            model=data.get("model", model),
+            latency=0.0,
+            input_tokens=usage.get("input_tokens"),
+            output_tokens=usage.get("output_tokens"),
+            raw=data
+        )
+
+
+class GoogleProvider(HTTPProvider):
+    """API generateContent de Google Gemini"""
+
+    name = "google"
+    default_model = "gemini-pro"
+    api_key_env = "GOOGLE_AI_API_KEY"
+
+    def _build(self, request: LLMRequest) -> Dict[str, Any]:
+        body = {
+            "contents": [{"role": "user", "parts": [{"text": request.prompt}]}],
+            "generationConfig": {
+                "temperature": request.temperature,
+                "maxOutputTokens": request.max_tokens
+            }
+        }
+        if request.system:
+            body["systemInstruction"] = {"parts": [{"text": request.system}]}
+
+        model = request.model or self.model
+        return {
+            "url": f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent",
+            "headers": {"x-goog-api-key": self.api_key},
+            "json": body
+        }
+
+    def _parse(self, data: Dict[str, Any], model: str) -> LLMResponse:
+        candidates = data.get("candidates") or []
+        if not candidates:
+            raise ProviderError(self.name, f"Réponse sans candidat: {data.get('promptFeedback', data)}")
+
+        parts = candidates[0].get("content", {}).get("parts", [])
+        usage = data.get("usageMetadata", {})
+        return LLMResponse(
+            text="".join(part.get("text", "") for part in parts).strip(),
+            provider=self.name,
+            model=model,
+            latency=0.0,
+            input_tokens=usage.get("promptTokenCount"),
+            output_tokens=usage.get("candidatesTokenCount"),
+            raw=data
+        )
+
+
+class FakeProvider(LLMProvider):
+    """Provider local sans réseau (tests, développement hors ligne)"""
+
+    name = "fake"
+    default_model = "fake-solidity"
+
+    DEFAULT_RESPONSE = """// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+import "@openzeppelin/contracts/access/Ownable.sol";
+
+/**
+ * @title FakeContract
+ * @dev Contrat renvoyé par le provider local de test
+ */
+contract FakeContract is Ownable {
+    event ValueChanged(uint256 value);
+
+    uint256 public value;
+
+    constructor() Ownable(msg.sender) {}
+
+    /// @dev Met à jour la valeur stockée
+    function setValue(uint256 newValue) external onlyOwner {
+        require(newValue != value, "Valeur identique");
+        value = newValue;
+        emit ValueChanged(newValue);
+    }
+}"""
+
+    def __init__(self, response: Optional[str] = None, latency: float = 0.0,
+                 model: Optional[str] = None, max_concurrency: int = 64):
+        super().__init__(model=model, max_concurrency=max_concurrency)
+        self.response = response or self.DEFAULT_RESPONSE
+        self.latency = latency
+        self.calls = 0
+
+    async def _complete(self, request: LLMRequest) -> LLMResponse:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return LLMResponse(
+            text=self.response,
+            provider=self.name,
+            model=request.model or self.model,
+            latency=0.0,
+            input_tokens=len(request.prompt) // 4,
+            output_tokens=len(self.response) // 4
+        )
+
+
+def _replay_provider(**options) -> LLMProvider:
+    # Import différé: agents.llm.replay dépend de ce module
+    from agents.llm.replay import ReplayProvider
+    return ReplayProvider(**options)
+
+
+PROVIDERS = {
+    "openai": OpenAIProvider,
+    "anthropic": AnthropicProvider,
+    "google": GoogleProvider,
+    "fake": FakeProvider,
+    "replay": _replay_provider
+}
+
+# Providers locaux (jamais enregistrés en mode LLM_RECORD)
+OFFLINE_PROVIDERS = {"fake", "replay"}
+
+# Concurrence par défaut (surchargeable par LLM_MAX_CONCURRENCY_<PROVIDER>)
+DEFAULT_CONCURRENCY = {"openai": 8, "anthropic": 4, "google": 4, "fake": 64, "replay": 64}
+
+_instances: Dict[str, LLMProvider] = {}
+
+
+def get_provider(name: str, **options) -> LLMProvider:
+    """
+    Retourne un provider partagé (même sémaphore et même pool pour tout le processus)
+
+    Args:
+        name: "openai", "anthropic", "google", "fake" ou "replay"
+        **options: Options du constructeur (model, api_key, ...); crée une instance dédiée
+
+    Returns:
+        Instance de LLMProvider (enveloppée par un RecordingProvider si LLM_RECORD=1)
+    """
+    if name not in PROVIDERS:
+        raise ValueError(f"Provider IA non supporté: {name}")
+
+    if options:
+        options.setdefault("max_concurrency", _concurrency_for(name))
+        return _maybe_record(name, PROVIDERS[name](**options))
+
+    if name not in _instances:
+        _instances[name] = _maybe_record(name, PROVIDERS[name](max_concurrency=_concurrency_for(name)))
+    return _instances[name]
+
+
+def _maybe_record(name: str, provider: LLMProvider) -> LLMProvider:
+    # LLM_RECORD=1: capture des réponses réelles pour un rejeu ultérieur (provider "replay")
+    if os.getenv("LLM_RECORD") != "1" or name in OFFLINE_PROVIDERS:
+        return provider
+    from agents.llm.replay import RecordingProvider
+    logger.info(f"📼 Enregistrement des réponses {name} activé")
+    return RecordingProvider(provider)
+
+
+def _concurrency_for(name: str) -> int:
+    return int(os.getenv(f"LLM_MAX_CONCURRENCY_{name.upper()}", DEFAULT_CONCURRENCY.get(name, 4)))
+
+
+async def close_providers():
+    """Ferme le pool de connexions partagé"""
+    await _POOL.close()
@@ -0,0 +1,112 @@
+"""
+Requêtes couvertes (hedged requests) entre deux providers LLM
+
+Le provider principal est appelé seul; si sa réponse n'est pas arrivée après
+`hedge_after` secondes (ou s'il échoue), le provider secondaire est lancé en
+concurrence. La première réponse valide l'emporte et l'autre appel est annulé.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HedgeOutcome:
+    """Résultat d'une requête couverte"""
+    result: Any
+    winner: Optional[str]
+    hedged: bool
+    elapsed: float
+    attempts: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "winner": self.winner,
+            "hedged": self.hedged,
+            "elapsed": self.elapsed,
+            "attempts": self.attempts
+        }
+
+
+async def hedged_call(calls: Dict[str, Callable[[], Awaitable[Any]]], primary: str,
+                      hedge_after: float, is_valid: Callable[[Any], bool]) -> HedgeOutcome:
+    """
+    Exécute le provider principal puis, au-delà du seuil, les suivants en concurrence
+
+    Args:
+        calls: Fabriques de coroutines par provider (ordre = priorité des secours)
+        primary: Provider principal
+        hedge_after: Délai (s) avant de lancer les secours
+        is_valid: Prédicat de validité d'un résultat
+
+    Returns:
+        HedgeOutcome avec le premier résultat valide (ou le dernier résultat obtenu)
+    """
+    start = time.perf_counter()
+    order = [primary] + [name for name in calls if name != primary]
+    pending: Dict[asyncio.Task, str] = {}
+    attempts: List[Dict[str, Any]] = []
+    fallback_result = None
+    launched = 0
+
+    def launch_next() -> bool:
+        nonlocal launched
+        if launched >= len(order):
+            return False
+        name = order[launched]
+        launched += 1
+        pending[asyncio.ensure_future(calls[name]())] = name
+        if launched > 1:
+            logger.info(f"🏁 Requête couverte: lancement de {name} "
+                        f"({time.perf_counter() - start:.2f}s)")
+        return True
+
+    launch_next()
+
+    try:
+        while pending:
+            # Tant qu'un secours reste disponible, attendre au plus jusqu'au seuil
+            timeout = hedge_after if launched < len(order) else None
+            done, _ = await asyncio.wait(pending.keys(), timeout=timeout,
+                                         return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                launch_next()
+                continue
+
+            for task in done:
+                name = pending.pop(task)
+                elapsed = time.perf_counter() - start
+                error = task.exception()
+
+                if error is None and is_valid(task.result()):
+                    attempts.append({"provider": name, "valid": True, "elapsed": elapsed})
+                    return HedgeOutcome(task.result(), name, launched > 1, elapsed, attempts)
+
+                attempts.append({
+                    "provider": name,
+                    "valid": False,
+                    "elapsed": elapsed,
+                    "error": str(error) if error else None
+                })
+                if error is None:
+                    fallback_result = task.result()
+
+            # Échec ou réponse invalide: lancer immédiatement le secours suivant
+            if not pending:
+                launch_next()
+
+        return HedgeOutcome(fallback_result, None, launched > 1, time.perf_counter() - start, attempts)
+
+    finally:
+        # Annuler les perdants (la liste attempts est partagée avec le résultat retourné)
+        for task, name in pending.items():
+            task.cancel()
+            attempts.append({"provider": name, "valid": False, "cancelled": True,
+                             "elapsed": time.perf_counter() - start})
+        if pending:
+            await asyncio.gather(*pending.keys(), return_exceptions=True)
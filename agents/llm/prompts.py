@@ -0,0 +1,133 @@
+"""
+Construction de prompts: templates précompilés et budget de tokens
+
+Les templates sont normalisés (indentation, espaces, lignes vides) et
+découpés une seule fois; le rendu ne fait plus qu'une concaténation.
+Le compteur de tokens par provider permet de dimensionner max_tokens à la
+taille attendue de la réponse plutôt qu'à une valeur fixe.
+"""
+import math
+import re
+import textwrap
+from string import Formatter
+from typing import Dict, Any, List, Optional, Tuple
+
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def compact_prompt(text: str) -> str:
+    """
+    Supprime l'indentation commune, les espaces de fin de ligne et les lignes vides multiples
+
+    Args:
+        text: Texte brut (souvent issu d'une chaîne triple-quote indentée)
+
+    Returns:
+        Texte compact, sans espace en début ni en fin
+    """
+    text = textwrap.dedent(text)
+    text = "\n".join(line.rstrip() for line in text.splitlines())
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+class PromptTemplate:
+    """Template compilé une fois (champs au format str.format)"""
+
+    def __init__(self, template: str):
+        self.source = compact_prompt(template)
+        self._chunks: List[Tuple[str, Optional[str]]] = [
+            (literal, field_name)
+            for literal, field_name, _, _ in Formatter().parse(self.source)
+        ]
+        self.fields = {field_name for _, field_name in self._chunks if field_name}
+
+    def render(self, **values: Any) -> str:
+        """Rend le template avec les valeurs fournies"""
+        missing = self.fields - values.keys()
+        if missing:
+            raise KeyError(f"Champs manquants pour le template: {sorted(missing)}")
+
+        parts = []
+        for literal, field_name in self._chunks:
+            parts.append(literal)
+            if field_name:
+                parts.append(str(values[field_name]))
+        return "".join(parts)
+
+
+class TokenCounter:
+    """Compteur de tokens par provider (tiktoken si disponible, sinon estimation)"""
+
+    # Caractères par token observés sur du Solidity commenté en français
+    CHARS_PER_TOKEN = {"openai": 3.5, "anthropic": 3.2, "google": 3.8, "fake": 4.0, "replay": 4.0}
+
+    def __init__(self, provider: str, model: Optional[str] = None):
+        self.provider = provider
+        self.model = model
+        self.chars_per_token = self.CHARS_PER_TOKEN.get(provider, 3.5)
+        self._encoding = None
+
+        if provider == "openai":
+            try:
+                import tiktoken
+                self._encoding = tiktoken.encoding_for_model(model or "gpt-4")
+            except Exception:
+                self._encoding = None
+
+    def count(self, text: str) -> int:
+        """Nombre de tokens (exact pour OpenAI avec tiktoken, estimé sinon)"""
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return math.ceil(len(text) / self.chars_per_token)
+
+
+# Fenêtre de contexte et sortie maximale par modèle (tokens)
+MODEL_LIMITS: Dict[str, Dict[str, int]] = {
+    "gpt-4": {"context": 8192, "output": 4096},
+    "gpt-3.5-turbo": {"context": 16385, "output": 4096},
+    "claude-3-5-sonnet-20241022": {"context": 200000, "output": 8192},
+    "gemini-pro": {"context": 32760, "output": 8192}
+}
+DEFAULT_LIMITS = {"context": 8192, "output": 4096}
+
+
+class TokenBudget:
+    """Dimensionne max_tokens selon la taille attendue de la réponse"""
+
+    def __init__(self, counter: TokenCounter, expected_output: Dict[str, int],
+                 headroom: float = 1.5, minimum: int = 512):
+        """
+        Args:
+            counter: Compteur de tokens du provider
+            expected_output: Taille de réponse attendue par type (clé "default" en repli)
+            headroom: Marge multiplicative sur la taille attendue
+            minimum: Plancher de max_tokens
+        """
+        self.counter = counter
+        self.expected_output = expected_output
+        self.headroom = headroom
+        self.minimum = minimum
+
+    def max_tokens(self, kind: str, prompt: str, system: str = "",
+                   model: Optional[str] = None) -> int:
+        """
+        Calcule max_tokens pour une requête
+
+        Args:
+            kind: Type de réponse attendue (ex: type de contrat)
+            prompt: Prompt utilisateur rendu
+            system: Prompt système
+            model: Modèle cible (pour les limites de contexte)
+
+        Returns:
+            max_tokens borné par la sortie maximale et le contexte restant du modèle
+        """
+        limits = MODEL_LIMITS.get(model or self.counter.model or "", DEFAULT_LIMITS)
+        expected = self.expected_output.get(kind, self.expected_output.get("default", 2000))
+        wanted = max(self.minimum, int(expected * self.headroom))
+
+        prompt_tokens = self.counter.count(prompt) + self.counter.count(system)
+        available = limits["context"] - prompt_tokens
+        return max(self.minimum, min(wanted, limits["output"], available))
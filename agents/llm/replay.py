@@ -0,0 +1,146 @@
+"""
+Enregistrement et rejeu déterministe des réponses LLM
+
+RecordingProvider enregistre les réponses d'un provider réel dans un magasin
+de fixtures; ReplayProvider les rejoue sans réseau, avec une latence
+synthétique configurable (fixe, enregistrée, ou nulle). Permet de mesurer
+les performances du générateur en CI sans clé d'API.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
+
+from agents.llm.client import LLMProvider, LLMRequest, LLMResponse, ProviderError, FakeProvider
+
+DEFAULT_FIXTURES_DIR = Path(__file__).resolve().parent.parent.parent / "cache" / "llm_fixtures"
+
+
+class FixtureStore:
+    """Magasin de fixtures (un fichier JSON par requête, indexé par empreinte)"""
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or os.getenv("LLM_FIXTURES_DIR") or DEFAULT_FIXTURES_DIR)
+
+    @staticmethod
+    def key(request: LLMRequest) -> str:
+        """Empreinte d'une requête: seuls le prompt système et le prompt comptent"""
+        digest = hashlib.sha256()
+        digest.update(request.system.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(request.prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def load(self, request: LLMRequest) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(self.key(request)), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, request: LLMRequest, response: LLMResponse):
+        path = self._path(self.key(request))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fixture = {
+            "provider": response.provider,
+            "model": response.model,
+            "prompt_preview": request.prompt[:200],
+            "text": response.text,
+            "latency": response.latency,
+            "input_tokens": response.input_tokens,
+            "output_tokens": response.output_tokens
+        }
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.root.glob("*/*.json")) if self.root.exists() else 0
+
+
+class RecordingProvider(LLMProvider):
+    """Enveloppe un provider réel et enregistre chacune de ses réponses"""
+
+    def __init__(self, inner: LLMProvider, store: Optional[FixtureStore] = None):
+        super().__init__(model=inner.model, max_concurrency=inner.max_concurrency)
+        self.name = inner.name
+        self.inner = inner
+        self.store = store if store is not None else FixtureStore()
+
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        # La limite de concurrence est celle du provider enveloppé
+        response = await self.inner.complete(request)
+        self.store.save(request, response)
+        return response
+
+    async def _complete(self, request: LLMRequest) -> LLMResponse:
+        return await self.inner._complete(request)
+
+
+class ReplayProvider(LLMProvider):
+    """Rejoue les fixtures enregistrées avec une latence synthétique"""
+
+    name = "replay"
+    default_model = "replay"
+
+    def __init__(self, store: Optional[FixtureStore] = None,
+                 latency: Union[float, str, None] = None, jitter: float = 0.0,
+                 strict: Optional[bool] = None, model: Optional[str] = None,
+                 max_concurrency: int = 64, seed: int = 0):
+        """
+        Args:
+            store: Magasin de fixtures (défaut: $LLM_FIXTURES_DIR ou cache/llm_fixtures)
+            latency: Secondes fixes, "recorded" pour la latence enregistrée (défaut: $LLM_REPLAY_LATENCY ou 0)
+            jitter: Variation relative aléatoire de la latence (0.2 = ±20%)
+            strict: Erreur si la fixture manque (sinon réponse du FakeProvider)
+            seed: Graine du générateur de jitter (rejeu déterministe)
+        """
+        super().__init__(model=model, max_concurrency=max_concurrency)
+        self.store = store if store is not None else FixtureStore()
+        self.latency = latency if latency is not None else os.getenv("LLM_REPLAY_LATENCY", "0")
+        self.jitter = jitter
+        self.strict = strict if strict is not None else os.getenv("LLM_REPLAY_STRICT", "1") == "1"
+        self._random = random.Random(seed)
+        self.hits = 0
+        self.misses = 0
+
+    def _delay(self, fixture: Optional[Dict[str, Any]]) -> float:
+        if self.latency == "recorded":
+            base = (fixture or {}).get("latency", 0.0) or 0.0
+        else:
+            base = float(self.latency)
+        if self.jitter and base:
+            base *= 1 + self._random.uniform(-self.jitter, self.jitter)
+        return max(0.0, base)
+
+    async def _complete(self, request: LLMRequest) -> LLMResponse:
+        fixture = self.store.load(request)
+
+        if fixture is None:
+            self.misses += 1
+            if self.strict:
+                raise ProviderError(self.name, f"Fixture manquante ({FixtureStore.key(request)[:12]}) "
+                                               f"dans {self.store.root}")
+            fixture = {"text": FakeProvider.DEFAULT_RESPONSE, "model": self.model}
+        else:
+            self.hits += 1
+
+        delay = self._delay(fixture)
+        if delay:
+            await asyncio.sleep(delay)
+
+        return LLMResponse(
+            text=fixture["text"],
+            provider=self.name,
+            model=fixture.get("model", self.model),
+            latency=0.0,
+            input_tokens=fixture.get("input_tokens"),
+            output_tokens=fixture.get("output_tokens")
+        )
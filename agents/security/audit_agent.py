@@ -0,0 +1,636 @@
+"""
+Agent d'audit de sécurité (Slither, Mythril)
+
+Chaque analyseur installé s'exécute en sous-processus asynchrone, contrat par
+contrat et en parallèle. Les sorties JSON sont ramenées au format commun des
+constats (agents.blockchain.analysis.finding). Les résultats sont mis en cache
+par contrat: la clé couvre le contenu du contrat et de tous ses imports, la
+version et les options de l'outil; un contrat inchangé n'est jamais réanalysé.
+"""
+import sys
+import json
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import shutil
+import signal
+import time
+from typing import Dict, Any, List, Optional, Set
+from pathlib import Path
+from datetime import datetime
+
+# Racine du dépôt dans le path pour l'analyse Solidity partagée
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from agents.blockchain.analysis import finding, index_file, parse_solidity
+from pipeline.registry import register_agent
+
+logger = logging.getLogger(__name__)
+
+TOOLS = ("slither", "mythril")
+EXECUTABLES = {"slither": "slither", "mythril": "myth"}
+DEFAULT_CACHE_DIR = Path("cache") / "security"
+DEFAULT_TIMEOUTS = {"slither": 300, "mythril": 900}
+# Temps d'exécution symbolique accordé à Mythril (--execution-timeout)
+DEFAULT_EXECUTION_TIMEOUT = 600
+# Part du budget d'une analyse time-boxée laissée à l'exécution symbolique
+MYTHRIL_EXECUTION_SHARE = 0.8
+# Durée supposée d'une analyse jamais mesurée (ordonnancement)
+DEFAULT_EXPECTED = {"slither": 30.0, "mythril": 300.0}
+SEVERITY_ORDER = {"info": 0, "low": 1, "medium": 2, "high": 3}
+_SEVERITIES = {"informational": "info", "optimization": "info", "high": "high", "medium": "medium", "low": "low"}
+_IMPORT_PATH = re.compile(r"""import\s+(?:[^;]*?\bfrom\s+)?["']([^"']+)["']""")
+
+
+def severity_of(label: Optional[str]) -> str:
+    """Sévérité normalisée (high, medium, low, info)"""
+    return _SEVERITIES.get((label or "").strip().lower(), "info")
+
+
+def resolve_import(project_root: Path, importer: Path, target: str) -> Optional[Path]:
+    """Fichier importé: relatif à l'importeur, sinon paquet de node_modules"""
+    if target.startswith("."):
+        candidate = (importer.parent / target).resolve()
+    else:
+        candidate = (Path(project_root) / "node_modules" / target).resolve()
+    return candidate if candidate.is_file() else None
+
+
+def dependency_closure(project_root: Path, source: Path, snapshot=None) -> List[Path]:
+    """
+    Le contrat et tous les fichiers qu'il importe, transitivement (ordre stable)
+
+    Avec un instantané du projet (pipeline.snapshot.ProjectSnapshot), les sources
+    du projet sont lues depuis celui-ci; node_modules reste lu sur disque.
+    """
+    seen: Set[Path] = set()
+    pending = [Path(source).resolve()]
+    while pending:
+        current = pending.pop()
+        in_snapshot = snapshot is not None and current in snapshot
+        if current in seen or not (in_snapshot or current.is_file()):
+            continue
+        seen.add(current)
+        index = parse_solidity(snapshot.read_text(current)) if in_snapshot else index_file(current)
+        for statement in index.imports:
+            match = _IMPORT_PATH.search(statement)
+            resolved = resolve_import(project_root, current, match.group(1)) if match else None
+            if resolved:
+                pending.append(resolved)
+    return sorted(seen)
+
+
+def dependency_hash(project_root: Path, source: Path, snapshot=None) -> str:
+    """Empreinte SHA-256 du contrat et de ses dépendances"""
+    root = Path(project_root).resolve()
+    digest = hashlib.sha256()
+    for path in dependency_closure(root, source, snapshot):
+        try:
+            name = str(path.relative_to(root))
+        except ValueError:
+            name = str(path)
+        digest.update(name.encode("utf-8"))
+        if snapshot is not None and path in snapshot:
+            digest.update(bytes.fromhex(snapshot.digest(path)))
+        else:
+            digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+class AuditCache:
+    """Un fichier JSON par (contrat, outil), valide tant que sa clé est inchangée"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def _path(self, contract: str, tool: str) -> Path:
+        safe = re.sub(r"[^\w.-]", "_", contract)
+        return self.directory / tool / f"{safe}.json"
+
+    def lookup(self, contract: str, tool: str, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(contract, tool), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return entry["result"] if entry.get("key") == key else None
+
+    def store(self, contract: str, tool: str, key: str, result: Dict[str, Any]):
+        path = self._path(contract, tool)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "stored": datetime.now().isoformat(), "result": result}, f)
+        os.replace(tmp_path, path)
+
+
+class DurationHistory:
+    """Durées observées par (outil, contrat), lissées d'une exécution à l'autre"""
+
+    def __init__(self, path: Path, smoothing: float = 0.5):
+        self.path = Path(path)
+        self.smoothing = smoothing
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.durations: Dict[str, float] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.durations = {}
+
+    def expected(self, tool: str, contract: str) -> float:
+        known = self.durations.get(f"{tool}:{contract}")
+        if known is not None:
+            return known
+        same_tool = sorted(v for k, v in self.durations.items() if k.startswith(f"{tool}:"))
+        # Médiane basse: un contrat inconnu passe avant les analyses notoirement longues
+        return same_tool[(len(same_tool) - 1) // 2] if same_tool else DEFAULT_EXPECTED.get(tool, 60.0)
+
+    def record(self, tool: str, contract: str, seconds: float, lower_bound: bool = False):
+        """Ajoute une mesure; une analyse interrompue ne peut que rallonger l'estimation"""
+        key = f"{tool}:{contract}"
+        previous = self.durations.get(key)
+        if previous is None:
+            value = seconds
+        elif lower_bound:
+            value = max(previous, seconds)
+        else:
+            value = self.smoothing * seconds + (1 - self.smoothing) * previous
+        self.durations[key] = round(value, 3)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.durations, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class SecurityAuditAgent:
+    """Agent d'audit statique (Slither) et symbolique (Mythril) des contrats"""
+
+    def __init__(self, project_root: Path, tools: Optional[List[str]] = None,
+                 max_parallel: int = 0, timeouts: Optional[Dict[str, float]] = None,
+                 execution_timeout: int = DEFAULT_EXECUTION_TIMEOUT,
+                 cache_dir: Path = DEFAULT_CACHE_DIR, use_cache: bool = True,
+                 budgets: Optional[Dict[str, float]] = None, deadline: Optional[float] = None,
+                 snapshot=None):
+        """
+        Args:
+            project_root: Racine du projet Hardhat
+            tools: Analyseurs à utiliser ("slither", "mythril")
+            max_parallel: Analyses simultanées (0 = nombre de CPU)
+            timeouts: Durée maximale d'une analyse par outil (secondes)
+            execution_timeout: Budget d'exécution symbolique de Mythril (secondes)
+            cache_dir: Dossier du cache (relatif au projet)
+            use_cache: Réutiliser les résultats des contrats inchangés
+            budgets: Budget par contrat et par outil (secondes); au-delà, le résultat est partiel
+            deadline: Durée maximale de l'audit complet (secondes), None sans limite
+            snapshot: Instantané du projet partagé avec les gates (contrats et imports non relus)
+        """
+        self.project_root = Path(project_root)
+        self.tools = [t for t in (tools or TOOLS) if t in TOOLS]
+        self.max_parallel = max_parallel or os.cpu_count() or 2
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.execution_timeout = execution_timeout
+        self.cache = AuditCache(self.project_root / cache_dir) if use_cache else None
+        self.budgets = {tool: min(seconds, self.timeouts[tool]) for tool, seconds in (budgets or {}).items()
+                        if tool in self.timeouts}
+        self.deadline = deadline
+        self.snapshot = snapshot
+        self.history = DurationHistory(self.project_root / cache_dir / "durations.json")
+        self._versions: Dict[str, Optional[str]] = {}
+
+    def available_tools(self) -> List[str]:
+        return [tool for tool in self.tools if shutil.which(EXECUTABLES[tool])]
+
+    def contracts(self) -> List[Path]:
+        if self.snapshot is not None:
+            return self.snapshot.paths("contracts/**/*.sol")
+        contracts_dir = self.project_root / "contracts"
+        return sorted(contracts_dir.glob("**/*.sol")) if contracts_dir.exists() else []
+
+    async def audit(self, contracts: Optional[List[Path]] = None,
+                    changed: Optional[List[Path]] = None) -> Dict[str, Any]:
+        """
+        Analyse les contrats avec chaque outil disponible
+
+        Les analyses hors cache sont lancées de la plus courte à la plus longue
+        (durées des exécutions précédentes). Avec `budgets`, chaque analyse est
+        bornée; avec `deadline`, celles encore en cours à l'échéance sont
+        interrompues et signalées comme partielles.
+
+        Args:
+            contracts: Fichiers .sol à analyser (par défaut: contracts/**/*.sol)
+            changed: Fichiers modifiés (mode --since): un contrat dont ni le source ni
+                les imports n'ont changé n'est pas analysé, seul son résultat en cache
+                est repris (marqué `reused`)
+
+        Returns:
+            Constats unifiés, résultats par contrat et par outil, outils absents,
+            analyses partielles à reprendre en mode approfondi (`deep`)
+        """
+        contracts = [Path(p) for p in contracts] if contracts is not None else self.contracts()
+        tools = self.available_tools()
+        missing = [tool for tool in self.tools if tool not in tools]
+        for tool in missing:
+            logger.warning(f"⚠️  {tool} non installé: analyse ignorée")
+
+        start = time.perf_counter()
+        keys = {path: dependency_hash(self.project_root, path, self.snapshot) for path in contracts}
+        versions = dict(zip(tools, await asyncio.gather(*(self._version(tool) for tool in tools))))
+
+        affected = None
+        if changed is not None:
+            modified = {Path(p).resolve() for p in changed}
+            affected = {path for path in contracts
+                        if modified.intersection(dependency_closure(self.project_root, path, self.snapshot))}
+
+        jobs = [(path, tool) for path in contracts for tool in tools]
+        results: Dict[tuple, Dict[str, Any]] = {}
+        queue = []
+        for path, tool in jobs:
+            key = self._cache_key(keys[path], tool, versions[tool])
+            cached = self.cache.lookup(self._relative(path), tool, key) if self.cache is not None else None
+            reused = affected is not None and path not in affected
+            if cached is not None:
+                results[(path, tool)] = {**cached, "cached": True}
+                if reused:
+                    results[(path, tool)]["reused"] = True
+            elif reused:
+                results[(path, tool)] = {"findings": [], "cached": False, "not_in_diff": True}
+            else:
+                queue.append((self.history.expected(tool, self._relative(path)), path, tool, key))
+        queue.sort(key=lambda job: job[0])
+        await self._schedule(queue, results)
+        self.history.save()
+
+        report: Dict[str, Any] = {
+            "tools": tools,
+            "missing_tools": missing,
+            "contracts": {},
+            "findings": [],
+            "errors": [],
+            "cached": 0,
+            "analyzed": 0,
+            "deep": []
+        }
+        if affected is not None:
+            report.update(reused=0, not_in_diff=0)
+        for path, tool in jobs:
+            name = self._relative(path)
+            result = results[(path, tool)]
+            report["contracts"].setdefault(name, {})[tool] = result
+            if result.get("reused"):
+                report["findings"].extend({**f, "reused": True} for f in result.get("findings", []))
+                report["reused"] += 1
+            else:
+                report["findings"].extend(result.get("findings", []))
+            if result.get("error"):
+                # Seules les analyses interrompues par leur budget sont partielles; les autres
+                # erreurs (plantage, compilation, timeout complet) laissent le contrat non audité
+                report["errors"].append({"contract": name, "tool": tool, "error": result["error"],
+                                         "partial": bool(result.get("partial"))})
+            if result.get("partial"):
+                report["deep"].append({"contract": name, "tool": tool})
+            if result.get("not_in_diff"):
+                report["not_in_diff"] += 1
+            else:
+                report["cached" if result.get("cached") else "analyzed"] += 1
+
+        report["partial"] = bool(report["deep"])
+        report["failed"] = sum(1 for error in report["errors"] if not error["partial"])
+        report["findings"].sort(key=lambda f: (-SEVERITY_ORDER.get(f["severity"], 0), f["file"], f["line"] or 0))
+        report["counts"] = {severity: sum(1 for f in report["findings"] if f["severity"] == severity)
+                            for severity in SEVERITY_ORDER}
+        report["duration"] = round(time.perf_counter() - start, 3)
+        logger.info(f"🔒 Audit: {len(report['findings'])} constat(s), {report['analyzed']} analyse(s), "
+                    f"{report['cached']} en cache, {len(report['deep'])} partielle(s) ({report['duration']}s)")
+        return report
+
+    async def _schedule(self, queue: List[tuple], results: Dict[tuple, Dict[str, Any]]):
+        """Exécute la file (plus courte d'abord) sur `max_parallel` workers, dans la limite de `deadline`"""
+        pending = list(queue)
+        running: Dict[tuple, float] = {}
+
+        async def worker():
+            while pending:
+                _, path, tool, key = pending.pop(0)
+                running[(path, tool)] = time.perf_counter()
+                results[(path, tool)] = await self._audit_one(path, tool, key)
+                del running[(path, tool)]
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(self.max_parallel, len(queue)))]
+        if not workers:
+            return
+        done, not_done = await asyncio.wait(workers, timeout=self.deadline)
+        for task in done:
+            task.result()
+        if not not_done:
+            return
+
+        # Échéance de la gate: les analyses en cours sont interrompues, les autres non lancées
+        for task in not_done:
+            task.cancel()
+        await asyncio.gather(*not_done, return_exceptions=True)
+        now = time.perf_counter()
+        for (path, tool), started in running.items():
+            logger.warning(f"⏱️  {tool}: {self._relative(path)} interrompu à l'échéance de la gate")
+            self.history.record(tool, self._relative(path), now - started, lower_bound=True)
+            results[(path, tool)] = {"findings": [], "partial": True, "cached": False,
+                                     "error": f"Échéance de la gate ({self.deadline:.0f}s) atteinte"}
+        for _, path, tool, _ in pending:
+            results[(path, tool)] = {"findings": [], "partial": True, "cached": False, "not_started": True}
+
+    def _relative(self, path: Path) -> str:
+        try:
+            return str(Path(path).resolve().relative_to(self.project_root.resolve()))
+        except ValueError:
+            return str(path)
+
+    def _cache_key(self, dependencies: str, tool: str, version: Optional[str]) -> str:
+        options = {"version": version, "remaps": self._remaps()}
+        if tool == "mythril":
+            options["execution_timeout"] = self.execution_timeout
+        return hashlib.sha256(f"{dependencies}:{json.dumps(options, sort_keys=True)}".encode("utf-8")).hexdigest()
+
+    async def _audit_one(self, path: Path, tool: str, key: str) -> Dict[str, Any]:
+        name = self._relative(path)
+        budget = self.budgets.get(tool) or self.timeouts[tool]
+        logger.info(f"🔍 {tool}: {name} (budget {budget:.0f}s)")
+        start = time.perf_counter()
+        result = await (self._run_slither(path, budget) if tool == "slither" else self._run_mythril(path, budget))
+        result["duration"] = round(time.perf_counter() - start, 3)
+        self.history.record(tool, name, result["duration"], lower_bound=result.get("partial", False))
+
+        # Erreurs et résultats partiels ne sont pas mis en cache: ils seront repris
+        if self.cache is not None and not result.get("error") and not result.get("partial"):
+            self.cache.store(name, tool, key, result)
+        return {**result, "cached": False}
+
+    async def _version(self, tool: str) -> Optional[str]:
+        if tool not in self._versions:
+            command = ["slither", "--version"] if tool == "slither" else ["myth", "version"]
+            stdout, _, _ = await self._exec(command, timeout=60)
+            self._versions[tool] = (stdout.strip() or None) if stdout is not None else None
+        return self._versions[tool]
+
+    def _remaps(self) -> List[str]:
+        """Remappings des paquets npm importés (@openzeppelin/...)"""
+        modules = self.project_root / "node_modules"
+        if not modules.exists():
+            return []
+        return sorted(f"{scope.name}/={scope}/" for scope in modules.glob("@*") if scope.is_dir())
+
+    async def _exec(self, command: List[str], timeout: float):
+        """
+        (stdout, stderr, code de retour); stdout None en cas de timeout (code None)
+        ou d'échec de lancement (code -1)
+        """
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                cwd=self.project_root,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
+            )
+        except OSError as e:
+            return None, str(e), -1
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            await self._kill(process)
+            return None, f"Timeout après {timeout:.0f}s", None
+        except asyncio.CancelledError:
+            await self._kill(process)
+            raise
+        return (stdout.decode("utf-8", errors="replace"), stderr.decode("utf-8", errors="replace"),
+                process.returncode)
+
+    @staticmethod
+    async def _kill(process):
+        """Termine l'outil et ses sous-processus (solc, workers) pour libérer ses pipes"""
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            process.kill()
+        await process.wait()
+
+    def _budget_exceeded(self, stdout: Optional[str], code: Optional[int], budget: float, tool: str) -> bool:
+        """Timeout dû au budget time-boxé (analyse à reprendre), pas au timeout complet de l'outil"""
+        return stdout is None and code is None and budget < self.timeouts[tool]
+
+    @staticmethod
+    def _load_json(stdout: Optional[str], stderr: str):
+        """JSON de l'outil (ses codes de retour signalent aussi la présence de constats)"""
+        if stdout is None:
+            return None, stderr
+        try:
+            return json.loads(stdout), None
+        except json.JSONDecodeError:
+            return None, (stderr or stdout)[-500:]
+
+    async def _run_slither(self, path: Path, budget: float) -> Dict[str, Any]:
+        command = ["slither", str(path), "--json", "-"]
+        remaps = self._remaps()
+        if remaps:
+            command += ["--solc-remaps", " ".join(remaps)]
+        stdout, stderr, code = await self._exec(command, budget)
+        data, error = self._load_json(stdout, stderr)
+        if error:
+            # Slither n'écrit son JSON qu'à la fin: un dépassement de budget ne laisse aucun constat
+            return {"error": error, "findings": [],
+                    "partial": self._budget_exceeded(stdout, code, budget, "slither")}
+        if not data.get("success", True) and data.get("error"):
+            return {"error": str(data["error"])[-500:], "findings": []}
+
+        findings = []
+        for detector in (data.get("results") or {}).get("detectors", []):
+            element = (detector.get("elements") or [{}])[0]
+            mapping = element.get("source_mapping", {})
+            lines = mapping.get("lines") or [None]
+            parent = element.get("type_specific_fields", {}).get("parent", {})
+            function = element.get("name") if element.get("type") == "function" else parent.get("name")
+            findings.append(finding(
+                detector.get("check"), severity_of(detector.get("impact")),
+                detector.get("description", "").strip().split("\n")[0], lines[0], function,
+                tool="slither", confidence=(detector.get("confidence") or "").lower() or None,
+                file=mapping.get("filename_relative") or self._relative(path),
+                contract=parent.get("name") if element.get("type") == "function" else element.get("name")
+            ))
+        return {"findings": findings}
+
+    async def _run_mythril(self, path: Path, budget: float) -> Dict[str, Any]:
+        # Mythril s'arrête de lui-même à --execution-timeout et rapporte les constats déjà trouvés:
+        # une marge est laissée au budget pour la compilation et l'écriture du rapport
+        execution_timeout = min(self.execution_timeout, max(1, int(budget * MYTHRIL_EXECUTION_SHARE)))
+        command = ["myth", "analyze", str(path), "-o", "json",
+                   "--execution-timeout", str(execution_timeout)]
+        start = time.perf_counter()
+        stdout, stderr, code = await self._exec(command, budget)
+        truncated = execution_timeout < self.execution_timeout and time.perf_counter() - start >= execution_timeout
+        data, error = self._load_json(stdout, stderr)
+        if error:
+            return {"error": error, "findings": [],
+                    "partial": self._budget_exceeded(stdout, code, budget, "mythril")}
+        if not data.get("success", True) and data.get("error"):
+            return {"error": str(data["error"])[-500:], "findings": []}
+
+        findings = [
+            finding(issue.get("swc-id"), severity_of(issue.get("severity")), issue.get("title", ""),
+                    issue.get("lineno"), issue.get("function"),
+                    tool="mythril", confidence=None, file=self._relative(path), contract=issue.get("contract"),
+                    description=(issue.get("description") or "").strip().split("\n")[0])
+            for issue in data.get("issues", [])
+        ]
+        if truncated:
+            return {"findings": findings, "partial": True, "execution_timeout": execution_timeout}
+        return {"findings": findings}
+
+
+def blocking_findings(findings: List[Dict[str, Any]], fail_on: str = "high") -> List[Dict[str, Any]]:
+    """Constats de sévérité supérieure ou égale à `fail_on`"""
+    threshold = SEVERITY_ORDER.get(fail_on, SEVERITY_ORDER["high"])
+    return [f for f in findings if SEVERITY_ORDER.get(f["severity"], 0) >= threshold]
+
+
+def start_deep_mode(project_root: Path, partial: List[Dict[str, str]],
+                    execution_timeout: int = DEFAULT_EXECUTION_TIMEOUT,
+                    cache_dir: Path = DEFAULT_CACHE_DIR) -> Dict[str, Any]:
+    """
+    Relance en arrière-plan, sans budget, les analyses restées partielles
+
+    Le processus est détaché: il survit au retour de la gate et à la fin du
+    pipeline, et remplit le cache que la prochaine gate réutilisera. Une seule
+    analyse approfondie tourne à la fois (verrou contenant son PID).
+
+    Args:
+        partial: Entrées {"contract", "tool"} du rapport (`deep`)
+    """
+    import subprocess
+
+    root = Path(project_root)
+    lock = root / cache_dir / "deep.lock"
+    try:
+        pid = int(lock.read_text().strip())
+        os.kill(pid, 0)
+        return {"started": False, "running": pid}
+    except (FileNotFoundError, ValueError, ProcessLookupError, PermissionError):
+        pass
+
+    contracts = sorted({entry["contract"] for entry in partial})
+    tools = sorted({entry["tool"] for entry in partial})
+    lock.parent.mkdir(parents=True, exist_ok=True)
+    with open(root / cache_dir / "deep.log", "a", encoding="utf-8") as log:
+        process = subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "--deep", "--project-root", str(root),
+             "--execution-timeout", str(execution_timeout), "--tools", *tools, "--", *contracts],
+            cwd=root, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+            start_new_session=True
+        )
+    lock.write_text(str(process.pid))
+    logger.info(f"🌙 Mode approfondi lancé en arrière-plan (PID {process.pid}): {len(contracts)} contrat(s)")
+    return {"started": True, "pid": process.pid, "contracts": contracts, "tools": tools}
+
+
+@register_agent("security_auditor", tasks=("audit",),
+                inputs=("project_root", "contracts", "changed", "time_boxed", "snapshot"),
+                outputs=("findings", "counts", "blocking", "partial", "deep"), cost="expensive",
+                description="Audit Slither / Mythril en cache par contrat")
+async def run(task: str, config: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+    """
+    Point d'entrée utilisé par l'orchestrateur (Web3PipelineOrchestrator.run_agent)
+
+    Args:
+        task: Tâche à exécuter ("audit")
+        config: Configuration de l'agent (tools, max_parallel, timeouts, budgets, gate_budget, fail_on, ...)
+        **kwargs: project_root, contracts (fichiers .sol à analyser), changed (fichiers
+            modifiés: seuls les contrats concernés sont analysés),
+            time_boxed (appliquer budgets et gate_budget, puis reprendre les analyses partielles en arrière-plan),
+            snapshot (instantané du projet partagé par les gates)
+
+    Returns:
+        Rapport d'audit; "success" est faux si un constat atteint `fail_on` ou si une
+        analyse a échoué hors dépassement de budget (`failed`)
+    """
+    config = config or {}
+
+    if task != "audit":
+        return {"success": False, "agent": "security_auditor", "error": f"Tâche inconnue: {task}"}
+
+    time_boxed = kwargs.get("time_boxed", False)
+    agent = SecurityAuditAgent(
+        Path(kwargs.get("project_root", Path(__file__).resolve().parent.parent.parent)),
+        tools=config.get("tools"),
+        max_parallel=config.get("max_parallel", 0),
+        timeouts=config.get("timeouts"),
+        execution_timeout=config.get("execution_timeout", DEFAULT_EXECUTION_TIMEOUT),
+        use_cache=config.get("cache", True),
+        budgets=config.get("budgets") if time_boxed else None,
+        deadline=config.get("gate_budget") if time_boxed else None,
+        snapshot=kwargs.get("snapshot")
+    )
+    changed = kwargs.get("changed")
+    report = await agent.audit(kwargs.get("contracts"),
+                               changed=[Path(p) for p in changed] if changed is not None else None)
+
+    if report["deep"] and time_boxed and config.get("deep_mode", True) and agent.cache is not None:
+        report["deep_mode"] = start_deep_mode(agent.project_root, report["deep"], agent.execution_timeout)
+
+    blocking = blocking_findings(report["findings"], config.get("fail_on", "high"))
+    report["blocking"] = len(blocking)
+    report["agent"] = "security_auditor"
+    report["task"] = task
+    report["timestamp"] = datetime.now().isoformat()
+    report["success"] = not blocking and not report["failed"]
+    return report
+
+
+# Interface CLI simplifiée
+def main():
+    """Point d'entrée pour l'agent"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Agent d'audit de sécurité (Slither, Mythril)")
+    parser.add_argument("contracts", nargs="*", help="Fichiers .sol (par défaut: contracts/**/*.sol)")
+    parser.add_argument("--tools", nargs="+", default=list(TOOLS), choices=list(TOOLS),
+                        help="Analyseurs à utiliser")
+    parser.add_argument("--fail-on", default="high", choices=list(SEVERITY_ORDER),
+                        help="Sévérité minimale faisant échouer l'audit")
+    parser.add_argument("--no-cache", action="store_true", help="Réanalyser tous les contrats")
+    parser.add_argument("--execution-timeout", type=int, default=DEFAULT_EXECUTION_TIMEOUT,
+                        help="Budget d'exécution symbolique de Mythril (secondes)")
+    parser.add_argument("--project-root", default=str(Path(__file__).resolve().parent.parent.parent),
+                        help="Racine du projet Hardhat")
+    parser.add_argument("--deep", action="store_true",
+                        help="Mode approfondi (lancé par la gate): sans budget, libère le verrou en fin d'analyse")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    print("🔒 Agent d'Audit de Sécurité")
+    print("=" * 50)
+
+    try:
+        report = asyncio.run(run(
+            "audit",
+            config={"tools": args.tools, "fail_on": args.fail_on, "cache": not args.no_cache,
+                    "execution_timeout": args.execution_timeout},
+            project_root=args.project_root,
+            contracts=[Path(args.project_root) / c for c in args.contracts] or None
+        ))
+    finally:
+        if args.deep:
+            (Path(args.project_root) / DEFAULT_CACHE_DIR / "deep.lock").unlink(missing_ok=True)
+
+    for f in report["findings"]:
+        print(f"   [{f['severity'].upper()}] {f['tool']} {f['rule']} - {f['file']}:{f['line']} {f['message']}")
+    for error in report["errors"]:
+        print(f"   {'⏱️ ' if error['partial'] else '❌'} {error['tool']} {error['contract']}: {error['error']}")
+    print(f"\n📊 {report['counts']} ({report['analyzed']} analyse(s), {report['cached']} en cache)")
+    return 0 if report["success"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,504 @@
+"""
+Agent de génération de tests guidée par la couverture
+
+Lit le rapport istanbul de solidity-coverage, ne cible que les branches non
+couvertes des contrats modifiés et génère un fichier de test Hardhat par
+contrat. La couverture est re-mesurée de façon incrémentale: seuls les
+nouveaux fichiers passent sous `hardhat coverage` et leurs compteurs sont
+ajoutés au rapport existant, sans relancer toute la suite. Le rapport garde
+l'empreinte de chaque source mesuré: un contrat ciblé modifié depuis est
+d'abord re-mesuré avec les seuls tests qui le concernent.
+"""
+import sys
+import json
+import asyncio
+import logging
+import re
+import shutil
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Set, Tuple
+from pathlib import Path
+from datetime import datetime
+
+# Racine du dépôt dans le path pour la couche LLM partagée et le runner de tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from agents.llm.client import LLMRequest, get_provider
+from agents.llm.prompts import PromptTemplate, TokenBudget, TokenCounter, compact_prompt
+from agents.blockchain.analysis import index_file
+from pipeline.test_runner import (
+    DEFAULT_COVERAGE_REPORT, TestRunner, contract_dependents, coverage_summary,
+    discover_tests, git_changed_files, merge_coverage, stale_sources
+)
+from pipeline.registry import register_agent
+
+logger = logging.getLogger(__name__)
+
+GENERATED_DIR = "generated"
+EXPECTED_TEST_TOKENS = {"default": 2500}
+# Extrait des tests existants joint au prompt comme modèle de style
+EXAMPLE_CHARS = 3000
+_FENCE = re.compile(r"^```[\w-]*\n(.*?)\n```", re.S | re.M)
+
+GENERATION_TEMPLATE = PromptTemplate("""
+    TU ES UN EXPERT EN TESTS DE SMART CONTRACTS (HARDHAT, ETHERS V6, CHAI).
+
+    # MISSION
+    Écris des tests qui exécutent les branches NON COUVERTES du contrat {contract}.
+
+    # BRANCHES À COUVRIR
+    {gaps}
+
+    # CONTRAT ({path})
+    {source}
+
+    # TESTS EXISTANTS (style à reproduire)
+    {examples}
+
+    # RÈGLES STRICTES
+    1. CommonJS: require("chai") et require("hardhat"), API ethers v6 (waitForDeployment, parseEther)
+    2. Un seul describe("{contract} - couverture") et un it() par branche visée
+    3. @nomicfoundation/hardhat-network-helpers pour le temps (time.increaseTo) et les fixtures
+    4. Vérifier les revert avec revertedWith / revertedWithCustomError
+    5. Ne pas dépendre des autres fichiers de test
+
+    # FORMAT DE SORTIE
+    Retourne UNIQUEMENT le code JavaScript complet.
+    Pas d'explications, pas de markdown, juste le code.
+""")
+
+SYSTEM_PROMPT = compact_prompt("""
+    Tu es un ingénieur QA senior spécialisé en smart contracts Solidity.
+    Tes tests sont déterministes, indépendants et ciblent un comportement précis.
+    Chaque test déploie son propre état et vérifie le résultat attendu.
+""")
+
+
+@dataclass
+class CoverageGap:
+    """Branche (ou fonction sans branche) jamais exécutée par les tests"""
+    file: str
+    contract: str
+    function: Optional[str]
+    line: int
+    kind: str
+    branch_type: Optional[str] = None
+    branch_index: Optional[int] = None
+    code: str = ""
+
+    def describe(self) -> str:
+        where = f"{self.function}()" if self.function else self.contract
+        if self.kind == "function":
+            return f"- ligne {self.line}, {where}: fonction jamais appelée"
+        if self.branch_type in ("if", "cond-expr") and self.branch_index in (0, 1):
+            side = "condition vraie" if self.branch_index == 0 else "condition fausse"
+        else:
+            side = f"branche {self.branch_index + 1} ({self.branch_type})"
+        return f"- ligne {self.line}, {where}: {side} jamais exécutée → `{self.code}`"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def load_coverage(path: Path) -> Dict[str, Any]:
+    """Rapport istanbul (coverage.json), vide s'il n'existe pas"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def coverage_gaps(project_root: Path, coverage: Dict[str, Any],
+                  contracts: Optional[Set[str]] = None) -> List[CoverageGap]:
+    """
+    Branches non couvertes, rattachées à leur contrat et à leur fonction
+
+    Les fonctions jamais appelées et dépourvues de branche sont aussi
+    retenues: aucune branche ne les représenterait.
+
+    Args:
+        coverage: Rapport istanbul {fichier: {branchMap, b, fnMap, f, ...}}
+        contracts: Contrats à cibler (tous si None)
+    """
+    gaps = []
+    for name, data in sorted(coverage.items()):
+        path = Path(name) if Path(name).is_absolute() else Path(project_root) / name
+        if not path.exists():
+            continue
+        index = index_file(path)
+        lines = index.source.splitlines()
+
+        def locate(line: int):
+            contract = next((c for c in index.contracts if c.line <= line <= c.end_line), None)
+            if contract is None:
+                return None, None
+            function = next((f for f in contract.functions + contract.modifiers
+                             if f.line <= line <= f.end_line), None)
+            return contract.name, function
+
+        branch_lines = set()
+        for branch_id, counts in data.get("b", {}).items():
+            branch = data.get("branchMap", {}).get(branch_id, {})
+            locations = branch.get("locations") or []
+            for position, count in enumerate(counts):
+                location = locations[position] if position < len(locations) else branch.get("loc")
+                line = (location or {}).get("start", {}).get("line") or branch.get("line")
+                if not line:
+                    continue
+                branch_lines.add(line)
+                if count:
+                    continue
+                contract, function = locate(line)
+                if contract is None or (contracts is not None and contract not in contracts):
+                    continue
+                gaps.append(CoverageGap(
+                    file=name, contract=contract, function=function.name if function else None,
+                    line=line, kind="branch",
+                    branch_type=branch.get("type"), branch_index=position,
+                    code=lines[line - 1].strip() if line <= len(lines) else ""
+                ))
+
+        for function_id, count in data.get("f", {}).items():
+            declaration = data.get("fnMap", {}).get(function_id, {})
+            line = declaration.get("line") or declaration.get("loc", {}).get("start", {}).get("line")
+            if count or not line:
+                continue
+            contract, function = locate(line)
+            if contract is None or (contracts is not None and contract not in contracts):
+                continue
+            end = function.end_line if function else line
+            if any(line <= branch_line <= end for branch_line in branch_lines):
+                continue
+            gaps.append(CoverageGap(file=name, contract=contract,
+                                    function=function.name if function else declaration.get("name"),
+                                    line=line, kind="function",
+                                    code=lines[line - 1].strip() if line <= len(lines) else ""))
+    return gaps
+
+
+def branch_coverage(coverage: Dict[str, Any], files: Set[str]) -> float:
+    """Pourcentage de branches couvertes sur un ensemble de fichiers du rapport"""
+    summary = coverage_summary({name: data for name, data in coverage.items() if name in files})
+    return summary["total"]["branches"]
+
+
+class TestGeneratorAgent:
+    """Agent IA générant des tests pour les branches non couvertes des contrats modifiés"""
+
+    def __init__(self, project_root: Path, ai_provider: str = "openai", tests_dir: str = "tests",
+                 coverage_target: float = 80.0, max_rounds: int = 2, timeout: float = 900.0,
+                 coverage_report: Path = DEFAULT_COVERAGE_REPORT):
+        """
+        Args:
+            project_root: Racine du projet Hardhat
+            ai_provider: "openai", "anthropic", "google", "fake" ou "replay"
+            coverage_target: Couverture des branches (%) visée sur les contrats modifiés
+            max_rounds: Nombre maximal de cycles génération → mesure
+            coverage_report: Rapport istanbul fusionné (relatif au projet)
+        """
+        self.project_root = Path(project_root)
+        self.ai_provider = ai_provider
+        self.tests_dir = tests_dir
+        self.coverage_target = coverage_target
+        self.max_rounds = max_rounds
+        self.timeout = timeout
+        self.coverage_path = self.project_root / coverage_report
+        self.output_dir = self.project_root / tests_dir / GENERATED_DIR
+
+        self.client = get_provider(ai_provider)
+        self.model = self.client.model
+        self.token_budget = TokenBudget(TokenCounter(ai_provider, self.model), EXPECTED_TEST_TOKENS)
+
+    async def generate(self, changed: Optional[List[Path]] = None) -> Dict[str, Any]:
+        """
+        Génère des tests jusqu'à atteindre la couverture visée sur les contrats modifiés
+
+        Args:
+            changed: Fichiers modifiés (par défaut: `git diff HEAD` et fichiers non suivis)
+
+        Returns:
+            Couverture avant/après, lacunes restantes et fichiers de test conservés
+        """
+        if changed is None:
+            changed = await git_changed_files(self.project_root)
+        contracts = contract_dependents(self.project_root, changed)
+        result: Dict[str, Any] = {
+            "contracts": sorted(contracts),
+            "coverage_target": self.coverage_target,
+            "generated": [],
+            "rejected": [],
+            "rounds": 0
+        }
+        if not contracts:
+            logger.info("✅ Aucun contrat modifié: pas de test à générer")
+            result.update(status="up_to_date", coverage_ok=True)
+            return result
+
+        runner = TestRunner(self.project_root, tests_dir=self.tests_dir, timeout=self.timeout, coverage=True)
+        unavailable = runner.available()
+        if unavailable:
+            result.update(status="error", error=unavailable)
+            return result
+
+        coverage = load_coverage(self.coverage_path)
+        if not coverage:
+            # Première mesure: toute la suite, une seule fois
+            logger.info("📏 Pas de rapport de couverture: mesure complète initiale")
+            await runner.run()
+            coverage = load_coverage(self.coverage_path)
+        else:
+            # Sources ciblés modifiés depuis la mesure: lignes et compteurs périmés
+            stale = stale_sources(self.project_root, coverage, self._sources_of(contracts))
+            if stale:
+                coverage = await self._remeasure(coverage, stale)
+
+        gaps = coverage_gaps(self.project_root, coverage, contracts)
+        files = {name for name in coverage if contracts & set(self._contracts_of(name))}
+        result["coverage_before"] = branch_coverage(coverage, files)
+
+        while gaps and branch_coverage(coverage, files) < self.coverage_target and result["rounds"] < self.max_rounds:
+            result["rounds"] += 1
+            by_contract: Dict[str, List[CoverageGap]] = {}
+            for gap in gaps:
+                by_contract.setdefault(gap.contract, []).append(gap)
+            logger.info(f"🧪 Cycle {result['rounds']}: {len(gaps)} branche(s) non couverte(s) "
+                        f"dans {len(by_contract)} contrat(s)")
+
+            written = await asyncio.gather(*(self._generate_for(contract, contract_gaps, result["rounds"])
+                                             for contract, contract_gaps in by_contract.items()))
+            new_files = [path for path in written if path is not None]
+            if not new_files:
+                break
+
+            coverage, kept = await self._measure_incremental(coverage, new_files)
+            result["generated"].extend(str(p.relative_to(self.project_root)) for p in kept)
+            result["rejected"].extend(str(p.relative_to(self.project_root)) for p in new_files if p not in kept)
+            gaps = coverage_gaps(self.project_root, coverage, contracts)
+
+        result["coverage_after"] = branch_coverage(coverage, files)
+        result["coverage_ok"] = result["coverage_after"] >= self.coverage_target
+        result["remaining_gaps"] = [gap.to_dict() for gap in gaps]
+        result["status"] = "success" if result["coverage_ok"] else "below_target"
+        logger.info(f"📊 Couverture des branches: {result['coverage_before']}% → {result['coverage_after']}% "
+                    f"(objectif {self.coverage_target}%)")
+        return result
+
+    def _contracts_of(self, name: str) -> List[str]:
+        path = Path(name) if Path(name).is_absolute() else self.project_root / name
+        return [c.name for c in index_file(path).contracts] if path.exists() else []
+
+    def _sources_of(self, contracts: Set[str]) -> List[str]:
+        """Fichiers .sol (relatifs au projet) définissant l'un des contrats"""
+        contracts_dir = self.project_root / "contracts"
+        sources = sorted(contracts_dir.glob("**/*.sol")) if contracts_dir.exists() else []
+        return [str(path.relative_to(self.project_root)) for path in sources
+                if contracts & {c.name for c in index_file(path).contracts}]
+
+    async def _remeasure(self, coverage: Dict[str, Any], stale: List[str]) -> Dict[str, Any]:
+        """
+        Re-mesure les sources périmés avec les seuls tests qui les concernent
+        (select_affected) et remplace leurs entrées dans le rapport
+        """
+        logger.info(f"📏 Couverture périmée pour {len(stale)} source(s): re-mesure des tests concernés")
+        runner = TestRunner(self.project_root, tests_dir=self.tests_dir, timeout=self.timeout,
+                            coverage=True, coverage_report=None)
+        await runner.run(changed=[self.project_root / name for name in stale])
+        fresh = merge_coverage(shard.coverage for shard in runner.results if shard.coverage)
+
+        coverage = dict(coverage)
+        for name in stale:
+            # Sans test concerné, aucune mesure: l'ancienne entrée est écartée plutôt que réutilisée
+            coverage.pop(name, None)
+            if name in fresh:
+                coverage[name] = fresh[name]
+        self._save_coverage(coverage)
+        return coverage
+
+    def _save_coverage(self, coverage: Dict[str, Any]):
+        self.coverage_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.coverage_path, "w", encoding="utf-8") as f:
+            json.dump(coverage, f)
+
+    async def _generate_for(self, contract: str, gaps: List[CoverageGap], round_number: int) -> Optional[Path]:
+        """Demande au modèle un fichier de test couvrant les lacunes d'un contrat"""
+        source_path = Path(gaps[0].file)
+        if not source_path.is_absolute():
+            source_path = self.project_root / source_path
+        prompt = GENERATION_TEMPLATE.render(
+            contract=contract,
+            gaps="\n".join(gap.describe() for gap in gaps),
+            path=gaps[0].file,
+            source=source_path.read_text(encoding="utf-8", errors="replace"),
+            examples=self._examples(contract)
+        )
+        try:
+            response = await self.client.complete(LLMRequest(
+                prompt=prompt,
+                system=SYSTEM_PROMPT,
+                max_tokens=self.token_budget.max_tokens("default", prompt, SYSTEM_PROMPT, self.model),
+                temperature=0.2,
+                model=self.model
+            ))
+        except Exception as e:
+            logger.error(f"❌ Génération des tests de {contract}: {e}")
+            return None
+
+        code = self._extract_code(response.text)
+        if not code:
+            return None
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"{contract}.coverage-{round_number}.test.js"
+        path.write_text(code + "\n", encoding="utf-8")
+
+        error = await self._syntax_error(path)
+        if error:
+            logger.warning(f"⚠️  Test généré invalide pour {contract}: {error}")
+            path.unlink()
+            return None
+        return path
+
+    def _examples(self, contract: str) -> str:
+        """Tests existants du contrat (ou à défaut le premier test du projet)"""
+        tests = [t for t in discover_tests(self.project_root, self.tests_dir) if GENERATED_DIR not in t.parts]
+        pattern = re.compile(rf"\b{re.escape(contract)}\b")
+        texts = [t.read_text(encoding="utf-8", errors="replace") for t in tests]
+        related = [text for text in texts if pattern.search(text)] or texts[:1]
+        return "\n\n".join(related)[:EXAMPLE_CHARS] or "(aucun)"
+
+    @staticmethod
+    def _extract_code(text: str) -> str:
+        fenced = _FENCE.search(text or "")
+        return (fenced.group(1) if fenced else text or "").strip()
+
+    async def _syntax_error(self, path: Path) -> Optional[str]:
+        """Vérification syntaxique rapide (node --check) avant la mesure de couverture"""
+        if not shutil.which("node"):
+            return None
+        process = await asyncio.create_subprocess_exec(
+            "node", "--check", str(path),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT
+        )
+        stdout, _ = await process.communicate()
+        return None if process.returncode == 0 else stdout.decode("utf-8", errors="replace")[-500:]
+
+    async def _measure_incremental(self, coverage: Dict[str, Any],
+                                   new_files: List[Path]) -> Tuple[Dict[str, Any], List[Path]]:
+        """
+        Exécute uniquement les nouveaux tests sous couverture (un shard par fichier)
+        et ajoute leurs compteurs au rapport existant
+
+        Returns:
+            (couverture fusionnée, fichiers conservés); les fichiers en échec sont supprimés
+        """
+        runner = TestRunner(self.project_root, tests_dir=self.tests_dir, shards=len(new_files),
+                            timeout=self.timeout, coverage=True, coverage_report=None)
+        await runner.run(changed=new_files)
+
+        passed = {shard.files[0] for shard in runner.results if shard.success and len(shard.files) == 1}
+        kept, reports = [], [coverage]
+        for path in new_files:
+            relative = str(path.resolve().relative_to(self.project_root.resolve()))
+            if relative not in passed:
+                logger.warning(f"⚠️  Tests générés en échec, supprimés: {relative}")
+                path.unlink(missing_ok=True)
+                continue
+            kept.append(path)
+            shard = next(s for s in runner.results if s.files == [relative])
+            if shard.coverage:
+                reports.append(shard.coverage)
+
+        merged = merge_coverage(reports)
+        self._save_coverage(merged)
+        return merged, kept
+
+
+@register_agent("test_generator", tasks=("generate",), inputs=("project_root", "changed"),
+                outputs=("generated", "rejected", "coverage_before", "coverage_after", "status"), cost="expensive",
+                description="Tests Hardhat générés par LLM sur les branches non couvertes")
+async def run(task: str, config: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+    """
+    Point d'entrée utilisé par l'orchestrateur (Web3PipelineOrchestrator.run_agent)
+
+    Args:
+        task: Tâche à exécuter ("generate")
+        config: Configuration de l'agent (provider, coverage_target, max_rounds, ...)
+        **kwargs: project_root, changed (fichiers modifiés)
+
+    Returns:
+        Résultat de la génération avec le statut "success" attendu par l'orchestrateur
+    """
+    config = config or {}
+
+    if task != "generate":
+        return {"success": False, "agent": "test_generator", "error": f"Tâche inconnue: {task}"}
+
+    if config.get("framework", "hardhat") != "hardhat":
+        return {"success": False, "agent": "test_generator",
+                "error": f"Framework non supporté: {config['framework']}"}
+
+    agent = TestGeneratorAgent(
+        Path(kwargs.get("project_root", Path(__file__).resolve().parent.parent.parent)),
+        ai_provider=kwargs.get("provider", config.get("provider", "openai")),
+        tests_dir=config.get("tests_dir", "tests"),
+        coverage_target=config.get("coverage_target", 80),
+        max_rounds=config.get("max_rounds", 2),
+        timeout=config.get("timeout", 900)
+    )
+    changed = kwargs.get("changed")
+    result = await agent.generate([Path(p) for p in changed] if changed is not None else None)
+
+    result["agent"] = "test_generator"
+    result["task"] = task
+    result["timestamp"] = datetime.now().isoformat()
+    result["success"] = result["status"] in ("success", "up_to_date")
+    return result
+
+
+# Interface CLI simplifiée
+def main():
+    """Point d'entrée pour l'agent"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Agent IA de génération de tests guidée par la couverture")
+    parser.add_argument("--provider", "-p", default="openai",
+                       choices=["openai", "anthropic", "google", "fake", "replay"],
+                       help="Provider IA à utiliser")
+    parser.add_argument("--target", "-t", type=float, default=80.0,
+                       help="Couverture des branches visée (%%)")
+    parser.add_argument("--rounds", type=int, default=2,
+                       help="Cycles génération → mesure au maximum")
+    parser.add_argument("changed", nargs="*",
+                       help="Fichiers .sol modifiés (par défaut: git diff HEAD)")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    print("🧪 Agent de Génération de Tests")
+    print("=" * 50)
+
+    result = asyncio.run(run(
+        "generate",
+        config={"provider": args.provider, "coverage_target": args.target, "max_rounds": args.rounds},
+        changed=args.changed or None
+    ))
+
+    if result.get("error"):
+        print(f"❌ Erreur: {result['error']}")
+        return 1
+    if result["status"] == "up_to_date":
+        print("✅ Aucun contrat modifié")
+        return 0
+
+    print(f"📊 Couverture des branches: {result['coverage_before']}% → {result['coverage_after']}% "
+          f"(objectif {result['coverage_target']}%)")
+    for path in result["generated"]:
+        print(f"   ✅ {path}")
+    for path in result["rejected"]:
+        print(f"   ❌ {path} (en échec, supprimé)")
+    return 0 if result["success"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,6 +21,12 @@ module.exports = {
       chainId: 1337
     }
   },
+  // Rapport JSON ingéré par la gate PERFORMANCE du pipeline (REPORT_GAS=true npx hardhat test)
+  gasReporter: {
+    enabled: process.env.REPORT_GAS === "true",
+    outputJSON: true,
+    outputJSONFile: "reports/gas/gas-reporter.json"
+  },
   paths: {
     sources: "./contracts",
     tests: "./tests",
@@ -0,0 +1,174 @@
+"""
+Checkpoints des exécutions du pipeline
+
+Chaque résultat d'agent ou de gate réussi est enregistré avec le hash de ses
+entrées dans cache/runs/<run_id>/. Une exécution reprise (--resume <run_id>)
+réutilise les étapes dont les entrées n'ont pas changé.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+from pipeline.models import encode
+
+logger = logging.getLogger(__name__)
+
+
+def hash_inputs(project_root: Path, patterns: Iterable[str], params: Optional[Dict[str, Any]] = None,
+                snapshot=None) -> str:
+    """
+    Calcule le hash des entrées d'une étape
+
+    Args:
+        project_root: Racine du projet
+        patterns: Chemins ou globs relatifs dont le contenu (ou l'absence) est pris en compte
+        params: Paramètres de l'étape (kwargs, configuration)
+        snapshot: Instantané du projet (pipeline.snapshot.ProjectSnapshot): index et
+            empreintes partagés avec les gates au lieu de relire les fichiers
+
+    Returns:
+        Empreinte SHA-256 hexadécimale
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode("utf-8"))
+
+    for pattern in sorted(patterns):
+        is_glob = any(c in pattern for c in "*?[")
+        if snapshot is not None:
+            matches = snapshot.glob(pattern) if is_glob else [pattern]
+        else:
+            matches = [str(path.relative_to(project_root)) for path in sorted(project_root.glob(pattern))] \
+                if is_glob else [pattern]
+
+        for relative in matches:
+            digest.update(pattern.encode("utf-8"))
+            digest.update(relative.encode("utf-8"))
+            if snapshot is not None:
+                if relative in snapshot:
+                    digest.update(bytes.fromhex(snapshot.digest(relative)))
+                else:
+                    digest.update(b"<dir>" if snapshot.is_dir(relative) else b"<absent>")
+                continue
+            path = project_root / relative
+            if path.is_file():
+                file_digest = hashlib.sha256()
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 16), b""):
+                        file_digest.update(chunk)
+                digest.update(file_digest.digest())
+            else:
+                digest.update(b"<dir>" if path.is_dir() else b"<absent>")
+
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """Stockage des checkpoints d'une exécution du pipeline"""
+
+    def __init__(self, project_root: Path, run_id: Optional[str] = None, resume: bool = False):
+        """
+        Args:
+            project_root: Racine du projet
+            run_id: Identifiant d'exécution (généré si absent)
+            resume: Reprendre une exécution existante (erreur si introuvable)
+        """
+        self.runs_dir = project_root / "cache" / "runs"
+        self.run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self.run_dir = self.runs_dir / self.run_id
+        self.steps_dir = self.run_dir / "steps"
+        self.resumed = resume
+        self.reused_steps: List[str] = []
+
+        if resume and not self.run_dir.exists():
+            raise FileNotFoundError(f"Exécution introuvable: {self.run_id}")
+
+        self.steps_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest = self._read_json(self.run_dir / "manifest.json") or {
+            "run_id": self.run_id,
+            "created": datetime.now().isoformat(),
+            "phases": {}
+        }
+        self.manifest["updated"] = datetime.now().isoformat()
+        self._write_json(self.run_dir / "manifest.json", self.manifest)
+
+    @staticmethod
+    def step_key(kind: str, target: str, task: Optional[str] = None,
+                 params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Clé stable d'une étape (ex: gate.security, agent.contract_generator.generate.3f9a1c2b0d4e)
+
+        `params` distingue les appels d'une même tâche sur des artefacts
+        différents (une spec, un contrat): chacun a son propre checkpoint au
+        lieu d'écraser celui du précédent.
+        """
+        key = ".".join(part for part in (kind, target, task) if part)
+        if params:
+            encoded = json.dumps(params, sort_keys=True, default=str).encode("utf-8")
+            key += "." + hashlib.sha256(encoded).hexdigest()[:12]
+        return key
+
+    def lookup(self, step_key: str, input_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Retourne le résultat enregistré si les entrées sont inchangées
+
+        Args:
+            step_key: Clé de l'étape
+            input_hash: Hash des entrées courantes
+
+        Returns:
+            Résultat de l'étape ou None s'il faut la réexécuter
+        """
+        checkpoint = self._read_json(self.steps_dir / f"{step_key}.json")
+        if checkpoint is None or checkpoint.get("input_hash") != input_hash:
+            return None
+
+        self.reused_steps.append(step_key)
+        logger.info(f"♻️  Étape reprise depuis le checkpoint: {step_key}")
+        return checkpoint["result"]
+
+    def record(self, step_key: str, input_hash: str, result: Dict[str, Any]):
+        """Enregistre le résultat d'une étape terminée"""
+        self._write_json(self.steps_dir / f"{step_key}.json", {
+            "step": step_key,
+            "input_hash": input_hash,
+            "completed": datetime.now().isoformat(),
+            "result": result
+        })
+
+    def mark_phase(self, phase: str, success: bool):
+        """Enregistre l'issue d'une phase dans le manifeste"""
+        self.manifest["phases"][phase] = {
+            "success": success,
+            "completed": datetime.now().isoformat()
+        }
+        self.manifest["updated"] = datetime.now().isoformat()
+        self._write_json(self.run_dir / "manifest.json", self.manifest)
+
+    def prune(self, keep: int):
+        """Supprime les exécutions les plus anciennes au-delà de `keep`"""
+        runs = sorted((d for d in self.runs_dir.iterdir() if d.is_dir()), key=lambda d: d.stat().st_mtime)
+        for run_dir in runs[:-keep] if keep > 0 else []:
+            if run_dir != self.run_dir:
+                shutil.rmtree(run_dir, ignore_errors=True)
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _write_json(path: Path, data: Dict[str, Any]):
+        # Écriture atomique: un arrêt brutal ne laisse jamais de checkpoint tronqué
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, default=encode)
+        os.replace(tmp_path, path)
@@ -0,0 +1,516 @@
+"""
+Configuration typée du pipeline
+
+Le fichier de configuration (config/pipeline_config.yaml, .yml ou .json, ou
+le chemin donné par --config / PIPELINE_CONFIG) est fusionné avec les valeurs
+par défaut, surchargé par les variables d'environnement PIPELINE__SECTION__CLE
+puis validé une seule fois en dataclasses figées à slots. Le résultat est mis
+en cache (mémoire et cache/config/) sous la clé (chemin, taille, date de
+modification, surcharges): tant que le fichier est inchangé, ni lecture YAML
+ni validation ne sont refaites.
+
+Les sections d'agents du YAML d'architecture (smart_contract_security, ...)
+sont reconnues: leurs alias pointent vers les agents de l'orchestrateur.
+"""
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import pickle
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Mapping, Optional, Tuple, Union, get_args, get_origin, get_type_hints
+
+logger = logging.getLogger(__name__)
+
+CONFIG_DIR = Path("config")
+# Configuration de référence livrée avec la documentation d'architecture
+ARCHITECTURE_CONFIG_FILE = Path("Architecture") / "CONFIGURATION DU PIPELINE COMPLET.yaml"
+# Ordre de recherche (relatif au projet) quand aucun chemin n'est imposé
+CONFIG_FILES = tuple(CONFIG_DIR / name for name in ("pipeline_config.yaml", "pipeline_config.yml",
+                                                    "pipeline_config.json")) + (ARCHITECTURE_CONFIG_FILE,)
+DEFAULT_CONFIG_FILE = CONFIG_DIR / "pipeline_config.json"
+CONFIG_ENV = "PIPELINE_CONFIG"
+# PIPELINE__TESTS__SHARDS=4, PIPELINE__AGENTS__SECURITY_AUDITOR__ENABLED=false
+ENV_PREFIX = "PIPELINE__"
+DEFAULT_CACHE_DIR = Path("cache") / "config"
+# Incrémenté à chaque changement du modèle pour invalider les caches compilés
+SCHEMA_VERSION = 3
+
+# Noms d'agents du YAML d'architecture -> agents de l'orchestrateur
+AGENT_ALIASES = {
+    "smart_contract_security": "security_auditor",
+}
+
+
+class ConfigError(ValueError):
+    """Configuration illisible ou invalide (toutes les erreurs sont listées)"""
+
+    def __init__(self, source: str, errors: List[str]):
+        self.source = source
+        self.errors = errors
+        super().__init__(f"Configuration invalide ({source}): " + "; ".join(errors))
+
+
+@dataclass(frozen=True, slots=True)
+class PipelineSettings:
+    name: str = "Web3 AI Pipeline"
+    version: str = "1.0.0"
+    auto_start: bool = False
+    watch_mode: bool = True
+    max_concurrent_agents: int = 3
+    # Contrats à générer par `--mode run` (requirements, contract_type), network, include_existing
+    run: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True, slots=True)
+class AgentConfig:
+    """Activation d'un agent et options transmises à son point d'entrée run()"""
+    enabled: bool = False
+    options: Dict[str, Any] = field(default_factory=dict)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.options.get(key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Configuration passée à l'agent (copie: l'agent peut la modifier)"""
+        return {"enabled": self.enabled, **json.loads(json.dumps(self.options))}
+
+
+def default_agents() -> Dict[str, AgentConfig]:
+    return {
+        "contract_generator": AgentConfig(True, {
+            "provider": "openai",
+            "fallback_provider": None,
+            "hedge_after_s": 8.0,
+            "auto_save": True,
+            "validate_after_generate": True,
+            "max_fix_iterations": 3
+        }),
+        "security_auditor": AgentConfig(True, {
+            "tools": ["slither", "mythril"],
+            "auto_fix": False,
+            "max_parallel": 0,
+            "execution_timeout": 600,
+            "fail_on": "high",
+            "cache": True,
+            "budgets": {"slither": 120, "mythril": 300},
+            "gate_budget": 600,
+            "deep_mode": True
+        }),
+        "test_generator": AgentConfig(True, {
+            "framework": "hardhat",
+            "provider": "openai",
+            "coverage_target": 80,
+            "max_rounds": 2
+        }),
+        "deployment_manager": AgentConfig(True, {
+            "networks": ["hardhat", "sepolia"],
+            "auto_verify": True
+        })
+    }
+
+
+@dataclass(frozen=True, slots=True)
+class SecretsConfig:
+    # Motifs .gitignore exclus de la recherche (None: sorties générées)
+    exclude: Optional[List[str]] = None
+    max_file_size_mb: float = 64
+    fail_on: str = "high"
+    # Constats de sévérité inférieure ni rapportés ni comptés
+    min_severity: str = "info"
+
+
+@dataclass(frozen=True, slots=True)
+class GateConfig:
+    name: str
+    required: bool = False
+
+
+def default_gates() -> List[GateConfig]:
+    return [
+        GateConfig("requirements", True),
+        GateConfig("architecture", True),
+        GateConfig("security", True),
+        GateConfig("code_quality", False),
+        GateConfig("performance", False),
+        GateConfig("tests", False)
+    ]
+
+
+@dataclass(frozen=True, slots=True)
+class ValidationConfig:
+    gates: List[GateConfig] = field(default_factory=default_gates)
+    strict_mode: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class MonitoringConfig:
+    enabled: bool = True
+    metrics_interval: int = 60
+    alert_channels: List[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True, slots=True)
+class CheckpointConfig:
+    enabled: bool = True
+    keep_runs: int = 20
+
+
+@dataclass(frozen=True, slots=True)
+class DistributedConfig:
+    lease_seconds: float = 30
+    max_attempts: int = 3
+    poll_interval: float = 0.5
+    job_timeout: Optional[float] = 1800
+
+
+@dataclass(frozen=True, slots=True)
+class PerformanceConfig:
+    backend: str = "auto"
+    rpc_url: str = "http://127.0.0.1:8545"
+    chain_id: Optional[int] = None
+    spawn_node: bool = True
+    scenarios: str = "benchmarks/gas/scenarios.json"
+    history: str = "reports/gas/history.jsonl"
+    max_records: int = 200
+    gas_reporter_output: str = "reports/gas/gas-reporter.json"
+    threshold_pct: float = 5.0
+
+
+@dataclass(frozen=True, slots=True)
+class TestsConfig:
+    dir: str = "tests"
+    shards: int = 0
+    timeout: float = 900
+    coverage: bool = False
+    min_coverage: Optional[float] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ReportsConfig:
+    # json (document compact), jsonl ou binary (pipeline.report_codec)
+    format: str = "json"
+    # gzip ou zstd (paquet zstandard)
+    compression: Optional[str] = None
+    level: Optional[int] = None
+
+
+@dataclass(frozen=True, slots=True)
+class PipelineConfig:
+    pipeline: PipelineSettings = field(default_factory=PipelineSettings)
+    agents: Dict[str, AgentConfig] = field(default_factory=default_agents)
+    secrets: SecretsConfig = field(default_factory=SecretsConfig)
+    validation: ValidationConfig = field(default_factory=ValidationConfig)
+    monitoring: MonitoringConfig = field(default_factory=MonitoringConfig)
+    checkpoints: CheckpointConfig = field(default_factory=CheckpointConfig)
+    distributed: DistributedConfig = field(default_factory=DistributedConfig)
+    performance: PerformanceConfig = field(default_factory=PerformanceConfig)
+    tests: TestsConfig = field(default_factory=TestsConfig)
+    reports: ReportsConfig = field(default_factory=ReportsConfig)
+    # Fichier d'origine (None: valeurs par défaut)
+    source: Optional[str] = field(default=None, compare=False)
+
+    def agent(self, name: str) -> Optional[AgentConfig]:
+        """Configuration d'un agent activé, None s'il est absent ou désactivé"""
+        agent = self.agents.get(name)
+        return agent if agent is not None and agent.enabled else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Forme sérialisable (même structure que pipeline_config.json)"""
+        data = {}
+        for item in dataclasses.fields(self):
+            if item.name == "source":
+                continue
+            value = getattr(self, item.name)
+            if item.name == "agents":
+                data["agents"] = {name: agent.to_dict() for name, agent in value.items()}
+            else:
+                data[item.name] = dataclasses.asdict(value)
+        return data
+
+
+def _coerce(value: Any, hint: Any, path: str, errors: List[str]) -> Any:
+    """Valide `value` contre l'annotation `hint` (conversions sans perte uniquement)"""
+    if hint is Any:
+        return value
+    origin = get_origin(hint)
+    if origin is Union:
+        if value is None:
+            return None
+        (inner,) = [arg for arg in get_args(hint) if arg is not type(None)]
+        return _coerce(value, inner, path, errors)
+    if hint is AgentConfig:
+        return _build_agent(value, path, errors)
+    if dataclasses.is_dataclass(hint):
+        if not isinstance(value, dict):
+            errors.append(f"{path}: section attendue, reçu {type(value).__name__}")
+            return None
+        return _build(hint, value, path, errors)
+    if origin is list:
+        if not isinstance(value, list):
+            errors.append(f"{path}: liste attendue, reçu {type(value).__name__}")
+            return []
+        (item,) = get_args(hint)
+        return [_coerce(v, item, f"{path}[{i}]", errors) for i, v in enumerate(value)]
+    if origin is dict:
+        if not isinstance(value, dict):
+            errors.append(f"{path}: objet attendu, reçu {type(value).__name__}")
+            return {}
+        _, item = get_args(hint)
+        return {str(k): _coerce(v, item, f"{path}.{k}", errors) for k, v in value.items()}
+    if hint is bool:
+        if not isinstance(value, bool):
+            errors.append(f"{path}: booléen attendu, reçu {value!r}")
+        return value
+    if hint is int:
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if not isinstance(value, int) or isinstance(value, bool):
+            errors.append(f"{path}: entier attendu, reçu {value!r}")
+        return value
+    if hint is float:
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            errors.append(f"{path}: nombre attendu, reçu {value!r}")
+            return value
+        return float(value)
+    if hint is str:
+        # YAML lit `version: 1.0` comme un nombre
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        if not isinstance(value, str):
+            errors.append(f"{path}: texte attendu, reçu {value!r}")
+        return value
+    return value
+
+
+def _build(cls, data: Dict[str, Any], path: str, errors: List[str]):
+    hints = get_type_hints(cls)
+    names = {item.name for item in dataclasses.fields(cls)}
+    for key in data:
+        if key not in names:
+            logger.warning(f"⚠️  Clé de configuration inconnue ignorée: {path}.{key}")
+    kwargs = {}
+    for item in dataclasses.fields(cls):
+        if item.name in data:
+            kwargs[item.name] = _coerce(data[item.name], hints[item.name], f"{path}.{item.name}", errors)
+        elif item.default is dataclasses.MISSING and item.default_factory is dataclasses.MISSING:
+            errors.append(f"{path}.{item.name}: valeur requise")
+    try:
+        return cls(**kwargs)
+    except TypeError as e:
+        errors.append(f"{path}: {e}")
+        return None
+
+
+def _build_agent(value: Any, path: str, errors: List[str]) -> AgentConfig:
+    # `agent: false` ou `agent: true` sans options
+    if isinstance(value, bool):
+        return AgentConfig(value)
+    if not isinstance(value, dict):
+        errors.append(f"{path}: section attendue, reçu {type(value).__name__}")
+        return AgentConfig()
+    options = dict(value)
+    enabled = options.pop("enabled", False)
+    if not isinstance(enabled, bool):
+        errors.append(f"{path}.enabled: booléen attendu, reçu {enabled!r}")
+    return AgentConfig(bool(enabled), options)
+
+
+def merge(base: Dict[str, Any], overlay: Mapping[str, Any]) -> Dict[str, Any]:
+    """Fusion récursive: les objets sont fusionnés, les autres valeurs remplacées"""
+    merged = dict(base)
+    for key, value in overlay.items():
+        if isinstance(value, Mapping) and isinstance(merged.get(key), dict):
+            merged[key] = merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def env_overlays(environ: Mapping[str, str]) -> List[Tuple[Tuple[str, ...], Any]]:
+    """Surcharges PIPELINE__A__B=valeur (valeur JSON, texte brut à défaut), triées"""
+    overlays = []
+    for name, raw in environ.items():
+        if not name.startswith(ENV_PREFIX):
+            continue
+        keys = tuple(part.lower() for part in name[len(ENV_PREFIX):].split("__") if part)
+        if not keys:
+            continue
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        overlays.append((keys, value))
+    return sorted(overlays, key=lambda overlay: overlay[0])
+
+
+def _normalize(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Alias d'agents (YAML d'architecture) et emplacement historique de `secrets`"""
+    agents = data.get("agents")
+    if isinstance(agents, dict):
+        agents = dict(agents)
+        if isinstance(agents.get("secrets"), dict) and "secrets" not in data:
+            data = {**data, "secrets": agents["secrets"]}
+        agents.pop("secrets", None)
+        for alias, name in AGENT_ALIASES.items():
+            if isinstance(agents.get(alias), dict):
+                section = agents.pop(alias)
+                agents[name] = merge(section, agents.get(name, {})) if isinstance(agents.get(name), dict) else section
+        data = {**data, "agents": agents}
+    return data
+
+
+def read_config_file(path: Path) -> Dict[str, Any]:
+    """
+    Contenu brut d'un fichier JSON ou YAML
+
+    Raises:
+        ConfigError: Fichier illisible, syntaxe invalide ou PyYAML absent
+    """
+    try:
+        text = Path(path).read_text(encoding="utf-8")
+    except OSError as e:
+        raise ConfigError(str(path), [str(e)])
+
+    if Path(path).suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ConfigError(str(path), ["PyYAML requis pour lire la configuration YAML (pip install pyyaml)"])
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ConfigError(str(path), [f"YAML invalide: {e}"])
+    else:
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise ConfigError(str(path), [f"JSON invalide: {e}"])
+
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise ConfigError(str(path), ["la racine doit être un objet"])
+    return data
+
+
+def find_config_file(project_root: Path, path: Optional[Path] = None,
+                     environ: Optional[Mapping[str, str]] = None) -> Optional[Path]:
+    """
+    Fichier à charger: `path`, puis $PIPELINE_CONFIG, puis
+    config/pipeline_config.{yaml,yml,json}, puis Architecture/CONFIGURATION DU PIPELINE COMPLET.yaml
+    """
+    environ = os.environ if environ is None else environ
+    explicit = path or environ.get(CONFIG_ENV)
+    if explicit:
+        explicit = Path(explicit)
+        return explicit if explicit.is_absolute() else Path(project_root) / explicit
+    for name in CONFIG_FILES:
+        candidate = Path(project_root) / name
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def _check_reports(reports: ReportsConfig, errors: List[str]):
+    from pipeline.report_codec import COMPRESSIONS, FORMATS
+
+    if reports.format not in FORMATS:
+        errors.append(f"config.reports.format: {reports.format!r} inconnu (choix: {', '.join(FORMATS)})")
+    if reports.compression is not None and reports.compression not in COMPRESSIONS:
+        errors.append(f"config.reports.compression: {reports.compression!r} inconnue "
+                      f"(choix: {', '.join(COMPRESSIONS)})")
+
+
+def validate(data: Dict[str, Any], source: Optional[str] = None) -> PipelineConfig:
+    """
+    Fusionne `data` avec les valeurs par défaut et construit la configuration typée
+
+    Raises:
+        ConfigError: Valeurs de type incorrect (toutes listées)
+    """
+    errors: List[str] = []
+    merged = merge(PipelineConfig().to_dict(), _normalize(data))
+    config = _build(PipelineConfig, merged, "config", errors)
+    if not errors:
+        _check_reports(config.reports, errors)
+    if errors:
+        raise ConfigError(source or "<défaut>", errors)
+    return dataclasses.replace(config, source=source)
+
+
+# Configurations compilées du processus: chemin -> (clé, configuration)
+_MEMO: Dict[str, Tuple[tuple, PipelineConfig]] = {}
+
+
+def load_config(project_root: Path, path: Optional[Path] = None,
+                environ: Optional[Mapping[str, str]] = None,
+                cache_dir: Optional[Path] = DEFAULT_CACHE_DIR) -> PipelineConfig:
+    """
+    Charge, surcharge et valide la configuration (compilée en cache tant que rien ne change)
+
+    Args:
+        project_root: Racine du projet
+        path: Fichier imposé (sinon $PIPELINE_CONFIG, config/pipeline_config.* puis Architecture/, voir find_config_file)
+        environ: Variables d'environnement (surcharges PIPELINE__...)
+        cache_dir: Cache disque des configurations validées (relatif à la racine), None pour le désactiver
+
+    Raises:
+        ConfigError: Fichier imposé introuvable ou configuration invalide
+    """
+    project_root = Path(project_root)
+    environ = os.environ if environ is None else environ
+    config_path = find_config_file(project_root, path, environ)
+    overlays = env_overlays(environ)
+
+    if config_path is not None:
+        try:
+            stat = config_path.stat()
+        except OSError:
+            raise ConfigError(str(config_path), ["fichier introuvable"])
+        signature = (str(config_path.resolve()), stat.st_size, stat.st_mtime_ns)
+    else:
+        signature = (None, 0, 0)
+    key = (SCHEMA_VERSION, signature, json.dumps(overlays, sort_keys=True, default=str))
+
+    memo_key = str(project_root.resolve())
+    memo = _MEMO.get(memo_key)
+    if memo is not None and memo[0] == key:
+        return memo[1]
+
+    cache_path = None
+    if cache_dir is not None:
+        digest = hashlib.sha1(memo_key.encode("utf-8")).hexdigest()[:12]
+        cache_path = project_root / cache_dir / f"pipeline-{digest}.pickle"
+        try:
+            with open(cache_path, "rb") as f:
+                cached_key, config = pickle.load(f)
+            if cached_key == key:
+                _MEMO[memo_key] = (key, config)
+                return config
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError, TypeError):
+            pass
+
+    data = read_config_file(config_path) if config_path is not None else {}
+    for keys, value in overlays:
+        overlay: Dict[str, Any] = {keys[-1]: value}
+        for part in reversed(keys[:-1]):
+            overlay = {part: overlay}
+        data = merge(data, overlay)
+    config = validate(data, str(config_path) if config_path is not None else None)
+    if overlays:
+        logger.info(f"⚙️  {len(overlays)} surcharge(s) de configuration par l'environnement")
+
+    _MEMO[memo_key] = (key, config)
+    if cache_path is not None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump((key, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, cache_path)
+        except OSError as e:
+            logger.debug(f"Cache de configuration non écrit: {e}")
+    return config
@@ -0,0 +1,208 @@
+"""
+Exécution en flux (streaming DAG) des étapes du pipeline
+
+Chaque étape consomme les artefacts de ses étapes amont dès qu'ils sont
+produits (pas de barrière entre phases): un contrat généré est validé
+pendant que les suivants sont encore en cours de génération.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, AsyncIterator, Awaitable
+
+logger = logging.getLogger(__name__)
+
+# Marqueur de fin de flux propagé aux étapes aval
+_END = object()
+
+
+@dataclass
+class Artifact:
+    """Artefact circulant entre les étapes (contrat, rapport, déploiement...)"""
+    kind: str
+    name: str
+    path: Optional[Path] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+# Une source produit des artefacts; un handler transforme un artefact en 0..n artefacts
+SourceFn = Callable[[], AsyncIterator[Artifact]]
+HandlerFn = Callable[[Artifact], AsyncIterator[Artifact]]
+
+
+@dataclass
+class Stage:
+    """Étape du DAG"""
+    name: str
+    handler: Optional[HandlerFn] = None
+    source: Optional[SourceFn] = None
+    upstream: List[str] = field(default_factory=list)
+    concurrency: int = 1
+    queue_size: int = 16
+
+
+@dataclass
+class StageStats:
+    """Statistiques d'exécution d'une étape"""
+    processed: int = 0
+    produced: int = 0
+    errors: List[str] = field(default_factory=list)
+    first_output_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+class StreamingDAG:
+    """Graphe d'étapes connectées par des files bornées"""
+
+    def __init__(self):
+        self.stages: Dict[str, Stage] = {}
+        self.stats: Dict[str, StageStats] = {}
+        self.outputs: Dict[str, List[Artifact]] = {}
+
+    def add_source(self, name: str, source: SourceFn) -> "StreamingDAG":
+        """Ajoute une étape source (sans amont)"""
+        self.stages[name] = Stage(name=name, source=source)
+        return self
+
+    def add_stage(self, name: str, handler: HandlerFn, upstream: List[str],
+                  concurrency: int = 1, queue_size: int = 16) -> "StreamingDAG":
+        """
+        Ajoute une étape de traitement
+
+        Args:
+            name: Nom de l'étape
+            handler: Générateur asynchrone artefact -> artefacts produits
+            upstream: Étapes dont les sorties alimentent celle-ci
+            concurrency: Nombre d'artefacts traités simultanément
+            queue_size: Taille de la file d'entrée (contre-pression)
+        """
+        missing = [u for u in upstream if u not in self.stages]
+        if missing:
+            raise ValueError(f"Étapes amont inconnues pour {name}: {missing}")
+
+        self.stages[name] = Stage(name=name, handler=handler, upstream=upstream,
+                                  concurrency=concurrency, queue_size=queue_size)
+        return self
+
+    async def run(self) -> Dict[str, List[Artifact]]:
+        """
+        Exécute le DAG jusqu'à épuisement des sources
+
+        Returns:
+            Artefacts produits par étape
+        """
+        queues = {name: asyncio.Queue(maxsize=stage.queue_size)
+                  for name, stage in self.stages.items() if stage.handler}
+        downstream: Dict[str, List[str]] = {name: [] for name in self.stages}
+        for name, stage in self.stages.items():
+            for up in stage.upstream:
+                downstream[up].append(name)
+
+        # Nombre de fins de flux attendues par étape (une par amont)
+        pending_ends = {name: len(stage.upstream) for name, stage in self.stages.items()}
+        self.stats = {name: StageStats() for name in self.stages}
+        self.outputs = {name: [] for name in self.stages}
+        started = time.perf_counter()
+
+        async def emit(stage_name: str, artifact: Artifact):
+            stats = self.stats[stage_name]
+            stats.produced += 1
+            if stats.first_output_at is None:
+                stats.first_output_at = time.perf_counter() - started
+            self.outputs[stage_name].append(artifact)
+            for target in downstream[stage_name]:
+                await queues[target].put(artifact)
+
+        async def close(stage_name: str):
+            self.stats[stage_name].finished_at = time.perf_counter() - started
+            for target in downstream[stage_name]:
+                await queues[target].put(_END)
+
+        async def run_source(stage: Stage):
+            try:
+                async for artifact in stage.source():
+                    await emit(stage.name, artifact)
+            except Exception as e:
+                logger.error(f"❌ Source {stage.name}: {e}")
+                self.stats[stage.name].errors.append(str(e))
+            finally:
+                await close(stage.name)
+
+        async def run_worker(stage: Stage, state: Dict[str, int]):
+            queue = queues[stage.name]
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    if state["done"]:
+                        return
+                    state["ends"] += 1
+                    if state["ends"] >= pending_ends[stage.name]:
+                        # Tous les amonts sont terminés: réveiller les autres workers
+                        state["done"] = True
+                        for _ in range(stage.concurrency - 1):
+                            await queue.put(_END)
+                        return
+                    continue
+
+                self.stats[stage.name].processed += 1
+                try:
+                    async for produced in stage.handler(item):
+                        await emit(stage.name, produced)
+                except Exception as e:
+                    logger.error(f"❌ Étape {stage.name} ({item.name}): {e}")
+                    self.stats[stage.name].errors.append(f"{item.name}: {e}")
+
+        async def run_stage(stage: Stage):
+            # Les workers partagent un compteur: la dernière fin d'amont termine l'étape
+            state = {"ends": 0, "done": False}
+            if pending_ends[stage.name] == 0:
+                await close(stage.name)
+                return
+            workers = [asyncio.create_task(run_worker(stage, state)) for _ in range(stage.concurrency)]
+            await asyncio.gather(*workers)
+            await close(stage.name)
+
+        tasks = []
+        for stage in self.stages.values():
+            if stage.source:
+                tasks.append(asyncio.create_task(run_source(stage)))
+            else:
+                tasks.append(asyncio.create_task(run_stage(stage)))
+
+        await asyncio.gather(*tasks)
+        return self.outputs
+
+
+class SharedStep:
+    """
+    Étape globale (ex: gate projet) exécutée une seule fois et partagée par tous les artefacts
+
+    Avec `after`, l'étape ne démarre qu'une fois l'événement déclenché (par
+    exemple quand tous les contrats générés sont écrits), même si un artefact
+    la demande plus tôt.
+    """
+
+    def __init__(self, factory: Callable[[], Awaitable[Any]], after: Optional[asyncio.Event] = None):
+        self._factory = factory
+        self._after = after
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> Any:
+        if self._after is not None:
+            await self._after.wait()
+        return await self._factory()
+
+    async def get(self) -> Any:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        return await asyncio.shield(self._task)
+
+    def result(self) -> Optional[Any]:
+        """Résultat de l'étape si elle a été exécutée avec succès, sinon None"""
+        if self._task is None or not self._task.done() or self._task.cancelled():
+            return None
+        if self._task.exception() is not None:
+            return None
+        return self._task.result()
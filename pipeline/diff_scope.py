@@ -0,0 +1,226 @@
+"""
+Périmètre incrémental d'une validation (mode --since)
+
+Calcule, avec git seul, les fichiers et plages de lignes modifiés depuis une
+référence (point de divergence avec la branche cible): `git diff --unified=0`
+pour les fichiers suivis, `git ls-files --others` pour les nouveaux fichiers
+(considérés modifiés en entier). Les gates limitent leur analyse à ce
+périmètre; les résultats des fichiers inchangés sont repris du cache et
+marqués comme réutilisés.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULTS_DIR = Path("cache") / "incremental"
+
+# En-tête de hunk: @@ -a[,b] +c[,d] @@
+_HUNK = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+@dataclass
+class DiffScope:
+    """Fichiers modifiés (chemins relatifs à la racine du projet) et leurs plages de lignes"""
+    ref: str
+    base: str
+    # Plages (début, fin) incluses, 1-indexées; None = fichier entier (nouveau fichier)
+    files: Dict[str, Optional[List[Tuple[int, int]]]] = field(default_factory=dict)
+    deleted: List[str] = field(default_factory=list)
+
+    def contains(self, relative: str) -> bool:
+        """Le fichier a-t-il changé depuis la référence"""
+        return relative in self.files
+
+    def touches(self, relative: str, start: Optional[int], end: Optional[int] = None) -> bool:
+        """
+        Les lignes [start, end] recoupent-elles une plage modifiée
+
+        Sans numéro de ligne, seule l'appartenance du fichier au périmètre compte.
+        """
+        if relative not in self.files:
+            return False
+        ranges = self.files[relative]
+        if ranges is None or start is None:
+            return True
+        end = start if end is None else end
+        return any(first <= end and start <= last for first, last in ranges)
+
+    def paths(self, project_root: Path) -> List[Path]:
+        """Chemins absolus des fichiers modifiés ou supprimés"""
+        return [Path(project_root) / relative for relative in [*self.files, *self.deleted]]
+
+    @property
+    def lines_changed(self) -> Optional[int]:
+        """Nombre de lignes ajoutées ou modifiées (None si un fichier est nouveau)"""
+        if any(ranges is None for ranges in self.files.values()):
+            return None
+        return sum(last - first + 1 for ranges in self.files.values() for first, last in ranges)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ref": self.ref,
+            "base": self.base,
+            "files": len(self.files),
+            "deleted": len(self.deleted),
+            "lines_changed": self.lines_changed
+        }
+
+
+async def _git(project_root: Path, *args: str) -> Optional[str]:
+    """Sortie d'une commande git, None en cas d'échec"""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "git", "-c", "core.quotepath=off", *args,
+            cwd=project_root,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout, _ = await asyncio.wait_for(process.communicate(), timeout=60)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    if process.returncode != 0:
+        return None
+    return stdout.decode("utf-8", errors="replace")
+
+
+def _unquote(path: str) -> str:
+    """Chemin d'un en-tête de diff (guillemets ajoutés par git autour des caractères spéciaux)"""
+    if len(path) >= 2 and path[0] == path[-1] == '"':
+        # Séquences octales des octets UTF-8: décodées en latin-1 puis réinterprétées
+        return path[1:-1].encode("utf-8").decode("unicode_escape").encode("latin-1").decode("utf-8", errors="replace")
+    return path
+
+
+def parse_unified_diff(output: str) -> Tuple[Dict[str, List[Tuple[int, int]]], List[str]]:
+    """
+    Plages de lignes ajoutées ou modifiées par fichier d'un `git diff --unified=0`
+
+    Une suppression pure est rattachée aux lignes qui l'entourent.
+
+    Returns:
+        (plages par fichier, fichiers supprimés)
+    """
+    files: Dict[str, List[Tuple[int, int]]] = {}
+    deleted: List[str] = []
+    old_path: Optional[str] = None
+    current: Optional[str] = None
+    # Les lignes ---/+++ ne sont des en-têtes qu'entre "diff --git" et le premier hunk
+    in_header = False
+
+    for line in output.splitlines():
+        if line.startswith("diff --git "):
+            in_header, old_path, current = True, None, None
+        elif in_header and line.startswith("--- "):
+            old_path = _unquote(line[4:])
+        elif in_header and line.startswith("+++ "):
+            new_path = _unquote(line[4:])
+            if new_path == "/dev/null":
+                if old_path and old_path.startswith("a/"):
+                    deleted.append(old_path[2:])
+                current = None
+            else:
+                current = new_path[2:] if new_path.startswith("b/") else new_path
+                files.setdefault(current, [])
+        elif line.startswith("@@"):
+            in_header = False
+            if current is None:
+                continue
+            match = _HUNK.match(line)
+            if not match:
+                continue
+            start = int(match.group(1))
+            count = int(match.group(2)) if match.group(2) is not None else 1
+            if count == 0:
+                # Lignes supprimées après `start`: les voisines sont concernées
+                files[current].append((max(1, start), start + 1))
+            else:
+                files[current].append((start, start + count - 1))
+
+    return files, deleted
+
+
+async def compute_diff_scope(project_root: Path, ref: str) -> DiffScope:
+    """
+    Périmètre des changements depuis `ref` (arbre de travail compris)
+
+    La comparaison part du point de divergence entre `ref` et HEAD: une
+    pull request n'est comparée qu'à ce qu'elle modifie, pas aux commits
+    ajoutés depuis sur la branche cible.
+
+    Raises:
+        ValueError: Référence inconnue ou projet hors d'un dépôt git
+    """
+    project_root = Path(project_root)
+    if await _git(project_root, "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}") is None:
+        raise ValueError(f"Référence git inconnue: {ref}")
+
+    merge_base = await _git(project_root, "merge-base", ref, "HEAD")
+    base = merge_base.strip() if merge_base else ref
+
+    diff = await _git(project_root, "diff", "--unified=0", "--no-color", "--no-ext-diff", "--no-renames",
+                      "--relative", "--src-prefix=a/", "--dst-prefix=b/", base)
+    if diff is None:
+        raise ValueError(f"git diff impossible depuis {ref}")
+    ranges, deleted = parse_unified_diff(diff)
+    files: Dict[str, Optional[List[Tuple[int, int]]]] = dict(ranges)
+
+    untracked = await _git(project_root, "ls-files", "--others", "--exclude-standard")
+    for line in (untracked or "").splitlines():
+        if line.strip():
+            files[_unquote(line.strip())] = None
+
+    scope = DiffScope(ref=ref, base=base, files=files, deleted=deleted)
+    logger.info(f"🔀 Périmètre depuis {ref} ({base[:10]}): {len(files)} fichier(s) modifié(s), "
+                f"{len(deleted)} supprimé(s)")
+    return scope
+
+
+class FileResultCache:
+    """Résultats d'une gate par fichier, valides tant que le fichier est inchangé (taille, date)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: Dict[str, Any] = {}
+        self.dirty = False
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self.entries = {}
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[List[int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def lookup(self, relative: str, path: Path, signature: Optional[List[int]] = None) -> Optional[Any]:
+        """Résultat enregistré pour ce fichier, None s'il a changé depuis (signature: [taille, date] connue)"""
+        entry = self.entries.get(relative)
+        if entry is None or entry.get("signature") != (signature or self._signature(path)):
+            return None
+        return entry.get("result")
+
+    def store(self, relative: str, path: Path, result: Any, signature: Optional[List[int]] = None):
+        signature = signature or self._signature(path)
+        if signature is not None:
+            self.entries[relative] = {"signature": signature, "result": result}
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.entries, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self.dirty = False
@@ -0,0 +1,491 @@
+"""
+Exécution distribuée des portes de validation et des agents
+
+Le broker répartit des jobs (gate ou agent) entre des workers situés sur
+plusieurs nœuds. Chaque job est loué (lease) par un worker qui doit envoyer
+des heartbeats ; un bail expiré remet le job en file (retry sur perte de worker).
+
+Implémentations:
+    - SQLiteBroker: broker local (fichier SQLite), idéal pour les tests et un seul nœud
+    - SocketBroker: client TCP vers un BrokerServer (nœuds distants)
+
+Les brokers sont synchrones (verrou, socket ou SQLite bloquants): depuis la
+boucle asyncio, leurs appels passent par asyncio.to_thread.
+"""
+import asyncio
+import json
+import logging
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+
+from pipeline.models import encode
+
+logger = logging.getLogger(__name__)
+
+
+class JobKind:
+    """Types de jobs distribuables"""
+    GATE = "gate"
+    AGENT = "agent"
+
+
+class JobState:
+    """États d'un job dans le broker"""
+    PENDING = "pending"
+    LEASED = "leased"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """Job distribué (porte de validation ou exécution d'agent)"""
+    job_id: str
+    kind: str
+    target: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "target": self.target,
+            "payload": self.payload,
+            "attempts": self.attempts
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        return cls(
+            job_id=data["job_id"],
+            kind=data["kind"],
+            target=data["target"],
+            payload=data.get("payload", {}),
+            attempts=data.get("attempts", 0)
+        )
+
+
+class JobBroker(ABC):
+    """Interface d'un broker de jobs"""
+
+    @abstractmethod
+    def submit(self, kind: str, target: str, payload: Optional[Dict[str, Any]] = None) -> str:
+        """Ajoute un job en file et retourne son identifiant"""
+
+    @abstractmethod
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Job]:
+        """Loue le prochain job disponible pour un worker"""
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Prolonge le bail d'un job; False si le bail a été perdu"""
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """Enregistre le résultat d'un job terminé"""
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """Signale l'échec d'un job (il sera retenté si possible)"""
+
+    @abstractmethod
+    def get_result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Retourne {'state', 'result'} si le job est terminé, sinon None"""
+
+    @abstractmethod
+    def requeue_expired(self) -> int:
+        """Remet en file les jobs dont le bail a expiré"""
+
+    def close(self):
+        """Libère les ressources du broker"""
+
+
+class SQLiteBroker(JobBroker):
+    """Broker local basé sur SQLite (partageable entre processus d'un même nœud)"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            target TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            state TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker_id TEXT,
+            lease_expires REAL,
+            result TEXT,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, created_at);
+    """
+
+    def __init__(self, db_path: Path, max_attempts: int = 3):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def submit(self, kind: str, target: str, payload: Optional[Dict[str, Any]] = None) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, kind, target, payload, state, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, target, json.dumps(payload or {}, default=encode),
+                 JobState.PENDING, time.time())
+            )
+        return job_id
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Job]:
+        self.requeue_expired()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT job_id, kind, target, payload, attempts FROM jobs "
+                    "WHERE state = ? ORDER BY created_at LIMIT 1",
+                    (JobState.PENDING,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+
+                job_id, kind, target, payload, attempts = row
+                self._conn.execute(
+                    "UPDATE jobs SET state = ?, worker_id = ?, lease_expires = ?, attempts = ? "
+                    "WHERE job_id = ?",
+                    (JobState.LEASED, worker_id, time.time() + lease_seconds, attempts + 1, job_id)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return Job(job_id=job_id, kind=kind, target=target,
+                   payload=json.loads(payload), attempts=attempts + 1)
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE job_id = ? AND worker_id = ? AND state = ?",
+                (time.time() + lease_seconds, job_id, worker_id, JobState.LEASED)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = ?, result = ?, lease_expires = NULL "
+                "WHERE job_id = ? AND worker_id = ? AND state = ?",
+                (JobState.DONE, json.dumps(result, default=encode), job_id, worker_id, JobState.LEASED)
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts FROM jobs WHERE job_id = ? AND worker_id = ? AND state = ?",
+                (job_id, worker_id, JobState.LEASED)
+            ).fetchone()
+            if row is None:
+                return False
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, worker_id = NULL, lease_expires = NULL, result = ? "
+                "WHERE job_id = ?",
+                (self._state_after_failure(row[0]), json.dumps({"error": error}), job_id)
+            )
+        return True
+
+    def get_result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, result FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None or row[0] not in (JobState.DONE, JobState.FAILED):
+            return None
+        return {"state": row[0], "result": json.loads(row[1]) if row[1] else {}}
+
+    def requeue_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, attempts, worker_id FROM jobs WHERE state = ? AND lease_expires < ?",
+                (JobState.LEASED, now)
+            ).fetchall()
+            for job_id, attempts, worker_id in rows:
+                logger.warning(f"⚠️  Bail expiré pour le job {job_id[:8]} (worker {worker_id}), remise en file")
+                self._conn.execute(
+                    "UPDATE jobs SET state = ?, worker_id = NULL, lease_expires = NULL, result = ? "
+                    "WHERE job_id = ?",
+                    (self._state_after_failure(attempts),
+                     json.dumps({"error": f"Worker {worker_id} perdu après {attempts} tentative(s)"}),
+                     job_id)
+                )
+        return len(rows)
+
+    def _state_after_failure(self, attempts: int) -> str:
+        return JobState.FAILED if attempts >= self.max_attempts else JobState.PENDING
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SocketBroker(JobBroker):
+    """Client TCP d'un BrokerServer (protocole JSON, une ligne par requête)"""
+
+    def __init__(self, host: str, port: int, timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+
+    def _call(self, op: str, **args) -> Any:
+        request = (json.dumps({"op": op, "args": args}, default=encode) + "\n").encode("utf-8")
+
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+                        self._reader = self._sock.makefile("rb")
+                    self._sock.sendall(request)
+                    line = self._reader.readline()
+                    if not line:
+                        raise ConnectionError("Connexion fermée par le broker")
+                    break
+                except (OSError, ConnectionError):
+                    self._disconnect()
+                    if attempt == 1:
+                        raise
+
+        response = json.loads(line)
+        if not response.get("ok", False):
+            raise RuntimeError(f"Erreur broker ({op}): {response.get('error')}")
+        return response.get("value")
+
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    def submit(self, kind: str, target: str, payload: Optional[Dict[str, Any]] = None) -> str:
+        return self._call("submit", kind=kind, target=target, payload=payload or {})
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Job]:
+        data = self._call("lease", worker_id=worker_id, lease_seconds=lease_seconds)
+        return Job.from_dict(data) if data else None
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        return self._call("heartbeat", job_id=job_id, worker_id=worker_id, lease_seconds=lease_seconds)
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        return self._call("complete", job_id=job_id, worker_id=worker_id, result=result)
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        return self._call("fail", job_id=job_id, worker_id=worker_id, error=error)
+
+    def get_result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._call("get_result", job_id=job_id)
+
+    def requeue_expired(self) -> int:
+        return self._call("requeue_expired")
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+
+class BrokerServer:
+    """Serveur TCP exposant un broker local aux workers distants"""
+
+    OPERATIONS = ("submit", "lease", "heartbeat", "complete", "fail", "get_result", "requeue_expired")
+
+    def __init__(self, backend: JobBroker, host: str = "0.0.0.0", port: int = 7341,
+                 requeue_interval: float = 5.0):
+        self.backend = backend
+        self.host = host
+        self.port = port
+        self.requeue_interval = requeue_interval
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info("peername")
+        logger.debug(f"🔌 Worker connecté: {peer}")
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(await asyncio.to_thread(self._dispatch, line) + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            logger.debug(f"🔌 Worker déconnecté: {peer}")
+
+    def _dispatch(self, line: bytes) -> bytes:
+        try:
+            request = json.loads(line)
+            op = request.get("op")
+            if op not in self.OPERATIONS:
+                raise ValueError(f"Opération inconnue: {op}")
+
+            value = getattr(self.backend, op)(**request.get("args", {}))
+            if isinstance(value, Job):
+                value = value.to_dict()
+            response = {"ok": True, "value": value}
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+
+        return json.dumps(response, default=encode).encode("utf-8")
+
+    async def _requeue_loop(self):
+        while True:
+            await asyncio.sleep(self.requeue_interval)
+            await asyncio.to_thread(self.backend.requeue_expired)
+
+    async def serve_forever(self):
+        """Démarre le serveur et traite les requêtes jusqu'à interruption"""
+        server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        requeue_task = asyncio.create_task(self._requeue_loop())
+
+        logger.info(f"📡 Broker en écoute sur {self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            requeue_task.cancel()
+
+
+def create_broker(url: str, project_root: Path, max_attempts: int = 3) -> JobBroker:
+    """
+    Crée un broker à partir d'une URL
+
+    Args:
+        url: "sqlite:///relatif/broker.db", "sqlite:////absolu/broker.db",
+             "sqlite://" (cache/broker.db du projet) ou "tcp://hôte:port"
+        project_root: Racine du projet (pour les chemins relatifs)
+        max_attempts: Nombre maximal de tentatives par job
+
+    Returns:
+        Instance de JobBroker
+    """
+    parsed = urlparse(url)
+
+    if parsed.scheme == "sqlite":
+        raw_path = url[len("sqlite://"):]
+        raw_path = raw_path[1:] if raw_path.startswith("/") else raw_path
+        db_path = Path(raw_path) if raw_path else project_root / "cache" / "broker.db"
+        if not db_path.is_absolute():
+            db_path = project_root / db_path
+        return SQLiteBroker(db_path, max_attempts=max_attempts)
+
+    if parsed.scheme == "tcp":
+        return SocketBroker(parsed.hostname or "127.0.0.1", parsed.port or 7341)
+
+    raise ValueError(f"URL de broker non supportée: {url}")
+
+
+async def wait_for_result(broker: JobBroker, job_id: str, poll_interval: float = 0.5,
+                          timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Attend le résultat d'un job soumis au broker
+
+    Returns:
+        {'state': 'done'|'failed', 'result': {...}}
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+
+    while True:
+        outcome = await asyncio.to_thread(broker.get_result, job_id)
+        if outcome is not None:
+            return outcome
+        if deadline and time.monotonic() > deadline:
+            return {"state": JobState.FAILED, "result": {"error": f"Timeout en attente du job {job_id}"}}
+        await asyncio.sleep(poll_interval)
+
+
+class Worker:
+    """Worker exécutant les jobs du broker avec un orchestrateur local"""
+
+    def __init__(self, orchestrator, broker: JobBroker, gate_type, lease_seconds: float = 30.0,
+                 poll_interval: float = 1.0, worker_id: Optional[str] = None):
+        self.orchestrator = orchestrator
+        self.broker = broker
+        self.gate_type = gate_type
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:6]}"
+        self.jobs_processed = 0
+
+    async def _heartbeat_loop(self, job: Job):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(self.broker.heartbeat, job.job_id, self.worker_id, self.lease_seconds):
+                logger.warning(f"⚠️  Bail perdu pour le job {job.job_id[:8]}")
+                return
+
+    async def execute(self, job: Job) -> Dict[str, Any]:
+        """Exécute un job via les contrats run_validation_gate / run_agent de l'orchestrateur"""
+        # Chaque job voit l'arbre tel qu'il est au moment où il démarre
+        self.orchestrator.take_snapshot()
+
+        if job.kind == JobKind.GATE:
+            return await self.orchestrator.run_validation_gate(self.gate_type(job.target))
+
+        if job.kind == JobKind.AGENT:
+            payload = dict(job.payload)
+            task = payload.pop("task")
+            return await self.orchestrator.run_agent(job.target, task, **payload)
+
+        raise ValueError(f"Type de job inconnu: {job.kind}")
+
+    async def run_once(self) -> bool:
+        """Traite un job si disponible; retourne True si un job a été traité"""
+        job = await asyncio.to_thread(self.broker.lease, self.worker_id, self.lease_seconds)
+        if job is None:
+            return False
+
+        logger.info(f"⚙️  Job {job.job_id[:8]}: {job.kind} {job.target} (tentative {job.attempts})")
+        heartbeat = asyncio.create_task(self._heartbeat_loop(job))
+
+        try:
+            result = await self.execute(job)
+            await asyncio.to_thread(self.broker.complete, job.job_id, self.worker_id, result)
+        except Exception as e:
+            logger.error(f"❌ Job {job.job_id[:8]} en échec: {e}")
+            await asyncio.to_thread(self.broker.fail, job.job_id, self.worker_id, str(e))
+        finally:
+            heartbeat.cancel()
+
+        self.jobs_processed += 1
+        return True
+
+    async def run_forever(self, max_jobs: Optional[int] = None):
+        """Boucle principale du worker"""
+        logger.info(f"👷 Worker {self.worker_id} démarré")
+
+        while max_jobs is None or self.jobs_processed < max_jobs:
+            if not await self.run_once():
+                await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,251 @@
+"""
+Flux de constats à mémoire bornée
+
+Les constats d'une gate traversent une chaîne d'itérateurs asynchrones:
+
+    source (générateur du scanner) -> dedup -> filtre de sévérité -> sink
+
+Aucun étage ne garde la liste complète: la source tourne dans un thread et
+n'a jamais plus de `buffer` constats d'avance sur le consommateur (le
+scanner est suspendu sinon), la déduplication retient une fenêtre des
+dernières clés, le sink écrit chaque constat dans un rapport en flux
+(pipeline.report_codec) et ne conserve que des compteurs et un échantillon
+des plus sévères. La mémoire reste constante quel que soit le nombre de
+constats, et chacun est transmis (affichage CLI) dès qu'il est trouvé.
+"""
+import asyncio
+import hashlib
+import heapq
+import itertools
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Any, AsyncIterator, Callable, Iterator, List, Optional, Sequence
+
+from pipeline.models import Finding
+from pipeline.secret_scanner import SEVERITY_ORDER
+
+# Constats produits d'avance par la source
+DEFAULT_BUFFER = 256
+BATCH_SIZE = 32
+# Clés retenues par la déduplication (doublons plus éloignés non détectés)
+DEFAULT_DEDUP_WINDOW = 65536
+# Constats conservés dans le résultat de la gate
+DEFAULT_SAMPLE = 100
+
+_DONE = object()
+
+
+class _Failure:
+    """Exception levée par la source, transmise au consommateur"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def from_iterator(iterator: Iterator[Finding], buffer: int = DEFAULT_BUFFER) -> AsyncIterator[Finding]:
+    """
+    Itère un générateur bloquant (scanner) dans un thread
+
+    Les constats passent par lots de BATCH_SIZE, envoyés aussitôt si le
+    consommateur attend (le premier constat n'est pas retardé). Le thread
+    attend dès que `buffer` constats sont en attente; si le consommateur
+    s'arrête avant la fin, le générateur est fermé.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    slots = threading.Semaphore(max(1, buffer // BATCH_SIZE))
+    stop = threading.Event()
+    # Consommateur en attente d'un lot
+    hungry = threading.Event()
+
+    def send(batch: List[Finding]) -> bool:
+        slots.acquire()
+        if stop.is_set():
+            return False
+        hungry.clear()
+        loop.call_soon_threadsafe(queue.put_nowait, batch)
+        return True
+
+    def produce():
+        batch: List[Finding] = []
+        try:
+            for item in iterator:
+                batch.append(item)
+                if len(batch) >= BATCH_SIZE or hungry.is_set():
+                    if not send(batch):
+                        return
+                    batch = []
+            if (not batch or send(batch)) and not stop.is_set():
+                loop.call_soon_threadsafe(queue.put_nowait, _DONE)
+        except BaseException as e:
+            loop.call_soon_threadsafe(queue.put_nowait, _Failure(e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    producer = asyncio.ensure_future(asyncio.to_thread(produce))
+    try:
+        while True:
+            if queue.empty():
+                hungry.set()
+            batch = await queue.get()
+            if batch is _DONE:
+                break
+            if isinstance(batch, _Failure):
+                raise batch.error
+            slots.release()
+            for item in batch:
+                yield item
+    finally:
+        stop.set()
+        slots.release()
+        await producer
+
+
+def finding_key(finding: Finding) -> bytes:
+    """Empreinte d'un constat (règle, emplacement, message, secret)"""
+    text = f"{finding.rule}\0{finding.file}\0{finding.line}\0{finding.message}\0{finding.secret}"
+    return hashlib.blake2b(text.encode("utf-8", errors="replace"), digest_size=12).digest()
+
+
+async def dedup(findings: AsyncIterator[Finding], window: int = DEFAULT_DEDUP_WINDOW,
+                stats: Optional[Dict[str, int]] = None) -> AsyncIterator[Finding]:
+    """
+    Écarte les constats déjà vus parmi les `window` dernières clés
+
+    Args:
+        stats: Dict dont "duplicates" compte les constats écartés
+    """
+    seen: "OrderedDict[bytes, None]" = OrderedDict()
+    async for finding in findings:
+        key = finding_key(finding)
+        if key in seen:
+            seen.move_to_end(key)
+            if stats is not None:
+                stats["duplicates"] = stats.get("duplicates", 0) + 1
+            continue
+        seen[key] = None
+        if len(seen) > window:
+            seen.popitem(last=False)
+        yield finding
+
+
+async def severity_filter(findings: AsyncIterator[Finding], minimum: str = "info",
+                          stats: Optional[Dict[str, int]] = None) -> AsyncIterator[Finding]:
+    """
+    Constats de sévérité supérieure ou égale à `minimum`
+
+    Args:
+        stats: Dict dont "below_severity" compte les constats écartés
+    """
+    threshold = SEVERITY_ORDER.get(minimum, 0)
+    async for finding in findings:
+        if SEVERITY_ORDER.get(finding.severity, 0) >= threshold:
+            yield finding
+        elif stats is not None:
+            stats["below_severity"] = stats.get("below_severity", 0) + 1
+
+
+class FindingSink:
+    """
+    Destination d'un flux de constats
+
+    Chaque constat est écrit dans le rapport (pipeline.report_codec.ReportWriter)
+    et transmis à `on_finding`; seuls restent en mémoire les compteurs et les
+    `sample` constats les plus sévères (premiers trouvés à sévérité égale).
+    """
+
+    def __init__(self, writer=None, section: Sequence[str] = ("findings",), sample: int = DEFAULT_SAMPLE,
+                 fail_on: str = "high", on_finding: Optional[Callable[[Finding], None]] = None):
+        self.writer = writer
+        self.section = tuple(section)
+        self.sample_size = sample
+        self.threshold = SEVERITY_ORDER.get(fail_on, SEVERITY_ORDER["high"])
+        self.on_finding = on_finding
+        self.total = 0
+        self.blocking = 0
+        self.by_severity: Counter = Counter()
+        self.by_rule: Counter = Counter()
+        # Tas (sévérité, -ordre, constat): le moins prioritaire en tête
+        self._sample: List[Any] = []
+        self._order = itertools.count()
+
+    def is_blocking(self, finding: Finding) -> bool:
+        return SEVERITY_ORDER.get(finding.severity, 0) >= self.threshold
+
+    def add(self, finding: Finding):
+        self.total += 1
+        self.by_severity[finding.severity] += 1
+        self.by_rule[finding.rule] += 1
+        if self.is_blocking(finding):
+            self.blocking += 1
+        if self.writer is not None:
+            self.writer.record(self.section, finding)
+        if self.sample_size:
+            entry = (SEVERITY_ORDER.get(finding.severity, 0), -next(self._order), finding)
+            if len(self._sample) < self.sample_size:
+                heapq.heappush(self._sample, entry)
+            elif entry[:2] > self._sample[0][:2]:
+                heapq.heapreplace(self._sample, entry)
+        if self.on_finding is not None:
+            self.on_finding(finding)
+
+    async def consume(self, findings: AsyncIterator[Finding]) -> "FindingSink":
+        async for finding in findings:
+            self.add(finding)
+        return self
+
+    @property
+    def sample(self) -> List[Finding]:
+        """Constats conservés, du plus sévère au moins sévère"""
+        return [entry[2] for entry in sorted(self._sample, reverse=True)]
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self._sample)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "total": self.total,
+            "blocking": self.blocking,
+            "by_severity": dict(self.by_severity),
+            "by_rule": dict(self.by_rule.most_common()),
+            "truncated": self.truncated
+        }
+        if self.writer is not None:
+            result["report"] = str(self.writer.path)
+        return result
+
+
+async def stream(source: Iterator[Finding], sink: FindingSink, minimum: str = "info",
+                 buffer: int = DEFAULT_BUFFER, window: int = DEFAULT_DEDUP_WINDOW) -> Dict[str, int]:
+    """
+    Fait passer les constats d'un générateur bloquant par toute la chaîne
+
+    Returns:
+        Constats écartés par étage (duplicates, below_severity)
+    """
+    stats = {"duplicates": 0, "below_severity": 0}
+    await sink.consume(severity_filter(dedup(from_iterator(source, buffer), window, stats), minimum, stats))
+    return stats
+
+
+def print_findings(limit: int = 20, minimum: str = "high",
+                   output: Callable[[str], None] = print) -> Callable[[Finding], None]:
+    """Affichage immédiat des `limit` premiers constats de sévérité >= `minimum` (CLI)"""
+    threshold = SEVERITY_ORDER.get(minimum, 0)
+    shown = itertools.count()
+
+    def on_finding(finding: Finding):
+        if SEVERITY_ORDER.get(finding.severity, 0) < threshold:
+            return
+        index = next(shown)
+        if index < limit:
+            location = f"{finding.file}:{finding.line}" if finding.line is not None else finding.file
+            output(f"   🔑 [{finding.severity}] {location} {finding.message}"
+                   + (f" ({finding.secret})" if finding.secret else ""))
+        elif index == limit:
+            output("   … constats suivants dans le rapport")
+
+    return on_finding
@@ -0,0 +1,282 @@
+"""
+Modèle de données compact d'une exécution (agents, gates, constats, phases)
+
+Dataclasses à slots: un constat occupe une fraction de la mémoire d'un dict
+équivalent, ce qui compte quand une exécution garde des dizaines de milliers
+de constats. Les horodatages sont des entiers en nanosecondes de l'horloge
+monotone (durées exactes, insensibles aux changements d'heure); ils ne sont
+convertis en date ISO qu'à la sérialisation.
+
+`to_dict` de chaque modèle construit directement le dict de sortie (pas de
+`dataclasses.asdict`, qui copie récursivement); `encode` est le `default`
+JSON commun aux rapports, checkpoints et échanges avec les workers.
+"""
+import json
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
+
+# Correspondance horloge monotone -> horloge murale, fixée au chargement du module
+_MONOTONIC_ORIGIN = time.monotonic_ns()
+_WALL_ORIGIN = time.time_ns()
+
+
+def now_ns() -> int:
+    """Horodatage monotone en nanosecondes"""
+    return time.monotonic_ns()
+
+
+def isoformat(ns: Optional[int]) -> Optional[str]:
+    """Date ISO locale d'un horodatage monotone"""
+    if ns is None:
+        return None
+    return datetime.fromtimestamp((_WALL_ORIGIN + ns - _MONOTONIC_ORIGIN) / 1e9).isoformat()
+
+
+def from_isoformat(value: Optional[str]) -> Optional[int]:
+    """Horodatage monotone d'une date ISO (résultat relu d'un checkpoint ou d'un worker)"""
+    if not value:
+        return None
+    try:
+        wall = int(datetime.fromisoformat(value).timestamp() * 1e9)
+    except (TypeError, ValueError):
+        return None
+    return wall - _WALL_ORIGIN + _MONOTONIC_ORIGIN
+
+
+@dataclass(slots=True)
+class Finding:
+    """Constat d'une analyse (secret, audit, qualité)"""
+    rule: Optional[str]
+    severity: str
+    message: str
+    file: Optional[str] = None
+    line: Optional[int] = None
+    function: Optional[str] = None
+    tool: Optional[str] = None
+    # Secret masqué et entropie de la valeur (détection de secrets)
+    secret: Optional[str] = None
+    entropy: Optional[float] = None
+    # Repris d'une analyse précédente (hors des lignes modifiées en mode --since)
+    reused: bool = False
+    # Champs propres à un outil (swc, impact, confidence...)
+    extra: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Finding":
+        known = {key: data[key] for key in _FINDING_FIELDS if key in data}
+        extra = {key: value for key, value in data.items() if key not in _FINDING_FIELDS}
+        return cls(**known, extra=extra or None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {"rule": self.rule, "severity": self.severity, "message": self.message,
+                  "file": self.file, "line": self.line}
+        if self.function is not None:
+            result["function"] = self.function
+        if self.tool is not None:
+            result["tool"] = self.tool
+        if self.secret is not None:
+            result["secret"] = self.secret
+        if self.entropy is not None:
+            result["entropy"] = self.entropy
+        if self.reused:
+            result["reused"] = True
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+
+_FINDING_FIELDS = ("rule", "severity", "message", "file", "line", "function", "tool", "secret", "entropy",
+                   "reused")
+
+
+@dataclass(slots=True)
+class AgentState:
+    """État d'un agent enregistré auprès de l'orchestrateur"""
+    name: str
+    title: str
+    module: str
+    # Déclaration du registre (pipeline.registry.AgentSpec)
+    spec: Any
+    config: Dict[str, Any]
+    # AgentStatus de l'orchestrateur
+    status: Enum
+    last_run_ns: Optional[int] = None
+    runs: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.get("enabled", False)
+
+    @property
+    def last_run(self) -> Optional[str]:
+        return isoformat(self.last_run_ns)
+
+    def mark(self, status: Enum):
+        """Fin d'une exécution"""
+        self.status = status
+        self.last_run_ns = now_ns()
+        self.runs += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "title": self.title,
+            "module": self.module,
+            "status": self.status.value,
+            "last_run": self.last_run,
+            "runs": self.runs,
+            "config": self.config
+        }
+
+
+@dataclass(slots=True)
+class GateResult(Mapping):
+    """
+    Résultat d'une gate de validation
+
+    Les champs communs sont des attributs; le reste du rapport propre à la
+    gate (constats, mesures, périmètre...) est dans `details`. Le résultat se
+    lit aussi comme un dict en lecture seule (`result.get("passed")`,
+    `result["issues"]`), comme les rapports libres qu'il remplace.
+    """
+    gate: str
+    passed: bool
+    timestamp_ns: int = field(default_factory=now_ns)
+    checks: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    skipped: Optional[str] = None
+    # Analyse interrompue par son budget (résultat non réutilisable)
+    partial: bool = False
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "GateResult":
+        if isinstance(data, GateResult):
+            return data
+        details = {key: value for key, value in data.items() if key not in _GATE_FIELDS}
+        return cls(
+            gate=data.get("gate", ""),
+            passed=bool(data.get("passed", False)),
+            timestamp_ns=from_isoformat(data.get("timestamp")) or now_ns(),
+            checks=data.get("checks") or [],
+            error=data.get("error"),
+            skipped=data.get("skipped"),
+            partial=bool(data.get("partial", False)),
+            details=details
+        )
+
+    @property
+    def timestamp(self) -> str:
+        return isoformat(self.timestamp_ns)
+
+    def _fields(self) -> Iterator[str]:
+        yield "gate"
+        yield "passed"
+        if self.checks:
+            yield "checks"
+        if self.error is not None:
+            yield "error"
+        if self.skipped is not None:
+            yield "skipped"
+        if self.partial:
+            yield "partial"
+        yield from self.details
+        yield "timestamp"
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _GATE_FIELDS:
+            if key == "timestamp":
+                return self.timestamp
+            value = getattr(self, key)
+            # Champs optionnels absents du rapport tant qu'ils ne sont pas renseignés
+            if value is None or (key in ("checks", "partial") and not value):
+                raise KeyError(key)
+            return value
+        return self.details[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return self._fields()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._fields())
+
+    def to_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"gate": self.gate, "passed": self.passed}
+        if self.checks:
+            result["checks"] = self.checks
+        if self.error is not None:
+            result["error"] = self.error
+        if self.skipped is not None:
+            result["skipped"] = self.skipped
+        if self.partial:
+            result["partial"] = True
+        result.update(self.details)
+        result["timestamp"] = self.timestamp
+        return result
+
+
+_GATE_FIELDS = ("gate", "passed", "timestamp", "checks", "error", "skipped", "partial")
+
+
+@dataclass(slots=True)
+class PhaseResult:
+    """Résultat d'une phase du pipeline (agents exécutés, gates, durée)"""
+    phase: str
+    start_ns: int = field(default_factory=now_ns)
+    end_ns: Optional[int] = None
+    success: bool = True
+    agents_executed: List[Dict[str, Any]] = field(default_factory=list)
+    validations: List[GateResult] = field(default_factory=list)
+    error: Optional[str] = None
+    run_id: Optional[str] = None
+
+    def finish(self):
+        self.end_ns = now_ns()
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Durée en secondes (horloge monotone)"""
+        return (self.end_ns - self.start_ns) / 1e9 if self.end_ns is not None else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "phase": self.phase,
+            "start_time": isoformat(self.start_ns),
+            "end_time": isoformat(self.end_ns),
+            "duration": self.duration,
+            "agents_executed": self.agents_executed,
+            "validations": [validation.to_dict() for validation in self.validations],
+            "success": self.success
+        }
+        if self.error is not None:
+            result["error"] = self.error
+        if self.run_id is not None:
+            result["run_id"] = self.run_id
+        return result
+
+
+def encode(value: Any) -> Any:
+    """`default` JSON: modèles, énumérations, chemins, dates, ensembles (sinon str)"""
+    to_dict = getattr(value, "to_dict", None)
+    if to_dict is not None:
+        return to_dict()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if isinstance(value, Path):
+        return str(value)
+    return str(value)
+
+
+def dumps(value: Any, indent: Optional[int] = None) -> str:
+    """JSON d'un résultat (compact par défaut)"""
+    separators = None if indent else (",", ":")
+    return json.dumps(value, default=encode, indent=indent, separators=separators)
@@ -9,6 +9,11 @@ from datetime import datetime
 from typing import Dict, Any, List, Optional
 from enum import Enum
 
+# Racine du dépôt dans le path pour importer les modules pipeline/ et agents/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipeline.models import AgentState, Finding, GateResult, PhaseResult
+
 # Configuration logging avancée
 logging.basicConfig(
     level=logging.INFO,
@@ -39,6 +44,20 @@ class ValidationGate(Enum):
     CODE_QUALITY = "code_quality"
     PERFORMANCE = "performance"
     COMPLIANCE = "compliance"
+    TESTS = "tests"
+
+
+# Entrées (chemins/globs relatifs) dont dépend chaque gate, pour les checkpoints
+GATE_INPUTS: Dict[ValidationGate, List[str]] = {
+    ValidationGate.REQUIREMENTS: ["contracts", "hardhat.config.js", ".env", "package.json"],
+    ValidationGate.ARCHITECTURE: ["contracts/**/*.sol", "hardhat.config.js", "package.json"],
+    # Plus l'ensemble des fichiers parcourus par la recherche de secrets (SecretScanner.signature)
+    ValidationGate.SECURITY: ["contracts/**/*.sol"],
+    ValidationGate.CODE_QUALITY: ["contracts/**/*.sol"],
+    ValidationGate.PERFORMANCE: ["contracts/**/*.sol", "benchmarks/gas/scenarios.json", "hardhat.config.js"],
+    ValidationGate.COMPLIANCE: ["contracts/**/*.sol"],
+    ValidationGate.TESTS: ["contracts/**/*.sol", "tests/**/*", "hardhat.config.js", "package.json"]
+}
 
 
 class AgentStatus(Enum):
@@ -53,12 +72,20 @@ class AgentStatus(Enum):
 class Web3PipelineOrchestrator:
     """Orchestrateur principal du pipeline IA Web3"""
     
-    def __init__(self, project_root: Path):
+    def __init__(self, project_root: Path, config_path: Optional[Path] = None):
         self.project_root = project_root
-        self.agents: Dict[str, Dict] = {}
-        self.validation_gates: Dict[ValidationGate, bool] = {}
+        self.config_path = config_path
+        self.agents: Dict[str, AgentState] = {}
+        self.validation_gates: Dict[ValidationGate, GateResult] = {}
         self.current_phase: Optional[PipelinePhase] = None
         self.is_running = False
+        self.broker = None
+        self.checkpoints = None
+        self.diff_scope = None
+        self.registry = None
+        self.snapshot = None
+        # Appelé pour chaque constat dès qu'il est trouvé (affichage CLI)
+        self.on_finding = None
         
         # Initialisation
         self._setup_directories()
@@ -87,115 +114,56 @@ class Web3PipelineOrchestrator:
             path.mkdir(parents=True, exist_ok=True)
     
     def _load_configuration(self):
-        """Charge la configuration du pipeline"""
-        config_path = self.project_root / "config" / "pipeline_config.json"
+        """Charge la configuration typée du pipeline (JSON ou YAML, surcharges d'environnement)"""
+        from pipeline.config import PipelineConfig, load_config
         
-        if config_path.exists():
-            import json
-            with open(config_path, 'r') as f:
-                self.config = json.load(f)
-        else:
-            self.config = self._create_default_config()
-            self._save_configuration()
-    
-    def _create_default_config(self) -> Dict[str, Any]:
-        """Crée une configuration par défaut"""
-        return {
-            "pipeline": {
-                "name": "Web3 AI Pipeline",
-                "version": "1.0.0",
-                "auto_start": False,
-                "watch_mode": True,
-                "max_concurrent_agents": 3
-            },
-            "agents": {
-                "contract_generator": {
-                    "enabled": True,
-                    "provider": "openai",
-                    "auto_save": True,
-                    "validate_after_generate": True
-                },
-                "security_auditor": {
-                    "enabled": True,
-                    "tools": ["slither", "mythril"],
-                    "auto_fix": False
-                },
-                "test_generator": {
-                    "enabled": True,
-                    "framework": "hardhat",
-                    "coverage_target": 80
-                },
-                "deployment_manager": {
-                    "enabled": True,
-                    "networks": ["hardhat", "sepolia"],
-                    "auto_verify": True
-                }
-            },
-            "validation": {
-                "gates": [
-                    {"name": "requirements", "required": True},
-                    {"name": "architecture", "required": True},
-                    {"name": "security", "required": True},
-                    {"name": "code_quality", "required": False},
-                    {"name": "performance", "required": False}
-                ],
-                "strict_mode": True
-            },
-            "monitoring": {
-                "enabled": True,
-                "metrics_interval": 60,
-                "alert_channels": []
-            }
-        }
+        from pipeline.report_codec import available_compressions
+        
+        self.config = load_config(self.project_root, self.config_path)
+        if self.config.source is None:
+            self._save_configuration(PipelineConfig())
+        
+        # zstd demandé sans le paquet zstandard: repli sur gzip plutôt que des rapports perdus
+        self.report_compression = self.config.reports.compression
+        if self.report_compression == "zstd" and "zstd" not in available_compressions():
+            logger.warning("⚠️  zstandard non installé: rapports compressés en gzip")
+            self.report_compression = "gzip"
     
-    def _save_configuration(self):
-        """Sauvegarde la configuration"""
-        config_dir = self.project_root / "config"
-        config_dir.mkdir(exist_ok=True)
+    def _save_configuration(self, config=None):
+        """Sauvegarde la configuration (par défaut: celle chargée)"""
+        from pipeline.config import DEFAULT_CONFIG_FILE
         
-        import json
-        config_path = config_dir / "pipeline_config.json"
+        config_path = self.project_root / DEFAULT_CONFIG_FILE
+        config_path.parent.mkdir(exist_ok=True)
         
+        import json
         with open(config_path, 'w') as f:
-            json.dump(self.config, f, indent=2)
+            json.dump((config or self.config).to_dict(), f, indent=2)
         
         logger.info(f"📁 Configuration sauvegardée: {config_path}")
     
     def _initialize_agents(self):
-        """Initialise tous les agents disponibles"""
-        agents_config = self.config.get("agents", {})
-        
-        # Agent: Générateur de contrats
-        if agents_config.get("contract_generator", {}).get("enabled", False):
-            self.agents["contract_generator"] = {
-                "name": "Contract Generator",
-                "module": "agents.blockchain.contract_generator",
-                "status": AgentStatus.IDLE,
-                "last_run": None,
-                "config": agents_config["contract_generator"]
-            }
+        """Enregistre les agents déclarés (agents/ du projet, puis ceux du pipeline), sans les importer"""
+        from pipeline.registry import AgentRegistry, BUILTIN_AGENTS_DIR, DEFAULT_CACHE
         
-        # Agent: Auditeur de sécurité
-        if agents_config.get("security_auditor", {}).get("enabled", False):
-            self.agents["security_auditor"] = {
-                "name": "Security Auditor",
-                "module": "agents.security.audit_agent",
-                "status": AgentStatus.IDLE,
-                "last_run": None,
-                "config": agents_config["security_auditor"]
-            }
+        self.registry = AgentRegistry([self.project_root / "agents", BUILTIN_AGENTS_DIR],
+                                      cache_path=self.project_root / DEFAULT_CACHE)
         
-        # Agent: Générateur de tests
-        if agents_config.get("test_generator", {}).get("enabled", False):
-            self.agents["test_generator"] = {
-                "name": "Test Generator",
-                "module": "agents.testing.test_generator",
-                "status": AgentStatus.IDLE,
-                "last_run": None,
-                "config": agents_config["test_generator"]
-            }
+        for agent_name, spec in self.registry.specs.items():
+            # Un agent absent de la configuration est disponible; il est désactivé explicitement
+            agent_config = self.config.agents.get(agent_name)
+            if agent_config is not None and not agent_config.enabled:
+                continue
+            self.agents[agent_name] = AgentState(
+                name=agent_name,
+                title=agent_name.replace("_", " ").title(),
+                module=spec.module,
+                spec=spec,
+                config=agent_config.to_dict() if agent_config is not None else {"enabled": True},
+                status=AgentStatus.IDLE
+            )
         
-        logger.info(f"🤖 {len(self.agents)} agents initialisés")
+        logger.info(f"🤖 {len(self.agents)} agents initialisés (importés à la première exécution)")
     
     async def run_agent(self, agent_name: str, task: str, **kwargs) -> Dict[str, Any]:
         """
@@ -217,40 +185,25 @@ class Web3PipelineOrchestrator:
             }
         
         agent = self.agents[agent_name]
-        agent["status"] = AgentStatus.RUNNING
+        agent.status = AgentStatus.RUNNING
         
-        logger.info(f"▶️  Exécution: {agent['name']} - {task}")
+        logger.info(f"▶️  Exécution: {agent.title} - {task}")
         
         try:
-            # Import dynamique de l'agent
-            import importlib.util
+            # Instantané du projet transmis aux agents qui le déclarent en entrée
+            inputs = dict(kwargs)
+            if "snapshot" in agent.spec.inputs:
+                inputs.setdefault("snapshot", self.project_snapshot())
             
-            module_path = self.project_root / agent["module"].replace(".", "/") + ".py"
-            
-            if not module_path.exists():
-                # Créer un agent minimal si le fichier n'existe pas
+            # Module importé (et classe instanciée) à la première exécution seulement
+            try:
+                result = await self.registry.run(agent_name, task, config=agent.config, **inputs)
+            except FileNotFoundError:
+                # Créer un agent minimal si le fichier a disparu depuis la découverte
                 result = await self._create_minimal_agent(agent_name, task, **kwargs)
-            else:
-                spec = importlib.util.spec_from_file_location(agent_name, module_path)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                
-                if hasattr(module, 'run'):
-                    result = await module.run(task, **kwargs)
-                else:
-                    result = {
-                        "success": False,
-                        "error": f"Module {agent_name} n'a pas de fonction 'run'",
-                        "agent": agent_name
-                    }
             
             # Mettre à jour le statut
-            if result.get("success", False):
-                agent["status"] = AgentStatus.SUCCESS
-            else:
-                agent["status"] = AgentStatus.FAILED
-            
-            agent["last_run"] = datetime.now().isoformat()
+            agent.mark(AgentStatus.SUCCESS if result.get("success", False) else AgentStatus.FAILED)
             
             # Sauvegarder les résultats
             self._save_agent_results(agent_name, result)
@@ -261,8 +214,7 @@ class Web3PipelineOrchestrator:
             error_msg = f"Erreur exécution agent {agent_name}: {str(e)}"
             logger.error(error_msg)
             
-            agent["status"] = AgentStatus.FAILED
-            agent["last_run"] = datetime.now().isoformat()
+            agent.mark(AgentStatus.FAILED)
             
             return {
                 "success": False,
@@ -296,17 +248,12 @@ class Web3PipelineOrchestrator:
         reports_dir = self.project_root / "reports" / "agents"
         reports_dir.mkdir(parents=True, exist_ok=True)
         
-        import json
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{agent_name}_{timestamp}.json"
-        filepath = reports_dir / filename
-        
-        with open(filepath, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+        filepath = self._write_report(reports_dir / f"{agent_name}_{timestamp}", results)
         
         logger.debug(f"📊 Résultats sauvegardés: {filepath}")
     
-    async def run_validation_gate(self, gate: ValidationGate) -> Dict[str, Any]:
+    async def run_validation_gate(self, gate: ValidationGate) -> GateResult:
         """
         Exécute une porte de validation
         
@@ -324,91 +271,255 @@ class Web3PipelineOrchestrator:
             ValidationGate.SECURITY: self._validate_security,
             ValidationGate.CODE_QUALITY: self._validate_code_quality,
             ValidationGate.PERFORMANCE: self._validate_performance,
-            ValidationGate.COMPLIANCE: self._validate_compliance
+            ValidationGate.COMPLIANCE: self._validate_compliance,
+            ValidationGate.TESTS: self._validate_tests
         }
         
         if gate in validation_methods:
             try:
-                result = await validation_methods[gate]()
-                self.validation_gates[gate] = result.get("passed", False)
+                result = GateResult.from_dict(await validation_methods[gate]())
+                self.validation_gates[gate] = result
                 
                 # Sauvegarder le rapport
                 self._save_validation_report(gate, result)
                 
                 return result
             except Exception as e:
-                error_result = {
-                    "gate": gate.value,
-                    "passed": False,
-                    "error": str(e),
-                    "timestamp": datetime.now().isoformat()
-                }
-                self.validation_gates[gate] = False
+                error_result = GateResult(gate=gate.value, passed=False, error=str(e))
+                self.validation_gates[gate] = error_result
                 return error_result
         else:
-            return {
-                "gate": gate.value,
-                "passed": False,
-                "error": f"Gate de validation inconnue: {gate}",
-                "timestamp": datetime.now().isoformat()
-            }
+            return GateResult(gate=gate.value, passed=False, error=f"Gate de validation inconnue: {gate}")
     
+    def connect_broker(self, url: str):
+        """
+        Active l'exécution distribuée via un broker de jobs
+
+        Args:
+            url: URL du broker (sqlite://... ou tcp://hôte:port)
+        """
+        from pipeline.distributed import create_broker
+
+        self.broker = create_broker(url, self.project_root,
+                                    max_attempts=self.config.distributed.max_attempts)
+        logger.info(f"📡 Broker connecté: {url}")
+
+    async def dispatch_job(self, kind: str, target: str, **payload) -> Dict[str, Any]:
+        """
+        Soumet un job au broker et attend son résultat
+
+        Args:
+            kind: "gate" ou "agent"
+            target: Nom de la gate ou de l'agent
+            **payload: Arguments du job (task, kwargs de l'agent)
+
+        Returns:
+            Résultat identique à run_validation_gate / run_agent
+        """
+        from pipeline.distributed import JobState, wait_for_result
+
+        dist_config = self.config.distributed
+        job_id = await asyncio.to_thread(self.broker.submit, kind, target, payload)
+        logger.info(f"📤 Job {job_id[:8]} soumis: {kind} {target}")
+
+        outcome = await wait_for_result(
+            self.broker, job_id,
+            poll_interval=dist_config.poll_interval,
+            timeout=dist_config.job_timeout
+        )
+
+        if outcome["state"] == JobState.DONE:
+            return outcome["result"]
+
+        error = outcome["result"].get("error", "Job distribué en échec")
+        if kind == "gate":
+            return {"gate": target, "passed": False, "error": error,
+                    "timestamp": datetime.now().isoformat()}
+        return {"success": False, "error": error, "agent": target}
+
+    def enable_checkpoints(self, run_id: Optional[str] = None, resume: bool = False):
+        """
+        Active les checkpoints des étapes (agents et gates)
+
+        Args:
+            run_id: Identifiant de l'exécution à créer ou reprendre
+            resume: Reprendre l'exécution `run_id` en sautant les étapes inchangées
+        """
+        from pipeline.checkpoint import CheckpointStore
+
+        self.checkpoints = CheckpointStore(self.project_root, run_id=run_id, resume=resume)
+        self.checkpoints.prune(self.config.checkpoints.keep_runs)
+
+        action = "reprise" if resume else "démarrée"
+        logger.info(f"💾 Exécution {action}: {self.checkpoints.run_id}")
+
+    def take_snapshot(self):
+        """
+        Indexe l'arborescence pour l'exécution qui commence (remplace l'instantané précédent)
+
+        Returns:
+            pipeline.snapshot.ProjectSnapshot partagé par les gates et les agents
+        """
+        from pipeline.snapshot import ProjectSnapshot
+
+        if self.snapshot is not None:
+            self.snapshot.close()
+        self.snapshot = ProjectSnapshot.build(self.project_root, config=self.config)
+        return self.snapshot
+
+    def project_snapshot(self):
+        """Instantané de l'exécution en cours (créé au premier besoin)"""
+        return self.snapshot if self.snapshot is not None else self.take_snapshot()
+
+    async def enable_diff_scope(self, ref: str):
+        """
+        Limite les gates aux fichiers et lignes modifiés depuis `ref` (mode --since)
+
+        Raises:
+            ValueError: Référence git inconnue
+        """
+        from pipeline.diff_scope import compute_diff_scope
+
+        self.diff_scope = await compute_diff_scope(self.project_root, ref)
+
+    def _agent_inputs_hash(self, agent_name: str, task: str, kwargs: Dict[str, Any]) -> str:
+        """Hash des entrées d'un agent: module source, configuration et arguments"""
+        from pipeline.checkpoint import hash_inputs
+
+        agent = self.agents.get(agent_name)
+        patterns = [agent.module.replace(".", "/") + ".py"] if agent is not None else []
+        return hash_inputs(self.project_root, patterns,
+                           {"task": task, "kwargs": kwargs, "config": agent.config if agent is not None else {}},
+                           snapshot=self.project_snapshot())
+
+    async def execute_gate(self, gate: ValidationGate) -> GateResult:
+        """Exécute une gate localement ou sur un worker distant si un broker est connecté"""
+        if self.checkpoints is not None:
+            from pipeline.checkpoint import CheckpointStore, hash_inputs
+
+            step_key = CheckpointStore.step_key("gate", gate.value)
+            params = {"gate": gate.value}
+            if self.diff_scope is not None:
+                params["since"] = self.diff_scope.base
+            if gate == ValidationGate.SECURITY:
+                # Tout l'arbre est analysé: fichiers ajoutés n'importe où (frontend/, docs/...) compris
+                scanner = self._secret_scanner()
+                params["secrets"] = {
+                    "config": self.config.to_dict()["secrets"],
+                    "files": await asyncio.to_thread(scanner.signature)
+                }
+            input_hash = hash_inputs(self.project_root, GATE_INPUTS.get(gate, []), params,
+                                     snapshot=self.project_snapshot())
+            cached = self.checkpoints.lookup(step_key, input_hash)
+            if cached is not None:
+                result = GateResult.from_dict(cached)
+                self.validation_gates[gate] = result
+                return result
+
+        if self.broker is None:
+            result = await self.run_validation_gate(gate)
+        else:
+            result = GateResult.from_dict(await self.dispatch_job("gate", gate.value))
+            self.validation_gates[gate] = result
+            self._save_validation_report(gate, result)
+
+        # Seuls les succès complets sont réutilisables: un échec (timeout, nœud perdu) ou un
+        # résultat partiel (analyse interrompue par son budget) est retenté
+        if self.checkpoints is not None and result.passed and not result.partial:
+            self.checkpoints.record(step_key, input_hash, result.to_dict())
+
+        return result
+
+    async def execute_agent(self, agent_name: str, task: str, **kwargs) -> Dict[str, Any]:
+        """Exécute un agent localement ou sur un worker distant si un broker est connecté"""
+        if self.checkpoints is not None:
+            from pipeline.checkpoint import CheckpointStore
+
+            step_key = CheckpointStore.step_key("agent", agent_name, task, kwargs)
+            input_hash = self._agent_inputs_hash(agent_name, task, kwargs)
+            cached = self.checkpoints.lookup(step_key, input_hash)
+            if cached is not None:
+                return cached
+
+        if self.broker is None:
+            result = await self.run_agent(agent_name, task, **kwargs)
+        else:
+            result = await self.dispatch_job("agent", agent_name, task=task, **kwargs)
+            if agent_name in self.agents:
+                self.agents[agent_name].mark(AgentStatus.SUCCESS if result.get("success", False)
+                                             else AgentStatus.FAILED)
+            self._save_agent_results(agent_name, result)
+
+        if self.checkpoints is not None and result.get("success", False):
+            self.checkpoints.record(step_key, input_hash, result)
+
+        return result
+
+    async def run_worker(self, max_jobs: Optional[int] = None):
+        """Démarre un worker consommant les jobs du broker connecté"""
+        from pipeline.distributed import Worker
+
+        dist_config = self.config.distributed
+        worker = Worker(
+            self, self.broker, ValidationGate,
+            lease_seconds=dist_config.lease_seconds,
+            poll_interval=dist_config.poll_interval
+        )
+        await worker.run_forever(max_jobs=max_jobs)
+
     async def _validate_requirements(self) -> Dict[str, Any]:
         """Valide les exigences du projet"""
-        # Vérifier la présence de fichiers essentiels
-        essential_files = [
-            self.project_root / "contracts",
-            self.project_root / "hardhat.config.js",
-            self.project_root / ".env"
-        ]
+        snapshot = self.project_snapshot()
         
-        missing_files = []
-        for filepath in essential_files:
-            if not filepath.exists():
-                missing_files.append(str(filepath.relative_to(self.project_root)))
+        # Vérifier la présence de fichiers essentiels
+        essential_files = ["contracts", "hardhat.config.js", ".env"]
+        missing_files = [path for path in essential_files if not snapshot.exists(path)]
         
         return {
             "gate": "requirements",
             "passed": len(missing_files) == 0,
             "missing_files": missing_files,
             "checks": [
-                {"check": "contracts directory", "passed": (self.project_root / "contracts").exists()},
-                {"check": "hardhat.config.js", "passed": (self.project_root / "hardhat.config.js").exists()},
-                {"check": ".env file", "passed": (self.project_root / ".env").exists()},
-                {"check": "package.json", "passed": (self.project_root / "package.json").exists()}
+                {"check": "contracts directory", "passed": snapshot.is_dir("contracts")},
+                {"check": "hardhat.config.js", "passed": "hardhat.config.js" in snapshot},
+                {"check": ".env file", "passed": ".env" in snapshot},
+                {"check": "package.json", "passed": "package.json" in snapshot}
             ],
             "timestamp": datetime.now().isoformat()
         }
     
     async def _validate_architecture(self) -> Dict[str, Any]:
         """Valide l'architecture du projet"""
-        import subprocess
+        # Vérifier la compilation Hardhat (sous-processus asynchrone: la boucle
+        # d'événements reste disponible, notamment pour les heartbeats des workers)
+        process = await asyncio.create_subprocess_exec(
+            "npx", "hardhat", "compile",
+            cwd=self.project_root,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
         
-        # Vérifier la compilation Hardhat
         try:
-            result = subprocess.run(
-                ["npx", "hardhat", "compile"],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            stdout_bytes, _ = await asyncio.wait_for(process.communicate(), timeout=30)
+            stdout = stdout_bytes.decode("utf-8", errors="replace")
             
-            compiled = "Successfully" in result.stdout
+            compiled = "Successfully" in stdout
             
             return {
                 "gate": "architecture",
                 "passed": compiled,
                 "compilation_success": compiled,
-                "output": result.stdout[-500:] if result.stdout else "",
+                "output": stdout[-500:] if stdout else "",
                 "checks": [
                     {"check": "Hardhat compilation", "passed": compiled},
-                    {"check": "Solidity version", "passed": "0.8" in result.stdout if result.stdout else False}
+                    {"check": "Solidity version", "passed": "0.8" in stdout if stdout else False}
                 ],
                 "timestamp": datetime.now().isoformat()
             }
             
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
             return {
                 "gate": "architecture",
                 "passed": False,
@@ -416,76 +527,291 @@ class Web3PipelineOrchestrator:
                 "timestamp": datetime.now().isoformat()
             }
     
+    def _secret_scanner(self):
+        """Recherche de secrets configurée (pipeline.secret_scanner.SecretScanner) sur l'instantané"""
+        from pipeline.secret_scanner import SecretScanner
+        
+        secrets_config = self.config.secrets
+        return SecretScanner(
+            self.project_root,
+            exclude=secrets_config.exclude,
+            max_file_size=int(secrets_config.max_file_size_mb * 1024 * 1024),
+            snapshot=self.project_snapshot()
+        )
+    
     async def _validate_security(self) -> Dict[str, Any]:
         """Valide la sécurité du projet"""
-        # Vérifications de sécurité basiques
-        security_issues = []
-        
-        # Vérifier le fichier .env pour les clés sensibles en clair
-        env_path = self.project_root / ".env"
-        if env_path.exists():
-            with open(env_path, 'r') as f:
-                content = f.read()
-                
-                if "PRIVATE_KEY=0x" in content and "test test" not in content:
-                    security_issues.append("Clé privée réelle dans .env - utiliser des variables d'environnement")
-                
-                if "MNEMONIC=" in content and "test test" not in content:
-                    security_issues.append("Seed phrase réelle dans .env")
+        from pipeline.findings import FindingSink, stream
+
+        # Recherche de secrets sur tout l'arbre (scripts, backup_*, .env...), résultats en cache par fichier
+        secrets_config = self.config.secrets
+        scanner = self._secret_scanner()
+        # Constats en flux (dédupliqués, filtrés) vers leur propre rapport: seuls les compteurs
+        # et un échantillon des plus sévères restent dans le résultat de la gate
+        scan: Dict[str, Any] = {}
+        with self._open_findings_report("security") as writer:
+            writer.header({"gate": "security", "source": "secrets", "scope": self.diff_scope})
+            sink = FindingSink(writer, fail_on=secrets_config.fail_on, on_finding=self.on_finding)
+            dropped = await stream(scanner.iter_findings(self.diff_scope, scan), sink,
+                                   minimum=secrets_config.min_severity)
+        security_issues = [
+            f"{finding.message}: {finding.file}:{finding.line} ({finding.secret})"
+            for finding in sink.sample if sink.is_blocking(finding)
+        ]
+        exposed_env = [env["file"] for env in scan["env_files"] if not env["ignored"]]
         
-        return {
+        checks = [
+            {"check": "No secrets in the tree", "passed": sink.blocking == 0},
+            {"check": ".env in .gitignore", "passed": len(exposed_env) == 0}
+        ]
+        result = {
             "gate": "security",
-            "passed": len(security_issues) == 0,
             "security_issues": security_issues,
-            "checks": [
-                {"check": "No private keys in .env", "passed": len(security_issues) == 0},
-                {"check": ".env in .gitignore", "passed": self._is_env_gitignored()}
-            ],
-            "timestamp": datetime.now().isoformat()
+            "checks": checks,
+            "secrets": {
+                "findings": sink.sample,
+                **sink.to_dict(),
+                **dropped,
+                **{
+                    key: scan[key]
+                    for key in ("env_files", "files", "scanned", "cached", "skipped", "not_in_diff",
+                                "bytes", "duration")
+                    if key in scan
+                }
+            }
         }
-    
-    def _is_env_gitignored(self) -> bool:
-        """Vérifie si .env est dans .gitignore"""
-        gitignore_path = self.project_root / ".gitignore"
-        if gitignore_path.exists():
-            with open(gitignore_path, 'r') as f:
-                content = f.read()
-                return ".env" in content
-        return False
+        if self.diff_scope is not None:
+            result["scope"] = self.diff_scope.to_dict()
+        if exposed_env:
+            result["secrets"]["exposed_env_files"] = exposed_env
+        
+        # Analyse Slither / Mythril des contrats (résultats en cache par contrat)
+        if "security_auditor" in self.agents:
+            # Analyses time-boxées: les résultats partiels sont repris en arrière-plan (mode approfondi)
+            scoped = {}
+            if self.diff_scope is not None:
+                scoped["changed"] = [str(p) for p in self.diff_scope.paths(self.project_root)]
+            audit = await self.run_agent("security_auditor", "audit", project_root=str(self.project_root),
+                                         time_boxed=True, **scoped)
+            if audit.get("tools"):
+                result["audit"] = {
+                    key: audit.get(key)
+                    for key in ("tools", "missing_tools", "counts", "blocking", "errors", "failed", "analyzed",
+                                "cached", "reused", "not_in_diff", "duration", "partial", "deep", "deep_mode")
+                    if key in audit
+                }
+                result["audit"]["findings"] = [Finding.from_dict(f) for f in audit.get("findings", [])]
+                result["partial"] = audit.get("partial", False)
+                checks.append({"check": "No blocking audit findings", "passed": audit.get("blocking") == 0})
+                # Un outil en échec (plantage, compilation, timeout complet) n'a rien vérifié
+                checks.append({"check": "Security audit completed",
+                               "passed": audit.get("failed", 0) == 0})
+            else:
+                result["audit"] = {"skipped": audit.get("error") or "Aucun analyseur installé (slither, myth)"}
+        
+        result["passed"] = sink.blocking == 0 and all(
+            c["passed"] for c in checks if c["check"] != ".env in .gitignore"
+        )
+        result["timestamp"] = datetime.now().isoformat()
+        return result
     
     async def _validate_code_quality(self) -> Dict[str, Any]:
-        """Valide la qualité du code"""
+        """Valide la qualité du code (avec --since: contrats modifiés seulement, les autres repris du cache)"""
+        from pipeline.diff_scope import DEFAULT_RESULTS_DIR, FileResultCache
+        
         # Vérifications basiques de qualité
         issues = []
         
+        storage_packing = {}
+        snapshot = self.project_snapshot()
+        cache = FileResultCache(self.project_root / DEFAULT_RESULTS_DIR / "code_quality.json")
+        counts = {"analyzed": 0, "reused": 0, "not_in_diff": 0}
+        
         # Vérifier les contrats Solidity
-        contracts_dir = self.project_root / "contracts"
-        if contracts_dir.exists():
-            for sol_file in contracts_dir.glob("**/*.sol"):
-                with open(sol_file, 'r') as f:
-                    content = f.read()
-                    
-                    if "SPDX-License-Identifier" not in content:
-                        issues.append(f"{sol_file.name}: Licence SPDX manquante")
-                    
-                    if "@dev" not in content and "@title" not in content:
-                        issues.append(f"{sol_file.name}: Documentation NatSpec manquante")
+        sol_files = snapshot.glob("contracts/**/*.sol")
+        for relative in sol_files:
+            sol_file = snapshot.path(relative)
+            signature = snapshot.get(relative).signature
+            if self.diff_scope is not None and not self.diff_scope.contains(relative):
+                cached = cache.lookup(relative, sol_file, signature)
+                if cached is None:
+                    counts["not_in_diff"] += 1
+                    continue
+                counts["reused"] += 1
+            else:
+                cached = {
+                    "issues": self._contract_quality_issues(sol_file),
+                    "storage_packing": self._storage_packing_hints(sol_file)
+                }
+                cache.store(relative, sol_file, cached, signature)
+                counts["analyzed"] += 1
+            issues.extend(cached["issues"])
+            storage_packing.update(cached["storage_packing"])
+        cache.save()
         
-        return {
+        result = {
             "gate": "code_quality",
             "passed": len(issues) == 0,
             "issues": issues,
-            "file_count": len(list(contracts_dir.glob("**/*.sol"))) if contracts_dir.exists() else 0,
+            "storage_packing": storage_packing,
+            "file_count": len(sol_files),
             "timestamp": datetime.now().isoformat()
         }
+        if self.diff_scope is not None:
+            result.update(counts, scope=self.diff_scope.to_dict())
+        return result
+    
+    def _contract_quality_issues(self, sol_file: Path) -> List[str]:
+        """Vérifications de qualité d'un contrat Solidity (index partagé avec les agents contrats)"""
+        from agents.blockchain.analysis import parse_solidity
+        
+        issues = []
+        index = parse_solidity(self.project_snapshot().read_text(sol_file))
+        
+        if not index.license:
+            issues.append(f"{sol_file.name}: Licence SPDX manquante")
+        
+        documented = [c for c in index.contracts if c.doc] + [f for f in index.functions() if f.doc]
+        if not documented:
+            issues.append(f"{sol_file.name}: Documentation NatSpec manquante")
+        
+        return issues
+    
+    def _storage_packing_hints(self, sol_file: Path) -> Dict[str, Any]:
+        """Slots de stockage récupérables par réordonnancement (informatif, ne bloque pas la gate)"""
+        from agents.blockchain.storage_layout import analyze_storage
+        
+        hints = {}
+        for report in analyze_storage(self.project_snapshot().read_text(sol_file)):
+            if report.slots_saved > 0:
+                hints[f"{sol_file.name}:{report.name}"] = {
+                    "slots_saved": report.slots_saved,
+                    "suggested_order": report.suggested_order,
+                    "deployment_gas": report.gas["sstore_init_saved"],
+                    "max_gas_per_call": report.gas["max_per_call"]
+                }
+        return hints
     
     async def _validate_performance(self) -> Dict[str, Any]:
-        """Valide la performance"""
-        # Placeholder pour les vérifications de performance
+        """Valide la performance: gas mesuré (EVM locale, hardhat-gas-reporter) comparé au commit précédent"""
+        from agents.blockchain.gas_profiler import EVMUnavailable, load_scenarios, profile_project
+        from agents.blockchain.gas_baseline import (
+            GasBaselineStore, from_measurements, parse_gas_reporter, git_commit, git_ancestors, diff
+        )
+        from agents.blockchain.compiler import CompilerUnavailable
+        
+        perf_config = self.config.performance
+        threshold = perf_config.threshold_pct
+        store = GasBaselineStore(self.project_root / perf_config.history, perf_config.max_records)
+        previous_records = store.records()
+        
+        gas = {}
+        measurements = []
+        skipped = None
+        try:
+            measurements = await profile_project(
+                self.project_root,
+                backend=perf_config.backend,
+                rpc_url=perf_config.rpc_url,
+                chain_id=perf_config.chain_id,
+                spawn_node=perf_config.spawn_node,
+                scenarios=load_scenarios(self.project_root / perf_config.scenarios)
+            )
+            gas["profiler"] = from_measurements(measurements)
+        except (EVMUnavailable, CompilerUnavailable) as e:
+            logger.warning(f"⚠️ Mesure du gas impossible: {e}")
+            skipped = str(e)
+        
+        # Sortie de `REPORT_GAS=true npx hardhat test`, seulement si produite depuis la dernière exécution
+        reporter_path = self.project_root / perf_config.gas_reporter_output
+        last_run = max((r.get("timestamp", 0) for r in previous_records), default=0)
+        if reporter_path.exists() and reporter_path.stat().st_mtime > last_run:
+            try:
+                gas["gas-reporter"] = parse_gas_reporter(reporter_path)
+            except (ValueError, KeyError) as e:
+                logger.warning(f"⚠️ Rapport hardhat-gas-reporter illisible: {e}")
+        
+        if not any(gas.values()):
+            # Rien n'est mesurable: la gate n'est pas bloquante
+            return {
+                "gate": "performance",
+                "passed": True,
+                "skipped": skipped or "Aucune mesure de gas",
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        commit = await git_commit(self.project_root)
+        baseline = store.baseline(commit, await git_ancestors(self.project_root))
+        comparison = diff(gas, baseline["gas"] if baseline else {}, threshold)
+        store.append(commit, gas)
+        
+        for regression in comparison["regressions"]:
+            logger.warning(f"⛽ #{regression['rank']} {regression['contract']}.{regression['function']} "
+                           f"({regression['source']}): {regression['baseline']} → {regression['current']} gas "
+                           f"(+{regression['delta_pct']}%)")
+        
         return {
             "gate": "performance",
-            "passed": True,
-            "message": "Vérifications de performance à implémenter",
+            "passed": not comparison["regressions"],
+            "threshold_pct": threshold,
+            "commit": commit,
+            "baseline_commit": baseline["commit"] if baseline else None,
+            "sources": sorted(gas),
+            "measurements": [m.to_dict() for m in measurements],
+            **comparison,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    async def _validate_tests(self, changed: Optional[List[Path]] = None) -> Dict[str, Any]:
+        """
+        Valide les tests Hardhat (shards parallèles, couverture agrégée)
+
+        Args:
+            changed: Fichiers modifiés; seuls les tests concernés sont exécutés
+                (par défaut: ceux du périmètre --since s'il est actif)
+        """
+        from pipeline.test_runner import TestRunner
+        
+        if changed is None and self.diff_scope is not None:
+            changed = self.diff_scope.paths(self.project_root)
+        
+        tests_config = self.config.tests
+        runner = TestRunner(
+            self.project_root,
+            tests_dir=tests_config.dir,
+            shards=tests_config.shards,
+            timeout=tests_config.timeout,
+            coverage=tests_config.coverage
+        )
+        
+        unavailable = runner.available()
+        if unavailable:
+            logger.warning(f"⚠️ Tests non exécutés: {unavailable}")
+            return {
+                "gate": "tests",
+                "passed": True,
+                "skipped": unavailable,
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        summary = await runner.run(changed)
+        passed = summary["success"]
+        if self.diff_scope is not None:
+            summary["scope"] = self.diff_scope.to_dict()
+        
+        min_coverage = tests_config.min_coverage
+        if min_coverage is not None and "coverage" in summary:
+            coverage_ok = summary["coverage"]["total"]["lines"] >= min_coverage
+            summary["coverage_passed"] = coverage_ok
+            passed = passed and coverage_ok
+        
+        logger.info(f"🧪 Tests: {summary['tests_passed']} réussis, {summary['tests_failed']} échoués, "
+                    f"{summary['tests_pending']} en attente ({summary['selected']}/{summary['discovered']} fichiers)")
+        
+        return {
+            "gate": "tests",
+            "passed": passed,
+            **summary,
             "timestamp": datetime.now().isoformat()
         }
     
@@ -499,20 +825,15 @@ class Web3PipelineOrchestrator:
             "timestamp": datetime.now().isoformat()
         }
     
-    def _save_validation_report(self, gate: ValidationGate, results: Dict[str, Any]):
+    def _save_validation_report(self, gate: ValidationGate, results: GateResult):
         """Sauvegarde le rapport de validation"""
         reports_dir = self.project_root / "reports" / "validations"
         reports_dir.mkdir(parents=True, exist_ok=True)
         
-        import json
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"validation_{gate.value}_{timestamp}.json"
-        filepath = reports_dir / filename
-        
-        with open(filepath, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+        self._write_report(reports_dir / f"validation_{gate.value}_{timestamp}", results)
     
-    async def run_pipeline_phase(self, phase: PipelinePhase) -> Dict[str, Any]:
+    async def run_pipeline_phase(self, phase: PipelinePhase) -> PhaseResult:
         """
         Exécute une phase complète du pipeline
         
@@ -525,55 +846,52 @@ class Web3PipelineOrchestrator:
         logger.info(f"🚀 Démarrage phase: {phase.value}")
         self.current_phase = phase
         self.is_running = True
+        self.take_snapshot()
         
-        phase_results = {
-            "phase": phase.value,
-            "start_time": datetime.now().isoformat(),
-            "agents_executed": [],
-            "validations": [],
-            "success": True
-        }
+        phase_results = PhaseResult(phase=phase.value)
         
         try:
             if phase == PipelinePhase.CONCEPTION:
                 # Génération de contrat avec IA
-                result = await self.run_agent(
+                result = await self.execute_agent(
                     "contract_generator",
                     "generate",
                     requirements="NFT Marketplace avec fonctionnalités de base",
                     contract_type="erc721"
                 )
-                phase_results["agents_executed"].append(result)
+                phase_results.agents_executed.append(result)
                 
             elif phase == PipelinePhase.DEVELOPMENT:
                 # Validation des exigences et architecture
-                req_validation = await self.run_validation_gate(ValidationGate.REQUIREMENTS)
-                arch_validation = await self.run_validation_gate(ValidationGate.ARCHITECTURE)
+                req_validation, arch_validation = await self.run_gates(
+                    [ValidationGate.REQUIREMENTS, ValidationGate.ARCHITECTURE]
+                )
                 
-                phase_results["validations"].extend([req_validation, arch_validation])
+                phase_results.validations.extend([req_validation, arch_validation])
                 
                 if not (req_validation.get("passed", False) and arch_validation.get("passed", False)):
-                    phase_results["success"] = False
+                    phase_results.success = False
             
             elif phase == PipelinePhase.VALIDATION:
-                # Validation sécurité et qualité
-                sec_validation = await self.run_validation_gate(ValidationGate.SECURITY)
-                quality_validation = await self.run_validation_gate(ValidationGate.CODE_QUALITY)
+                # Validation sécurité, qualité et tests
+                validations = await self.run_gates(
+                    [ValidationGate.SECURITY, ValidationGate.CODE_QUALITY, ValidationGate.TESTS]
+                )
                 
-                phase_results["validations"].extend([sec_validation, quality_validation])
+                phase_results.validations.extend(validations)
                 
-                if not (sec_validation.get("passed", False) and quality_validation.get("passed", False)):
-                    phase_results["success"] = False
+                if not all(v.get("passed", False) for v in validations):
+                    phase_results.success = False
             
             elif phase == PipelinePhase.DEPLOYMENT:
                 # Préparation au déploiement
-                result = await self.run_agent(
+                result = await self.execute_agent(
                     "deployment_manager",
                     "prepare",
                     network="sepolia",
                     contract_name="SimpleNFT"
                 )
-                phase_results["agents_executed"].append(result)
+                phase_results.agents_executed.append(result)
             
             elif phase == PipelinePhase.MONITORING:
                 # Surveillance continue
@@ -581,38 +899,240 @@ class Web3PipelineOrchestrator:
                 # À implémenter: monitoring en temps réel
             
         except Exception as e:
-            phase_results["success"] = False
-            phase_results["error"] = str(e)
+            phase_results.success = False
+            phase_results.error = str(e)
             logger.error(f"❌ Erreur phase {phase.value}: {e}")
         
-        phase_results["end_time"] = datetime.now().isoformat()
-        phase_results["duration"] = (
-            datetime.fromisoformat(phase_results["end_time"]) - 
-            datetime.fromisoformat(phase_results["start_time"])
-        ).total_seconds()
+        phase_results.finish()
         
         # Sauvegarder les résultats
         self._save_phase_report(phase, phase_results)
         
+        if self.checkpoints is not None:
+            phase_results.run_id = self.checkpoints.run_id
+            self.checkpoints.mark_phase(phase.value, phase_results.success)
+        
         self.current_phase = None
         self.is_running = False
         
-        logger.info(f"✅ Phase {phase.value} terminée: {'SUCCÈS' if phase_results['success'] else 'ÉCHEC'}")
+        logger.info(f"✅ Phase {phase.value} terminée: {'SUCCÈS' if phase_results.success else 'ÉCHEC'}")
         
         return phase_results
     
-    def _save_phase_report(self, phase: PipelinePhase, results: Dict[str, Any]):
+    async def run_gates(self, gates: List[ValidationGate]) -> List[Dict[str, Any]]:
+        """Exécute des gates: en parallèle sur les workers si un broker est connecté, sinon en séquence"""
+        if self.broker is not None:
+            return list(await asyncio.gather(*(self.execute_gate(gate) for gate in gates)))
+
+        return [await self.execute_gate(gate) for gate in gates]
+
+    async def run_full_pipeline(self) -> Dict[str, Any]:
+        """
+        Exécute CONCEPTION → DEVELOPMENT → VALIDATION → DEPLOYMENT en flux
+        
+        Chaque contrat (existant ou généré) traverse les étapes dès qu'il est
+        disponible; les gates globales au projet ne sont exécutées qu'une fois
+        et partagées entre tous les contrats.
+        
+        Returns:
+            Résultats de l'exécution complète
+        """
+        from pipeline.dag import StreamingDAG, Artifact, SharedStep
+        
+        run_config = self.config.pipeline.run
+        concurrency = self.config.pipeline.max_concurrent_agents
+        specs = run_config.get("contracts", [
+            {"requirements": "NFT Marketplace avec fonctionnalités de base", "contract_type": "erc721"}
+        ])
+        
+        logger.info(f"🚀 Démarrage pipeline complet ({len(specs)} contrat(s) à générer)")
+        self.is_running = True
+        snapshot = self.take_snapshot()
+        
+        run_results = {
+            "mode": "run",
+            "start_time": datetime.now().isoformat(),
+            "contracts": {},
+            "agents_executed": [],
+            "validations": [],
+            "success": True
+        }
+        
+        def contract_report(artifact: Artifact) -> Dict[str, Any]:
+            return run_results["contracts"].setdefault(artifact.name, {
+                "path": str(artifact.path) if artifact.path else None,
+                "stages": {}
+            })
+        
+        # Déclenché quand toutes les générations sont terminées (contrats écrits et dans l'instantané)
+        generated = asyncio.Event()
+        
+        async def conception():
+            self.current_phase = PipelinePhase.CONCEPTION
+            semaphore = asyncio.Semaphore(concurrency)
+            
+            async def generate(spec: Dict[str, Any]) -> Dict[str, Any]:
+                async with semaphore:
+                    result = await self.execute_agent("contract_generator", "generate", **spec)
+                if result.get("file_path"):
+                    # Contrat écrit pendant l'exécution: ajouté à l'instantané des gates
+                    self.snapshot = self.snapshot.with_files([Path(result["file_path"])])
+                return result
+            
+            # Générations lancées avant d'émettre quoi que ce soit: les gates qui les attendent
+            # ne dépendent pas de la vitesse à laquelle l'aval consomme les artefacts
+            generations = [asyncio.ensure_future(generate(spec)) for spec in specs]
+            asyncio.gather(*generations, return_exceptions=True).add_done_callback(lambda _: generated.set())
+            try:
+                # Contrats existants: disponibles immédiatement pour l'aval
+                if run_config.get("include_existing", True):
+                    for sol_file in snapshot.paths("contracts/**/*.sol"):
+                        yield Artifact("contract", sol_file.stem, sol_file, {"origin": "existing"})
+                
+                # Contrats générés: émis au fil de l'eau
+                for future in asyncio.as_completed(generations):
+                    result = await future
+                    run_results["agents_executed"].append(result)
+                    if not result.get("success", False):
+                        run_results["success"] = False
+                    if result.get("file_path"):
+                        path = Path(result["file_path"])
+                        yield Artifact("contract", path.stem, path, {"origin": "generated"})
+            finally:
+                generated.set()
+        
+        requirements = SharedStep(lambda: self.execute_gate(ValidationGate.REQUIREMENTS))
+        # Compilation et audit (Slither/Mythril) doivent couvrir les contrats générés
+        architecture = SharedStep(lambda: self.execute_gate(ValidationGate.ARCHITECTURE), after=generated)
+        security = SharedStep(lambda: self.execute_gate(ValidationGate.SECURITY), after=generated)
+        
+        async def development(artifact: Artifact):
+            self.current_phase = PipelinePhase.DEVELOPMENT
+            req_validation, arch_validation = await asyncio.gather(requirements.get(), architecture.get())
+            passed = req_validation.get("passed", False) and arch_validation.get("passed", False)
+            contract_report(artifact)["stages"]["development"] = passed
+            if passed:
+                yield artifact
+        
+        async def validation(artifact: Artifact):
+            self.current_phase = PipelinePhase.VALIDATION
+            issues = self._contract_quality_issues(artifact.path) if artifact.path else []
+            sec_validation = await security.get()
+            passed = sec_validation.get("passed", False) and not issues
+            report = contract_report(artifact)
+            report["stages"]["validation"] = passed
+            report["quality_issues"] = issues
+            if passed:
+                yield artifact
+        
+        async def deployment(artifact: Artifact):
+            self.current_phase = PipelinePhase.DEPLOYMENT
+            result = await self.execute_agent(
+                "deployment_manager",
+                "prepare",
+                network=run_config.get("network", "sepolia"),
+                contract_name=artifact.name
+            )
+            run_results["agents_executed"].append(result)
+            contract_report(artifact)["stages"]["deployment"] = result.get("success", False)
+            yield Artifact("deployment", artifact.name, artifact.path, result)
+        
+        dag = (StreamingDAG()
+               .add_source("conception", conception)
+               .add_stage("development", development, ["conception"], concurrency=concurrency)
+               .add_stage("validation", validation, ["development"], concurrency=concurrency)
+               .add_stage("deployment", deployment, ["validation"], concurrency=concurrency))
+        
+        try:
+            await dag.run()
+        except Exception as e:
+            run_results["success"] = False
+            run_results["error"] = str(e)
+            logger.error(f"❌ Erreur pipeline complet: {e}")
+        
+        for step in (requirements, architecture, security):
+            if step.result() is not None:
+                run_results["validations"].append(step.result())
+        
+        run_results["stages"] = {
+            name: {
+                "processed": stats.processed,
+                "produced": stats.produced,
+                "first_output_s": stats.first_output_at,
+                "finished_s": stats.finished_at,
+                "errors": stats.errors
+            }
+            for name, stats in dag.stats.items()
+        }
+        if any(stats.errors for stats in dag.stats.values()):
+            run_results["success"] = False
+        if any(not all(report["stages"].values()) or len(report["stages"]) < 3
+               for report in run_results["contracts"].values()):
+            run_results["success"] = False
+        
+        run_results["end_time"] = datetime.now().isoformat()
+        run_results["duration"] = (
+            datetime.fromisoformat(run_results["end_time"]) -
+            datetime.fromisoformat(run_results["start_time"])
+        ).total_seconds()
+        
+        self._save_run_report(run_results)
+        if self.checkpoints is not None:
+            run_results["run_id"] = self.checkpoints.run_id
+            self.checkpoints.mark_phase("run", run_results["success"])
+        
+        self.current_phase = None
+        self.is_running = False
+        
+        logger.info(f"✅ Pipeline complet terminé: {'SUCCÈS' if run_results['success'] else 'ÉCHEC'}")
+        
+        return run_results
+    
+    def _save_run_report(self, results: Dict[str, Any]):
+        """Sauvegarde le rapport d'une exécution complète"""
+        reports_dir = self.project_root / "reports" / "phases"
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._write_report(reports_dir / f"run_{timestamp}", results, indent=2)
+    
+    def _save_phase_report(self, phase: PipelinePhase, results: PhaseResult):
         """Sauvegarde le rapport de phase"""
         reports_dir = self.project_root / "reports" / "phases"
         reports_dir.mkdir(parents=True, exist_ok=True)
         
-        import json
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"phase_{phase.value}_{timestamp}.json"
-        filepath = reports_dir / filename
+        self._write_report(reports_dir / f"phase_{phase.value}_{timestamp}", results, indent=2)
+    
+    def _open_findings_report(self, gate: str):
+        """
+        Rapport en flux des constats d'une gate (pipeline.report_codec.ReportWriter)
+        
+        Format configuré, sauf json (document unique gardé en mémoire jusqu'à la
+        fin) remplacé par jsonl.
+        """
+        from pipeline.report_codec import ReportWriter, report_path
         
-        with open(filepath, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+        settings = self.config.reports
+        format = "jsonl" if settings.format == "json" else settings.format
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = self.project_root / "reports" / "validations" / f"findings_{gate}_{timestamp}"
+        return ReportWriter(report_path(base, format, self.report_compression), format,
+                            self.report_compression, settings.level)
+    
+    def _write_report(self, base: Path, report: Any, indent: Optional[int] = None) -> Path:
+        """
+        Écrit un rapport au format configuré (reports.format, reports.compression)
+        
+        Args:
+            base: Chemin sans extension
+            indent: Indentation du format json non compressé (rapports de phase lus à la main)
+        """
+        from pipeline.report_codec import write_report
+        
+        settings = self.config.reports
+        return write_report(base, report, settings.format, self.report_compression, settings.level,
+                            indent=indent if self.report_compression is None else None)
     
     async def watch_mode(self):
         """Mode surveillance de fichiers"""
@@ -623,6 +1143,9 @@ class Web3PipelineOrchestrator:
         logger.info("   Surveillance des modifications de fichiers...")
         logger.info("   Ctrl+C pour arrêter")
         
+        # Les événements watchdog arrivent sur un autre thread que la boucle
+        loop = asyncio.get_running_loop()
+        
         class PipelineFileHandler(FileSystemEventHandler):
             def __init__(self, orchestrator):
                 self.orchestrator = orchestrator
@@ -642,24 +1165,38 @@ class Web3PipelineOrchestrator:
                     
                     # Déclencher des actions basées sur le type de fichier
                     if event.src_path.endswith('.sol'):
-                        asyncio.create_task(self._handle_solidity_change(event.src_path))
-                    elif event.src_path.endswith('.js'):
-                        asyncio.create_task(self._handle_javascript_change(event.src_path))
+                        asyncio.run_coroutine_threadsafe(self._handle_solidity_change(event.src_path), loop)
+                    elif event.src_path.endswith(('.js', '.mjs', '.cjs', '.ts')):
+                        asyncio.run_coroutine_threadsafe(self._handle_javascript_change(event.src_path), loop)
             
             async def _handle_solidity_change(self, filepath):
                 """Gère les modifications de fichiers Solidity"""
                 logger.info(f"   → Validation du contrat: {Path(filepath).name}")
+                self.orchestrator.take_snapshot()
                 
                 # Exécuter la validation sécurité
                 validation = await self.orchestrator.run_validation_gate(ValidationGate.SECURITY)
                 
                 if not validation.get("passed", False):
                     logger.warning(f"   ⚠️  Problèmes de sécurité détectés")
+                
+                await self._run_affected_tests(filepath)
             
             async def _handle_javascript_change(self, filepath):
-                """Gère les modifications de fichiers JavaScript"""
-                if "test" in filepath:
-                    logger.info(f"   → Tests modifiés, revalidation suggérée")
+                """Gère les modifications de fichiers JavaScript: relance des tests concernés"""
+                tests_dir = self.orchestrator.project_root / self.orchestrator.config.tests.dir
+                if tests_dir.resolve() in Path(filepath).resolve().parents:
+                    logger.info(f"   → Tests modifiés: {Path(filepath).name}")
+                    await self._run_affected_tests(filepath)
+            
+            async def _run_affected_tests(self, filepath):
+                result = await self.orchestrator._validate_tests(changed=[Path(filepath)])
+                if result.get("skipped") or not result.get("selected"):
+                    return
+                if result.get("passed", False):
+                    logger.info(f"   ✅ {result['tests_passed']} test(s) OK ({result['selected']} fichier(s))")
+                else:
+                    logger.warning(f"   ❌ {result.get('tests_failed', 0)} test(s) en échec")
         
         event_handler = PipelineFileHandler(self)
         observer = Observer()
@@ -700,15 +1237,15 @@ class Web3PipelineOrchestrator:
                     AgentStatus.SUCCESS: "🟢",
                     AgentStatus.FAILED: "🔴",
                     AgentStatus.DISABLED: "⚫"
-                }.get(agent["status"], "❓")
+                }.get(agent.status, "❓")
                 
-                print(f"  {status_icon} {agent['name']:20} {agent['status'].value}")
+                print(f"  {status_icon} {agent.title:20} {agent.status.value}")
             
             # Validations
             print("\n🔍 VALIDATIONS:")
             for gate in ValidationGate:
-                status = self.validation_gates.get(gate)
-                icon = "🟢" if status else "🔴" if status is False else "⚪"
+                result = self.validation_gates.get(gate)
+                icon = "⚪" if result is None else "🟢" if result.passed else "🔴"
                 print(f"  {icon} {gate.value.replace('_', ' ').title():20}")
             
             # Phase courante
@@ -732,25 +1269,26 @@ class Web3PipelineOrchestrator:
         # Agents
         print(f"\n🤖 Agents ({len(self.agents)}):")
         for agent_name, agent in self.agents.items():
-            enabled = agent['config'].get('enabled', False)
-            status = agent['status'].value
-            last_run = agent['last_run'][:19] if agent['last_run'] else 'Jamais'
+            status = agent.status.value
+            last_run = agent.last_run[:19] if agent.last_run_ns is not None else 'Jamais'
             
-            print(f"  • {agent['name']:25} {'✅' if enabled else '❌'} {status:10} {last_run}")
+            print(f"  • {agent.title:25} {'✅' if agent.enabled else '❌'} {status:10} {last_run:19} "
+                  f"[{agent.spec.cost}] {', '.join(agent.spec.task_names)}")
         
         # Validations
         print(f"\n🔍 Validations:")
-        passed = sum(1 for v in self.validation_gates.values() if v)
+        passed = sum(1 for result in self.validation_gates.values() if result.passed)
         total = len(self.validation_gates)
         print(f"  Portes passées: {passed}/{total}")
         
-        for gate, status in self.validation_gates.items():
-            icon = "✅" if status else "❌" if status is False else "⚪"
+        for gate, result in self.validation_gates.items():
+            icon = "✅" if result.passed else "❌"
             print(f"  {icon} {gate.value.replace('_', ' ').title()}")
         
         # Commandes disponibles
         print("\n🎯 Commandes disponibles:")
         print("  python pipeline/orchestrator.py --mode watch     # Mode surveillance")
+        print("  python pipeline/orchestrator.py --mode run       # Pipeline complet")
         print("  python pipeline/orchestrator.py --phase develop  # Phase développement")
         print("  python pipeline/orchestrator.py --validate       # Validation complète")
         print("  python pipeline/orchestrator.py --agent generate # Exécuter un agent")
@@ -765,14 +1303,23 @@ async def main():
     
     parser = argparse.ArgumentParser(description="Orchestrateur du Pipeline IA Web3")
     parser.add_argument("--project", "-p", default=".", help="Chemin du projet")
-    parser.add_argument("--mode", "-m", choices=["watch", "validate", "run"], default="watch",
-                       help="Mode d'exécution")
+    parser.add_argument("--mode", "-m", choices=["watch", "validate", "run", "worker", "broker"],
+                       default="watch", help="Mode d'exécution")
     parser.add_argument("--phase", choices=[p.value for p in PipelinePhase],
                        help="Phase spécifique à exécuter")
     parser.add_argument("--agent", help="Agent spécifique à exécuter")
     parser.add_argument("--task", help="Tâche pour l'agent")
     parser.add_argument("--gate", choices=[g.value for g in ValidationGate],
                        help="Porte de validation à exécuter")
+    parser.add_argument("--broker", help="Broker de jobs distribués (sqlite:///cache/broker.db, tcp://hôte:7341)")
+    parser.add_argument("--max-jobs", type=int, help="Nombre de jobs avant arrêt du worker")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                       help="Reprendre une exécution en sautant les étapes inchangées")
+    parser.add_argument("--config", "-c", metavar="FICHIER",
+                       help="Configuration JSON ou YAML (par défaut: $PIPELINE_CONFIG, puis config/pipeline_config.*, "
+                            "puis Architecture/CONFIGURATION DU PIPELINE COMPLET.yaml)")
+    parser.add_argument("--since", metavar="GIT_REF",
+                       help="Limiter les gates aux fichiers et lignes modifiés depuis cette référence git")
     parser.add_argument("--verbose", "-v", action="store_true", help="Mode verbeux")
     
     args = parser.parse_args()
@@ -788,10 +1335,64 @@ async def main():
         return 1
     
     # Initialiser l'orchestrateur
-    orchestrator = Web3PipelineOrchestrator(project_root)
+    from pipeline.config import ConfigError
+    
+    try:
+        orchestrator = Web3PipelineOrchestrator(project_root, Path(args.config).resolve() if args.config else None)
+    except ConfigError as e:
+        print(f"❌ {e}")
+        return 1
+    
+    if args.broker and args.mode != "broker":
+        orchestrator.connect_broker(args.broker)
+    
+    # Validation incrémentale: seuls les changements depuis la référence sont analysés
+    if args.since:
+        try:
+            await orchestrator.enable_diff_scope(args.since)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        scope = orchestrator.diff_scope
+        print(f"🔀 Depuis {args.since}: {len(scope.files)} fichier(s) modifié(s), {len(scope.deleted)} supprimé(s)")
+    
+    # Secrets bloquants affichés dès qu'ils sont trouvés, sans attendre la fin de l'analyse
+    if args.mode == "validate" or args.gate == ValidationGate.SECURITY.value:
+        from pipeline.findings import print_findings
+        orchestrator.on_finding = print_findings(minimum=orchestrator.config.secrets.fail_on)
+    
+    # Checkpoints des étapes pour les exécutions ponctuelles (reprise avec --resume)
+    one_shot = args.mode in ("validate", "run") or args.phase or args.agent or args.gate
+    if args.resume or (one_shot and args.mode not in ("worker", "broker")
+                       and orchestrator.config.checkpoints.enabled):
+        try:
+            orchestrator.enable_checkpoints(run_id=args.resume, resume=bool(args.resume))
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"💾 Exécution: {orchestrator.checkpoints.run_id} (reprise: --resume {orchestrator.checkpoints.run_id})")
     
     try:
-        if args.mode == "watch":
+        if args.mode == "broker":
+            # Serveur de jobs pour les workers distants
+            from urllib.parse import urlparse
+            from pipeline.distributed import BrokerServer, SQLiteBroker
+            
+            listen = urlparse(args.broker or "tcp://0.0.0.0:7341")
+            backend = SQLiteBroker(
+                project_root / "cache" / "broker.db",
+                max_attempts=orchestrator.config.distributed.max_attempts
+            )
+            await BrokerServer(backend, listen.hostname or "0.0.0.0", listen.port or 7341).serve_forever()
+            
+        elif args.mode == "worker":
+            # Worker exécutant les jobs du broker
+            if orchestrator.broker is None:
+                print("❌ Spécifiez un broker avec --broker")
+                return 1
+            await orchestrator.run_worker(max_jobs=args.max_jobs)
+            
+        elif args.mode == "watch" and not (args.phase or args.agent or args.gate):
             # Mode surveillance
             orchestrator.print_status()
             await orchestrator.watch_mode()
@@ -804,13 +1405,13 @@ async def main():
                 ValidationGate.REQUIREMENTS,
                 ValidationGate.ARCHITECTURE,
                 ValidationGate.SECURITY,
-                ValidationGate.CODE_QUALITY
+                ValidationGate.CODE_QUALITY,
+                ValidationGate.TESTS
             ]
             
             all_passed = True
-            for gate in gates_to_run:
-                result = await orchestrator.run_validation_gate(gate)
-                
+            results = await orchestrator.run_gates(gates_to_run)
+            for gate, result in zip(gates_to_run, results):
                 icon = "✅" if result.get("passed", False) else "❌"
                 print(f"{icon} {gate.value.replace('_', ' ').title():20} ", end="")
                 
@@ -820,6 +1421,8 @@ async def main():
                         print(f"- {result['error']}")
                     elif "missing_files" in result:
                         print(f"- Fichiers manquants: {len(result['missing_files'])}")
+                    elif result.get("tests_failed"):
+                        print(f"- {result['tests_failed']} test(s) en échec")
                 else:
                     print(f"- OK")
             
@@ -828,22 +1431,40 @@ async def main():
             else:
                 print("\n⚠️  Certaines validations ont échoué")
             
+        elif args.mode == "run":
+            # Pipeline complet en flux
+            print("🚀 Exécution complète du pipeline...")
+            result = await orchestrator.run_full_pipeline()
+            
+            for name, contract in result["contracts"].items():
+                stages = contract["stages"]
+                icon = "✅" if len(stages) == 3 and all(stages.values()) else "❌"
+                progress = " → ".join(f"{stage}{'✓' if ok else '✗'}" for stage, ok in stages.items())
+                print(f"{icon} {name:25} {progress}")
+            
+            if result.get("success", False):
+                print(f"\n🎉 Pipeline terminé avec succès ({result['duration']:.1f}s)")
+            else:
+                print(f"\n⚠️  Pipeline terminé avec des échecs ({result['duration']:.1f}s)")
+                if "error" in result:
+                    print(f"   Erreur: {result['error']}")
+            
         elif args.phase:
             # Exécuter une phase spécifique
             phase = PipelinePhase(args.phase)
             result = await orchestrator.run_pipeline_phase(phase)
             
-            if result.get("success", False):
-                print(f"✅ Phase {phase.value} terminée avec succès")
+            if result.success:
+                print(f"✅ Phase {phase.value} terminée avec succès ({result.duration:.1f}s)")
             else:
                 print(f"❌ Phase {phase.value} a échoué")
-                if "error" in result:
-                    print(f"   Erreur: {result['error']}")
+                if result.error:
+                    print(f"   Erreur: {result.error}")
         
         elif args.agent:
             # Exécuter un agent spécifique
             if args.task:
-                result = await orchestrator.run_agent(args.agent, args.task)
+                result = await orchestrator.execute_agent(args.agent, args.task)
                 
                 if result.get("success", False):
                     print(f"✅ Agent {args.agent} exécuté avec succès")
@@ -857,7 +1478,7 @@ async def main():
         elif args.gate:
             # Exécuter une porte de validation
             gate = ValidationGate(args.gate)
-            result = await orchestrator.run_validation_gate(gate)
+            result = await orchestrator.execute_gate(gate)
             
             icon = "✅" if result.get("passed", False) else "❌"
             print(f"{icon} {gate.value.replace('_', ' ').title()}")
@@ -880,6 +1501,10 @@ async def main():
         import traceback
         traceback.print_exc()
         return 1
+    finally:
+        # Fermer le pool de connexions LLM s'il a été utilisé
+        if "agents.llm.client" in sys.modules:
+            await sys.modules["agents.llm.client"].close_providers()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,332 @@
+"""
+Registre des agents du pipeline
+
+Un agent se déclare avec le décorateur `register_agent` (sur sa classe ou sur
+sa fonction `run`) ou par un point d'entrée `devpipeline.agents` d'un paquet
+installé. Les fichiers agents/**/*.py sont découverts par analyse syntaxique
+(ast), sans être importés: le nom, les tâches, les entrées/sorties et la
+classe de coût sont lus dans les arguments littéraux du décorateur. Le
+module d'un agent n'est importé, et sa classe instanciée, qu'à sa première
+exécution.
+"""
+import ast
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import sys
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "devpipeline.agents"
+DECORATOR = "register_agent"
+# Analyse statique en processus / outils externes ou EVM / LLM ou exécution symbolique
+COST_CLASSES = ("cheap", "moderate", "expensive")
+# Agents livrés avec le pipeline (utilisables sur un projet qui n'en a pas)
+BUILTIN_AGENTS_DIR = Path(__file__).resolve().parent.parent / "agents"
+DEFAULT_CACHE = Path("cache") / "agents" / "registry.json"
+
+
+def register_agent(name: str, *, tasks: Union[Sequence[str], Mapping[str, str]] = ("run",),
+                   inputs: Sequence[str] = (), outputs: Sequence[str] = (), cost: str = "moderate",
+                   description: str = "") -> Callable:
+    """
+    Déclare un agent (arguments littéraux: ils sont lus sans importer le module)
+
+    Args:
+        name: Nom de l'agent dans le pipeline
+        tasks: Tâches acceptées; pour une classe, tâche -> méthode appelée
+        inputs: Arguments attendus (kwargs de run_agent)
+        outputs: Clés produites dans le résultat
+        cost: Classe de coût ("cheap", "moderate", "expensive")
+        description: Description courte
+    """
+    if cost not in COST_CLASSES:
+        raise ValueError(f"Classe de coût inconnue: {cost} ({', '.join(COST_CLASSES)})")
+
+    def decorator(target):
+        target.__agent_spec__ = {"name": name, "tasks": tasks, "inputs": tuple(inputs),
+                                 "outputs": tuple(outputs), "cost": cost, "description": description}
+        return target
+
+    return decorator
+
+
+@dataclass(frozen=True, slots=True)
+class AgentSpec:
+    """Déclaration d'un agent, connue sans importer son module"""
+    name: str
+    module: str
+    target: str
+    kind: str  # "class" ou "function"
+    tasks: Tuple[Tuple[str, str], ...] = ()
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    cost: str = "moderate"
+    description: str = ""
+    path: Optional[str] = None
+    source: str = "decorator"
+
+    @property
+    def task_names(self) -> List[str]:
+        return [task for task, _ in self.tasks]
+
+    def method(self, task: str) -> Optional[str]:
+        return dict(self.tasks).get(task)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "module": self.module, "target": self.target, "kind": self.kind,
+                "tasks": self.task_names, "inputs": list(self.inputs), "outputs": list(self.outputs),
+                "cost": self.cost, "description": self.description, "source": self.source}
+
+
+def _normalize_tasks(tasks: Union[Sequence[str], Mapping[str, str]]) -> Tuple[Tuple[str, str], ...]:
+    if isinstance(tasks, Mapping):
+        return tuple((str(task), str(method)) for task, method in tasks.items())
+    return tuple((str(task), str(task)) for task in tasks)
+
+
+def _module_name(path: Path, agents_dir: Path) -> str:
+    relative = path.relative_to(agents_dir.parent).with_suffix("")
+    return ".".join(relative.parts)
+
+
+def scan_file(path: Path, agents_dir: Path) -> List[AgentSpec]:
+    """Agents déclarés dans un fichier (décorateurs register_agent à arguments littéraux)"""
+    try:
+        source = path.read_bytes()
+    except OSError:
+        return []
+    # Préfiltre: la grande majorité des fichiers n'est jamais analysée
+    if DECORATOR.encode("ascii") not in source:
+        return []
+    try:
+        tree = ast.parse(source, filename=str(path))
+    except SyntaxError as e:
+        logger.warning(f"⚠️  {path.name}: syntaxe invalide, agents ignorés ({e.msg})")
+        return []
+
+    specs = []
+    for node in tree.body:
+        if not isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            if not (isinstance(decorator, ast.Call) and getattr(decorator.func, "id", None) == DECORATOR):
+                continue
+            try:
+                args = [ast.literal_eval(arg) for arg in decorator.args]
+                kwargs = {kw.arg: ast.literal_eval(kw.value) for kw in decorator.keywords}
+            except ValueError:
+                logger.warning(f"⚠️  {path.name}:{decorator.lineno}: arguments de {DECORATOR} non littéraux")
+                continue
+            name = args[0] if args else kwargs.pop("name", None)
+            if not name:
+                continue
+            specs.append(AgentSpec(
+                name=name,
+                module=_module_name(path, agents_dir),
+                target=node.name,
+                kind="class" if isinstance(node, ast.ClassDef) else "function",
+                tasks=_normalize_tasks(kwargs.get("tasks", ("run",))),
+                inputs=tuple(kwargs.get("inputs", ())),
+                outputs=tuple(kwargs.get("outputs", ())),
+                cost=kwargs.get("cost", "moderate"),
+                description=kwargs.get("description", ""),
+                path=str(path)
+            ))
+    return specs
+
+
+def discover_directory(agents_dir: Path, cache: Optional[Dict[str, Any]] = None) -> List[AgentSpec]:
+    """
+    Agents déclarés dans agents/**/*.py
+
+    Args:
+        agents_dir: Dossier des agents
+        cache: Déclarations par fichier {chemin: [taille, date, specs]}, mis à jour sur place;
+            un fichier inchangé n'est pas relu
+    """
+    agents_dir = Path(agents_dir)
+    if not agents_dir.is_dir():
+        return []
+    specs = []
+    for path in sorted(agents_dir.rglob("*.py")):
+        if "__pycache__" in path.parts:
+            continue
+        if cache is None:
+            specs.extend(scan_file(path, agents_dir))
+            continue
+        stat = os.stat(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        entry = cache.get(str(path))
+        if entry is None or entry[:2] != signature:
+            entry = signature + [[asdict(spec) for spec in scan_file(path, agents_dir)]]
+            cache[str(path)] = entry
+        specs.extend(AgentSpec(**{**data, "tasks": tuple(tuple(task) for task in data["tasks"]),
+                                  "inputs": tuple(data["inputs"]), "outputs": tuple(data["outputs"])})
+                     for data in entry[2])
+    return specs
+
+
+def discover_entry_points(group: str = ENTRY_POINT_GROUP) -> List[AgentSpec]:
+    """Agents publiés par des paquets installés (métadonnées complétées au chargement)"""
+    from importlib.metadata import entry_points
+
+    try:
+        found = entry_points(group=group)
+    except Exception as e:
+        logger.warning(f"⚠️  Points d'entrée {group} illisibles: {e}")
+        return []
+    return [AgentSpec(name=ep.name, module=ep.module, target=ep.attr or "run",
+                      kind="unknown", source="entry_point") for ep in found]
+
+
+class AgentRegistry:
+    """Agents déclarés, importés et instanciés à la première utilisation"""
+
+    def __init__(self, directories: Iterable[Path] = (), entry_points: bool = True,
+                 cache_path: Optional[Path] = None):
+        """
+        Args:
+            directories: Dossiers agents/ à analyser (le premier qui déclare un nom l'emporte)
+            entry_points: Inclure les agents des paquets installés
+            cache_path: Cache des déclarations par fichier (évite de réanalyser les fichiers inchangés)
+        """
+        self.specs: Dict[str, AgentSpec] = {}
+        self._targets: Dict[str, Any] = {}
+        self._instances: Dict[str, Any] = {}
+        cache = self._load_cache(cache_path)
+        before = json.dumps(cache, sort_keys=True) if cache is not None else None
+        seen = set()
+        for directory in directories:
+            directory = Path(directory).resolve()
+            if directory in seen:
+                continue
+            seen.add(directory)
+            for spec in discover_directory(directory, cache):
+                self.add(spec)
+        if cache is not None and json.dumps(cache, sort_keys=True) != before:
+            self._save_cache(cache_path, cache)
+        if entry_points:
+            for spec in discover_entry_points():
+                self.add(spec)
+
+    @staticmethod
+    def _load_cache(cache_path: Optional[Path]) -> Optional[Dict[str, Any]]:
+        if cache_path is None:
+            return None
+        try:
+            return json.loads(Path(cache_path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_cache(cache_path: Path, cache: Dict[str, Any]):
+        try:
+            Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+            tmp = Path(cache_path).with_suffix(".tmp")
+            tmp.write_text(json.dumps(cache), encoding="utf-8")
+            os.replace(tmp, cache_path)
+        except OSError as e:
+            logger.debug(f"Cache du registre non écrit: {e}")
+
+    def add(self, spec: AgentSpec):
+        if spec.name in self.specs:
+            logger.debug(f"Agent {spec.name} déjà déclaré par {self.specs[spec.name].module}, "
+                         f"{spec.module} ignoré")
+            return
+        self.specs[spec.name] = spec
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.specs
+
+    def get(self, name: str) -> Optional[AgentSpec]:
+        return self.specs.get(name)
+
+    @property
+    def loaded(self) -> List[str]:
+        """Agents dont le module a été importé"""
+        return list(self._targets)
+
+    def _import(self, spec: AgentSpec):
+        if spec.module in sys.modules:
+            return sys.modules[spec.module]
+        if spec.path is None:
+            return importlib.import_module(spec.module)
+        module_spec = importlib.util.spec_from_file_location(spec.module, spec.path)
+        module = importlib.util.module_from_spec(module_spec)
+        # Enregistré avant exécution: les imports croisés entre agents réutilisent ce module
+        sys.modules[spec.module] = module
+        try:
+            module_spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[spec.module]
+            raise
+        return module
+
+    def load(self, name: str) -> Any:
+        """
+        Classe ou fonction de l'agent (module importé au premier appel)
+
+        Raises:
+            KeyError: Agent inconnu
+            FileNotFoundError: Fichier de l'agent disparu depuis la découverte
+        """
+        if name in self._targets:
+            return self._targets[name]
+        spec = self.specs[name]
+        if spec.path is not None and not Path(spec.path).exists():
+            raise FileNotFoundError(spec.path)
+        target = getattr(self._import(spec), spec.target)
+        if spec.source == "entry_point":
+            # Métadonnées déclarées par le décorateur, connues seulement après import
+            declared = getattr(target, "__agent_spec__", {})
+            self.specs[name] = AgentSpec(
+                name=name, module=spec.module, target=spec.target,
+                kind="class" if isinstance(target, type) else "function",
+                tasks=_normalize_tasks(declared.get("tasks", ("run",))),
+                inputs=tuple(declared.get("inputs", ())), outputs=tuple(declared.get("outputs", ())),
+                cost=declared.get("cost", "moderate"), description=declared.get("description", ""),
+                source="entry_point"
+            )
+        self._targets[name] = target
+        logger.debug(f"Agent {name} chargé ({spec.module}.{spec.target})")
+        return target
+
+    def instance(self, name: str) -> Any:
+        """Instance unique d'un agent déclaré sur une classe"""
+        if name not in self._instances:
+            self._instances[name] = self.load(name)()
+        return self._instances[name]
+
+    async def run(self, name: str, task: str, config: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+        """
+        Exécute une tâche d'un agent
+
+        Une fonction déclarée reçoit (task, config=..., **kwargs) comme les points
+        d'entrée run() existants. Pour une classe, la méthode associée à la tâche
+        est appelée avec les kwargs dans un thread (agents synchrones).
+        """
+        target = self.load(name)
+        spec = self.specs[name]
+        if spec.kind == "function":
+            return await target(task, config=config or {}, **kwargs)
+
+        method = spec.method(task)
+        if method is None:
+            return {"success": False, "agent": name,
+                    "error": f"Tâche inconnue: {task} ({', '.join(spec.task_names)})"}
+        instance = self.instance(name)
+        result = await asyncio.to_thread(getattr(instance, method), **kwargs)
+        return {
+            "success": True,
+            "agent": name,
+            "task": task,
+            "result": result,
+            "timestamp": datetime.now().isoformat()
+        }
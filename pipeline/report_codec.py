@@ -0,0 +1,412 @@
+"""
+Encodage des rapports du pipeline (JSON compact, JSON lines, binaire)
+
+Formats:
+- json: document JSON compact unique, lisible par n'importe quel outil
+- jsonl: une ligne d'en-tête puis une ligne par enregistrement
+- binary: trames préfixées par leur longueur (uint32), charge utile msgpack
+  quand le paquet est installé, JSON compact sinon
+
+Chaque format peut être compressé en gzip (bibliothèque standard) ou zstd
+(paquet `zstandard`), ce qui ajoute .gz / .zst à l'extension.
+
+Un rapport est découpé en en-tête et enregistrements: les listes de plus de
+STREAM_MIN_ITEMS éléments (constats, fichiers, contrôles) sont sorties de
+l'en-tête et écrites élément par élément sous une section (chemin de clés,
+par ex. ("issues",) ou ("secrets", "findings")). `iter_records` relit les
+formats jsonl et binary en flux, sans charger le fichier; `read_report`
+reconstruit le rapport complet.
+
+Usage:
+    python pipeline/report_codec.py reports/validations/validation_security_xxx.dpr.zst
+    python pipeline/report_codec.py RAPPORT --section issues --limit 20
+"""
+import argparse
+import gzip
+import io
+import json
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Any, BinaryIO, Iterator, List, Optional, Sequence, Tuple
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipeline.models import encode
+
+# Format -> extension
+FORMATS = {"json": ".json", "jsonl": ".jsonl", "binary": ".dpr"}
+# Compression -> extension ajoutée
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+
+# Listes plus courtes conservées dans l'en-tête
+STREAM_MIN_ITEMS = 16
+
+VERSION = 1
+MAGIC = b"DPR"
+# Trames du format binaire: en-tête, début de section, enregistrement
+FRAME_HEADER, FRAME_SECTION, FRAME_RECORD = b"H", b"S", b"R"
+_LENGTH = struct.Struct("<I")
+
+Section = Tuple[str, ...]
+
+
+class CodecUnavailable(RuntimeError):
+    """Compression demandée sans le paquet correspondant"""
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise CodecUnavailable("compression zstd indisponible (pip install zstandard)") from None
+    return zstandard
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+
+def available_compressions() -> List[str]:
+    """Compressions utilisables dans cet environnement"""
+    available = ["gzip"]
+    try:
+        _zstandard()
+        available.append("zstd")
+    except CodecUnavailable:
+        pass
+    return available
+
+
+def report_path(base: Path, format: str = "json", compression: Optional[str] = None) -> Path:
+    """Chemin du rapport `base` (sans extension) dans le format demandé"""
+    if format not in FORMATS:
+        raise ValueError(f"format de rapport inconnu: {format} (choix: {', '.join(FORMATS)})")
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"compression inconnue: {compression} (choix: {', '.join(COMPRESSIONS)})")
+    base = Path(base)
+    return base.with_name(base.name + FORMATS[format] + (COMPRESSIONS[compression] if compression else ""))
+
+
+def detect(path: Path) -> Tuple[str, Optional[str]]:
+    """Format et compression d'un rapport d'après son extension"""
+    suffixes = Path(path).suffixes
+    compression = None
+    for name, extension in COMPRESSIONS.items():
+        if suffixes and suffixes[-1] == extension:
+            compression = name
+            suffixes = suffixes[:-1]
+    for name, extension in FORMATS.items():
+        if suffixes and suffixes[-1] == extension:
+            return name, compression
+    raise ValueError(f"format de rapport non reconnu: {path}")
+
+
+def _open_write(path: Path, compression: Optional[str], level: Optional[int]) -> BinaryIO:
+    level = level if level is not None else DEFAULT_LEVELS.get(compression)
+    if compression == "gzip":
+        return gzip.open(path, "wb", compresslevel=level)
+    if compression == "zstd":
+        compressor = _zstandard().ZstdCompressor(level=level)
+        return compressor.stream_writer(open(path, "wb"))
+    return open(path, "wb", buffering=1024 * 1024)
+
+
+def _open_read(path: Path, compression: Optional[str]) -> BinaryIO:
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "zstd":
+        reader = _zstandard().ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.BufferedReader(reader, buffer_size=1024 * 1024)
+    return open(path, "rb", buffering=1024 * 1024)
+
+
+# Encodeur partagé: json.dumps en recrée un à chaque appel dès qu'une option est passée
+_ENCODER = json.JSONEncoder(default=encode, separators=(",", ":"), ensure_ascii=False)
+
+
+def _json_bytes(value: Any) -> bytes:
+    return _ENCODER.encode(value).encode("utf-8")
+
+
+def split(report: Any, min_items: int = STREAM_MIN_ITEMS) -> Tuple[Dict[str, Any], List[Tuple[Section, list]]]:
+    """
+    Sépare un rapport en en-tête et listes à écrire en flux
+
+    Les modèles (GateResult, PhaseResult...) sont convertis par `to_dict`;
+    seules les listes rangées dans des dicts sont extraites.
+    """
+    sections: List[Tuple[Section, list]] = []
+
+    def walk(value: Any, section: Section) -> Any:
+        to_dict = getattr(value, "to_dict", None)
+        if to_dict is not None:
+            value = to_dict()
+        if not isinstance(value, dict):
+            return value
+        header = {}
+        for key, item in value.items():
+            key = str(key)
+            to_dict = getattr(item, "to_dict", None)
+            if to_dict is not None:
+                item = to_dict()
+            if isinstance(item, dict):
+                header[key] = walk(item, section + (key,))
+            elif isinstance(item, (list, tuple)) and len(item) >= min_items:
+                sections.append((section + (key,), item))
+            else:
+                header[key] = item
+        return header
+
+    header = walk(report, ())
+    if not isinstance(header, dict):
+        header = {"value": header}
+    return header, sections
+
+
+def merge(header: Dict[str, Any], section: Sequence[str], item: Any):
+    """Replace un enregistrement dans l'en-tête (inverse de `split`)"""
+    target = header
+    for key in section[:-1]:
+        target = target.setdefault(key, {})
+    target.setdefault(section[-1], []).append(item)
+
+
+class ReportWriter:
+    """
+    Écriture d'un rapport en flux: `header` une fois, puis `record` par élément
+
+    Les formats jsonl et binary écrivent chaque enregistrement immédiatement
+    (mémoire constante); le format json les garde jusqu'à `close` pour
+    produire un document unique.
+    """
+
+    def __init__(self, path: Path, format: str = "json", compression: Optional[str] = None,
+                 level: Optional[int] = None):
+        self.path = Path(path)
+        self.format = format
+        self.compression = compression
+        self.records = 0
+        self._section: Optional[Section] = None
+        self._header: Optional[Dict[str, Any]] = None
+        self._msgpack = _msgpack() if format == "binary" else None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = _open_write(self.path, compression, level)
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _pack(self, value: Any) -> bytes:
+        if self._msgpack is not None:
+            return self._msgpack.packb(value, default=encode, use_bin_type=True)
+        return _json_bytes(value)
+
+    def _frame(self, kind: bytes, value: Any):
+        payload = self._pack(value)
+        self._file.write(_LENGTH.pack(len(payload)) + kind + payload)
+
+    def header(self, header: Dict[str, Any]):
+        if self.format == "json":
+            self._header = header
+        elif self.format == "jsonl":
+            self._file.write(_json_bytes({"format": "devpipeline-report", "version": VERSION,
+                                          "header": header}) + b"\n")
+        else:
+            self._file.write(MAGIC + bytes([VERSION]) + (b"m" if self._msgpack is not None else b"j"))
+            self._frame(FRAME_HEADER, header)
+
+    def record(self, section: Sequence[str], item: Any):
+        """Ajoute un élément à la liste `section` du rapport"""
+        section = tuple(section)
+        self.records += 1
+        if self.format == "json":
+            merge(self._header, section, item)
+            return
+        if section != self._section:
+            self._section = section
+            if self.format == "jsonl":
+                self._file.write(_json_bytes({"section": list(section)}) + b"\n")
+            else:
+                self._frame(FRAME_SECTION, list(section))
+        if self.format == "jsonl":
+            self._file.write(_json_bytes([item]) + b"\n")
+        else:
+            self._frame(FRAME_RECORD, item)
+
+    def close(self):
+        if self._file is None:
+            return
+        if self.format == "json":
+            self._file.write(_json_bytes(self._header or {}))
+        self._file.close()
+        self._file = None
+
+
+def write_report(base: Path, report: Any, format: str = "json", compression: Optional[str] = None,
+                 level: Optional[int] = None, indent: Optional[int] = None) -> Path:
+    """
+    Écrit un rapport complet
+
+    Args:
+        base: Chemin sans extension (reports/validations/validation_security_20250101_120000)
+        report: Dict ou modèle (GateResult, PhaseResult...)
+        indent: Indentation du format json (compact par défaut)
+
+    Returns:
+        Chemin du fichier écrit (extension du format et de la compression)
+    """
+    path = report_path(base, format, compression)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if format == "json":
+        with _open_write(path, compression, level) as f:
+            if indent:
+                f.write(json.dumps(report, default=encode, indent=indent, ensure_ascii=False).encode("utf-8"))
+            else:
+                f.write(_json_bytes(report))
+        return path
+
+    header, sections = split(report)
+    with ReportWriter(path, format, compression, level) as writer:
+        writer.header(header)
+        for section, items in sections:
+            for item in items:
+                writer.record(section, item)
+    return path
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    while len(data) < size:
+        chunk = f.read(size - len(data))
+        if not chunk:
+            raise ValueError("rapport binaire tronqué")
+        data += chunk
+    return data
+
+
+def _iter_binary(f: BinaryIO) -> Iterator[Tuple[bytes, Any]]:
+    preamble = f.read(len(MAGIC) + 2)
+    if len(preamble) < len(MAGIC) + 2 or not preamble.startswith(MAGIC):
+        raise ValueError("rapport binaire invalide (signature absente)")
+    if preamble[len(MAGIC)] > VERSION:
+        raise ValueError(f"rapport binaire version {preamble[len(MAGIC)]} non supportée")
+    if preamble[-1:] == b"m":
+        msgpack = _msgpack()
+        if msgpack is None:
+            raise CodecUnavailable("rapport encodé en msgpack (pip install msgpack)")
+        unpack = lambda payload: msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    else:
+        unpack = json.loads
+
+    while True:
+        prefix = f.read(_LENGTH.size + 1)
+        if not prefix:
+            return
+        if len(prefix) < _LENGTH.size + 1:
+            prefix += _read_exact(f, _LENGTH.size + 1 - len(prefix))
+        (length,) = _LENGTH.unpack_from(prefix)
+        yield prefix[-1:], unpack(_read_exact(f, length))
+
+
+def _iter_jsonl(f: BinaryIO) -> Iterator[Tuple[bytes, Any]]:
+    first = f.readline()
+    if not first:
+        raise ValueError("rapport jsonl vide")
+    yield FRAME_HEADER, json.loads(first)["header"]
+    for line in f:
+        value = json.loads(line)
+        if isinstance(value, dict):
+            yield FRAME_SECTION, value["section"]
+        else:
+            yield FRAME_RECORD, value[0]
+
+
+def _iter_frames(path: Path) -> Iterator[Tuple[bytes, Any]]:
+    format, compression = detect(path)
+    with _open_read(path, compression) as f:
+        if format == "json":
+            header, sections = split(json.load(f))
+            yield FRAME_HEADER, header
+            for section, items in sections:
+                yield FRAME_SECTION, list(section)
+                for item in items:
+                    yield FRAME_RECORD, item
+        elif format == "jsonl":
+            yield from _iter_jsonl(f)
+        else:
+            yield from _iter_binary(f)
+
+
+def read_header(path: Path) -> Dict[str, Any]:
+    """En-tête d'un rapport (sans les listes écrites en flux)"""
+    for kind, value in _iter_frames(path):
+        return value
+    return {}
+
+
+def iter_records(path: Path, section: Optional[Sequence[str]] = None) -> Iterator[Tuple[Section, Any]]:
+    """
+    Enregistrements d'un rapport, un à la fois: (section, élément)
+
+    Formats jsonl et binary lus en flux; un rapport json est chargé en entier.
+
+    Args:
+        section: Ne retourne que cette section (("issues",))
+    """
+    wanted = tuple(section) if section is not None else None
+    current: Section = ()
+    for kind, value in _iter_frames(path):
+        if kind == FRAME_SECTION:
+            current = tuple(value)
+        elif kind == FRAME_RECORD and (wanted is None or current == wanted):
+            yield current, value
+
+
+def read_report(path: Path) -> Dict[str, Any]:
+    """Rapport complet, quel que soit son format"""
+    format, compression = detect(path)
+    if format == "json":
+        with _open_read(path, compression) as f:
+            return json.load(f)
+    header: Dict[str, Any] = {}
+    current: Section = ()
+    for kind, value in _iter_frames(path):
+        if kind == FRAME_HEADER:
+            header = value
+        elif kind == FRAME_SECTION:
+            current = tuple(value)
+        else:
+            merge(header, current, value)
+    return header
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lecture en flux d'un rapport du pipeline")
+    parser.add_argument("report", type=Path, help="Rapport (.json, .jsonl, .dpr, éventuellement .gz/.zst)")
+    parser.add_argument("--section", help="Section à lister, clés séparées par des points (secrets.findings)")
+    parser.add_argument("--header", action="store_true", help="Affiche uniquement l'en-tête")
+    parser.add_argument("--limit", type=int, help="Nombre maximum d'enregistrements")
+    args = parser.parse_args()
+
+    out = sys.stdout
+    if args.header:
+        out.write(json.dumps(read_header(args.report), ensure_ascii=False, indent=2) + "\n")
+        return
+    section = tuple(args.section.split(".")) if args.section else None
+    for count, (name, item) in enumerate(iter_records(args.report, section)):
+        if args.limit is not None and count >= args.limit:
+            break
+        out.write(json.dumps({"section": ".".join(name), "record": item}, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
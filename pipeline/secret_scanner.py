@@ -0,0 +1,545 @@
+"""
+Détection de secrets dans l'arborescence du projet
+
+Parcourt tout le dépôt en respectant les règles .gitignore (racine et sous-
+dossiers), sans jamais descendre dans venv/ ou node_modules/. Les motifs (clés
+privées, mnémoniques, jetons d'API, URLs RPC avec clé) forment une seule
+expression compilée appliquée aux octets du fichier, projetés en mémoire
+(mmap) au-delà d'une certaine taille. Les valeurs génériques ne sont retenues
+que si leur entropie est élevée. Les résultats sont mis en cache par contenu:
+un fichier inchangé (taille, date) n'est pas relu, un fichier identique à un
+autre (copies de backup_*) n'est analysé qu'une fois.
+"""
+import fnmatch
+import hashlib
+import itertools
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from pipeline.models import Finding
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE = Path("cache") / "secrets" / "scan.json"
+# Dossiers jamais parcourus, quelles que soient les règles d'exclusion
+ALWAYS_SKIPPED = {".git", "node_modules", "venv", ".venv", "__pycache__"}
+# Sorties générées par Hardhat et par le pipeline (dont les rapports de ce scanner)
+DEFAULT_EXCLUDE = ["artifacts/", "cache/", "coverage/", "reports/", "logs/"]
+DEFAULT_MAX_FILE_SIZE = 64 * 1024 * 1024
+MMAP_THRESHOLD = 1024 * 1024
+BINARY_SNIFF = 8192
+# Incrémenté à chaque changement de règles pour invalider le cache
+RULES_VERSION = 3
+SEVERITY_ORDER = {"info": 0, "low": 1, "medium": 2, "high": 3}
+
+# Comptes publics de `npx hardhat node` (clé et phrase documentées, sans valeur réelle)
+PUBLIC_TEST_KEYS = {
+    "ac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80",
+    "59c6995e998f97a5a0044966f0945389dc9e86dae88c7a8412f4603b6b78690d",
+    "5de4111afa1a4b94908f83103eb1f1706367c2e68ca870fc3fb9a804cdab365a",
+}
+PUBLIC_TEST_MNEMONIC = "test test test test test test test test test test test junk"
+
+# (règle, sévérité, message, motif, entropie minimale de la valeur capturée)
+RULES = [
+    ("private-key", "high", "Clé privée Ethereum",
+     rb"(?i:priv(?:ate)?[_ -]?key|secret[_ -]?key|signer[_ -]?key|wallet[_ -]?key|deployer[_ -]?key)"
+     rb"[\w\"'`]*\s*(?:[:=]|=>|\()\s*\[?\s*[\"'`]?(?P<private_key_v>(?:0x)?[0-9a-fA-F]{64})(?![0-9a-fA-F])", 3.0),
+    ("wallet-private-key", "high", "Clé privée passée à un Wallet",
+     rb"Wallet\(\s*[\"'`](?P<wallet_private_key_v>(?:0x)?[0-9a-fA-F]{64})[\"'`]", 3.0),
+    ("mnemonic", "high", "Phrase mnémonique (seed phrase)",
+     rb"(?i:mnemonic|seed[_ ]?phrase|secret[_ ]?phrase|recovery[_ ]?phrase)[\w\"'`]*\s*(?:[:=]|=>|\()\s*[\"'`]?"
+     # Valeur entre guillemets, ou non citée (MNEMONIC=... d'un .env) jusqu'à la fin de la ligne
+     rb"(?P<mnemonic_v>(?:[a-z]{3,8}[ \t]+){11,23}[a-z]{3,8})(?:[\"'`]|(?m:[ \t]*\r?$))", 0.0),
+    ("pem-private-key", "high", "Clé privée PEM",
+     rb"-----BEGIN (?:RSA |EC |DSA |OPENSSH |ENCRYPTED )?PRIVATE KEY-----", 0.0),
+    ("aws-access-key", "high", "Clé d'accès AWS",
+     rb"\b(?:AKIA|ASIA)[0-9A-Z]{16}\b", 3.0),
+    ("github-token", "high", "Jeton GitHub",
+     rb"\b(?:gh[pousr]_[A-Za-z0-9]{36,}|github_pat_[A-Za-z0-9_]{60,})", 3.5),
+    ("anthropic-api-key", "high", "Clé d'API Anthropic",
+     rb"\bsk-ant-[A-Za-z0-9_-]{32,}", 3.5),
+    ("openai-api-key", "high", "Clé d'API OpenAI",
+     rb"\bsk-(?!ant-)(?:proj-)?[A-Za-z0-9_-]{32,}", 3.5),
+    ("google-api-key", "high", "Clé d'API Google",
+     rb"\bAIza[0-9A-Za-z_-]{35}\b", 3.5),
+    ("slack-token", "high", "Jeton Slack",
+     rb"\bxox[abposr]-[0-9A-Za-z-]{10,}", 3.0),
+    ("rpc-url-key", "high", "URL RPC contenant une clé de projet",
+     rb"https://[a-z0-9.-]+\.(?:infura\.io/v3|alchemy\.com/v2|alchemyapi\.io/v2|quiknode\.pro)"
+     rb"/(?P<rpc_url_key_v>[A-Za-z0-9_-]{20,})", 3.0),
+    ("generic-secret", "medium", "Valeur secrète à forte entropie",
+     rb"(?i:(?:api[_-]?key|secret|token|passw(?:or)?d|auth[_-]?key)[\w.-]*)[\"'`]?\s*[:=]\s*[\"'`]?"
+     rb"(?P<generic_secret_v>[A-Za-z0-9+/_.=-]{20,})", 4.0),
+]
+
+# Chaque règle commence par l'un de ces littéraux (minuscules): leurs occurrences, trouvées
+# par recherche d'octets, sont les seules positions où l'expression complète est essayée
+KEYWORDS = (b"priv", b"secret", b"signer", b"wallet", b"deployer", b"mnemonic", b"seed", b"recovery",
+            b"-----begin", b"akia", b"asia", b"ghp_", b"gho_", b"ghu_", b"ghs_", b"ghr_", b"github_pat_",
+            b"sk-", b"aiza", b"xox", b"https://", b"api", b"token", b"passw", b"auth")
+CHUNK_SIZE = 16 * 1024 * 1024
+# Recouvrement entre blocs: une correspondance à cheval sur deux blocs reste entière
+CHUNK_OVERLAP = 4096
+
+_GROUPS = {rule.replace("-", "_"): (rule, severity, message, min_entropy)
+           for rule, severity, message, _, min_entropy in RULES}
+# Alternative nommée par règle, la première qui correspond l'emporte
+MATCHER = re.compile(b"|".join(b"(?P<%s>%s)" % (rule.replace("-", "_").encode(), pattern)
+                               for rule, _, _, pattern, _ in RULES))
+
+
+def shannon_entropy(value: str) -> float:
+    """Entropie de Shannon (bits par caractère)"""
+    if not value:
+        return 0.0
+    counts = Counter(value)
+    return -sum(n / len(value) * math.log2(n / len(value)) for n in counts.values())
+
+
+def redact(value: str) -> str:
+    """Forme affichable d'un secret (début et fin seulement)"""
+    return f"{value[:4]}…{value[-2:]}" if len(value) > 8 else "…"
+
+
+def is_env_file(name: str) -> bool:
+    """Fichiers d'environnement (.env, .env.local, ...), hors modèles documentés"""
+    return (name == ".env" or name.startswith(".env.")) and not name.endswith((".example", ".sample", ".template"))
+
+
+def translate(pattern: str) -> str:
+    """Expression régulière (sans ancres) d'un motif glob: `**` traverse les dossiers, `*` et `?` non"""
+    regex, i = "", 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            regex += "/.*"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 1:]:
+            end = pattern.index("]", i + 1)
+            regex += fnmatch.translate(pattern[i:end + 1])[4:-3]
+            i = end + 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return regex
+
+
+class IgnoreRules:
+    """Règles .gitignore (négation, dossiers seuls, motifs ancrés, **)"""
+
+    def __init__(self):
+        self.rules: List[Tuple["re.Pattern", bool, bool]] = []
+
+    def add(self, pattern: str, base: str = ""):
+        """Ajoute un motif relatif au dossier `base` (chemin POSIX relatif à la racine)"""
+        pattern = pattern.rstrip("\n").rstrip()
+        if not pattern or pattern.startswith("#"):
+            return
+        negated = pattern.startswith("!")
+        if negated:
+            pattern = pattern[1:]
+        if pattern.startswith("\\"):
+            pattern = pattern[1:]
+        dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+
+        regex = translate(pattern)
+
+        prefix = re.escape(base + "/") if base else ""
+        full = f"^{prefix}{regex}$" if anchored else f"^{prefix}(?:.*/)?{regex}$"
+        self.rules.append((re.compile(full), negated, dir_only))
+
+    def load(self, gitignore: Path, base: str = ""):
+        try:
+            with open(gitignore, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    self.add(line, base)
+        except OSError:
+            pass
+
+    def ignored(self, relative: str, is_dir: bool = False) -> bool:
+        """Vrai si le chemin (POSIX, relatif à la racine) est ignoré; la dernière règle l'emporte"""
+        result = False
+        for regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relative):
+                result = not negated
+        return result
+
+
+def bounded_map(executor: ThreadPoolExecutor, fn: Callable, items: Iterable, ahead: int) -> Iterator[Any]:
+    """`executor.map` sans tout soumettre d'avance: au plus `ahead` tâches en cours ou terminées non lues"""
+    items = iter(items)
+    futures = deque(executor.submit(fn, item) for item in itertools.islice(items, ahead))
+    while futures:
+        result = futures.popleft().result()
+        for item in itertools.islice(items, 1):
+            futures.append(executor.submit(fn, item))
+        yield result
+
+
+class SecretScanner:
+    """Analyse les fichiers texte du projet à la recherche de secrets"""
+
+    def __init__(self, project_root: Path, exclude: Optional[List[str]] = None,
+                 max_file_size: int = DEFAULT_MAX_FILE_SIZE, cache_path: Optional[Path] = DEFAULT_CACHE,
+                 workers: int = 0, snapshot=None):
+        """
+        Args:
+            project_root: Racine du dépôt
+            exclude: Motifs supplémentaires au format .gitignore (par défaut: sorties générées)
+            max_file_size: Taille au-delà de laquelle un fichier est ignoré (octets)
+            cache_path: Cache des résultats (relatif à la racine), None pour le désactiver
+            workers: Threads de lecture / hachage (0 = automatique)
+            snapshot: Instantané du projet (pipeline.snapshot.ProjectSnapshot): index et
+                contenus partagés avec les autres gates au lieu d'un nouveau parcours
+        """
+        self.project_root = Path(project_root)
+        self.max_file_size = max_file_size
+        self.cache_path = self.project_root / cache_path if cache_path is not None else None
+        self.workers = workers or min(32, (os.cpu_count() or 2) * 4)
+        self.snapshot = snapshot
+        self.excludes = IgnoreRules()
+        for pattern in DEFAULT_EXCLUDE if exclude is None else exclude:
+            self.excludes.add(pattern)
+        self.ignore = IgnoreRules()
+        self.ignore.load(self.project_root / ".gitignore")
+
+    def is_ignored(self, relative: str, is_dir: bool = False) -> bool:
+        """Chemin ignoré par git (règles .gitignore chargées pendant le parcours)"""
+        return self.ignore.ignored(relative, is_dir)
+
+    def walk(self) -> Iterator[Tuple[Path, str, int, int, bool]]:
+        """
+        Fichiers à analyser: (chemin, chemin relatif, taille, date en ns, ignoré par git)
+
+        Les fichiers d'environnement sont analysés même s'ils sont ignorés:
+        c'est là que les secrets se trouvent le plus souvent.
+        """
+        if self.snapshot is not None:
+            yield from self._walk_snapshot()
+            return
+        pending = [(self.project_root, "")]
+        while pending:
+            directory, relative_dir = pending.pop()
+            if relative_dir:
+                self.ignore.load(directory / ".gitignore", relative_dir)
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                relative = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                try:
+                    if entry.is_symlink():
+                        continue
+                    if entry.is_dir():
+                        if (entry.name in ALWAYS_SKIPPED or self.excludes.ignored(relative, True)
+                                or self.ignore.ignored(relative, True)):
+                            continue
+                        pending.append((Path(entry.path), relative))
+                    elif entry.is_file():
+                        if self.excludes.ignored(relative):
+                            continue
+                        ignored = self.ignore.ignored(relative)
+                        if ignored and not is_env_file(entry.name):
+                            continue
+                        stat = entry.stat()
+                        yield Path(entry.path), relative, stat.st_size, stat.st_mtime_ns, ignored
+                except OSError:
+                    continue
+
+    def _walk_snapshot(self) -> Iterator[Tuple[Path, str, int, int, bool]]:
+        """Parcours de l'index de l'instantané (dossiers ignorés par git déjà écartés)"""
+        excluded_dirs: Dict[str, bool] = {}
+
+        def excluded(directory: str) -> bool:
+            if not directory:
+                return False
+            if directory not in excluded_dirs:
+                parent = directory.rpartition("/")[0]
+                excluded_dirs[directory] = excluded(parent) or self.excludes.ignored(directory, True)
+            return excluded_dirs[directory]
+
+        for relative, entry in self.snapshot.files.items():
+            if excluded(relative.rpartition("/")[0]) or self.excludes.ignored(relative):
+                continue
+            if entry.ignored and not is_env_file(relative.rpartition("/")[2]):
+                continue
+            yield self.snapshot.path(relative), relative, entry.size, entry.mtime_ns, entry.ignored
+
+    def signature(self) -> str:
+        """
+        Empreinte de l'ensemble des fichiers analysés (chemin, taille, date, statut git)
+
+        Change dès qu'un fichier parcouru par `walk` est ajouté, modifié ou
+        supprimé: c'est l'entrée du checkpoint de la gate de sécurité.
+        """
+        entries = sorted(f"{relative}\0{size}\0{mtime_ns}\0{int(ignored)}"
+                         for _, relative, size, mtime_ns, ignored in self.walk())
+        digest = hashlib.sha256()
+        for entry in entries:
+            digest.update(entry.encode("utf-8", errors="surrogateescape") + b"\n")
+        return digest.hexdigest()
+
+    def _load_cache(self) -> Dict[str, Any]:
+        if self.cache_path is None:
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        return cache if cache.get("version") == RULES_VERSION else {}
+
+    def _save_cache(self, files: Dict[str, Any], results: Dict[str, Any]):
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": RULES_VERSION, "files": files, "results": results}, f, separators=(",", ":"))
+        os.replace(tmp_path, self.cache_path)
+
+    @staticmethod
+    def _read(path: Path, size: int):
+        """Contenu du fichier: octets, ou projection mmap au-delà de MMAP_THRESHOLD (à fermer)"""
+        with open(path, "rb") as f:
+            if size < MMAP_THRESHOLD:
+                return f.read()
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def candidates(content) -> Iterator[int]:
+        """Positions croissantes des mots-clés (bytes ou mmap, parcouru par blocs)"""
+        size = len(content)
+        for offset in range(0, size, CHUNK_SIZE):
+            chunk = content[offset:offset + CHUNK_SIZE + CHUNK_OVERLAP].lower()
+            limit = min(CHUNK_SIZE, len(chunk))
+            positions = set()
+            for keyword in KEYWORDS:
+                index = chunk.find(keyword, 0, limit + len(keyword) - 1)
+                while index != -1:
+                    positions.add(offset + index)
+                    index = chunk.find(keyword, index + 1, limit + len(keyword) - 1)
+            yield from sorted(positions)
+
+    def scan_bytes(self, content) -> List[Dict[str, Any]]:
+        """
+        Secrets d'un contenu (bytes ou mmap); `line` est 1-indexé
+
+        Parmi des correspondances qui se chevauchent, la plus sévère l'emporte:
+        `OPENAI_API_KEY=sk-proj-...` correspond d'abord à generic-secret (mot-clé
+        `API`), puis à openai-api-key à l'intérieur de la même valeur.
+        """
+        findings = []
+        line, position, end = 1, 0, 0
+        # Correspondance retenue, pas encore émise: (début, fin, règle, sévérité, message, valeur)
+        pending = None
+
+        def emit():
+            nonlocal line, position
+            start, _, rule, severity, message, value = pending
+            # Tranche (copie bornée, mmap n'a pas de count): chaque octet n'est compté qu'une fois
+            line += content[position:start].count(b"\n")
+            position = start
+            findings.append({"rule": rule, "severity": severity, "message": message, "line": line,
+                             "secret": redact(value), "entropy": round(shannon_entropy(value), 2)})
+
+        for start in self.candidates(content):
+            overlaps = start < end
+            match = MATCHER.match(content, start)
+            if match is None:
+                continue
+            group = match.lastgroup
+            rule, severity, message, min_entropy = _GROUPS[group]
+            if overlaps and SEVERITY_ORDER[severity] <= SEVERITY_ORDER[pending[3]]:
+                continue
+            value_group = f"{group}_v"
+            raw = match.group(value_group) if value_group in MATCHER.groupindex else match.group(group)
+            value = raw.decode("utf-8", errors="replace")
+            if not self._is_secret(rule, value, min_entropy):
+                continue
+            if pending is not None and not overlaps:
+                emit()
+            pending = (start, match.end(), rule, severity, message, value)
+            end = max(end, match.end())
+        if pending is not None:
+            emit()
+        return findings
+
+    @staticmethod
+    def _is_secret(rule: str, value: str, min_entropy: float) -> bool:
+        if rule in ("private-key", "wallet-private-key"):
+            return value.lower().removeprefix("0x") not in PUBLIC_TEST_KEYS and shannon_entropy(value) >= min_entropy
+        if rule == "mnemonic":
+            words = value.split()
+            # Phrase publique de test ou mots répétés: pas une vraie seed phrase
+            return " ".join(words) != PUBLIC_TEST_MNEMONIC and len(set(words)) >= len(words) * 2 // 3
+        if rule == "generic-secret":
+            # Identifiants, chemins et mots composés ont une entropie plus faible que les jetons aléatoires
+            return shannon_entropy(value) >= min_entropy and bool(re.search(r"\d", value))
+        return shannon_entropy(value) >= min_entropy
+
+    def _process(self, path: Path, size: int, known: Dict[str, Any], claimed: set) -> Tuple[Optional[str], Any]:
+        """
+        Lit, hache et analyse un fichier (exécuté dans un thread)
+
+        Returns:
+            (empreinte, constats); constats None si ce contenu est déjà connu ou
+            analysé par un autre thread; (None, None) pour un binaire ou un fichier illisible
+        """
+        try:
+            content = self.snapshot.buffer(path) if self.snapshot is not None else self._read(path, size)
+        except (OSError, ValueError):
+            return None, None
+        try:
+            if b"\0" in content[:BINARY_SNIFF]:
+                return None, None
+            digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+            if digest in known or digest in claimed:
+                return digest, None
+            claimed.add(digest)
+            return digest, self.scan_bytes(content)
+        finally:
+            # Projections mmap propres à cette lecture (les octets de l'instantané restent partagés)
+            if isinstance(content, mmap.mmap):
+                content.close()
+
+    def iter_findings(self, scope=None, summary: Optional[Dict[str, Any]] = None) -> Iterator[Finding]:
+        """
+        Constats au fil de l'analyse, sans les accumuler
+
+        Les constats des fichiers repris du cache sortent pendant le parcours,
+        ceux des fichiers analysés dès que leur lecture est terminée. L'ordre
+        n'est pas trié; le cache est enregistré quand le générateur est épuisé.
+
+        Args:
+            scope: Périmètre incrémental (pipeline.diff_scope.DiffScope): seuls les
+                fichiers modifiés sont analysés, les autres sont repris du cache
+            summary: Dict complété en fin de parcours: fichiers d'environnement et
+                leur statut git, statistiques (analysés, en cache, hors périmètre,
+                octets lus, durée, nombre de constats)
+        """
+        start = time.perf_counter()
+        cache = self._load_cache()
+        cached_files = cache.get("files", {})
+        cached_results = cache.get("results", {})
+        files: Dict[str, Any] = {}
+        results: Dict[str, Any] = {}
+        stats = {"files": 0, "scanned": 0, "cached": 0, "skipped": 0, "bytes": 0}
+        if scope is not None:
+            stats["not_in_diff"] = 0
+        env_files = []
+        changed = []
+        count = 0
+
+        def emit(relative: str, found: List[Dict[str, Any]]) -> Iterator[Finding]:
+            for f in found:
+                finding = Finding(file=relative, **f)
+                if scope is not None:
+                    finding.reused = not scope.touches(relative, finding.line)
+                yield finding
+
+        for path, relative, size, mtime_ns, ignored in self.walk():
+            stats["files"] += 1
+            if is_env_file(path.name):
+                env_files.append({"file": relative, "ignored": ignored})
+            if size == 0 or size > self.max_file_size:
+                stats["skipped"] += 1
+                continue
+            signature = [size, mtime_ns]
+            known = cached_files.get(relative)
+            if known and known[:2] == signature and known[2] in cached_results:
+                # Inchangé depuis la dernière analyse: ni lecture ni hachage
+                files[relative] = known
+                results[known[2]] = cached_results[known[2]]
+                stats["cached"] += 1
+                count += len(results[known[2]])
+                yield from emit(relative, results[known[2]])
+                continue
+            if scope is not None and not scope.contains(relative):
+                # Hors du diff et jamais analysé: laissé à une analyse complète
+                stats["not_in_diff"] += 1
+                continue
+            changed.append((path, relative, size, signature))
+
+        claimed: set = set()
+        # Fichiers identiques analysés par un autre thread: constats émis une fois le contenu analysé
+        pending: Dict[str, List[str]] = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # Au plus quelques fichiers d'avance sur le consommateur: constats en attente bornés
+            outcomes = bounded_map(executor, lambda item: self._process(item[0], item[2], cached_results, claimed),
+                                   changed, self.workers * 2)
+            for (_, relative, size, signature), (digest, found) in zip(changed, outcomes):
+                if digest is None:
+                    stats["skipped"] += 1
+                    continue
+                files[relative] = signature + [digest]
+                if found is None:
+                    # Contenu déjà analysé (copie d'un autre fichier ou simple changement de date)
+                    stats["cached"] += 1
+                    if digest in cached_results:
+                        results[digest] = cached_results[digest]
+                    if digest in results:
+                        count += len(results[digest])
+                        yield from emit(relative, results[digest])
+                    else:
+                        pending.setdefault(digest, []).append(relative)
+                    continue
+                results[digest] = found
+                stats["scanned"] += 1
+                stats["bytes"] += size
+                for copy in [relative] + pending.pop(digest, []):
+                    count += len(found)
+                    yield from emit(copy, found)
+
+        self._save_cache(files, results)
+        duration = round(time.perf_counter() - start, 3)
+        logger.info(f"🔑 Secrets: {count} constat(s) sur {stats['files']} fichier(s) "
+                    f"({stats['scanned']} analysé(s), {stats['cached']} en cache, {duration}s)")
+        if summary is not None:
+            summary.update(env_files=env_files, **stats, duration=duration, findings_count=count)
+
+    def scan(self, scope=None) -> Dict[str, Any]:
+        """
+        Analyse l'arborescence
+
+        Args:
+            scope: Périmètre incrémental (voir `iter_findings`)
+
+        Returns:
+            Constats triés par sévérité (pipeline.models.Finding: fichier, ligne,
+            règle, secret masqué; `reused` hors des lignes modifiées), fichiers
+            d'environnement et leur statut git, statistiques (analysés, en cache,
+            hors périmètre, octets lus, durée)
+        """
+        summary: Dict[str, Any] = {}
+        findings = list(self.iter_findings(scope, summary))
+        findings.sort(key=lambda f: (-SEVERITY_ORDER.get(f.severity, 0), f.file, f.line))
+        summary.pop("findings_count", None)
+        return {"findings": findings, **summary}
@@ -0,0 +1,303 @@
+"""
+Instantané du projet partagé par les gates et les agents d'une exécution
+
+L'arborescence est indexée une seule fois (chemin, taille, date de
+modification, statut git) en respectant .gitignore, sans descendre dans
+venv/ ou node_modules/. Le contenu des petits fichiers n'est lu qu'à la
+première demande puis conservé pour la durée de l'instantané; au-delà de
+MMAP_THRESHOLD, chaque demande reçoit sa propre projection mmap en lecture
+seule, fermée par l'appelant après usage (aucun descripteur ne reste ouvert
+entre deux passes, quel que soit le nombre de gros fichiers). Toutes les
+gates voient ainsi le même état de l'arbre, et un petit fichier lu par l'une
+n'est pas relu par les suivantes.
+
+L'instantané est immuable: un fichier créé pendant l'exécution (contrat
+généré) est ajouté par `with_files`, qui retourne un nouvel instantané.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, FrozenSet, Iterable, List, Mapping, Optional, Union
+
+from pipeline.secret_scanner import ALWAYS_SKIPPED, MMAP_THRESHOLD, IgnoreRules, translate
+
+logger = logging.getLogger(__name__)
+
+# Octets de petits fichiers conservés en mémoire (au-delà, relus à chaque demande)
+DEFAULT_MAX_CACHED_BYTES = 256 * 1024 * 1024
+
+PathLike = Union[str, Path]
+
+
+@dataclass(frozen=True, slots=True)
+class FileEntry:
+    """Fichier indexé (chemin POSIX relatif à la racine)"""
+    relative: str
+    size: int
+    mtime_ns: int
+    # Ignoré par git (indexé quand même: .env, journaux...)
+    ignored: bool = False
+
+    @property
+    def signature(self) -> List[int]:
+        return [self.size, self.mtime_ns]
+
+
+@dataclass(frozen=True, slots=True)
+class ProjectSnapshot:
+    """Vue figée de l'arborescence du projet, contenus chargés à la demande"""
+    root: Path
+    files: Mapping[str, FileEntry]
+    directories: FrozenSet[str]
+    # Configuration du pipeline (pipeline.config.PipelineConfig) en vigueur pour l'exécution
+    config: Any = None
+    created: float = 0.0
+    duration: float = 0.0
+    max_cached_bytes: int = DEFAULT_MAX_CACHED_BYTES
+    _ignore: IgnoreRules = field(default_factory=IgnoreRules, repr=False, compare=False)
+    _buffers: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+    _digests: Dict[str, str] = field(default_factory=dict, repr=False, compare=False)
+    _state: Dict[str, Any] = field(default_factory=lambda: {"cached_bytes": 0, "stale": set()},
+                                   repr=False, compare=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @classmethod
+    def build(cls, project_root: Path, config: Any = None,
+              max_cached_bytes: int = DEFAULT_MAX_CACHED_BYTES) -> "ProjectSnapshot":
+        """
+        Indexe l'arborescence (un seul parcours, stat fournis par scandir)
+
+        Les dossiers ignorés par git sont enregistrés sans être parcourus;
+        les fichiers ignorés sont indexés et marqués comme tels.
+        """
+        start = time.perf_counter()
+        root = Path(project_root).resolve()
+        ignore = IgnoreRules()
+        ignore.load(root / ".gitignore")
+        files: Dict[str, FileEntry] = {}
+        directories = set()
+
+        pending = [(root, "")]
+        while pending:
+            directory, relative_dir = pending.pop()
+            if relative_dir:
+                ignore.load(directory / ".gitignore", relative_dir)
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                relative = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                try:
+                    if entry.is_symlink():
+                        continue
+                    if entry.is_dir():
+                        if entry.name in ALWAYS_SKIPPED:
+                            continue
+                        directories.add(relative)
+                        if not ignore.ignored(relative, True):
+                            pending.append((Path(entry.path), relative))
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        files[relative] = FileEntry(relative, stat.st_size, stat.st_mtime_ns,
+                                                    ignore.ignored(relative))
+                except OSError:
+                    continue
+
+        snapshot = cls(
+            root=root,
+            files=MappingProxyType(dict(sorted(files.items()))),
+            directories=frozenset(directories),
+            config=config,
+            created=time.time(),
+            duration=round(time.perf_counter() - start, 3),
+            max_cached_bytes=max_cached_bytes,
+            _ignore=ignore
+        )
+        logger.info(f"📸 Instantané: {len(files)} fichier(s), {len(directories)} dossier(s) "
+                    f"({snapshot.duration}s)")
+        return snapshot
+
+    def relative(self, path: PathLike) -> Optional[str]:
+        """Chemin POSIX relatif à la racine (None hors du projet)"""
+        path = Path(path)
+        if path.is_absolute():
+            try:
+                path = path.relative_to(self.root)
+            except ValueError:
+                try:
+                    path = path.resolve().relative_to(self.root)
+                except ValueError:
+                    return None
+        relative = path.as_posix()
+        return "" if relative == "." else relative
+
+    def path(self, relative: str) -> Path:
+        return self.root / relative
+
+    def get(self, path: PathLike) -> Optional[FileEntry]:
+        relative = self.relative(path)
+        return self.files.get(relative) if relative is not None else None
+
+    def __contains__(self, path: PathLike) -> bool:
+        return self.get(path) is not None
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def is_dir(self, path: PathLike) -> bool:
+        relative = self.relative(path)
+        return relative == "" or relative in self.directories
+
+    def exists(self, path: PathLike) -> bool:
+        """Fichier ou dossier présent au moment de l'instantané"""
+        return path in self or self.is_dir(path)
+
+    def glob(self, pattern: str) -> List[str]:
+        """Fichiers (chemins relatifs triés) correspondant à un motif (`contracts/**/*.sol`)"""
+        regex = re.compile(f"^{translate(pattern)}$")
+        return [relative for relative in self.files if regex.match(relative)]
+
+    def paths(self, pattern: str) -> List[Path]:
+        """Comme `glob`, en chemins absolus"""
+        return [self.root / relative for relative in self.glob(pattern)]
+
+    def buffer(self, path: PathLike):
+        """
+        Contenu d'un fichier: octets, ou projection mmap pour les gros fichiers
+
+        Les octets sont chargés à la première demande puis partagés (lecture
+        seule, utilisables depuis plusieurs threads). Une projection mmap est
+        propre à l'appelant, qui la ferme après usage (`release`). Un fichier
+        hors de l'instantané (node_modules, créé depuis) est lu sur disque sans
+        être conservé.
+
+        Raises:
+            OSError: Fichier illisible ou disparu
+        """
+        relative = self.relative(path)
+        entry = self.files.get(relative) if relative is not None else None
+        if entry is None:
+            return Path(path if relative is None else self.root / relative).read_bytes()
+        cached = self._buffers.get(relative)
+        if cached is not None:
+            return cached
+
+        with open(self.root / relative, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if [stat.st_size, stat.st_mtime_ns] != entry.signature and relative not in self._state["stale"]:
+                self._state["stale"].add(relative)
+                logger.warning(f"⚠️  {relative} modifié depuis l'instantané: contenu actuel utilisé")
+            if stat.st_size >= MMAP_THRESHOLD:
+                # Non conservée: chaque projection garde un descripteur jusqu'à sa fermeture
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            content = f.read()
+            if self._state["cached_bytes"] + len(content) > self.max_cached_bytes:
+                return content
+
+        with self._lock:
+            # Un autre thread a pu charger le même fichier entre-temps: sa version est conservée
+            existing = self._buffers.get(relative)
+            if existing is not None:
+                return existing
+            self._buffers[relative] = content
+            self._state["cached_bytes"] += len(content)
+        return content
+
+    @staticmethod
+    def release(content):
+        """Ferme une projection mmap retournée par `buffer` (sans effet sur des octets)"""
+        if isinstance(content, mmap.mmap):
+            content.close()
+
+    def read_bytes(self, path: PathLike) -> bytes:
+        content = self.buffer(path)
+        if isinstance(content, bytes):
+            return content
+        try:
+            return content[:]
+        finally:
+            content.close()
+
+    def read_text(self, path: PathLike, encoding: str = "utf-8", errors: str = "replace") -> str:
+        return self.read_bytes(path).decode(encoding, errors=errors)
+
+    def digest(self, path: PathLike) -> str:
+        """Empreinte SHA-256 du contenu (calculée une fois par fichier)"""
+        relative = self.relative(path)
+        if relative is not None and relative in self._digests:
+            return self._digests[relative]
+        content = self.buffer(path)
+        try:
+            value = hashlib.sha256(content).hexdigest()
+        finally:
+            self.release(content)
+        if relative in self.files:
+            self._digests[relative] = value
+        return value
+
+    def with_files(self, paths: Iterable[PathLike]) -> "ProjectSnapshot":
+        """
+        Nouvel instantané incluant l'état actuel de `paths` (fichiers créés,
+        modifiés ou supprimés par l'exécution); le reste de l'index et les
+        contenus déjà chargés (octets immuables) sont repris dans une table
+        propre au nouvel instantané: fermer l'un n'affecte pas l'autre.
+        """
+        files = dict(self.files)
+        directories = set(self.directories)
+        buffers = dict(self._buffers)
+        digests = dict(self._digests)
+        for path in paths:
+            relative = self.relative(path)
+            if relative is None:
+                continue
+            buffers.pop(relative, None)
+            digests.pop(relative, None)
+            try:
+                stat = os.stat(self.root / relative)
+            except OSError:
+                files.pop(relative, None)
+                continue
+            files[relative] = FileEntry(relative, stat.st_size, stat.st_mtime_ns,
+                                        self._ignore.ignored(relative))
+            parent = Path(relative).parent
+            while parent != Path("."):
+                directories.add(parent.as_posix())
+                parent = parent.parent
+
+        return ProjectSnapshot(
+            root=self.root,
+            files=MappingProxyType(dict(sorted(files.items()))),
+            directories=frozenset(directories),
+            config=self.config,
+            created=time.time(),
+            max_cached_bytes=self.max_cached_bytes,
+            _ignore=self._ignore,
+            _buffers=buffers,
+            _digests=digests,
+            _state={"cached_bytes": self._state["cached_bytes"], "stale": set(self._state["stale"])}
+        )
+
+    def close(self):
+        """Libère les contenus chargés par cet instantané"""
+        with self._lock:
+            self._buffers.clear()
+            self._digests.clear()
+            self._state["cached_bytes"] = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "files": len(self.files),
+            "directories": len(self.directories),
+            "bytes": sum(entry.size for entry in self.files.values()),
+            "loaded": len(self._buffers),
+            "stale": sorted(self._state["stale"]),
+            "duration": self.duration
+        }
@@ -0,0 +1,446 @@
+"""
+Exécution parallèle des tests Hardhat
+
+Les fichiers de test sont répartis en N shards équilibrés (durées mesurées
+lors des exécutions précédentes); chaque shard est un processus
+`npx hardhat test` distinct avec son propre réseau Hardhat en mémoire. Les
+résultats et la couverture (solidity-coverage) sont agrégés. Une sélection
+restreinte aux tests concernés par des contrats modifiés est possible.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+TEST_EXTENSIONS = {".js", ".mjs", ".cjs", ".ts"}
+_TEST_NAME = re.compile(r"[.-](test|spec)\.[cm]?[jt]s$")
+_IMPORT_PATH = re.compile(r"""import\s+(?:[^;]*?\bfrom\s+)?["']([^"']+)["']""")
+_PASSING = re.compile(r"^\s*(\d+) passing", re.M)
+_FAILING = re.compile(r"^\s*(\d+) failing", re.M)
+_PENDING = re.compile(r"^\s*(\d+) pending", re.M)
+# "  1) Suite\n       sous-suite\n         test:" (titre imbriqué sur plusieurs lignes)
+_FAILURE = re.compile(r"^\s*\d+\) ([^\n]+)((?:\n[ \t]+[^\n]+?)*?):[ \t]*$", re.M)
+_ANSI = re.compile(r"\x1b\[[0-9;]*m")
+
+# Entrées du projet propres à chaque shard (écrites par Hardhat / solidity-coverage)
+_SHARD_LOCAL = {"cache", "artifacts", "coverage", "coverage.json", ".coverage_artifacts",
+                ".coverage_cache", ".coverage_contracts", ".git"}
+
+DEFAULT_COVERAGE_REPORT = Path("reports") / "tests" / "coverage.json"
+# Empreinte du source mesuré, ajoutée à chaque fichier du rapport istanbul
+SOURCE_HASH_KEY = "sourceHash"
+
+
+@dataclass
+class ShardResult:
+    """Résultat d'un processus de test"""
+    index: int
+    files: List[str]
+    passed: int = 0
+    failed: int = 0
+    pending: int = 0
+    duration: float = 0.0
+    returncode: Optional[int] = None
+    failures: List[str] = field(default_factory=list)
+    output: str = ""
+    coverage: Optional[Dict[str, Any]] = None
+
+    @property
+    def success(self) -> bool:
+        return self.returncode == 0 and self.failed == 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "shard": self.index,
+            "files": self.files,
+            "passed": self.passed,
+            "failed": self.failed,
+            "pending": self.pending,
+            "duration": round(self.duration, 3),
+            "returncode": self.returncode,
+            "failures": self.failures,
+            "output": self.output[-1000:] if not self.success else ""
+        }
+
+
+def discover_tests(project_root: Path, tests_dir: str = "tests") -> List[Path]:
+    """Fichiers de test du dossier `tests_dir` (*.test.js, *-test.mjs, *.spec.ts, ...)"""
+    root = Path(project_root) / tests_dir
+    if not root.exists():
+        return []
+    files = sorted(p for p in root.rglob("*") if p.is_file() and p.suffix in TEST_EXTENSIONS
+                   and "node_modules" not in p.parts)
+    named = [p for p in files if _TEST_NAME.search(p.name)]
+    # Sans convention de nommage, Hardhat exécute tous les fichiers du dossier
+    return named or files
+
+
+def contract_dependents(project_root: Path, changed: Iterable[Path]) -> Set[str]:
+    """
+    Contrats concernés par des fichiers .sol modifiés: ceux qu'ils définissent
+    et, transitivement, ceux des fichiers qui les importent
+    """
+    from agents.blockchain.analysis import index_file
+
+    contracts_dir = Path(project_root) / "contracts"
+    sources = sorted(contracts_dir.glob("**/*.sol")) if contracts_dir.exists() else []
+    importers: Dict[Path, Set[Path]] = {}
+    for source in sources:
+        for statement in index_file(source).imports:
+            match = _IMPORT_PATH.search(statement)
+            if match and match.group(1).startswith("."):
+                imported = (source.parent / match.group(1)).resolve()
+                importers.setdefault(imported, set()).add(source.resolve())
+
+    pending = [Path(p).resolve() for p in changed if str(p).endswith(".sol")]
+    affected_files: Set[Path] = set()
+    while pending:
+        current = pending.pop()
+        if current in affected_files:
+            continue
+        affected_files.add(current)
+        pending.extend(importers.get(current, ()))
+
+    names = set()
+    for path in affected_files:
+        if path.exists():
+            names.update(c.name for c in index_file(path).contracts)
+    return names
+
+
+def select_affected(project_root: Path, tests: List[Path], changed: Iterable[Path],
+                    tests_dir: str = "tests") -> List[Path]:
+    """
+    Tests concernés par des fichiers modifiés
+
+    Un test est retenu s'il a lui-même changé ou s'il référence un contrat
+    concerné; un fichier JavaScript de support modifié sous tests/ les retient tous.
+    """
+    changed = [Path(p).resolve() for p in changed]
+    test_set = {t.resolve() for t in tests}
+    tests_root = (Path(project_root) / tests_dir).resolve()
+    if any(p.suffix in TEST_EXTENSIONS and p not in test_set and tests_root in p.parents for p in changed):
+        return list(tests)
+
+    names = contract_dependents(project_root, changed)
+    pattern = re.compile(r"\b(" + "|".join(map(re.escape, sorted(names))) + r")\b") if names else None
+    selected = []
+    for test in tests:
+        if test.resolve() in changed:
+            selected.append(test)
+        elif pattern and pattern.search(test.read_text(encoding="utf-8", errors="replace")):
+            selected.append(test)
+    return selected
+
+
+async def git_changed_files(project_root: Path, ref: str = "HEAD") -> List[Path]:
+    """Fichiers modifiés depuis `ref` (index, arbre de travail et fichiers non suivis)"""
+    changed = []
+    for args in (("diff", "--name-only", ref), ("ls-files", "--others", "--exclude-standard")):
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "git", *args,
+                cwd=project_root,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout=30)
+        except (OSError, asyncio.TimeoutError):
+            return []
+        if process.returncode != 0:
+            return []
+        changed.extend(Path(project_root) / line for line in stdout.decode("utf-8", errors="replace").splitlines()
+                       if line.strip())
+    return changed
+
+
+def source_hash(path: Path) -> Optional[str]:
+    """Empreinte du contenu d'un source (None s'il n'existe plus)"""
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def stale_sources(project_root: Path, coverage: Dict[str, Any], names: Iterable[str]) -> List[str]:
+    """
+    Sources dont la couverture ne correspond plus au contenu actuel
+
+    Absent du rapport, sans empreinte (rapport antérieur) ou modifié depuis la
+    mesure: ses numéros de ligne (branchMap, fnMap) ne sont plus fiables.
+    """
+    stale = []
+    for name in sorted(set(names)):
+        recorded = coverage.get(name, {}).get(SOURCE_HASH_KEY)
+        if recorded is None or recorded != source_hash(Path(project_root) / name):
+            stale.append(name)
+    return stale
+
+
+def merge_coverage(reports: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Fusionne des rapports istanbul (coverage.json) en sommant les compteurs
+
+    Les compteurs d'une autre version d'un source (empreintes différentes) ne
+    s'additionnent pas: la mesure la plus récente (dernier rapport) remplace l'autre.
+    """
+    merged: Dict[str, Any] = {}
+    for report in reports:
+        for path, data in report.items():
+            if path not in merged or merged[path].get(SOURCE_HASH_KEY) != data.get(SOURCE_HASH_KEY):
+                merged[path] = json.loads(json.dumps(data))
+                continue
+            target = merged[path]
+            for key in ("s", "f", "l"):
+                for item, count in data.get(key, {}).items():
+                    target.setdefault(key, {})[item] = target.get(key, {}).get(item, 0) + count
+            for item, counts in data.get("b", {}).items():
+                current = target.setdefault("b", {}).get(item, [0] * len(counts))
+                target["b"][item] = [a + b for a, b in zip(current, counts)]
+    return merged
+
+
+def coverage_summary(coverage: Dict[str, Any]) -> Dict[str, Any]:
+    """Pourcentages lignes / instructions / fonctions / branches, par fichier et au total"""
+    def ratio(covered: int, total: int) -> float:
+        return round(covered / total * 100, 2) if total else 100.0
+
+    totals = {"lines": [0, 0], "statements": [0, 0], "functions": [0, 0], "branches": [0, 0]}
+    files = {}
+    for path, data in sorted(coverage.items()):
+        counts = {
+            "lines": list(data.get("l", {}).values()),
+            "statements": list(data.get("s", {}).values()),
+            "functions": list(data.get("f", {}).values()),
+            "branches": [c for branch in data.get("b", {}).values() for c in branch]
+        }
+        files[path] = {}
+        for metric, values in counts.items():
+            covered = sum(1 for v in values if v)
+            totals[metric][0] += covered
+            totals[metric][1] += len(values)
+            files[path][metric] = ratio(covered, len(values))
+    return {"total": {metric: ratio(*values) for metric, values in totals.items()}, "files": files}
+
+
+class TestRunner:
+    """Exécute les tests Hardhat en shards parallèles"""
+
+    def __init__(self, project_root: Path, tests_dir: str = "tests", shards: int = 0,
+                 timeout: float = 900.0, coverage: bool = False,
+                 coverage_report: Optional[Path] = DEFAULT_COVERAGE_REPORT):
+        """
+        Args:
+            coverage_report: Rapport de couverture fusionné (relatif au projet), None pour ne pas l'écrire
+        """
+        self.project_root = Path(project_root)
+        self.tests_dir = tests_dir
+        self.shards = shards or os.cpu_count() or 2
+        self.timeout = timeout
+        self.coverage = coverage
+        self.coverage_report = coverage_report
+        self.durations_path = self.project_root / "cache" / "test_durations.json"
+        self.workspaces: Optional[Path] = None
+        # Résultats par shard de la dernière exécution (couverture incluse)
+        self.results: List[ShardResult] = []
+
+    def available(self) -> Optional[str]:
+        """None si Hardhat est utilisable, sinon la raison"""
+        if not shutil.which("npx"):
+            return "npx introuvable (installer Node.js)"
+        if not (self.project_root / "node_modules" / "hardhat").exists():
+            return "Hardhat n'est pas installé (npm install)"
+        return None
+
+    def _load_durations(self) -> Dict[str, float]:
+        try:
+            with open(self.durations_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_durations(self, results: List[ShardResult], estimates: Dict[str, float]):
+        durations = self._load_durations()
+        for shard in results:
+            if shard.returncode is None:
+                continue
+            # Durée du shard répartie au prorata des estimations de ses fichiers
+            weight = sum(estimates[f] for f in shard.files) or 1.0
+            for name in shard.files:
+                durations[name] = round(shard.duration * estimates[name] / weight, 3)
+        self.durations_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.durations_path, "w", encoding="utf-8") as f:
+            json.dump(durations, f, indent=2, sort_keys=True)
+
+    def plan(self, tests: List[Path]) -> List[List[str]]:
+        """Répartit les fichiers en shards de durées proches (plus longs d'abord)"""
+        known = self._load_durations()
+        relative = [str(t.resolve().relative_to(self.project_root.resolve())) for t in tests]
+        # Sans historique: la taille du fichier (1 s / 2 Ko) sert d'estimation
+        self._estimates = {name: known.get(name) or max(0.1, (self.project_root / name).stat().st_size / 2048)
+                           for name in relative}
+
+        count = max(1, min(self.shards, len(relative)))
+        shards: List[List[str]] = [[] for _ in range(count)]
+        loads = [0.0] * count
+        for name in sorted(relative, key=lambda n: self._estimates[n], reverse=True):
+            target = loads.index(min(loads))
+            shards[target].append(name)
+            loads[target] += self._estimates[name]
+        return [sorted(s) for s in shards if s]
+
+    def _workspace(self, index: int) -> Path:
+        """
+        Copie légère du projet (liens symboliques) propre à un shard: cache,
+        artefacts et rapports de couverture ne sont pas partagés entre processus
+        """
+        workspace = self.workspaces / f"shard-{index}"
+        workspace.mkdir()
+        for entry in self.project_root.iterdir():
+            if entry.name in _SHARD_LOCAL and (self.coverage or entry.name not in ("cache", "artifacts")):
+                continue
+            (workspace / entry.name).symlink_to(entry, target_is_directory=entry.is_dir())
+        return workspace
+
+    async def _compile(self) -> Optional[str]:
+        """Compilation unique avant les shards (None si réussie, sinon la sortie)"""
+        process = await asyncio.create_subprocess_exec(
+            "npx", "hardhat", "compile",
+            cwd=self.project_root,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return "Timeout lors de la compilation"
+        return None if process.returncode == 0 else stdout.decode("utf-8", errors="replace")[-1000:]
+
+    async def _run_shard(self, index: int, files: List[str]) -> ShardResult:
+        result = ShardResult(index=index, files=files)
+        workspace = self._workspace(index)
+        if self.coverage:
+            pattern = files[0] if len(files) == 1 else "{" + ",".join(files) + "}"
+            command = ["npx", "hardhat", "coverage", "--testfiles", pattern]
+        else:
+            command = ["npx", "hardhat", "test", "--no-compile", *files]
+
+        env = dict(os.environ, FORCE_COLOR="0")
+        start = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=workspace,
+            env=env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            result.duration = time.perf_counter() - start
+            result.failures.append(f"Timeout du shard après {self.timeout:.0f}s")
+            result.failed = max(1, result.failed)
+            return result
+
+        result.duration = time.perf_counter() - start
+        result.returncode = process.returncode
+        result.output = _ANSI.sub("", stdout.decode("utf-8", errors="replace"))
+        result.passed = int(_PASSING.search(result.output).group(1)) if _PASSING.search(result.output) else 0
+        result.failed = int(_FAILING.search(result.output).group(1)) if _FAILING.search(result.output) else 0
+        result.pending = int(_PENDING.search(result.output).group(1)) if _PENDING.search(result.output) else 0
+        failing = _FAILING.search(result.output)
+        if failing:
+            result.failures = [" ".join((m.group(1) + m.group(2)).split())
+                               for m in _FAILURE.finditer(result.output, failing.end())]
+
+        coverage_file = workspace / "coverage.json"
+        if self.coverage and coverage_file.exists():
+            with open(coverage_file, "r", encoding="utf-8") as f:
+                # Chemins du shard ramenés à ceux du projet
+                result.coverage = {self._project_path(path, workspace): data for path, data in json.load(f).items()}
+            for path, data in result.coverage.items():
+                data[SOURCE_HASH_KEY] = source_hash(self.project_root / path)
+        return result
+
+    def _project_path(self, path: str, workspace: Path) -> str:
+        try:
+            return str(Path(path).relative_to(workspace))
+        except ValueError:
+            try:
+                return str(Path(path).resolve().relative_to(self.project_root.resolve()))
+            except ValueError:
+                return path
+
+    async def run(self, changed: Optional[Iterable[Path]] = None) -> Dict[str, Any]:
+        """
+        Exécute les tests (tous, ou seulement ceux concernés par `changed`)
+
+        Returns:
+            Résultats agrégés: totaux, shards, échecs et couverture
+        """
+        tests = discover_tests(self.project_root, self.tests_dir)
+        selected = (select_affected(self.project_root, tests, changed, self.tests_dir)
+                    if changed is not None else tests)
+        summary: Dict[str, Any] = {
+            "discovered": len(tests),
+            "selected": len(selected),
+            "affected_only": changed is not None,
+            "shards": [],
+            "tests_passed": 0, "tests_failed": 0, "tests_pending": 0,
+            "failures": []
+        }
+        if not selected:
+            summary["success"] = True
+            return summary
+
+        if not self.coverage:
+            error = await self._compile()
+            if error:
+                summary.update(success=False, compile_error=error)
+                return summary
+
+        plan = self.plan(selected)
+        logger.info(f"🧪 {len(selected)} fichier(s) de test en {len(plan)} shard(s)")
+        start = time.perf_counter()
+        self.workspaces = Path(tempfile.mkdtemp(prefix="hardhat-shards-"))
+        try:
+            results = await asyncio.gather(*(self._run_shard(i, files) for i, files in enumerate(plan)))
+        finally:
+            shutil.rmtree(self.workspaces, ignore_errors=True)
+        summary["duration"] = round(time.perf_counter() - start, 3)
+        self.results = list(results)
+        self._save_durations(results, self._estimates)
+
+        for shard in results:
+            summary["shards"].append(shard.to_dict())
+            summary["tests_passed"] += shard.passed
+            summary["tests_failed"] += shard.failed
+            summary["tests_pending"] += shard.pending
+            summary["failures"].extend(f"{f} ({', '.join(shard.files)})" for f in shard.failures)
+        summary["success"] = all(shard.success for shard in results)
+
+        if self.coverage:
+            merged = merge_coverage(shard.coverage for shard in results if shard.coverage)
+            if merged:
+                summary["coverage"] = coverage_summary(merged)
+                if self.coverage_report is not None:
+                    report_path = self.project_root / self.coverage_report
+                    report_path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(report_path, "w", encoding="utf-8") as f:
+                        json.dump(merged, f)
+                    summary["coverage_report"] = str(self.coverage_report)
+        return summary
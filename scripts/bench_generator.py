@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Benchmark hors ligne du générateur de contrats
+
+Rejoue des réponses enregistrées (provider "replay", ou "fake") avec une
+latence synthétique et mesure, pour plusieurs niveaux de concurrence:
+- le débit de génération de bout en bout (contrats/s)
+- le coût de l'analyse du code généré
+- le coût de la sauvegarde (code + métadonnées)
+
+Enregistrer des fixtures réelles au préalable:
+    LLM_RECORD=1 python agents/blockchain/contract_generator.py -r "..." -p openai
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.blockchain.contract_generator import ContractGeneratorAgent
+from agents.llm.client import FakeProvider, get_provider
+from agents.llm.replay import FixtureStore
+
+REQUIREMENTS = [
+    ("erc20", "Token ERC20 avec mint réservé au propriétaire et plafond d'émission"),
+    ("erc721", "Collection NFT avec prix de mint et retrait des fonds par le propriétaire"),
+    ("erc1155", "Multi-token avec URI par identifiant et mint par lot"),
+    ("custom", "Coffre de dépôt avec délai de retrait et pause d'urgence"),
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def make_agent(args) -> ContractGeneratorAgent:
+    if args.provider == "replay":
+        options = {"latency": args.latency, "jitter": args.jitter, "strict": args.strict,
+                   "max_concurrency": max(args.concurrency)}
+        if args.fixtures:
+            options["store"] = FixtureStore(Path(args.fixtures))
+        provider = get_provider("replay", **options)
+    else:
+        provider = FakeProvider(latency=args.latency, max_concurrency=max(args.concurrency))
+
+    agent = ContractGeneratorAgent(ai_provider=args.provider)
+    # Le provider partagé est remplacé par l'instance configurée pour le benchmark
+    _, _, budget = agent.backends[args.provider]
+    agent.client = provider
+    agent.backends[args.provider] = (provider, provider.model, budget)
+    return agent
+
+
+async def bench_generation(agent: ContractGeneratorAgent, requests: int, concurrency: int) -> Dict[str, Any]:
+    """Génère `requests` contrats avec au plus `concurrency` appels simultanés"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def one(index: int):
+        nonlocal failures
+        contract_type, requirements = REQUIREMENTS[index % len(REQUIREMENTS)]
+        async with semaphore:
+            start = time.perf_counter()
+            result = await agent.generate_contract_async(requirements, contract_type)
+            latencies.append(time.perf_counter() - start)
+            if result["status"] != "success":
+                failures += 1
+            return result
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "failures": failures,
+        "elapsed": elapsed,
+        "throughput": requests / elapsed if elapsed else 0.0,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "_results": results
+    }
+
+
+def bench_analysis(agent: ContractGeneratorAgent, results: List[Dict[str, Any]], rounds: int) -> Dict[str, Any]:
+    """Coût de _analyze_generated_code sur les contrats générés"""
+    samples = [(r["code"], r["contract_type"]) for r in results if r.get("code")]
+    timings = []
+    for _ in range(rounds):
+        for code, contract_type in samples:
+            start = time.perf_counter()
+            agent._analyze_generated_code(code, contract_type)
+            timings.append(time.perf_counter() - start)
+    return {
+        "calls": len(timings),
+        "mean_us": statistics.mean(timings) * 1e6 if timings else 0.0,
+        "p95_us": percentile(timings, 95) * 1e6
+    }
+
+
+def bench_save(agent: ContractGeneratorAgent, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Coût de save_contract (répertoire temporaire, noms de fichiers distincts)"""
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+        for index, result in enumerate(r for r in results if r.get("code")):
+            result = dict(result, file_name=f"Bench_{index}.sol")
+            start = time.perf_counter()
+            agent.save_contract(result, output_dir)
+            timings.append(time.perf_counter() - start)
+    return {
+        "calls": len(timings),
+        "mean_ms": statistics.mean(timings) * 1e3 if timings else 0.0,
+        "p95_ms": percentile(timings, 95) * 1e3
+    }
+
+
+async def run_benchmark(args) -> Dict[str, Any]:
+    agent = make_agent(args)
+    report = {"provider": args.provider, "latency": args.latency, "levels": []}
+
+    # Tour de chauffe (templates, compteur de tokens, imports paresseux)
+    contract_type, requirements = REQUIREMENTS[0]
+    await agent.generate_contract_async(requirements, contract_type)
+
+    results: List[Dict[str, Any]] = []
+    for concurrency in args.concurrency:
+        level = await bench_generation(agent, args.requests, concurrency)
+        results = level.pop("_results")
+        report["levels"].append(level)
+        print(f"  c={concurrency:<4} {level['throughput']:8.1f} contrats/s   "
+              f"p50={level['latency_p50'] * 1e3:7.1f}ms  p95={level['latency_p95'] * 1e3:7.1f}ms  "
+              f"échecs={level['failures']}")
+
+    report["analysis"] = bench_analysis(agent, results, args.rounds)
+    report["save"] = bench_save(agent, results)
+
+    if args.provider == "replay":
+        report["fixtures"] = {"hits": agent.client.hits, "misses": agent.client.misses}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hors ligne du générateur de contrats")
+    parser.add_argument("--provider", choices=["replay", "fake"], default="replay")
+    parser.add_argument("--fixtures", help="Dossier de fixtures (défaut: cache/llm_fixtures)")
+    parser.add_argument("--latency", default="0.2",
+                        help="Latence synthétique en secondes, ou 'recorded' (replay uniquement)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Variation relative de la latence")
+    parser.add_argument("--strict", action="store_true",
+                        help="Échouer sur fixture manquante (sinon réponse de test)")
+    parser.add_argument("--requests", "-n", type=int, default=64, help="Générations par niveau")
+    parser.add_argument("--concurrency", "-c", default="1,4,16,64",
+                        help="Niveaux de concurrence (séparés par des virgules)")
+    parser.add_argument("--rounds", type=int, default=20, help="Répétitions du benchmark d'analyse")
+    parser.add_argument("--output", "-o", help="Fichier JSON de résultats")
+
+    args = parser.parse_args()
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+    if args.latency != "recorded":
+        args.latency = float(args.latency)
+    elif args.provider != "replay":
+        parser.error("--latency recorded nécessite --provider replay")
+
+    # Les journaux INFO par génération fausseraient les mesures
+    logging.disable(logging.INFO)
+
+    print(f"🏎️  Benchmark générateur ({args.provider}, latence {args.latency}, {args.requests} requêtes/niveau)")
+    report = asyncio.run(run_benchmark(args))
+
+    print(f"  🔍 Analyse:     {report['analysis']['mean_us']:8.1f} µs/contrat "
+          f"(p95 {report['analysis']['p95_us']:.1f} µs)")
+    print(f"  💾 Sauvegarde:  {report['save']['mean_ms']:8.2f} ms/contrat "
+          f"(p95 {report['save']['p95_ms']:.2f} ms)")
+    if "fixtures" in report:
+        print(f"  📼 Fixtures:    {report['fixtures']['hits']} rejouées, {report['fixtures']['misses']} manquantes")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Résultats: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
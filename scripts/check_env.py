@@ -8,6 +8,11 @@ import subprocess
 from pathlib import Path
 from datetime import datetime
 
+# Racine du dépôt dans le path pour l'instantané du projet partagé avec le pipeline
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipeline.snapshot import ProjectSnapshot
+
 def print_header(text):
     print("\n" + "="*60)
     print(f"  {text}")
@@ -147,20 +152,19 @@ def check_project_structure():
         else:
             print_check("❌", f"{description}", "Manquant")
 
-def check_smart_contracts():
-    """Vérifie les smart contracts"""
+def check_smart_contracts(snapshot):
+    """Vérifie les smart contracts (index de l'instantané: ni parcours ni stat supplémentaires)"""
     print_header("SMART CONTRACTS")
     
-    contracts_dir = Path("contracts")
-    if contracts_dir.exists():
-        sol_files = list(contracts_dir.glob("**/*.sol"))
+    if snapshot.is_dir("contracts"):
+        sol_files = snapshot.glob("contracts/**/*.sol")
         
         if sol_files:
             print_check("📄", "Contrats Solidity", f"{len(sol_files)} fichier(s)")
             
             for sol_file in sol_files[:3]:  # Afficher les 3 premiers
-                size = sol_file.stat().st_size
-                print_check("   ", f"  {sol_file.name}", f"{size:,} bytes")
+                size = snapshot.get(sol_file).size
+                print_check("   ", f"  {Path(sol_file).name}", f"{size:,} bytes")
             
             if len(sol_files) > 3:
                 print(f"     ... et {len(sol_files) - 3} autres")
@@ -179,12 +183,14 @@ def main():
     print("="*60)
     
     try:
+        snapshot = ProjectSnapshot.build(Path.cwd())
+        
         check_python()
         check_node()
         check_python_packages()
         check_api_keys()
         check_project_structure()
-        check_smart_contracts()
+        check_smart_contracts(snapshot)
         
         print_header("🎯 RÉSUMÉ & RECOMMANDATIONS")
         
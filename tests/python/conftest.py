@@ -0,0 +1,7 @@
+"""Tests Python du pipeline (les tests Hardhat de tests/ sont lancés par pipeline/test_runner.py)"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
@@ -0,0 +1,149 @@
+"""Index Solidity par expressions régulières et règles dérivées (agents.blockchain.analysis)"""
+from agents.blockchain.analysis import cei_violations, parse_solidity, unbounded_loops
+
+BRACES = '''// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+/// @notice Les accolades des commentaires et des chaînes } ne comptent pas {
+contract Registry {
+    string public constant OPEN = "{";
+    string public constant CLOSE = '}}';
+    /* } fin apparente du contrat
+       { */
+    mapping(address => string) public names;
+
+    function register(string calldata name) external {
+        // } commentaire fermant
+        require(bytes(name).length > 0, "nom vide }");
+        names[msg.sender] = string.concat("{", name, "}");
+    }
+
+    function clear() external {
+        delete names[msg.sender];
+    }
+}
+
+contract After {
+    uint256 public count;
+}
+'''
+
+INHERITANCE = '''pragma solidity ^0.8.20;
+
+contract Base {
+    uint256 public total;
+    address public owner;
+}
+
+contract Middle is Base {
+    mapping(address => uint256) public shares;
+}
+
+contract Child is Middle {
+    function add(uint256 amount) external {
+        total += amount;
+        shares[msg.sender] = amount;
+    }
+
+    function who() external view returns (address) {
+        return owner;
+    }
+}
+'''
+
+VAULT = '''pragma solidity ^0.8.20;
+
+contract Vault {
+    mapping(address => uint256) public balances;
+
+    function withdraw() external {
+        uint256 amount = balances[msg.sender];
+        (bool ok, ) = msg.sender.call{value: amount}("");
+        require(ok, "echec");
+        balances[msg.sender] = 0;
+    }
+
+    function withdrawSafe() external {
+        uint256 amount = balances[msg.sender];
+        balances[msg.sender] = 0;
+        (bool ok, ) = msg.sender.call{value: amount}("");
+        require(ok, "echec");
+    }
+}
+'''
+
+LOOPS = '''pragma solidity ^0.8.20;
+
+contract Airdrop {
+    address[] public holders;
+    uint256 public rounds;
+    uint256 public constant MAX = 10;
+
+    function payAll() external {
+        for (uint256 i = 0; i < holders.length; i++) {
+            payable(holders[i]).transfer(1);
+        }
+    }
+
+    function replay() external {
+        for (uint256 i = 0; i < rounds; i++) {}
+    }
+
+    function fixed() external pure returns (uint256 sum) {
+        for (uint256 i = 0; i < MAX; i++) { sum += i; }
+    }
+
+    function batch(address[] calldata ids) external pure returns (uint256 n) {
+        for (uint256 i = 0; i < ids.length; i++) { n++; }
+    }
+}
+'''
+
+
+def test_braces_in_comments_and_strings():
+    index = parse_solidity(BRACES)
+
+    assert [(c.name, c.line, c.end_line) for c in index.contracts] == [("Registry", 5, 21), ("After", 23, 25)]
+    registry = index.contract("Registry")
+    assert [(f.name, f.line, f.end_line) for f in registry.functions] == [("register", 12, 16), ("clear", 18, 20)]
+    assert [v.name for v in registry.state_variables] == ["OPEN", "CLOSE", "names"]
+    assert [w.name for w in registry.function("register").state_writes] == ["names"]
+    assert "accolades" in registry.doc
+    assert len(index.masked) == len(BRACES)
+
+
+def test_inheritance_within_file():
+    index = parse_solidity(INHERITANCE)
+    child = index.contract("Child")
+
+    assert child.bases == ["Middle"]
+    assert [v.name for v in index.inherited_state(child)] == ["total", "owner", "shares"]
+    assert [w.name for w in child.function("add").state_writes] == ["total", "shares"]
+    assert [r.name for r in child.function("who").state_reads] == ["owner"]
+
+
+def test_cei_write_after_call_with_value():
+    violations = cei_violations(parse_solidity(VAULT))
+
+    assert len(violations) == 1
+    violation = violations[0]
+    assert (violation["contract"], violation["function"]) == ("Vault", "withdraw")
+    assert violation["call"]["kind"] == "call"
+    assert violation["call"]["sends_value"] is True
+    assert violation["writes_after_call"] == [{"variable": "balances", "line": 10}]
+    assert violation["guarded"] is False
+
+
+def test_cei_guarded_by_non_reentrant():
+    source = VAULT.replace("function withdraw() external", "function withdraw() external nonReentrant")
+    assert [v["guarded"] for v in cei_violations(parse_solidity(source))] == [True]
+
+
+def test_storage_length_bound_is_unbounded():
+    found = unbounded_loops(parse_solidity(LOOPS))
+
+    assert [(function.name, loop.kind, variable) for function, loop, variable in found] == [
+        ("payAll", "for", "holders"),
+        ("replay", "for", "rounds"),
+    ]
+    assert found[0][1].condition == "i < holders.length"
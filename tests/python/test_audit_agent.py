@@ -0,0 +1,71 @@
+"""Échecs d'outils de l'audit: bloquants sauf dépassement de budget (agents.security.audit_agent)"""
+import asyncio
+import json
+
+import pytest
+
+from agents.security.audit_agent import SecurityAuditAgent, run
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "contracts").mkdir()
+    for name in ("Token", "Vault"):
+        (tmp_path / "contracts" / f"{name}.sol").write_text(f"pragma solidity ^0.8.0;\ncontract {name} {{}}\n")
+    return tmp_path
+
+
+def fake_tools(monkeypatch, analysis):
+    """Slither et Mythril « installés », `analysis(command)` remplace leur exécution"""
+    async def _exec(self, command, timeout):
+        if command[1:] in (["--version"], ["version"]):
+            return "0.10.0\n", "", 0
+        return analysis(command, timeout)
+
+    monkeypatch.setattr(SecurityAuditAgent, "available_tools", lambda self: ["slither", "mythril"])
+    monkeypatch.setattr(SecurityAuditAgent, "_exec", _exec)
+
+
+def audit(project, **config):
+    return asyncio.run(run("audit", config={"cache": False, "deep_mode": False, **config},
+                           project_root=str(project), time_boxed="budgets" in config))
+
+
+def test_compilation_failure_fails_audit(project, monkeypatch):
+    fake_tools(monkeypatch, lambda command, timeout: (json.dumps({"success": False, "error": "Compilation failed"}),
+                                                      "", 1))
+    report = audit(project)
+
+    assert report["blocking"] == 0
+    assert report["failed"] == 4
+    assert report["success"] is False
+    assert not report["partial"]
+
+
+def test_crash_and_full_timeout_fail_audit(project, monkeypatch):
+    fake_tools(monkeypatch, lambda command, timeout: (None, f"Timeout après {timeout:.0f}s", None)
+               if command[0] == "myth" else ("Traceback (most recent call last): ...", "segfault", 1))
+    report = audit(project)
+
+    assert report["failed"] == 4
+    assert {error["tool"] for error in report["errors"]} == {"slither", "mythril"}
+    assert report["success"] is False
+
+
+def test_budget_timeout_is_partial_only(project, monkeypatch):
+    fake_tools(monkeypatch, lambda command, timeout: (None, f"Timeout après {timeout:.0f}s", None)
+               if command[0] == "slither" else (json.dumps({"success": True, "issues": []}), "", 0))
+    report = audit(project, budgets={"slither": 5})
+
+    assert report["failed"] == 0
+    assert report["partial"]
+    assert {entry["tool"] for entry in report["deep"]} == {"slither"}
+    assert report["success"] is True
+
+
+def test_clean_run_succeeds(project, monkeypatch):
+    fake_tools(monkeypatch, lambda command, timeout: (json.dumps({"success": True, "results": {"detectors": []},
+                                                                  "issues": []}), "", 0))
+    report = audit(project)
+
+    assert (report["failed"], report["blocking"], report["success"]) == (0, 0, True)
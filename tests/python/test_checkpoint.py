@@ -0,0 +1,100 @@
+"""Checkpoints: clés d'étapes, reprise et invalidation par les entrées"""
+import pytest
+
+from pipeline.checkpoint import CheckpointStore, hash_inputs
+from pipeline.snapshot import ProjectSnapshot
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "contracts").mkdir()
+    (tmp_path / "contracts" / "Token.sol").write_text("contract Token {}\n")
+    (tmp_path / "hardhat.config.js").write_text("module.exports = {};\n")
+    return tmp_path
+
+
+def test_step_key_without_params():
+    assert CheckpointStore.step_key("gate", "security") == "gate.security"
+    assert CheckpointStore.step_key("agent", "contract_generator", "generate") == "agent.contract_generator.generate"
+
+
+def test_step_key_distinguishes_artifacts():
+    first = CheckpointStore.step_key("agent", "deployment_manager", "prepare",
+                                     {"network": "sepolia", "contract_name": "Token"})
+    second = CheckpointStore.step_key("agent", "deployment_manager", "prepare",
+                                      {"network": "sepolia", "contract_name": "Market"})
+    same = CheckpointStore.step_key("agent", "deployment_manager", "prepare",
+                                    {"contract_name": "Token", "network": "sepolia"})
+    assert first != second
+    assert first == same
+    assert first.startswith("agent.deployment_manager.prepare.")
+
+
+def test_lookup_hit_and_invalidation(project):
+    store = CheckpointStore(project)
+    store.record("gate.security", "hash-1", {"passed": True})
+    assert store.lookup("gate.security", "hash-1") == {"passed": True}
+    assert store.lookup("gate.security", "hash-2") is None
+    assert store.lookup("gate.tests", "hash-1") is None
+    assert store.reused_steps == ["gate.security"]
+
+
+def test_resume_reads_previous_run(project):
+    store = CheckpointStore(project)
+    key = CheckpointStore.step_key("agent", "contract_generator", "generate", {"contract_type": "erc20"})
+    store.record(key, "hash", {"success": True})
+
+    resumed = CheckpointStore(project, run_id=store.run_id, resume=True)
+    assert resumed.lookup(key, "hash") == {"success": True}
+
+
+def test_per_artifact_records_are_kept(project):
+    store = CheckpointStore(project)
+    keys = [CheckpointStore.step_key("agent", "contract_generator", "generate", {"contract_type": kind})
+            for kind in ("erc20", "erc721", "erc1155")]
+    for key in keys:
+        store.record(key, f"hash-{key}", {"key": key})
+    assert [store.lookup(key, f"hash-{key}") for key in keys] == [{"key": key} for key in keys]
+
+
+def test_resume_unknown_run(project):
+    with pytest.raises(FileNotFoundError):
+        CheckpointStore(project, run_id="missing", resume=True)
+
+
+def test_hash_inputs_tracks_content_and_params(project):
+    patterns = ["contracts/**/*.sol", "hardhat.config.js", ".env"]
+    base = hash_inputs(project, patterns, {"gate": "architecture"})
+    assert hash_inputs(project, patterns, {"gate": "architecture"}) == base
+    assert hash_inputs(project, patterns, {"gate": "tests"}) != base
+
+    (project / "contracts" / "Token.sol").write_text("contract Token { uint x; }\n")
+    changed = hash_inputs(project, patterns, {"gate": "architecture"})
+    assert changed != base
+
+    (project / ".env").write_text("NETWORK=sepolia\n")
+    assert hash_inputs(project, patterns, {"gate": "architecture"}) != changed
+
+
+def test_hash_inputs_new_file_matching_glob(project):
+    base = hash_inputs(project, ["contracts/**/*.sol"])
+    (project / "contracts" / "lib").mkdir()
+    (project / "contracts" / "lib" / "Math.sol").write_text("library Math {}\n")
+    assert hash_inputs(project, ["contracts/**/*.sol"]) != base
+
+
+def test_hash_inputs_snapshot_matches_disk(project):
+    patterns = ["contracts/**/*.sol", "hardhat.config.js", "package.json"]
+    snapshot = ProjectSnapshot.build(project)
+    try:
+        assert hash_inputs(project, patterns, {"x": 1}, snapshot=snapshot) == hash_inputs(project, patterns, {"x": 1})
+    finally:
+        snapshot.close()
+
+
+def test_prune_keeps_recent_runs(project):
+    stores = [CheckpointStore(project, run_id=f"run_{i}") for i in range(4)]
+    stores[-1].prune(keep=2)
+    remaining = sorted(d.name for d in (project / "cache" / "runs").iterdir())
+    assert len(remaining) == 2
+    assert stores[-1].run_id in remaining
@@ -0,0 +1,78 @@
+"""Résolution du binaire solc: pas de téléchargement implicite, erreurs en CompilerUnavailable"""
+import asyncio
+import sys
+import types
+
+import pytest
+
+from agents.blockchain.compiler import CompilerUnavailable, SolidityCompiler
+
+SOURCE = "pragma solidity 0.8.20;\ncontract A {}\n"
+
+
+@pytest.fixture
+def compiler(tmp_path, monkeypatch):
+    """Ni solc dans le PATH, ni cache Hardhat, ni solcjs: seules les sources testées comptent"""
+    monkeypatch.setattr(SolidityCompiler, "_binaries", {})
+    monkeypatch.setenv("PATH", str(tmp_path / "bin"))
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.delenv("SOLC_BINARY", raising=False)
+    monkeypatch.delenv("SOLC_AUTO_INSTALL", raising=False)
+    monkeypatch.setitem(sys.modules, "solcx", None)
+    return SolidityCompiler(tmp_path)
+
+
+def fake_solcx(monkeypatch, tmp_path, installed=()):
+    calls = []
+    module = types.SimpleNamespace(
+        get_installed_solc_versions=lambda: list(installed) + calls,
+        install_solc=lambda version: calls.append(version),
+        get_executable=lambda version: tmp_path / f"solc-{version}"
+    )
+    monkeypatch.setitem(sys.modules, "solcx", module)
+    return calls
+
+
+def test_missing_solc_binary_is_unavailable(compiler, tmp_path, monkeypatch):
+    monkeypatch.setenv("SOLC_BINARY", str(tmp_path / "absent" / "solc"))
+    with pytest.raises(CompilerUnavailable, match="SOLC_BINARY"):
+        compiler.resolve("0.8.20")
+    with pytest.raises(CompilerUnavailable):
+        asyncio.run(compiler.compile(SOURCE))
+
+
+def test_solc_binary_vanished_before_spawn(compiler, tmp_path, monkeypatch):
+    binary = tmp_path / "solc"
+    binary.write_text("#!/bin/sh\nexit 0\n")
+    binary.chmod(0o755)
+    monkeypatch.setenv("SOLC_BINARY", str(binary))
+    assert compiler.resolve("0.8.20") == [str(binary)]
+
+    binary.unlink()
+    with pytest.raises(CompilerUnavailable, match="Lancement"):
+        asyncio.run(compiler.compile(SOURCE))
+
+
+def test_installed_solcx_version_is_used(compiler, tmp_path, monkeypatch):
+    calls = fake_solcx(monkeypatch, tmp_path, installed=["0.8.20"])
+    assert compiler.resolve("0.8.20") == [str(tmp_path / "solc-0.8.20")]
+    assert calls == []
+
+
+def test_no_download_without_opt_in(compiler, tmp_path, monkeypatch):
+    calls = fake_solcx(monkeypatch, tmp_path)
+    with pytest.raises(CompilerUnavailable, match="SOLC_AUTO_INSTALL"):
+        compiler.resolve("0.8.20")
+    assert calls == []
+
+
+@pytest.mark.parametrize("opt_in", ["env", "argument"])
+def test_download_with_opt_in(compiler, tmp_path, monkeypatch, opt_in):
+    calls = fake_solcx(monkeypatch, tmp_path)
+    if opt_in == "env":
+        monkeypatch.setenv("SOLC_AUTO_INSTALL", "1")
+        compiler = SolidityCompiler(tmp_path)
+    else:
+        compiler = SolidityCompiler(tmp_path, auto_install=True)
+    assert compiler.resolve("0.8.21") == [str(tmp_path / "solc-0.8.21")]
+    assert calls == ["0.8.21"]
@@ -0,0 +1,41 @@
+"""Ordre de recherche du fichier de configuration (pipeline.config.find_config_file)"""
+from pathlib import Path
+
+from pipeline.config import ARCHITECTURE_CONFIG_FILE, find_config_file, load_config
+
+
+def write(root: Path, relative, text: str = "{}\n") -> Path:
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def test_nothing_found(tmp_path):
+    assert find_config_file(tmp_path, environ={}) is None
+
+
+def test_architecture_config_is_last_resort(tmp_path):
+    architecture = write(tmp_path, ARCHITECTURE_CONFIG_FILE)
+    assert find_config_file(tmp_path, environ={}) == architecture
+
+    json_config = write(tmp_path, "config/pipeline_config.json")
+    assert find_config_file(tmp_path, environ={}) == json_config
+
+    yaml_config = write(tmp_path, "config/pipeline_config.yaml")
+    assert find_config_file(tmp_path, environ={}) == yaml_config
+
+
+def test_explicit_path_and_environment_win(tmp_path):
+    write(tmp_path, ARCHITECTURE_CONFIG_FILE)
+    write(tmp_path, "config/pipeline_config.yaml")
+
+    assert find_config_file(tmp_path, environ={"PIPELINE_CONFIG": "env.json"}) == tmp_path / "env.json"
+    assert find_config_file(tmp_path, Path("cli.yaml"), {"PIPELINE_CONFIG": "env.json"}) == tmp_path / "cli.yaml"
+
+
+def test_architecture_config_loads(tmp_path):
+    write(tmp_path, ARCHITECTURE_CONFIG_FILE,
+          "agents:\n  smart_contract_security:\n    enabled: false\n")
+    config = load_config(tmp_path, environ={}, cache_dir=None)
+    assert config.source == str(tmp_path / ARCHITECTURE_CONFIG_FILE)
@@ -0,0 +1,172 @@
+"""Exécution en flux: étapes chaînées et étapes partagées"""
+import asyncio
+
+import pytest
+
+from pipeline.dag import Artifact, SharedStep, StreamingDAG
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_artifacts_flow_through_stages():
+    async def source():
+        for name in ("A", "B", "C"):
+            yield Artifact("contract", name)
+
+    async def double(artifact):
+        yield artifact
+        yield Artifact("report", artifact.name + "-report")
+
+    async def main():
+        dag = (StreamingDAG()
+               .add_source("conception", source)
+               .add_stage("development", double, ["conception"], concurrency=2))
+        return dag, await dag.run()
+
+    dag, outputs = run(main())
+    assert sorted(a.name for a in outputs["development"]) == ["A", "A-report", "B", "B-report", "C", "C-report"]
+    assert dag.stats["development"].processed == 3
+    assert dag.stats["development"].produced == 6
+
+
+def test_downstream_starts_before_source_ends():
+    events = []
+
+    async def source():
+        yield Artifact("contract", "first")
+        await asyncio.sleep(0.05)
+        events.append("source-end")
+        yield Artifact("contract", "second")
+
+    async def stage(artifact):
+        events.append(f"processed-{artifact.name}")
+        yield artifact
+
+    async def main():
+        await StreamingDAG().add_source("s", source).add_stage("t", stage, ["s"]).run()
+
+    run(main())
+    assert events.index("processed-first") < events.index("source-end")
+
+
+def test_stage_errors_are_recorded():
+    async def source():
+        yield Artifact("contract", "ok")
+        yield Artifact("contract", "bad")
+
+    async def stage(artifact):
+        if artifact.name == "bad":
+            raise RuntimeError("boom")
+        yield artifact
+
+    async def main():
+        dag = StreamingDAG().add_source("s", source).add_stage("t", stage, ["s"])
+        outputs = await dag.run()
+        return dag, outputs
+
+    dag, outputs = run(main())
+    assert [a.name for a in outputs["t"]] == ["ok"]
+    assert dag.stats["t"].errors == ["bad: boom"]
+
+
+def test_unknown_upstream():
+    async def stage(artifact):
+        yield artifact
+
+    with pytest.raises(ValueError):
+        StreamingDAG().add_stage("t", stage, ["missing"])
+
+
+def test_shared_step_runs_once():
+    calls = []
+
+    async def gate():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"passed": True}
+
+    async def main():
+        step = SharedStep(gate)
+        results = await asyncio.gather(*(step.get() for _ in range(5)))
+        return step, results
+
+    step, results = run(main())
+    assert calls == [1]
+    assert results == [{"passed": True}] * 5
+    assert step.result() == {"passed": True}
+
+
+def test_shared_step_waits_for_event():
+    order = []
+
+    async def main():
+        generated = asyncio.Event()
+
+        async def gate():
+            order.append("gate")
+            return True
+
+        step = SharedStep(gate, after=generated)
+        waiting = asyncio.ensure_future(step.get())
+        await asyncio.sleep(0.01)
+        order.append("generated")
+        assert not waiting.done()
+        generated.set()
+        return await waiting
+
+    assert run(main()) is True
+    assert order == ["generated", "gate"]
+
+
+def test_shared_step_gates_see_generated_artifacts():
+    """Une gate partagée attendant la génération n'empêche pas les artefacts existants de circuler"""
+    written = []
+
+    async def main():
+        generated = asyncio.Event()
+        seen = {}
+
+        async def gate():
+            seen["files"] = list(written)
+            return True
+
+        step = SharedStep(gate, after=generated)
+
+        async def source():
+            async def generate():
+                await asyncio.sleep(0.01)
+                written.append("Generated.sol")
+            task = asyncio.ensure_future(generate())
+            task.add_done_callback(lambda _: generated.set())
+            # Plus d'artefacts existants que la file de l'étape suivante ne peut en contenir
+            for i in range(40):
+                yield Artifact("contract", f"Existing{i}")
+            await task
+            yield Artifact("contract", "Generated")
+
+        async def development(artifact):
+            if await step.get():
+                yield artifact
+
+        dag = StreamingDAG().add_source("s", source).add_stage("d", development, ["s"], queue_size=4)
+        outputs = await asyncio.wait_for(dag.run(), timeout=5)
+        return seen, outputs
+
+    seen, outputs = run(main())
+    assert seen["files"] == ["Generated.sol"]
+    assert len(outputs["d"]) == 41
+
+
+def test_shared_step_failure_has_no_result():
+    async def gate():
+        raise RuntimeError("timeout")
+
+    async def main():
+        step = SharedStep(gate)
+        with pytest.raises(RuntimeError):
+            await step.get()
+        return step
+
+    assert run(main()).result() is None
@@ -0,0 +1,113 @@
+"""Plages modifiées d'un `git diff --unified=0` (pipeline.diff_scope.parse_unified_diff)"""
+from pipeline.diff_scope import DiffScope, parse_unified_diff
+
+MODIFIED = """\
+diff --git a/contracts/Token.sol b/contracts/Token.sol
+index 9405325..333c592 100644
+--- a/contracts/Token.sol
++++ b/contracts/Token.sol
+@@ -2 +2 @@ pragma solidity ^0.8.0;
+-    uint256 a;
++    uint256 b;
+@@ -4 +3,0 @@ contract Token {
+-    uint256 d;
+@@ -5,0 +5,2 @@ contract Token {
++    uint256 f;
++    uint256 g;
+"""
+
+DELETED = """\
+diff --git a/contracts/Old.sol b/contracts/Old.sol
+deleted file mode 100644
+index 587be6b..0000000
+--- a/contracts/Old.sol
++++ /dev/null
+@@ -1 +0,0 @@
+-contract Old {}
+"""
+
+ADDED = """\
+diff --git a/contracts/New.sol b/contracts/New.sol
+new file mode 100644
+index 0000000..587be6b
+--- /dev/null
++++ b/contracts/New.sol
+@@ -0,0 +1,3 @@
++contract New {
++}
++
+"""
+
+
+def test_modified_lines():
+    files, deleted = parse_unified_diff(MODIFIED)
+
+    assert files == {"contracts/Token.sol": [(2, 2), (3, 4), (5, 6)]}
+    assert deleted == []
+
+
+def test_pure_deletion_touches_neighbours():
+    files, _ = parse_unified_diff("diff --git a/x.sol b/x.sol\n--- a/x.sol\n+++ b/x.sol\n@@ -1,3 +0,0 @@\n")
+
+    assert files == {"x.sol": [(1, 1)]}
+
+
+def test_deleted_and_added_files():
+    files, deleted = parse_unified_diff(MODIFIED + DELETED + ADDED)
+
+    assert deleted == ["contracts/Old.sol"]
+    assert "contracts/Old.sol" not in files
+    assert files["contracts/New.sol"] == [(1, 3)]
+    assert files["contracts/Token.sol"] == [(2, 2), (3, 4), (5, 6)]
+
+
+def test_quoted_non_ascii_path():
+    diff = (
+        'diff --git "a/\\303\\251t\\303\\251.sol" "b/\\303\\251t\\303\\251.sol"\n'
+        'index 49fd79f..25973d3 100644\n'
+        '--- "a/\\303\\251t\\303\\251.sol"\n'
+        '+++ "b/\\303\\251t\\303\\251.sol"\n'
+        '@@ -1,0 +2 @@ un\n'
+        '+deux\n'
+    )
+
+    assert parse_unified_diff(diff) == ({"été.sol": [(2, 2)]}, [])
+
+
+def test_content_lines_looking_like_headers():
+    diff = (
+        "diff --git a/notes.md b/notes.md\n"
+        "--- a/notes.md\n"
+        "+++ b/notes.md\n"
+        "@@ -3 +3 @@\n"
+        "--- /dev/null\n"
+        "+++ b/other.md\n"
+    )
+
+    assert parse_unified_diff(diff) == ({"notes.md": [(3, 3)]}, [])
+
+
+def test_binary_and_mode_only_changes_have_no_ranges():
+    diff = (
+        "diff --git a/logo.png b/logo.png\n"
+        "index 1111111..2222222 100644\n"
+        "Binary files a/logo.png and b/logo.png differ\n"
+        "diff --git a/run.sh b/run.sh\n"
+        "old mode 100644\n"
+        "new mode 100755\n"
+    )
+
+    assert parse_unified_diff(diff) == ({}, [])
+
+
+def test_scope_touches_parsed_ranges():
+    files, deleted = parse_unified_diff(MODIFIED + DELETED)
+    scope = DiffScope(ref="main", base="abc", files={**files, "contracts/Untracked.sol": None}, deleted=deleted)
+
+    assert scope.touches("contracts/Token.sol", 6)
+    assert scope.touches("contracts/Token.sol", 1, 2)
+    assert not scope.touches("contracts/Token.sol", 7, 20)
+    assert scope.touches("contracts/Token.sol", None)
+    assert scope.touches("contracts/Untracked.sol", 500)
+    assert not scope.touches("contracts/Old.sol", 1)
+    assert scope.lines_changed is None
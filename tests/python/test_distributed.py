@@ -0,0 +1,102 @@
+"""Appels de broker hors de la boucle asyncio (pipeline.distributed)"""
+import asyncio
+import socket
+import time
+
+from pipeline.distributed import (BrokerServer, JobBroker, JobKind, JobState, SocketBroker,
+                                  SQLiteBroker, Worker, wait_for_result)
+from pipeline.models import Finding
+
+
+class SlowBroker(JobBroker):
+    """Broker dont chaque appel bloque comme un socket sans réponse"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def get_result(self, job_id):
+        time.sleep(self.delay)
+        return {"state": JobState.DONE, "result": {"job": job_id}}
+
+    def submit(self, kind, target, payload=None):
+        raise NotImplementedError
+
+    lease = heartbeat = complete = fail = requeue_expired = submit
+
+
+async def ticks_during(coro, interval: float = 0.01) -> int:
+    count = 0
+
+    async def tick():
+        nonlocal count
+        while True:
+            await asyncio.sleep(interval)
+            count += 1
+
+    ticker = asyncio.create_task(tick())
+    try:
+        await coro
+    finally:
+        ticker.cancel()
+    return count
+
+
+def test_wait_for_result_does_not_block_loop():
+    async def scenario():
+        return await ticks_during(wait_for_result(SlowBroker(0.3), "job"))
+
+    assert asyncio.run(scenario()) >= 10
+
+
+class FakeOrchestrator:
+    def take_snapshot(self):
+        pass
+
+    async def run_validation_gate(self, gate):
+        await asyncio.sleep(0.05)
+        return {"gate": gate, "passed": True}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_worker_over_socket_broker(tmp_path):
+    async def scenario():
+        port = free_port()
+        server = asyncio.create_task(
+            BrokerServer(SQLiteBroker(tmp_path / "broker.db"), "127.0.0.1", port).serve_forever())
+        client = SocketBroker("127.0.0.1", port, timeout=5)
+        try:
+            for _ in range(100):
+                try:
+                    job_id = await asyncio.to_thread(client.submit, JobKind.GATE, "security")
+                    break
+                except OSError:
+                    await asyncio.sleep(0.02)
+            worker = Worker(FakeOrchestrator(), client, str, lease_seconds=0.06)
+            assert await worker.run_once()
+            return await wait_for_result(client, job_id, poll_interval=0.01, timeout=5)
+        finally:
+            client.close()
+            server.cancel()
+
+    outcome = asyncio.run(scenario())
+    assert outcome["state"] == JobState.DONE
+    assert outcome["result"] == {"gate": "security", "passed": True}
+
+
+def test_payload_models_survive_sqlite(tmp_path):
+    broker = SQLiteBroker(tmp_path / "broker.db")
+    finding = Finding("reentrancy", "high", "Appel externe avant écriture", file="contracts/Vault.sol", line=12)
+    try:
+        broker.submit(JobKind.AGENT, "security_auditor", {"task": "audit", "findings": [finding],
+                                                          "contracts": {tmp_path / "Vault.sol"}})
+        job = broker.lease("worker", 30)
+    finally:
+        broker.close()
+
+    assert job.payload["findings"] == [finding.to_dict()]
+    assert job.payload["contracts"] == [str(tmp_path / "Vault.sol")]
@@ -0,0 +1,32 @@
+"""Délai entre deux tentatives d'un fournisseur HTTP (agents.llm.client.retry_delay)"""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from agents.llm.client import MAX_RETRY_DELAY, retry_delay
+
+
+def test_seconds():
+    assert retry_delay("7", 0) == 7.0
+    assert retry_delay("1.5", 3) == 1.5
+
+
+@pytest.mark.parametrize("value", [None, "", "bientôt", "nan", "inf"])
+def test_fallback_is_exponential(value):
+    assert [retry_delay(value, attempt) for attempt in range(4)] == [1.0, 2.0, 4.0, 8.0]
+
+
+def test_http_date():
+    date = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 <= retry_delay(format_datetime(date, usegmt=True), 0) <= 30
+
+
+def test_past_http_date_does_not_wait():
+    assert retry_delay("Wed, 21 Oct 2015 07:28:00 GMT", 2) == 0.0
+
+
+def test_bounded():
+    assert retry_delay("86400", 0) == MAX_RETRY_DELAY
+    assert retry_delay("-5", 0) == 0.0
+    assert retry_delay(None, 20) == MAX_RETRY_DELAY
@@ -0,0 +1,131 @@
+"""Formats de rapport json / jsonl / binary, avec et sans gzip (pipeline.report_codec)"""
+import gzip
+import importlib.util
+
+import pytest
+
+from pipeline.models import Finding
+from pipeline.report_codec import (STREAM_MIN_ITEMS, CodecUnavailable, ReportWriter, detect, iter_records, merge,
+                                   read_header, read_report, report_path, split, write_report)
+
+FORMATS = ["json", "jsonl", "binary"]
+COMPRESSIONS = [None, "gzip"]
+
+
+def sample_report():
+    return {
+        "gate": "security",
+        "passed": False,
+        "score": 72.5,
+        "tools": ["slither", "mythril"],
+        "issues": [{"rule": f"R{i}", "line": i, "message": "é ✓"} for i in range(40)],
+        "secrets": {
+            "scanned": 12,
+            "findings": [{"file": f"src/{i}.ts", "severity": "high"} for i in range(STREAM_MIN_ITEMS)]
+        }
+    }
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+@pytest.mark.parametrize("format", FORMATS)
+def test_round_trip(tmp_path, format, compression):
+    path = write_report(tmp_path / "validation_security", sample_report(), format, compression)
+
+    assert path == report_path(tmp_path / "validation_security", format, compression)
+    assert detect(path) == (format, compression)
+    assert read_report(path) == sample_report()
+
+
+@pytest.mark.parametrize("format", FORMATS)
+def test_gzip_output_is_compressed(tmp_path, format):
+    path = write_report(tmp_path / "report", sample_report(), format, "gzip")
+
+    with gzip.open(path, "rb") as f:
+        assert f.read()
+    assert path.stat().st_size < write_report(tmp_path / "plain", sample_report(), format).stat().st_size
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+@pytest.mark.parametrize("format", FORMATS)
+def test_header_keeps_short_lists_only(tmp_path, format, compression):
+    header = read_header(write_report(tmp_path / "report", sample_report(), format, compression))
+
+    assert header["tools"] == ["slither", "mythril"]
+    assert header["secrets"]["scanned"] == 12
+    assert "issues" not in header
+    assert "findings" not in header["secrets"]
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+@pytest.mark.parametrize("format", FORMATS)
+def test_iter_records_by_section(tmp_path, format, compression):
+    path = write_report(tmp_path / "report", sample_report(), format, compression)
+
+    issues = list(iter_records(path, ("issues",)))
+    assert [item["line"] for _, item in issues] == list(range(40))
+    assert {section for section, _ in issues} == {("issues",)}
+
+    findings = [item for _, item in iter_records(path, ["secrets", "findings"])]
+    assert findings == sample_report()["secrets"]["findings"]
+
+    assert len(list(iter_records(path))) == 40 + STREAM_MIN_ITEMS
+
+
+@pytest.mark.parametrize("format", FORMATS)
+def test_writer_streams_models(tmp_path, format):
+    path = report_path(tmp_path / "report", format, "gzip")
+    finding = Finding("OPENAI_API_KEY", "critical", "Clé OpenAI", file=".env", line=3)
+
+    with ReportWriter(path, format, "gzip") as writer:
+        writer.header({"gate": "security"})
+        writer.record(("secrets", "findings"), finding)
+        writer.record(("issues",), {"rule": "R1"})
+        writer.record(("secrets", "findings"), finding)
+
+    assert writer.records == 3
+    assert read_report(path) == {
+        "gate": "security",
+        "secrets": {"findings": [finding.to_dict(), finding.to_dict()]},
+        "issues": [{"rule": "R1"}]
+    }
+
+
+def test_split_and_merge_are_inverse():
+    header, sections = split(sample_report())
+
+    assert [section for section, _ in sections] == [("issues",), ("secrets", "findings")]
+    for section, items in sections:
+        for item in items:
+            merge(header, section, item)
+    assert header == sample_report()
+
+
+def test_detect_and_report_path_reject_unknown(tmp_path):
+    with pytest.raises(ValueError):
+        detect(tmp_path / "report.txt")
+    with pytest.raises(ValueError):
+        report_path(tmp_path / "report", "xml")
+    with pytest.raises(ValueError):
+        report_path(tmp_path / "report", "json", "bz2")
+
+
+def test_truncated_binary(tmp_path):
+    path = write_report(tmp_path / "report", sample_report(), "binary")
+    path.write_bytes(path.read_bytes()[:-3])
+
+    with pytest.raises(ValueError, match="tronqué"):
+        read_report(path)
+
+
+def test_binary_without_signature(tmp_path):
+    path = tmp_path / "report.dpr"
+    path.write_bytes(b"{}")
+
+    with pytest.raises(ValueError, match="signature"):
+        read_header(path)
+
+
+@pytest.mark.skipif(importlib.util.find_spec("zstandard") is not None, reason="zstandard installé")
+def test_zstd_without_package(tmp_path):
+    with pytest.raises(CodecUnavailable):
+        write_report(tmp_path / "report", sample_report(), "jsonl", "zstd")
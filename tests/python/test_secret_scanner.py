@@ -0,0 +1,90 @@
+"""Détection de secrets: règles spécifiques prioritaires sur generic-secret"""
+import pytest
+
+from pipeline.secret_scanner import SecretScanner
+
+# Corps de clé assemblé à l'exécution: ce fichier ne contient lui-même aucun secret détectable
+BODY = "Qm7xK2pL9vR4tW8zN3bC6dF1gH5jS0aY" + "uE7iO2kM4nB9vX3c"
+
+
+# Phrase assemblée à l'exécution, comme BODY
+WORDS = ["abandon", "ability", "able", "about", "above", "absent",
+         "absorb", "abstract", "absurd", "abuse", "access", "accident"]
+
+
+@pytest.fixture
+def scanner(tmp_path):
+    return SecretScanner(tmp_path, cache_path=None)
+
+
+@pytest.mark.parametrize("line, rule", [
+    (f"OPENAI_API_KEY=sk-{'proj'}-{BODY}", "openai-api-key"),
+    (f"ANTHROPIC_API_KEY=sk-{'ant'}-api03-{BODY}", "anthropic-api-key"),
+    (f"GITHUB_TOKEN=gh{'p'}_{BODY[:36]}", "github-token"),
+])
+def test_provider_rule_wins_over_generic_secret(scanner, line, rule):
+    findings = scanner.scan_bytes(line.encode())
+    assert [(f["rule"], f["severity"], f["line"]) for f in findings] == [(rule, "high", 1)]
+
+
+def test_generic_secret_still_reported(scanner):
+    findings = scanner.scan_bytes(f"api_key = 'Zx9{BODY[:25]}'\n".encode())
+    assert [f["rule"] for f in findings] == ["generic-secret"]
+
+
+def test_lines_after_overlapping_matches(scanner):
+    content = "\n".join([
+        f"OPENAI_API_KEY=sk-{'proj'}-{BODY}",
+        "DEBUG=true",
+        f"GITHUB_TOKEN=gh{'p'}_{BODY[:36]}",
+    ]).encode()
+    findings = scanner.scan_bytes(content)
+    assert [(f["rule"], f["line"]) for f in findings] == [("openai-api-key", 1), ("github-token", 3)]
+
+
+@pytest.mark.parametrize("content", [
+    f"MNEMONIC={' '.join(WORDS)}\n",
+    f"MNEMONIC={' '.join(WORDS)}\r\nDEBUG=true\r\n",
+    f"MNEMONIC={' '.join(WORDS)}",
+    f"SEED_PHRASE = {' '.join(WORDS)}   \n",
+    f"MNEMONIC=\"{' '.join(WORDS)}\"\n",
+    f"const mnemonic = '{' '.join(WORDS)}';\n",
+])
+def test_mnemonic_quoted_or_not(scanner, content):
+    findings = scanner.scan_bytes(content.encode())
+    assert [(f["rule"], f["severity"], f["line"]) for f in findings] == [("mnemonic", "high", 1)]
+
+
+def test_public_test_mnemonic_ignored(scanner):
+    assert scanner.scan_bytes(f"MNEMONIC={' '.join(['test'] * 11 + ['junk'])}\n".encode()) == []
+
+
+def test_unquoted_mnemonic_in_env_file_is_blocking(tmp_path):
+    (tmp_path / ".env").write_text(f"RPC_URL=http://localhost:8545\nMNEMONIC={' '.join(WORDS)}\n")
+    scan = SecretScanner(tmp_path, cache_path=None).scan()
+    assert [(f.rule, f.severity, f.line) for f in scan["findings"]] == [("mnemonic", "high", 2)]
+
+
+def test_unignored_env_file_is_blocking(tmp_path):
+    (tmp_path / ".env").write_text(f"OPENAI_API_KEY=sk-{'proj'}-{BODY}\n")
+    scan = SecretScanner(tmp_path, cache_path=None).scan()
+    assert [(f.rule, f.severity, f.file) for f in scan["findings"]] == [("openai-api-key", "high", ".env")]
+    assert scan["env_files"] == [{"file": ".env", "ignored": False}]
+
+
+def test_signature_covers_whole_tree(tmp_path):
+    (tmp_path / "contracts").mkdir()
+    (tmp_path / "contracts" / "Token.sol").write_text("contract Token {}\n")
+    before = SecretScanner(tmp_path, cache_path=None).signature()
+    assert SecretScanner(tmp_path, cache_path=None).signature() == before
+
+    (tmp_path / "frontend").mkdir()
+    (tmp_path / "frontend" / "leak.ts").write_text("export const x = 1;\n")
+    assert SecretScanner(tmp_path, cache_path=None).signature() != before
+
+
+def test_signature_ignores_excluded_outputs(tmp_path):
+    before = SecretScanner(tmp_path, cache_path=None).signature()
+    (tmp_path / "reports").mkdir()
+    (tmp_path / "reports" / "validation.json").write_text("{}")
+    assert SecretScanner(tmp_path, cache_path=None).signature() == before
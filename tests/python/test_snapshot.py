@@ -0,0 +1,71 @@
+"""Contenus de l'instantané: gros fichiers sans descripteur conservé, tables propres (pipeline.snapshot)"""
+import hashlib
+import mmap
+import os
+
+import pytest
+
+from pipeline.secret_scanner import MMAP_THRESHOLD, SecretScanner
+from pipeline.snapshot import ProjectSnapshot
+
+
+def open_fds() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+
+pytestmark = pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="/proc/self/fd requis")
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "data").mkdir()
+    for i in range(40):
+        (tmp_path / "data" / f"blob{i}.txt").write_bytes(b"x" * MMAP_THRESHOLD + f"{i}\n".encode())
+    (tmp_path / "small.txt").write_text("petit\n")
+    return tmp_path
+
+
+def test_large_files_release_their_descriptor(project):
+    snapshot = ProjectSnapshot.build(project)
+    before = open_fds()
+
+    content = snapshot.buffer("data/blob0.txt")
+    assert isinstance(content, mmap.mmap)
+    assert open_fds() == before + 1
+    snapshot.release(content)
+    assert open_fds() == before
+
+    for relative in snapshot.glob("data/*.txt"):
+        assert snapshot.read_bytes(relative).endswith(b"\n")
+        snapshot.digest(relative)
+    assert open_fds() == before
+    assert snapshot.to_dict()["loaded"] == 0
+
+
+def test_secret_scan_keeps_no_descriptor(project):
+    snapshot = ProjectSnapshot.build(project)
+    before = open_fds()
+    SecretScanner(project, cache_path=None, snapshot=snapshot).scan()
+    assert open_fds() == before
+
+
+def test_digest_matches_content(project):
+    snapshot = ProjectSnapshot.build(project)
+    expected = hashlib.sha256((project / "data" / "blob3.txt").read_bytes()).hexdigest()
+    assert snapshot.digest("data/blob3.txt") == expected
+
+
+def test_derived_snapshot_close_leaves_parent_intact(project):
+    parent = ProjectSnapshot.build(project)
+    assert parent.read_bytes("small.txt") == b"petit\n"
+    assert parent.read_bytes("data/blob1.txt")[-2:] == b"1\n"
+
+    (project / "new.txt").write_text("nouveau\n")
+    child = parent.with_files([project / "new.txt"])
+    assert child.read_bytes("small.txt") == b"petit\n"
+    assert "new.txt" in child and "new.txt" not in parent
+
+    child.close()
+    assert parent.to_dict()["loaded"] == 1
+    assert parent.read_bytes("small.txt") == b"petit\n"
+    assert parent.read_bytes("data/blob1.txt")[-2:] == b"1\n"
@@ -0,0 +1,96 @@
+"""Agencement du stockage et empaquetage optimal (agents.blockchain.storage_layout)"""
+from agents.blockchain.analysis import GAS
+from agents.blockchain.storage_layout import StorageItem, _first_fit_decreasing, allocate, analyze_storage, count_slots, pack
+
+MIXED = '''pragma solidity ^0.8.20;
+
+contract Mixed {
+    uint8 a;
+    uint256 b;
+    uint8 c;
+    address d;
+    uint256 e;
+    bool f;
+    address g;
+    uint8 h;
+    uint256 public constant LIMIT = 10;
+
+    function touch() external {
+        a = 1;
+        h = 2;
+    }
+}
+'''
+
+
+def report_of(source, name):
+    return next(report for report in analyze_storage(source) if report.name == name)
+
+
+def test_mixed_layout_optimal_slots():
+    report = report_of(MIXED, "Mixed")
+
+    assert report.current_slots == 5
+    assert report.optimal_slots == 4
+    assert report.optimal is True
+    assert set(report.suggested_order[:2]) == {"b", "e"}
+    assert sorted(report.suggested_order) == ["a", "b", "c", "d", "e", "f", "g", "h"]
+    assert [(item.name, item.slot, item.offset) for item in report.layout] == [
+        ("a", 0, 0), ("b", 1, 0), ("c", 2, 0), ("d", 2, 1), ("e", 3, 0), ("f", 4, 0), ("g", 4, 1), ("h", 4, 21)
+    ]
+    assert report.gas["sstore_init_saved"] == GAS["sstore_set"] - GAS["sload_cold"]
+    assert report.gas["per_function"] == {"touch": GAS["sload_cold"]}
+
+
+def test_suggested_order_allocates_to_optimal_slots():
+    report = report_of(MIXED, "Mixed")
+    by_name = {item.name: item for item in report.layout}
+    ordered = [StorageItem(n, by_name[n].type, by_name[n].size, by_name[n].whole_slots)
+               for n in report.suggested_order]
+
+    assert count_slots(allocate(ordered)) == report.optimal_slots
+
+
+def test_exact_search_beats_first_fit_decreasing():
+    sizes = [20, 13, 10, 8, 6, 6]
+    items = [StorageItem(f"v{i}", f"bytes{size}", size) for i, size in enumerate(sizes)]
+
+    assert len(_first_fit_decreasing(items)) == 3
+    ordered, proven = pack(items)
+    assert count_slots(allocate(ordered)) == 2
+    assert proven is True
+
+
+def test_already_packed_contract():
+    source = "contract Packed {\n    address owner;\n    uint64 since;\n    bool paused;\n    uint256 total;\n}\n"
+    report = report_of(source, "Packed")
+
+    assert (report.current_slots, report.optimal_slots, report.slots_saved) == (2, 2, 0)
+    assert report.suggested_order == ["owner", "since", "paused", "total"]
+
+
+def test_struct_packing_and_inherited_slots():
+    source = '''
+contract Base {
+    uint8 version;
+}
+
+contract Pool is Base {
+    struct Position {
+        uint8 kind;
+        uint256 amount;
+        uint8 flags;
+    }
+    mapping(uint256 => Position) positions;
+    uint128 low;
+    uint256 big;
+    uint128 high;
+}
+'''
+    report = report_of(source, "Pool")
+
+    # Les variables héritées gardent leur slot: celles du contrat commencent au slot 1
+    assert [item.slot for item in report.layout] == [1, 2, 3, 4]
+    assert (report.current_slots, report.optimal_slots) == (4, 3)
+    assert report.structs["Position"]["current_slots"] == 3
+    assert report.structs["Position"]["optimal_slots"] == 2
@@ -0,0 +1,114 @@
+"""Couverture périmée re-mesurée avant le calcul des lacunes (agents.testing.test_generator)"""
+import asyncio
+import json
+
+import pytest
+
+from agents.testing import test_generator as generator
+from pipeline import test_runner as runner
+from pipeline.test_runner import SOURCE_HASH_KEY, ShardResult, merge_coverage, source_hash, stale_sources
+
+TOKEN_V1 = """pragma solidity ^0.8.0;
+contract Token {
+    function mint(uint256 amount) external {
+        if (amount > 10) { revert(); }
+    }
+}
+"""
+# Deux lignes ajoutées en tête de contrat: le `if` passe de la ligne 4 à la ligne 6
+TOKEN_V2 = TOKEN_V1.replace("contract Token {\n", "contract Token {\n    uint256 public supply;\n\n")
+
+
+def entry(line: int, counts, digest=None):
+    data = {
+        "b": {"0": counts},
+        "branchMap": {"0": {"type": "if", "line": line,
+                            "locations": [{"start": {"line": line}}, {"start": {"line": line}}]}},
+        "f": {"0": 1}, "fnMap": {"0": {"name": "mint", "line": 3}}
+    }
+    if digest is not None:
+        data[SOURCE_HASH_KEY] = digest
+    return data
+
+
+def test_merge_sums_same_source_only():
+    merged = merge_coverage([{"a.sol": entry(4, [1, 0], "v1")}, {"a.sol": entry(4, [2, 0], "v1")}])
+    assert merged["a.sol"]["b"]["0"] == [3, 0]
+
+    merged = merge_coverage([{"a.sol": entry(4, [5, 0], "v1")}, {"a.sol": entry(6, [0, 1], "v2")}])
+    assert merged["a.sol"]["b"]["0"] == [0, 1]
+    assert merged["a.sol"]["branchMap"]["0"]["line"] == 6
+
+
+def test_stale_sources(tmp_path):
+    (tmp_path / "a.sol").write_text("contract A {}\n")
+    (tmp_path / "b.sol").write_text("contract B {}\n")
+    (tmp_path / "c.sol").write_text("contract C {}\n")
+    coverage = {
+        "a.sol": entry(1, [1, 1], source_hash(tmp_path / "a.sol")),
+        "b.sol": entry(1, [1, 1], "ancienne"),
+        "c.sol": entry(1, [1, 1])
+    }
+    assert stale_sources(tmp_path, coverage, ["a.sol", "b.sol", "c.sol", "d.sol"]) == ["b.sol", "c.sol", "d.sol"]
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "contracts").mkdir()
+    (tmp_path / "contracts" / "Token.sol").write_text(TOKEN_V1)
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "Token.test.js").write_text('describe("Token", () => {});\n')
+    return tmp_path
+
+
+def fake_runner(monkeypatch, project, calls):
+    """Hardhat simulé: la couverture mesurée est celle du source actuel (if à la ligne 6)"""
+    async def run(self, changed=None):
+        calls.append(sorted(str(p.relative_to(project)) for p in changed) if changed is not None else None)
+        digest = source_hash(project / "contracts" / "Token.sol")
+        self.results = [ShardResult(index=0, files=["tests/Token.test.js"], returncode=0,
+                                    coverage={"contracts/Token.sol": entry(6, [1, 0], digest)})]
+        return {"success": True}
+
+    monkeypatch.setattr(runner.TestRunner, "available", lambda self: None)
+    monkeypatch.setattr(runner.TestRunner, "run", run)
+
+
+def generate(project):
+    agent = generator.TestGeneratorAgent(project, ai_provider="fake", max_rounds=0)
+    return agent, asyncio.run(agent.generate(changed=[project / "contracts" / "Token.sol"]))
+
+
+def test_stale_coverage_is_remeasured(project, monkeypatch):
+    agent = generator.TestGeneratorAgent(project, ai_provider="fake")
+    agent.coverage_path.parent.mkdir(parents=True)
+    # Mesure faite sur TOKEN_V1, le contrat a changé depuis
+    agent.coverage_path.write_text(json.dumps({
+        "contracts/Token.sol": entry(4, [7, 7], source_hash(project / "contracts" / "Token.sol"))
+    }))
+    (project / "contracts" / "Token.sol").write_text(TOKEN_V2)
+    calls = []
+    fake_runner(monkeypatch, project, calls)
+
+    agent, result = generate(project)
+
+    assert calls == [["contracts/Token.sol"]]
+    assert [(gap["line"], gap["branch_index"]) for gap in result["remaining_gaps"]] == [(6, 1)]
+    saved = generator.load_coverage(agent.coverage_path)["contracts/Token.sol"]
+    assert saved["b"]["0"] == [1, 0]
+    assert saved[SOURCE_HASH_KEY] == source_hash(project / "contracts" / "Token.sol")
+
+
+def test_fresh_coverage_is_reused(project, monkeypatch):
+    agent = generator.TestGeneratorAgent(project, ai_provider="fake")
+    agent.coverage_path.parent.mkdir(parents=True)
+    agent.coverage_path.write_text(json.dumps({
+        "contracts/Token.sol": entry(4, [1, 0], source_hash(project / "contracts" / "Token.sol"))
+    }))
+    calls = []
+    fake_runner(monkeypatch, project, calls)
+
+    _, result = generate(project)
+
+    assert calls == []
+    assert [(gap["line"], gap["branch_index"]) for gap in result["remaining_gaps"]] == [(4, 1)]